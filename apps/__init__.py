@@ -42,6 +42,15 @@ class App(object):
         """
         return list(self.app.devices) if self.app is not None else []
 
+    def is_healthy(self):
+        """When implemented, this method checks whether an idle instance of the app can be reused by another workflow,
+        for example whether its connection to the device is still open. Instances which are not healthy are shut down.
+
+        Returns:
+            (bool): True if the instance can be reused
+        """
+        return True
+
     def shutdown(self):
         """When implemented, this method performs shutdown procedures for the app
         """
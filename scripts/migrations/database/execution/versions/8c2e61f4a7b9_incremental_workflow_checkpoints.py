@@ -0,0 +1,138 @@
+"""incremental workflow checkpoints
+
+Revision ID: 8c2e61f4a7b9
+Revises: 5f3a8e4c1b2d
+Create Date: 2026-10-18 14:21:07.532170
+
+"""
+import json
+import logging
+import pickle
+import zlib
+from datetime import datetime
+from io import BytesIO
+
+from alembic import op
+import sqlalchemy as sa
+import sqlalchemy_utils
+
+
+# revision identifiers, used by Alembic.
+revision = '8c2e61f4a7b9'
+down_revision = '5f3a8e4c1b2d'
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+saved_workflow = sa.table('saved_workflow',
+                          sa.column('workflow_execution_id', sa.String),
+                          sa.column('accumulator', sa.LargeBinary),
+                          sa.column('app_instances', sa.LargeBinary),
+                          sa.column('app_devices', sa.Text))
+saved_accumulator_entries = sa.table('saved_accumulator_entries',
+                                     sa.column('workflow_execution_id', sa.String),
+                                     sa.column('data', sa.LargeBinary))
+workflow_status = sa.table('workflow_status',
+                           sa.column('execution_id', sa.String),
+                           sa.column('status', sa.String),
+                           sa.column('completed_at', sa.DateTime))
+action_status = sa.table('action_status',
+                         sa.column('_workflow_status_id', sa.String),
+                         sa.column('status', sa.String))
+
+
+class _StubObject(object):
+    """Stands in for the app instances in an old saved state, which are not needed to convert it"""
+
+    def __new__(cls, *args, **kwargs):
+        return object.__new__(cls)
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __setstate__(self, state):
+        pass
+
+
+class _AppInstancesUnpickler(pickle.Unpickler):
+    def find_class(self, module, name):
+        return _StubObject
+
+
+def _load_app_devices(app_instances):
+    instances = _AppInstancesUnpickler(BytesIO(app_instances)).load()
+    app_devices = []
+    for key in instances:
+        if not (isinstance(key, tuple) and len(key) == 2):
+            raise ValueError('Unexpected app instance key {}'.format(key))
+        app_devices.append(list(key))
+    return app_devices
+
+
+def _abort_executions(connection, execution_ids):
+    for execution_id in execution_ids:
+        connection.execute(saved_workflow.delete().where(saved_workflow.c.workflow_execution_id == execution_id))
+        connection.execute(workflow_status.update().where(sa.and_(
+            workflow_status.c.execution_id == execution_id,
+            workflow_status.c.status.in_(['paused', 'awaiting_data']))).values(
+            status='aborted', completed_at=datetime.utcnow()))
+        connection.execute(action_status.update().where(sa.and_(
+            action_status.c._workflow_status_id == execution_id,
+            action_status.c.status == 'awaiting_data')).values(status='aborted'))
+
+
+def upgrade():
+    op.create_table('saved_accumulator_entries',
+                    sa.Column('id', sa.Integer(), nullable=False),
+                    sa.Column('workflow_execution_id', sqlalchemy_utils.types.uuid.UUIDType(binary=False),
+                              nullable=False),
+                    sa.Column('data', sa.LargeBinary(), nullable=False),
+                    sa.PrimaryKeyConstraint('id'))
+    op.create_index(op.f('ix_saved_accumulator_entries_workflow_execution_id'), 'saved_accumulator_entries',
+                    ['workflow_execution_id'], unique=False)
+    with op.batch_alter_table("saved_workflow") as batch_op:
+        batch_op.add_column(sa.Column('app_devices', sqlalchemy_utils.types.json.JSONType(), nullable=True))
+
+    # Convert saved states to the new format. Saved states which cannot be converted are removed, and their
+    # executions are marked as aborted so that they are not left paused forever.
+    connection = op.get_bind()
+    unconvertible = []
+    rows = connection.execute(sa.select([saved_workflow.c.workflow_execution_id, saved_workflow.c.accumulator,
+                                         saved_workflow.c.app_instances])).fetchall()
+    for execution_id, accumulator, app_instances in rows:
+        try:
+            accumulator = pickle.loads(accumulator)
+            app_devices = _load_app_devices(app_instances)
+        except Exception:
+            logger.warning('Could not convert the saved state of workflow execution {}. Aborting it'.format(
+                execution_id), exc_info=True)
+            unconvertible.append(execution_id)
+            continue
+        if accumulator:
+            connection.execute(saved_accumulator_entries.insert().values(
+                workflow_execution_id=execution_id,
+                data=zlib.compress(pickle.dumps(dict(accumulator), pickle.HIGHEST_PROTOCOL))))
+        connection.execute(saved_workflow.update().where(
+            saved_workflow.c.workflow_execution_id == execution_id).values(app_devices=json.dumps(app_devices)))
+    _abort_executions(connection, unconvertible)
+
+    with op.batch_alter_table("saved_workflow") as batch_op:
+        batch_op.drop_column('accumulator')
+        batch_op.drop_column('app_instances')
+        batch_op.alter_column('app_devices', existing_type=sqlalchemy_utils.types.json.JSONType(), nullable=False)
+
+
+def downgrade():
+    # App instances cannot be re-created in the old format, so saved states are removed and their executions are
+    # marked as aborted
+    connection = op.get_bind()
+    execution_ids = [execution_id for execution_id, in connection.execute(
+        sa.select([saved_workflow.c.workflow_execution_id])).fetchall()]
+    _abort_executions(connection, execution_ids)
+    with op.batch_alter_table("saved_workflow") as batch_op:
+        batch_op.drop_column('app_devices')
+        batch_op.add_column(sa.Column('app_instances', sa.PickleType(), nullable=False))
+        batch_op.add_column(sa.Column('accumulator', sa.PickleType(), nullable=False))
+    op.drop_index(op.f('ix_saved_accumulator_entries_workflow_execution_id'), table_name='saved_accumulator_entries')
+    op.drop_table('saved_accumulator_entries')
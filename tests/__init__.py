@@ -1,3 +1,5 @@
+import sys
+
 __all__ = ['test_action',
            'test_app_action_event_dispatcher',
            'test_app_api_server',
@@ -12,8 +14,11 @@ __all__ = ['test_action',
            'test_authentication',
            'test_branch',
            'test_callback_container',
+           'test_callback_pipeline',
            'test_case_config_db',
            'test_case_database',
+           'test_case_event_writer',
+           'test_case_retention',
            'test_case_server',
            'test_case_subscriptions',
            'test_configuration_server',
@@ -36,14 +41,19 @@ __all__ = ['test_action',
            'test_messaging_endpoints',
            'test_metrics',
            'test_metrics_server',
+           'test_metrics_histogram',
+           'test_notification_streams',
            'test_playbook',
+           'test_parallel_workflow',
            'test_problem',
+           'test_result_encoding',
            'test_roles_pages_database',
            'test_roles_server',
            'test_scheduledtasks_database',
            'test_scheduledtasks_server',
            'test_scheduler_actions',
            'test_scheduler',
+           'test_sse_stream',
            'test_simple_workflow',
            'test_system_server',
            'test_trigger_helpers',
@@ -55,8 +65,20 @@ __all__ = ['test_action',
            'test_workflow_authorization',
            'test_workflow_authorization_cache',
            'test_workflow_authorized_user_set',
+           'test_workflow_cache',
            'test_workflow_server',
            'test_workflow_status',
+           'test_workflow_status_recorder',
+           'test_workflow_checkpoint',
+           'test_execution_database',
+           'test_app_instance_pool',
+           'test_device_config_cache',
+           'test_worker_autoscaler',
+           'test_pending_workflow_queue',
+           'test_load_balancer',
            'test_zmq_communication',
            'test_zmq_communication_server',
            'testapps']
+
+if sys.version_info >= (3, 7):
+    __all__.append('test_asyncio_worker')
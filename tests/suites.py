@@ -1,3 +1,4 @@
+import sys
 from unittest import TestLoader, TestSuite
 
 from . import *
@@ -7,18 +8,20 @@ def add_tests_to_suite(suite, test_modules):
     suite.addTests([TestLoader().loadTestsFromModule(test_module) for test_module in test_modules])
 
 
-__case_tests = [test_case_subscriptions, test_case_database, test_case_config_db]
+__case_tests = [test_case_subscriptions, test_case_database, test_case_config_db, test_case_event_writer,
+                test_case_retention]
 case_suite = TestSuite()
 add_tests_to_suite(case_suite, __case_tests)
 
 __server_tests = [test_workflow_server, test_app_api_server, test_case_server, test_configuration_server,
                   test_scheduler_actions,
-                  test_device_server, test_app_blueprint, test_metrics_server,
+                  test_device_server, test_app_blueprint, test_metrics_server, test_metrics_histogram,
                   test_scheduledtasks_database, test_scheduledtasks_server, test_authentication, test_roles_server,
                   test_users_server, test_message_history_database, test_message_db,
                   test_message, test_messaging_endpoints, test_workflow_authorization,
                   test_workflow_authorized_user_set, test_workflow_authorization_cache, test_trigger_helpers,
-                  test_system_server, test_workflow_status, test_problem]
+                  test_system_server, test_workflow_status, test_problem, test_sse_stream,
+                  test_notification_streams]
 server_suite = TestSuite()
 add_tests_to_suite(server_suite, __server_tests)
 
@@ -28,15 +31,21 @@ __execution_tests = [test_argument, test_execution_events, test_execution_modes,
                      test_app_utilities, test_input_validation, test_decorators,
                      test_app_api_validation, test_condition_transform_validation,
                      test_roles_pages_database, test_users_roles_database, test_playbook,
-                     test_scheduler, test_walkoff_tag, test_app_cache, test_app_base]
+                     test_scheduler, test_walkoff_tag, test_app_cache, test_app_base, test_workflow_status_recorder,
+                     test_callback_pipeline, test_result_encoding, test_workflow_checkpoint,
+                     test_execution_database, test_app_instance_pool, test_device_config_cache,
+                     test_worker_autoscaler, test_pending_workflow_queue]
 execution_suite = TestSuite()
 add_tests_to_suite(execution_suite, __execution_tests)
 
-__workflow_tests = [test_simple_workflow, test_workflow_manipulation]
+__workflow_tests = [test_simple_workflow, test_workflow_manipulation, test_workflow_cache, test_parallel_workflow]
+if sys.version_info >= (3, 7):
+    __workflow_tests.append(test_asyncio_worker)
 workflow_suite = TestSuite()
 add_tests_to_suite(workflow_suite, __workflow_tests)
 
-__integration_tests = [test_zmq_communication, test_zmq_communication_server, test_triggers_server]
+__integration_tests = [test_load_balancer, test_zmq_communication, test_zmq_communication_server,
+                       test_triggers_server]
 integration_suite = TestSuite()
 add_tests_to_suite(integration_suite, __integration_tests)
 
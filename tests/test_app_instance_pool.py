@@ -0,0 +1,114 @@
+import unittest
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+import walkoff.appgateway
+from tests.config import test_apps_path
+from tests.util import execution_db_help
+from walkoff import executiondb
+from walkoff.appgateway.appinstancepool import AppInstancePool
+from walkoff.appgateway.appinstancerepo import AppInstanceRepo
+from walkoff.executiondb.device import App, Device
+
+MockAction = namedtuple('MockAction', ['app_name', 'device_id'])
+
+
+class TestAppInstancePool(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        execution_db_help.setup_dbs()
+        walkoff.appgateway.cache_apps(test_apps_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        execution_db_help.tear_down_device_db()
+        walkoff.appgateway.clear_cache()
+
+    def setUp(self):
+        self.pool = AppInstancePool(max_size=10, max_per_device=2, ttl=60)
+
+    def tearDown(self):
+        for app in executiondb.execution_db.session.query(App).all():
+            executiondb.execution_db.session.delete(app)
+        executiondb.execution_db.session.commit()
+
+    def test_released_instance_reused(self):
+        instance = self.pool.lease('HelloWorld', None)
+        self.pool.release('HelloWorld', None, instance)
+        self.assertIs(self.pool.lease('HelloWorld', None), instance)
+        self.assertDictEqual(self.pool.get_statistics(), {'idle': 0, 'hits': 1, 'misses': 1, 'evictions': 0})
+
+    def test_instances_not_shared_between_devices(self):
+        instance = self.pool.lease('HelloWorld', None)
+        self.pool.release('HelloWorld', None, instance)
+        self.assertIsNot(self.pool.lease('HelloWorld', 'other'), instance)
+
+    def test_max_per_device(self):
+        instances = [self.pool.lease('HelloWorld', None) for _ in range(3)]
+        for instance in instances:
+            self.pool.release('HelloWorld', None, instance)
+        self.assertEqual(self.pool.get_statistics()['idle'], 2)
+        self.assertEqual(self.pool.get_statistics()['evictions'], 1)
+
+    def test_least_recently_used_evicted(self):
+        self.pool.max_size = 1
+        first = self.pool.lease('HelloWorld', 'first')
+        second = self.pool.lease('HelloWorld', 'second')
+        self.pool.release('HelloWorld', 'first', first)
+        self.pool.release('HelloWorld', 'second', second)
+        self.assertIsNot(self.pool.lease('HelloWorld', 'first'), first)
+        self.assertIs(self.pool.lease('HelloWorld', 'second'), second)
+
+    def test_expired_instance_not_reused(self):
+        instance = self.pool.lease('HelloWorld', None)
+        self.pool.release('HelloWorld', None, instance)
+        self.pool.ttl = -1
+        self.assertIsNot(self.pool.lease('HelloWorld', None), instance)
+        self.assertEqual(self.pool.get_statistics()['evictions'], 1)
+
+    def test_unhealthy_instance_not_reused(self):
+        instance = self.pool.lease('HelloWorld', None)
+        instance().is_healthy = lambda: False
+        self.pool.release('HelloWorld', None, instance)
+        self.assertIsNot(self.pool.lease('HelloWorld', None), instance)
+
+    def test_failing_health_check_not_reused(self):
+        def is_healthy():
+            raise ValueError()
+
+        instance = self.pool.lease('HelloWorld', None)
+        instance().is_healthy = is_healthy
+        self.pool.release('HelloWorld', None, instance)
+        self.assertIsNot(self.pool.lease('HelloWorld', None), instance)
+
+    def test_instance_of_modified_device_not_reused(self):
+        device = Device('test', [], [], 'type')
+        executiondb.execution_db.session.add(App('HelloWorld', devices=[device]))
+        executiondb.execution_db.session.commit()
+        instance = self.pool.lease('HelloWorld', device.id)
+        self.pool.release('HelloWorld', device.id, instance)
+        device.modified_at = datetime.utcnow() + timedelta(minutes=1)
+        executiondb.execution_db.session.commit()
+        self.assertIsNot(self.pool.lease('HelloWorld', device.id), instance)
+
+    def test_invalid_app_not_pooled(self):
+        instance = self.pool.lease('InvalidApp', None)
+        self.pool.release('InvalidApp', None, instance)
+        self.assertEqual(self.pool.get_statistics()['idle'], 0)
+
+    def test_clear(self):
+        self.pool.release('HelloWorld', None, self.pool.lease('HelloWorld', None))
+        self.pool.clear()
+        self.assertEqual(self.pool.get_statistics()['idle'], 0)
+
+    def test_repo_leases_and_releases(self):
+        repo = AppInstanceRepo(pool=self.pool)
+        device_id = repo.setup_app_instance(MockAction('HelloWorld', None))
+        instance = repo.get_app_instance(device_id)
+        repo.shutdown_instances()
+        self.assertEqual(self.pool.get_statistics()['idle'], 1)
+        repo = AppInstanceRepo.from_app_devices([['HelloWorld', None]])
+        self.assertIsNot(repo.get_app_instance(device_id), instance)
+        repo = AppInstanceRepo(pool=self.pool)
+        repo.setup_app_instance(MockAction('HelloWorld', None))
+        self.assertIs(repo.get_app_instance(device_id), instance)
@@ -0,0 +1,127 @@
+import sys
+import threading
+import time
+import unittest
+from uuid import uuid4
+
+import walkoff.appgateway
+import walkoff.config.config
+from tests import config
+from tests.util import execution_db_help
+from walkoff.appgateway.actionresult import ActionResult
+from walkoff.appgateway.decorators import action, is_coroutine_action
+from walkoff.executiondb.action import Action
+from walkoff.executiondb.argument import Argument
+from walkoff.executiondb.branch import Branch
+from walkoff.executiondb.workflow import Workflow, get_executing_workflow
+from walkoff.multiprocessedexecutor.worker import get_workflow_slots
+
+asyncio_supported = sys.version_info >= (3, 7)
+
+if asyncio_supported:
+    import asyncio
+    from tests.util.asyncactions import async_plus_one, async_buggy, executing_workflows
+    from walkoff.multiprocessedexecutor.asyncioworker import AsyncioWorkflowExecutor
+
+
+@unittest.skipUnless(asyncio_supported, 'The asyncio worker mode requires Python 3.7 or later')
+class TestAsyncioWorker(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        execution_db_help.setup_dbs()
+        walkoff.appgateway.cache_apps(config.test_apps_path)
+        walkoff.config.config.load_app_apis(apps_path=config.test_apps_path)
+
+    def setUp(self):
+        self.executor = AsyncioWorkflowExecutor(max_threads=1)
+        del executing_workflows[:]
+
+    def tearDown(self):
+        self.executor.shutdown(timeout=2)
+        walkoff.config.config.worker_mode = 'threads'
+
+    @classmethod
+    def tearDownClass(cls):
+        walkoff.appgateway.clear_cache()
+        execution_db_help.tear_down_device_db()
+
+    @staticmethod
+    def plus_one(name, executable=None, number=None, reference=None):
+        argument = Argument('number', value=number) if number is not None else Argument('number', reference=reference)
+        action_ = Action('HelloWorld', 'returnPlusOne', name, id=uuid4(), arguments=[argument])
+        if executable is not None:
+            action_._action_executable = executable
+        return action_
+
+    def build_workflow(self, *executables):
+        actions = [self.plus_one('action0', executable=executables[0], number=1)]
+        for i, executable in enumerate(executables[1:]):
+            actions.append(self.plus_one('action{}'.format(i + 1), executable=executable, reference=actions[-1].id))
+        branches = [Branch(source_id=source.id, destination_id=destination.id)
+                    for source, destination in zip(actions, actions[1:])]
+        workflow = Workflow('workflow', actions[0].id, actions=actions, branches=branches)
+        workflow.reset()
+        workflow.set_execution_id(str(uuid4()))
+        return workflow, actions
+
+    def execute(self, *workflows):
+        checked_in = []
+        futures = [self.executor.submit(lambda workflow_=workflow: workflow_, checked_in.append)
+                   for workflow in workflows]
+        for future in futures:
+            future.result(timeout=10)
+        self.assertEqual(len(checked_in), len(workflows))
+
+    def test_coroutine_action_decorator(self):
+        self.assertTrue(is_coroutine_action(async_plus_one))
+        result = asyncio.new_event_loop().run_until_complete(async_plus_one(1))
+        self.assertIsInstance(result, ActionResult)
+        self.assertEqual(result.result, 2)
+
+    def test_coroutine_action_executed_synchronously(self):
+        action_ = self.plus_one('action', executable=async_plus_one, number=1)
+        result = action_.execute(instance=None, accumulator={})
+        self.assertEqual(result.result, 2)
+        self.assertEqual(action_.get_output().result, 2)
+
+    def test_coroutine_actions_executed_concurrently(self):
+        workflows = [self.build_workflow(async_plus_one, async_plus_one)[0] for _ in range(20)]
+        start = time.time()
+        self.execute(*workflows)
+        self.assertLess(time.time() - start, 2)
+        for workflow in workflows:
+            self.assertListEqual(sorted(workflow.get_accumulator().values()), [2, 3])
+        self.assertEqual(len(executing_workflows), 40)
+        for workflow in workflows:
+            self.assertEqual(executing_workflows.count(workflow), 2)
+
+    def test_sync_actions_executed_on_thread_pool(self):
+        threads = []
+
+        @action
+        def plus_one(number):
+            threads.append(threading.current_thread())
+            executing_workflows.append(get_executing_workflow())
+            return number + 1
+
+        workflow, _ = self.build_workflow(plus_one, async_plus_one)
+        self.execute(workflow)
+        self.assertListEqual(sorted(workflow.get_accumulator().values()), [2, 3])
+        self.assertNotEqual(threads[0], self.executor._thread)
+        self.assertListEqual(executing_workflows, [workflow, workflow])
+
+    def test_coroutine_action_error(self):
+        workflow, actions = self.build_workflow(async_buggy)
+        self.execute(workflow)
+        self.assertEqual(actions[0].get_output().status, 'UnhandledException')
+
+    def test_workflow_not_checked_out(self):
+        checked_in = []
+        self.executor.submit(lambda: None, checked_in.append).result(timeout=10)
+        self.assertListEqual(checked_in, [])
+
+    def test_workflow_slots(self):
+        walkoff.config.config.worker_mode = 'threads'
+        self.assertEqual(get_workflow_slots(), walkoff.config.config.num_threads_per_process)
+        walkoff.config.config.worker_mode = 'asyncio'
+        self.assertEqual(get_workflow_slots(), walkoff.config.config.asyncio_workflows_per_process)
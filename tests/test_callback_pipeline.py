@@ -0,0 +1,76 @@
+import threading
+import time
+import unittest
+
+from walkoff.multiprocessedexecutor.callbackpipeline import CallbackPipeline
+
+
+class TestCallbackPipeline(unittest.TestCase):
+    def setUp(self):
+        self.handled = []
+        self.handled_lock = threading.Lock()
+
+    def handle(self, item):
+        with self.handled_lock:
+            self.handled.append(item)
+
+    def test_all_items_handled_before_stop_returns(self):
+        pipeline = CallbackPipeline(self.handle, 4, 1000)
+        pipeline.start()
+        for i in range(50):
+            pipeline.put('key{}'.format(i % 7), i)
+        pipeline.stop()
+        self.assertSetEqual(set(self.handled), set(range(50)))
+        self.assertDictEqual(pipeline.get_statistics(),
+                             {'queue_depth': 0, 'processed': 50, 'backpressure': 0, 'dropped': 0})
+
+    def test_items_with_same_key_handled_in_order(self):
+        pipeline = CallbackPipeline(self.handle, 4, 1000)
+        pipeline.start()
+        for i in range(200):
+            pipeline.put('key{}'.format(i % 5), ('key{}'.format(i % 5), i))
+        pipeline.stop()
+        for key in ('key{}'.format(i) for i in range(5)):
+            values = [value for item_key, value in self.handled if item_key == key]
+            self.assertListEqual(values, sorted(values))
+            self.assertEqual(len(values), 40)
+
+    def test_handler_errors_do_not_stop_consumers(self):
+        def handle(item):
+            if item == 1:
+                raise ValueError()
+            self.handle(item)
+
+        pipeline = CallbackPipeline(handle, 1, 10)
+        pipeline.start()
+        for i in range(3):
+            pipeline.put('key', i)
+        pipeline.stop()
+        self.assertListEqual(self.handled, [0, 2])
+        self.assertEqual(pipeline.processed_count, 3)
+
+    def test_backpressure(self):
+        release = threading.Event()
+
+        def handle(item):
+            release.wait()
+            self.handle(item)
+
+        pipeline = CallbackPipeline(handle, 1, 2)
+        pipeline.start()
+        blocked_put = threading.Thread(target=lambda: [pipeline.put('key', i) for i in range(5)])
+        blocked_put.start()
+        time.sleep(0.2)
+        self.assertTrue(blocked_put.is_alive())
+        self.assertEqual(pipeline.queue_depth, 2)
+        self.assertGreaterEqual(pipeline.backpressure_count, 1)
+        release.set()
+        blocked_put.join()
+        pipeline.stop()
+        self.assertListEqual(self.handled, list(range(5)))
+        self.assertEqual(pipeline.dropped_count, 0)
+
+    def test_record_dropped(self):
+        pipeline = CallbackPipeline(self.handle, 1, 10)
+        pipeline.record_dropped()
+        self.assertEqual(pipeline.get_statistics()['dropped'], 1)
@@ -1,5 +1,6 @@
 import json
 import unittest
+from datetime import datetime
 
 import walkoff.case.database as case_database
 from tests.util import execution_db_help
@@ -133,6 +134,29 @@ class TestCaseDatabase(unittest.TestCase):
             self.assertSetEqual(set(event_cases), set(message_cases),
                                 'Expected cases does not equal received cases info for event {0}'.format(event_message))
 
+    def test_add_events(self):
+        TestCaseDatabase.__construct_basic_db()
+        existing = case_database.Event(type='SYSTEM', message='message0')
+        case_database.case_db.add_event(event=existing, cases=['case1'])
+        case_ids = case_database.case_db.get_case_ids(['case1', 'case2', 'case3'])
+        events = [({'type': 'WORKFLOW', 'timestamp': datetime(2018, 1, 1, i), 'originator': 'id1',
+                    'message': 'message{}'.format(i), 'data': ''}, case_id_list)
+                  for i, case_id_list in enumerate([[case_ids['case1'], case_ids['case2']],
+                                                    [],
+                                                    [case_ids['case3']]], start=1)]
+        case_database.case_db.add_events(events)
+
+        added = case_database.case_db.session.query(case_database.Event) \
+            .filter(case_database.Event.id > existing.id).order_by(case_database.Event.id).all()
+        self.assertListEqual([event.id for event in added], [existing.id + 1, existing.id + 2, existing.id + 3])
+        self.assertListEqual([event.message for event in added], ['message1', 'message2', 'message3'])
+        self.assertListEqual([sorted(case.name for case in event.cases) for event in added],
+                             [['case1', 'case2'], [], ['case3']])
+
+    def test_add_events_none(self):
+        case_database.case_db.add_events([])
+        self.assertEqual(case_database.case_db.session.query(case_database.Event).count(), 0)
+
     def test_edit_note(self):
         TestCaseDatabase.__construct_basic_db()
 
@@ -209,3 +233,50 @@ class TestCaseDatabase(unittest.TestCase):
         for event in event_json_list:
             self.assertIn(event['message'], input_output)
             self.assertEqual(event['data'], input_output[event['message']])
+
+    @staticmethod
+    def __add_case_events():
+        TestCaseDatabase.__construct_basic_db()
+        case_id = case_database.case_db.get_case_ids(['case1'])['case1']
+        for i in range(7):
+            event = case_database.Event(type='ACTION' if i % 2 else 'WORKFLOW', originator='id{}'.format(i % 3),
+                                        message='message{}'.format(i), timestamp=datetime(2018, 1, 1, i))
+            case_database.case_db.add_event(event=event, cases=['case1'] if i != 3 else ['case2'])
+        return case_id
+
+    def test_get_case_events_pages(self):
+        case_id = TestCaseDatabase.__add_case_events()
+        messages = []
+        after = None
+        while True:
+            events = case_database.case_db.get_case_events(case_id, after=after, limit=2)
+            if not events:
+                break
+            self.assertLessEqual(len(events), 2)
+            messages.extend(event.message for event in events)
+            after = events[-1].id
+        self.assertListEqual(messages, ['message0', 'message1', 'message2', 'message4', 'message5', 'message6'])
+
+    def test_get_case_events_filters(self):
+        case_id = TestCaseDatabase.__add_case_events()
+
+        def get_messages(**filters):
+            return [event.message for event in case_database.case_db.get_case_events(case_id, **filters)]
+
+        self.assertListEqual(get_messages(event_type='ACTION'), ['message1', 'message5'])
+        self.assertListEqual(get_messages(originator='id1'), ['message1', 'message4'])
+        self.assertListEqual(get_messages(start=datetime(2018, 1, 1, 2), end=datetime(2018, 1, 1, 5)),
+                             ['message2', 'message4', 'message5'])
+        self.assertListEqual(get_messages(event_type='WORKFLOW', start=datetime(2018, 1, 1, 1), limit=1),
+                             ['message2'])
+
+    def test_iter_case_events(self):
+        case_id = TestCaseDatabase.__add_case_events()
+        for batch_size in (1, 2, 6, 100):
+            self.assertListEqual(
+                [event.message for event in case_database.case_db.iter_case_events(case_id, batch_size=batch_size)],
+                ['message0', 'message1', 'message2', 'message4', 'message5', 'message6'])
+        self.assertListEqual(
+            [event.message for event in case_database.case_db.iter_case_events(case_id, batch_size=1,
+                                                                              event_type='ACTION')],
+            ['message1', 'message5'])
@@ -0,0 +1,118 @@
+import unittest
+
+import walkoff.case.database as case_database
+from tests.util import execution_db_help
+from walkoff.case.eventwriter import CaseEventWriter
+from walkoff.case.subscription import set_subscriptions
+
+
+class TestCaseEventWriter(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        execution_db_help.setup_dbs()
+
+    @classmethod
+    def tearDownClass(cls):
+        execution_db_help.tear_down_device_db()
+        case_database.case_db.tear_down()
+
+    def setUp(self):
+        case_database.initialize()
+        set_subscriptions({'case1': {'id1': ['e1']}, 'case2': {'id1': ['e1']}, 'case3': {}})
+        self.writer = CaseEventWriter(flush_interval=60, max_pending=3, durability='batched')
+
+    def tearDown(self):
+        self.writer.stop()
+        case_database.case_db.session.query(case_database.Event).delete()
+        case_database.case_db.session.query(case_database.Case).delete()
+        case_database.case_db.session.commit()
+
+    @staticmethod
+    def get_case_events(case_name):
+        case_database.case_db.session.expire_all()
+        case = case_database.case_db.session.query(case_database.Case).filter_by(name=case_name).first()
+        return [event.as_json() for event in case.events]
+
+    def add_event(self, message, case_names):
+        self.writer.add_event('action', 'id1', message, '"data"', case_names)
+
+    def test_immediate(self):
+        writer = CaseEventWriter(durability='immediate')
+        writer.add_event('action', 'id1', 'message', '"data"', ['case1', 'case2'])
+        for case_name in ('case1', 'case2'):
+            events = self.get_case_events(case_name)
+            self.assertEqual(len(events), 1)
+            self.assertEqual(events[0]['message'], 'message')
+            self.assertEqual(events[0]['originator'], 'id1')
+            self.assertEqual(events[0]['data'], 'data')
+        self.assertListEqual(self.get_case_events('case3'), [])
+
+    def test_batched_without_thread_writes_immediately(self):
+        self.add_event('message', ['case1'])
+        self.assertEqual(len(self.get_case_events('case1')), 1)
+
+    def test_batched_waits_for_flush(self):
+        self.writer.start()
+        self.add_event('message1', ['case1'])
+        self.add_event('message2', ['case1', 'case2'])
+        self.assertListEqual(self.get_case_events('case1'), [])
+        self.writer.flush()
+        self.assertListEqual([event['message'] for event in self.get_case_events('case1')], ['message1', 'message2'])
+        self.assertListEqual([event['message'] for event in self.get_case_events('case2')], ['message2'])
+
+    def test_batched_flushes_when_full(self):
+        self.writer.start()
+        for i in range(3):
+            self.add_event('message{}'.format(i), ['case1'])
+        for _ in range(20):
+            if len(self.get_case_events('case1')) == 3:
+                break
+            self.writer._thread.join(0.05)
+        self.assertEqual(len(self.get_case_events('case1')), 3)
+
+    def test_stop_writes_pending(self):
+        self.writer.start()
+        self.add_event('message', ['case2'])
+        self.writer.stop()
+        self.assertEqual(len(self.get_case_events('case2')), 1)
+
+    def test_untracked_case_ignored(self):
+        self.writer.add_event('action', 'id1', 'message', '', ['case1', 'invalid'])
+        self.assertEqual(len(self.get_case_events('case1')), 1)
+
+    def test_renamed_case(self):
+        case_database.case_db.get_case_ids(['case1'])
+        case_database.case_db.rename_case('case1', 'renamed')
+        self.writer.add_event('action', 'id1', 'message', '', ['renamed'])
+        self.assertEqual(len(self.get_case_events('renamed')), 1)
+
+    @staticmethod
+    def fail_next_write():
+        def add_events(events):
+            del case_database.case_db.add_events
+            raise Exception('database is locked')
+
+        case_database.case_db.add_events = add_events
+
+    def test_failed_flush_retried(self):
+        self.writer.start()
+        self.add_event('message1', ['case1'])
+        self.fail_next_write()
+        self.writer.flush()
+        self.assertListEqual(self.get_case_events('case1'), [])
+        self.add_event('message2', ['case1'])
+        self.writer.flush()
+        self.assertListEqual([event['message'] for event in self.get_case_events('case1')], ['message1', 'message2'])
+
+    def test_failed_flush_keeps_newest_unwritten(self):
+        writer = CaseEventWriter(flush_interval=60, max_pending=10, durability='batched', max_unwritten=2)
+        writer.start()
+        try:
+            for i in range(3):
+                writer.add_event('action', 'id1', 'message{}'.format(i), '"data"', ['case1'])
+            self.fail_next_write()
+            writer.flush()
+            self.assertEqual(len(writer._pending), 2)
+        finally:
+            writer.stop()
+        self.assertListEqual([event['message'] for event in self.get_case_events('case1')], ['message1', 'message2'])
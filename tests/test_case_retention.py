@@ -0,0 +1,116 @@
+import gzip
+import shutil
+import unittest
+from datetime import datetime, timedelta
+from os.path import join
+
+import walkoff.case.database as case_database
+from tests.util import execution_db_help
+from walkoff.case.retention import (CaseEventRetention, iter_archived_events, get_archived_days,
+                                    get_archive_file_path)
+from walkoff.case.subscription import set_subscriptions
+
+
+class TestCaseRetention(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        execution_db_help.setup_dbs()
+        cls.archive_path = join('.', 'tests', 'tmp', 'case_archives')
+
+    @classmethod
+    def tearDownClass(cls):
+        execution_db_help.tear_down_device_db()
+        case_database.case_db.tear_down()
+
+    def setUp(self):
+        case_database.initialize()
+        set_subscriptions({'case1': {'id1': ['e1']}, 'case2': {'id1': ['e1']}})
+        self.now = datetime.utcnow()
+        for i in range(10):
+            event = case_database.Event(type='ACTION' if i % 2 else 'WORKFLOW', originator='id1',
+                                        message='message{}'.format(i), data='{"i": %d}' % i,
+                                        timestamp=self.now - timedelta(days=10 - i, hours=-1))
+            case_database.case_db.add_event(event=event, cases=['case1', 'case2'] if i < 5 else ['case1'])
+
+    def tearDown(self):
+        case_database.case_db.session.query(case_database.Event).delete()
+        case_database.case_db.session.query(case_database.Case).delete()
+        case_database.case_db.session.commit()
+        shutil.rmtree(self.archive_path, ignore_errors=True)
+
+    def get_retention(self, **kwargs):
+        kwargs.setdefault('batch_size', 3)
+        return CaseEventRetention(archive_path=self.archive_path, **kwargs)
+
+    @staticmethod
+    def get_messages_in_database():
+        case_database.case_db.session.expire_all()
+        return [event.message for event in
+                case_database.case_db.session.query(case_database.Event).order_by(case_database.Event.id)]
+
+    def test_no_limits(self):
+        self.assertEqual(self.get_retention().expire_events(), 0)
+        self.assertEqual(len(self.get_messages_in_database()), 10)
+        self.assertListEqual(get_archived_days(self.archive_path), [])
+
+    def test_max_age(self):
+        self.assertEqual(self.get_retention(max_age=5, expiry='delete').expire_events(), 5)
+        self.assertListEqual(self.get_messages_in_database(), ['message{}'.format(i) for i in range(5, 10)])
+        self.assertListEqual(get_archived_days(self.archive_path), [])
+        self.assertEqual(case_database.case_db.session.query(case_database._CaseEventLink).count(), 5)
+
+    def test_max_count(self):
+        self.assertEqual(self.get_retention(max_count=4, expiry='delete').expire_events(), 6)
+        self.assertListEqual(self.get_messages_in_database(), ['message{}'.format(i) for i in range(6, 10)])
+
+    def test_both_limits(self):
+        self.assertEqual(self.get_retention(max_age=8, max_count=5, expiry='delete').expire_events(), 5)
+        self.assertEqual(self.get_retention(max_age=3, max_count=5, expiry='delete').expire_events(), 2)
+        self.assertListEqual(self.get_messages_in_database(), ['message{}'.format(i) for i in range(7, 10)])
+
+    def test_archive(self):
+        self.assertEqual(self.get_retention(max_age=5, expiry='archive').expire_events(), 5)
+        days = get_archived_days(self.archive_path)
+        self.assertEqual(len(days), 5)
+        with gzip.open(get_archive_file_path(days[0], self.archive_path), 'rb') as archive_file:
+            self.assertEqual(len(archive_file.read().splitlines()), 1)
+        events = list(iter_archived_events(archive_path=self.archive_path))
+        self.assertListEqual([event['message'] for event in events], ['message{}'.format(i) for i in range(5)])
+        self.assertDictEqual(events[0]['data'], {'i': 0})
+        self.assertSetEqual(set(events[0]['cases']), {'case1', 'case2'})
+
+    def test_archive_appends(self):
+        self.get_retention(max_count=8).expire_events()
+        self.get_retention(max_count=6).expire_events()
+        self.assertListEqual([event['message'] for event in iter_archived_events(archive_path=self.archive_path)],
+                             ['message{}'.format(i) for i in range(4)])
+
+    def test_iter_archived_events_filters(self):
+        self.get_retention(max_age=1).expire_events()
+
+        def get_messages(**filters):
+            return [event['message'] for event in iter_archived_events(archive_path=self.archive_path, **filters)]
+
+        self.assertListEqual(get_messages(event_type='ACTION'), ['message1', 'message3', 'message5', 'message7'])
+        self.assertListEqual(get_messages(case_name='case2'), ['message{}'.format(i) for i in range(5)])
+        self.assertListEqual(get_messages(originator='invalid'), [])
+        self.assertListEqual(get_messages(start=self.now - timedelta(days=4), end=self.now - timedelta(days=2)),
+                             ['message6', 'message7'])
+
+    def test_iter_archived_events_truncated_file(self):
+        self.get_retention(max_age=8).expire_events()
+        path = get_archive_file_path(get_archived_days(self.archive_path)[0], self.archive_path)
+        with open(path, 'ab') as archive_file:
+            archive_file.write(b'\x1f\x8b\x08')
+        self.assertListEqual([event['message'] for event in iter_archived_events(archive_path=self.archive_path)],
+                             ['message0', 'message1'])
+
+    def test_thread_expires_events(self):
+        retention = self.get_retention(max_count=2, interval=0.01)
+        retention.start()
+        for _ in range(50):
+            if len(self.get_messages_in_database()) == 2:
+                break
+            retention._thread.join(0.05)
+        retention.stop()
+        self.assertListEqual(self.get_messages_in_database(), ['message8', 'message9'])
@@ -291,6 +291,17 @@ class TestCaseServer(ServerTestCase):
         self.assertIn('name', case)
         self.assertListEqual(case['events'], [])
 
+    def test_read_all_events(self):
+        case = self.post_with_status_check('/api/cases', headers=self.headers, data=json.dumps({'name': 'case1'}),
+                                           content_type='application/json', status_code=OBJECT_CREATED)
+        for i in range(3):
+            event = case_database.Event(type='SYSTEM', message='message{}'.format(i))
+            case_database.case_db.add_event(event=event, cases=['case1'])
+        response = self.get_with_status_check('/api/cases/{}/events'.format(case['id']), headers=self.headers)
+        self.assertListEqual([event['message'] for event in response], ['message0', 'message1', 'message2'])
+        response = self.get_with_status_check('/api/cases/{}/events?limit=2'.format(case['id']), headers=self.headers)
+        self.assertListEqual([event['message'] for event in response], ['message0', 'message1'])
+
     def test_import_cases(self):
         self.__basic_case_setup()
         subscription = {'id': 'id1', 'events': ['a', 'b', 'c']}
@@ -1,5 +1,6 @@
 import copy
 import unittest
+from uuid import uuid4
 
 import walkoff.case.database as db
 import walkoff.case.subscription as subs
@@ -143,6 +144,39 @@ class TestCases(unittest.TestCase):
         subs.set_subscriptions(self.cases1)
         self.assertSetEqual(set(subs.get_cases_subscribed('id1', 'e2')), {'case1', 'case2'})
 
+    def test_get_cases_subscribed_uuid_originator(self):
+        originator = uuid4()
+        subs.set_subscriptions({'case1': {str(originator): ['e1']}})
+        self.assertSetEqual(set(subs.get_cases_subscribed(originator, 'e1')), {'case1'})
+
+    def test_get_cases_subscribed_after_add_and_delete(self):
+        subs.set_subscriptions(self.cases1)
+        subs.add_cases(self.cases2)
+        self.assertSetEqual(set(subs.get_cases_subscribed('id1', 'b')), {'case4'})
+        subs.delete_cases(['case2', 'case4'])
+        self.assertSetEqual(set(subs.get_cases_subscribed('id1', 'e2')), {'case1'})
+        self.assertSetEqual(set(subs.get_cases_subscribed('id1', 'b')), set())
+
+    def test_get_cases_subscribed_after_rename(self):
+        subs.set_subscriptions(self.cases1)
+        subs.rename_case('case1', 'renamed')
+        self.assertSetEqual(set(subs.get_cases_subscribed('id1', 'e2')), {'renamed', 'case2'})
+
+    def test_get_cases_subscribed_after_modify_and_remove(self):
+        subs.set_subscriptions(self.cases1)
+        subs.modify_subscription('case2', 'id1', ['e1'])
+        self.assertSetEqual(set(subs.get_cases_subscribed('id1', 'e1')), {'case1', 'case2'})
+        self.assertSetEqual(set(subs.get_cases_subscribed('id1', 'e3')), {'case1'})
+        subs.remove_subscription_node('case1', 'id1')
+        self.assertSetEqual(set(subs.get_cases_subscribed('id1', 'e1')), {'case2'})
+        self.assertSetEqual(set(subs.get_cases_subscribed('id1', 'e2')), set())
+
+    def test_get_cases_subscribed_after_subscriptions_replaced(self):
+        subs.set_subscriptions(self.cases1)
+        subs.subscriptions = self.cases2
+        self.assertSetEqual(set(subs.get_cases_subscribed('id1', 'e2')), set())
+        self.assertSetEqual(set(subs.get_cases_subscribed('id4', 'd')), {'case3'})
+
     def test_modify_subscriptions_no_cases(self):
         subs.modify_subscription('case1', 'id1', ['e1', 'e3'])
         self.assertInMemoryCasesAreCorrect({})
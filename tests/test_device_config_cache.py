@@ -0,0 +1,72 @@
+import unittest
+from datetime import datetime, timedelta
+
+from tests.util import execution_db_help
+from walkoff import executiondb
+from walkoff.executiondb.device import (App, Device, DeviceField, EncryptedDeviceField, DeviceConfigCache,
+                                        UnknownDeviceField)
+
+
+class TestDeviceConfigCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        execution_db_help.setup_dbs()
+
+    @classmethod
+    def tearDownClass(cls):
+        execution_db_help.tear_down_device_db()
+
+    def setUp(self):
+        self.cache = DeviceConfigCache(ttl=60)
+        self.device = Device('test', [DeviceField('port', 'integer', 22)],
+                             [EncryptedDeviceField('password', 'string', 'secret')], 'type')
+        self.app = App('HelloWorld', devices=[self.device])
+        executiondb.execution_db.session.add(self.app)
+        executiondb.execution_db.session.commit()
+
+    def tearDown(self):
+        for app in executiondb.execution_db.session.query(App).all():
+            executiondb.execution_db.session.delete(app)
+        executiondb.execution_db.session.commit()
+
+    def test_fields(self):
+        self.assertDictEqual(self.cache.get_plaintext_fields(self.device), {'port': 22})
+        self.assertEqual(self.cache.get_encrypted_field(self.device, 'password'), 'secret')
+        with self.assertRaises(UnknownDeviceField):
+            self.cache.get_encrypted_field(self.device, 'invalid')
+        self.assertDictEqual(self.cache.get_statistics(), {'size': 1, 'hits': 2, 'misses': 1})
+
+    def test_returned_fields_not_shared(self):
+        self.cache.get_plaintext_fields(self.device)['port'] = 23
+        self.assertDictEqual(self.cache.get_plaintext_fields(self.device), {'port': 22})
+
+    def test_invalidate(self):
+        self.cache.get_plaintext_fields(self.device)
+        self.device.update_from_json({'fields': [{'name': 'port', 'type': 'integer', 'value': 23}]})
+        executiondb.execution_db.session.commit()
+        self.cache.invalidate(self.device.id)
+        self.assertDictEqual(self.cache.get_plaintext_fields(self.device), {'port': 23})
+        self.cache.invalidate()
+        self.assertEqual(self.cache.get_statistics()['size'], 0)
+
+    def test_modified_device_reloaded(self):
+        self.cache.get_plaintext_fields(self.device)
+        self.device.modified_at = datetime.utcnow() + timedelta(minutes=1)
+        executiondb.execution_db.session.commit()
+        self.cache.get_plaintext_fields(self.device)
+        self.assertEqual(self.cache.get_statistics()['misses'], 2)
+
+    def test_expired_device_reloaded(self):
+        self.cache.ttl = -1
+        self.cache.get_plaintext_fields(self.device)
+        self.cache.get_plaintext_fields(self.device)
+        self.assertEqual(self.cache.get_statistics()['misses'], 2)
+
+    def test_unsaved_device_not_cached(self):
+        device = Device('other', [DeviceField('port', 'integer', 22)], [], 'type')
+        self.assertDictEqual(self.cache.get_plaintext_fields(device), {'port': 22})
+        self.assertEqual(self.cache.get_statistics()['size'], 0)
+
+    def test_app_get_device(self):
+        self.assertEqual(self.app.get_device(self.device.id), self.device)
+        self.assertIsNone(self.app.get_device('invalid'))
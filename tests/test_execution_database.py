@@ -0,0 +1,43 @@
+import unittest
+from uuid import uuid4
+
+from sqlalchemy.exc import OperationalError
+
+from tests.util import execution_db_help
+from walkoff import executiondb
+from walkoff.executiondb.workflowresults import WorkflowStatus
+
+
+class TestExecutionDatabase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        execution_db_help.setup_dbs()
+
+    def tearDown(self):
+        executiondb.execution_db.read_session.remove()
+        execution_db_help.cleanup_device_db()
+
+    @classmethod
+    def tearDownClass(cls):
+        execution_db_help.tear_down_device_db()
+
+    def test_sqlite_pragmas(self):
+        for engine in (executiondb.execution_db.engine, executiondb.execution_db.read_engine):
+            with engine.connect() as connection:
+                self.assertEqual(connection.execute('PRAGMA journal_mode').scalar(), 'wal')
+                self.assertEqual(connection.execute('PRAGMA synchronous').scalar(), 1)
+                self.assertEqual(connection.execute('PRAGMA busy_timeout').scalar(), 5000)
+
+    def test_read_session_sees_committed_writes(self):
+        execution_id = uuid4()
+        executiondb.execution_db.session.add(WorkflowStatus(execution_id, uuid4(), 'workflow'))
+        executiondb.execution_db.session.commit()
+        workflow_status = executiondb.execution_db.read_session.query(WorkflowStatus).filter_by(
+            execution_id=execution_id).first()
+        self.assertEqual(workflow_status.name, 'workflow')
+
+    def test_read_session_cannot_write(self):
+        executiondb.execution_db.read_session.add(WorkflowStatus(uuid4(), uuid4(), 'workflow'))
+        with self.assertRaises(OperationalError):
+            executiondb.execution_db.read_session.commit()
+        executiondb.execution_db.read_session.rollback()
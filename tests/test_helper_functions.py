@@ -1,5 +1,6 @@
 import types
 import unittest
+from datetime import datetime
 from os import sep
 from os.path import join
 
@@ -141,6 +142,11 @@ class TestHelperFunctions(unittest.TestCase):
         with self.assertRaises(UnknownAppAction):
             get_app_action_api('HelloWorld', 'invalid')
 
+    def test_get_app_action_api_no_parameters(self):
+        _, parameters = get_app_action_api('HelloWorld', 'helloWorld')
+        self.assertTupleEqual(parameters, ())
+        self.assertIs(get_app_action_api('HelloWorld', 'helloWorld')[1], parameters)
+
     def assert_params_tuple_equal(self, actual, expected):
         self.assertEqual(len(actual), len(expected))
         self.assertEqual(len(actual), 2)
@@ -206,6 +212,19 @@ class TestHelperFunctions(unittest.TestCase):
         self.assertEqual(create_sse_event(event_id=1, event='something', data=data),
                          'id: 1\nevent: something\ndata: {}\n\n'.format(json.dumps(data)))
 
+    def test_rfc_datetime_as_utc(self):
+        self.assertIsNone(rfc_datetime_as_utc(None))
+        expected = datetime(2018, 1, 1, 12, 0, 0)
+        for timestamp in ('2018-01-01T12:00:00Z', '2018-01-01T12:00:00', '2018-01-01T12:00:00+00:00',
+                          '2018-01-01T07:00:00-05:00', '2018-01-01T13:30:00+01:30'):
+            self.assertEqual(rfc_datetime_as_utc(timestamp), expected)
+        self.assertEqual(rfc_datetime_as_utc('2018-01-01T12:00:00.250Z'), datetime(2018, 1, 1, 12, 0, 0, 250000))
+
+    def test_rfc_datetime_as_utc_invalid(self):
+        for timestamp in ('2018-01-01', '2018-01-01 12:00:00', '2018-01-01T12:00:00+0100', 'invalid'):
+            with self.assertRaises(ValueError):
+                rfc_datetime_as_utc(timestamp)
+
     def test_database_connection_error_handler(self):
         from sqlalchemy.exc import SQLAlchemyError
         class DbException(SQLAlchemyError): pass
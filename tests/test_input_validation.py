@@ -1,6 +1,7 @@
 import unittest
 
-from walkoff.appgateway.validator import validate_parameter, validate_parameters, convert_json
+from walkoff.appgateway.validator import validate_parameter, validate_parameters, convert_json, \
+    get_parameters_validator, clear_parameters_validators
 from walkoff.config.config import initialize
 from walkoff.executiondb.argument import Argument
 from walkoff.helpers import InvalidArgument
@@ -306,6 +307,29 @@ class TestInputValidation(unittest.TestCase):
         expected = {'name1': 'test', 'name2': 5}
         self.assertDictEqual(validate_parameters(parameter_apis, arguments, self.message), expected)
 
+    def test_compiled_validator_reused(self):
+        parameter_apis = [
+            {'name': 'name1', 'type': 'string', 'minLength': 1, 'maxLength': 25, 'enum': ['test', 'test3']},
+            {'name': 'name2', 'type': 'integer', 'minimum': -3, 'maximum': 25}]
+        validator = get_parameters_validator('app1', 'actions', 'action1', parameter_apis, self.message)
+        self.assertIs(get_parameters_validator('app1', 'actions', 'action1', parameter_apis, self.message), validator)
+        arguments = [Argument('name1', value='test'), Argument('name2', value='5')]
+        for _ in range(2):
+            self.assertDictEqual(validator.validate(arguments), {'name1': 'test', 'name2': 5})
+        with self.assertRaises(InvalidArgument):
+            validator.validate([Argument('name1', value='invalid'), Argument('name2', value='5')])
+        clear_parameters_validators()
+
+    def test_compiled_validator_recompiled_on_api_change(self):
+        parameter_apis = [{'name': 'name1', 'type': 'integer', 'minimum': -3, 'maximum': 25}]
+        validator = get_parameters_validator('app1', 'actions', 'action1', parameter_apis, self.message)
+        new_parameter_apis = [{'name': 'name1', 'type': 'integer', 'minimum': 30}]
+        new_validator = get_parameters_validator('app1', 'actions', 'action1', new_parameter_apis, self.message)
+        self.assertIsNot(new_validator, validator)
+        with self.assertRaises(InvalidArgument):
+            new_validator.validate([Argument('name1', value='5')])
+        clear_parameters_validators()
+
     def test_convert_json(self):
         parameter_api = {
             'name': 'name1',
@@ -0,0 +1,291 @@
+import os
+import threading
+import time
+import unittest
+from uuid import uuid4
+
+import zmq
+import zmq.auth as auth
+import zmq.green
+
+import walkoff.config.config
+import walkoff.config.paths
+from tests.util import execution_db_help
+from walkoff import executiondb
+from walkoff.executiondb import WorkflowStatusEnum
+from walkoff.executiondb.statusrecorder import workflow_status_recorder
+from walkoff.executiondb.workflowresults import WorkflowStatus
+from walkoff.multiprocessedexecutor.encoding import format_ready_message, negotiate_encoding
+from walkoff.multiprocessedexecutor.loadbalancer import LoadBalancer
+from walkoff.multiprocessedexecutor.worker import Worker
+from walkoff.proto.build.data_pb2 import ExecuteWorkflowBatchMessage, Message
+
+
+class MockWorker(object):
+    def __init__(self, ctx, number, encodings=None):
+        self.identity = u'Worker-{}'.format(number).encode('ascii')
+        server_public, _ = auth.load_certificate(
+            os.path.join(walkoff.config.paths.zmq_private_keys_path, 'server.key_secret'))
+        client_public, client_secret = auth.load_certificate(
+            os.path.join(walkoff.config.paths.zmq_private_keys_path, 'client.key_secret'))
+        self.socket = ctx.socket(zmq.DEALER)
+        self.socket.identity = self.identity
+        self.socket.curve_secretkey = client_secret
+        self.socket.curve_publickey = client_public
+        self.socket.curve_serverkey = server_public
+        self.socket.connect(walkoff.config.config.zmq_requests_address)
+        self.socket.send(format_ready_message(encodings))
+
+    def receive(self, timeout=2000):
+        if not self.socket.poll(timeout):
+            return None
+        batch = ExecuteWorkflowBatchMessage()
+        batch.ParseFromString(self.socket.recv())
+        return batch
+
+    def receive_execution_ids(self, timeout=2000):
+        batch = self.receive(timeout=timeout)
+        return [message.workflow_execution_id for message in batch.workflows] if batch is not None else None
+
+    def close(self):
+        self.socket.close(linger=0)
+
+
+class UnavailableExecutionDatabase(object):
+    @property
+    def session(self):
+        raise AssertionError('The execution database was queried')
+
+
+class TestLoadBalancer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        execution_db_help.setup_dbs()
+        cls.original_addresses = (walkoff.config.config.zmq_requests_address,
+                                  walkoff.config.config.zmq_communication_address)
+        walkoff.config.config.zmq_requests_address = 'tcp://127.0.0.1:5655'
+        walkoff.config.config.zmq_communication_address = 'tcp://127.0.0.1:5657'
+
+    @classmethod
+    def tearDownClass(cls):
+        execution_db_help.tear_down_device_db()
+        (walkoff.config.config.zmq_requests_address,
+         walkoff.config.config.zmq_communication_address) = cls.original_addresses
+
+    def setUp(self):
+        self.original_config = (walkoff.config.config.num_threads_per_process,
+                                walkoff.config.config.load_balancer_poll_timeout,
+                                walkoff.config.config.max_workflows_per_dispatch,
+                                walkoff.config.config.preferred_result_encoding)
+        walkoff.config.config.num_threads_per_process = 3
+        walkoff.config.config.load_balancer_poll_timeout = 10000
+        walkoff.config.config.max_workflows_per_dispatch = 10
+        self.ctx = zmq.green.Context()
+        self.worker_ctx = zmq.Context()
+        self.load_balancer = LoadBalancer(self.ctx)
+        self.thread = threading.Thread(target=self.load_balancer.manage_workflows)
+        self.thread.start()
+        self.workers = []
+
+    def tearDown(self):
+        self.load_balancer.thread_exit = True
+        self.load_balancer.wake()
+        self.thread.join(timeout=2)
+        for worker in self.workers:
+            worker.close()
+        self.worker_ctx.term()
+        self.ctx.term()
+        execution_db_help.cleanup_device_db()
+        (walkoff.config.config.num_threads_per_process,
+         walkoff.config.config.load_balancer_poll_timeout,
+         walkoff.config.config.max_workflows_per_dispatch,
+         walkoff.config.config.preferred_result_encoding) = self.original_config
+
+    def add_worker(self, encodings=None):
+        worker = MockWorker(self.worker_ctx, len(self.workers), encodings=encodings)
+        self.workers.append(worker)
+        self.wait_for(lambda: worker.identity in self.load_balancer.workers)
+        return worker
+
+    @staticmethod
+    def wait_for(condition, timeout=2):
+        end = time.time() + timeout
+        while not condition():
+            if time.time() > end:
+                raise AssertionError('Timed out waiting for the load balancer')
+            time.sleep(0.01)
+
+    def add_workflow(self, **kwargs):
+        execution_id = str(uuid4())
+        self.load_balancer.add_workflow(str(uuid4()), execution_id, **kwargs)
+        return execution_id
+
+    @staticmethod
+    def receive_batches(worker):
+        batches = []
+        execution_ids = worker.receive_execution_ids()
+        while execution_ids is not None:
+            batches.append(execution_ids)
+            execution_ids = worker.receive_execution_ids(timeout=200)
+        return batches
+
+    def test_wakeup_on_add_workflow(self):
+        worker = self.add_worker()
+        start = time.time()
+        execution_id = self.add_workflow()
+        execution_ids = worker.receive_execution_ids()
+        self.assertLess(time.time() - start, 1)
+        self.assertListEqual(execution_ids, [execution_id])
+
+    def test_dispatch_to_worker_with_most_free_slots(self):
+        worker1 = self.add_worker()
+        worker2 = self.add_worker()
+        first = self.add_workflow()
+        self.wait_for(lambda: first in self.load_balancer.workflow_comms)
+        first_worker, other_worker = ((worker1, worker2) if self.load_balancer.workflow_comms[first] == worker1.identity
+                                      else (worker2, worker1))
+        self.assertListEqual(first_worker.receive_execution_ids(), [first])
+
+        second = self.add_workflow()
+        self.assertListEqual(other_worker.receive_execution_ids(), [second])
+        self.assertIsNone(first_worker.receive(timeout=100))
+        self.assertEqual(self.load_balancer.workers[first_worker.identity], 2)
+        self.assertEqual(self.load_balancer.workers[other_worker.identity], 2)
+
+    def test_release_on_workflow_shutdown(self):
+        worker = self.add_worker()
+        execution_id = self.add_workflow()
+        worker.receive()
+        self.assertEqual(self.load_balancer.workers[worker.identity], 2)
+        self.load_balancer.handle_workflow_shutdown({'execution_id': execution_id})
+        self.assertEqual(self.load_balancer.workers[worker.identity], 3)
+        self.assertNotIn(execution_id, self.load_balancer.workflow_comms)
+
+    def test_release_on_workflow_paused(self):
+        worker = self.add_worker()
+        execution_id = self.add_workflow()
+        worker.receive()
+        self.load_balancer.handle_workflow_paused({'execution_id': execution_id})
+        self.assertEqual(self.load_balancer.workers[worker.identity], 3)
+        self.assertNotIn(execution_id, self.load_balancer.workflow_comms)
+
+    def test_released_worker_receives_pending_workflows(self):
+        walkoff.config.config.num_threads_per_process = 1
+        worker = self.add_worker()
+        first = self.add_workflow()
+        second = self.add_workflow()
+        self.assertListEqual(worker.receive_execution_ids(), [first])
+        self.assertIsNone(worker.receive(timeout=100))
+        self.load_balancer.handle_workflow_shutdown({'execution_id': first})
+        self.assertListEqual(worker.receive_execution_ids(), [second])
+
+    def test_available_workers_bounded(self):
+        workers = [self.add_worker(), self.add_worker()]
+        for _ in range(500):
+            execution_id = self.add_workflow()
+            self.wait_for(lambda: execution_id in self.load_balancer.workflow_comms)
+            self.load_balancer.handle_workflow_shutdown({'execution_id': execution_id})
+        self.assertLessEqual(len(self.load_balancer.available_workers), 2 * len(self.load_balancer.workers))
+        self.assertDictEqual(self.load_balancer.workers, {worker.identity: 3 for worker in workers})
+
+    def test_batch_limited_by_max_workflows_per_dispatch(self):
+        walkoff.config.config.num_threads_per_process = 5
+        walkoff.config.config.max_workflows_per_dispatch = 2
+        execution_ids = [self.add_workflow() for _ in range(7)]
+        worker = self.add_worker()
+        batches = self.receive_batches(worker)
+        self.assertListEqual([len(batch) for batch in batches], [2, 2, 1])
+        self.assertListEqual([execution_id for batch in batches for execution_id in batch], execution_ids[:5])
+        self.assertEqual(self.load_balancer.workers[worker.identity], 0)
+
+    def test_batch_limited_by_free_slots(self):
+        execution_ids = [self.add_workflow() for _ in range(5)]
+        worker = self.add_worker()
+        self.assertListEqual(self.receive_batches(worker), [execution_ids[:3]])
+
+    def test_batch_result_encoding(self):
+        walkoff.config.config.preferred_result_encoding = 'msgpack'
+        worker = self.add_worker(encodings=[Message.JSON, Message.MSGPACK])
+        self.add_workflow()
+        self.assertEqual(worker.receive().result_encoding, negotiate_encoding([Message.JSON, Message.MSGPACK]))
+
+    def test_batch_result_encoding_json_only_worker(self):
+        walkoff.config.config.preferred_result_encoding = 'msgpack'
+        worker = self.add_worker(encodings=[Message.JSON])
+        self.add_workflow()
+        self.assertEqual(worker.receive().result_encoding, Message.JSON)
+
+    def test_aborted_pending_workflow_skipped(self):
+        aborted = [self.add_workflow(), self.add_workflow(resume=True)]
+        for execution_id in aborted:
+            self.load_balancer.handle_workflow_aborted({'execution_id': execution_id})
+        execution_id = self.add_workflow()
+
+        execution_db = executiondb.execution_db
+        executiondb.execution_db = UnavailableExecutionDatabase()
+        try:
+            worker = self.add_worker()
+            batches = self.receive_batches(worker)
+        finally:
+            executiondb.execution_db = execution_db
+        self.assertListEqual(batches, [[execution_id]])
+        self.assertSetEqual(self.load_balancer.pending_execution_ids, set())
+        self.assertSetEqual(self.load_balancer.aborted_execution_ids, set())
+
+    def test_aborted_resumed_workflow_skipped(self):
+        aborted_execution_id = str(uuid4())
+        workflow_status = WorkflowStatus(aborted_execution_id, str(uuid4()), 'workflow')
+        workflow_status.aborted()
+        executiondb.execution_db.session.add(workflow_status)
+        executiondb.execution_db.session.commit()
+
+        self.load_balancer.add_workflow(str(uuid4()), aborted_execution_id, resume=True)
+        execution_id = self.add_workflow(resume=True)
+        worker = self.add_worker()
+        self.assertListEqual(self.receive_batches(worker), [[execution_id]])
+        self.assertSetEqual(self.load_balancer.pending_execution_ids, set())
+        self.assertSetEqual(self.load_balancer.aborted_execution_ids, set())
+
+    def test_workflow_aborted_after_dispatch_not_tracked(self):
+        worker = self.add_worker()
+        execution_id = self.add_workflow()
+        worker.receive()
+        self.load_balancer.handle_workflow_aborted({'execution_id': execution_id})
+        self.assertSetEqual(self.load_balancer.pending_execution_ids, set())
+        self.assertSetEqual(self.load_balancer.aborted_execution_ids, set())
+        self.assertEqual(self.load_balancer.workers[worker.identity], 3)
+
+    def test_remove_worker_aborts_its_workflows(self):
+        worker = self.add_worker()
+        execution_id = self.add_workflow(concurrency_limits={'limit': 1})
+        held_execution_id = self.add_workflow(concurrency_limits={'limit': 1})
+        workflow_status_recorder.workflow_pending(execution_id, str(uuid4()), 'workflow')
+        self.assertListEqual(worker.receive_execution_ids(), [execution_id])
+
+        self.load_balancer.remove_worker(worker.identity)
+        self.assertNotIn(execution_id, self.load_balancer.workflow_comms)
+        self.assertEqual(workflow_status_recorder.get_pending_workflow_status(execution_id),
+                         WorkflowStatusEnum.aborted)
+        workflow_status_recorder.flush()
+
+        replacement = self.add_worker()
+        self.assertListEqual(replacement.receive_execution_ids(), [held_execution_id])
+
+
+class TestWorkerBatch(unittest.TestCase):
+    def test_execute_workflow_batch(self):
+        worker = Worker.__new__(Worker)
+        submitted = []
+        worker.submit_workflow = submitted.append
+
+        batch = ExecuteWorkflowBatchMessage()
+        batch.result_encoding = Message.MSGPACK
+        execution_ids = [str(uuid4()) for _ in range(3)]
+        for execution_id in execution_ids:
+            message = batch.workflows.add()
+            message.workflow_id = str(uuid4())
+            message.workflow_execution_id = execution_id
+        worker.execute_workflow_batch(batch.SerializeToString())
+
+        self.assertListEqual([message.workflow_execution_id for message in submitted], execution_ids)
+        self.assertEqual(worker.result_encoding, Message.MSGPACK)
@@ -35,20 +35,11 @@ class MetricsTest(ServerTestCase):
         orderless_list_compare(self,
                                list(metrics.app_metrics['HelloWorldBounded']['actions']['repeatBackToMe'].keys()),
                                ['success'])
-        for form in ['success']:
-            orderless_list_compare(self,
-                                   list(metrics.app_metrics['HelloWorldBounded']['actions']['repeatBackToMe'][
-                                            form].keys()),
-                                   ['count', 'avg_time'])
-            self.assertEqual(metrics.app_metrics['HelloWorldBounded']['actions']['repeatBackToMe'][form]['count'], 1)
+        self.assertEqual(metrics.app_metrics['HelloWorldBounded']['actions']['repeatBackToMe']['success'].count, 1)
         orderless_list_compare(self,
                                list(metrics.app_metrics['HelloWorldBounded']['actions']['helloWorld'].keys()),
                                ['success'])
-        orderless_list_compare(self,
-                               list(
-                                   metrics.app_metrics['HelloWorldBounded']['actions']['helloWorld']['success'].keys()),
-                               ['count', 'avg_time'])
-        self.assertEqual(metrics.app_metrics['HelloWorldBounded']['actions']['helloWorld']['success']['count'], 1)
+        self.assertEqual(metrics.app_metrics['HelloWorldBounded']['actions']['helloWorld']['success'].count, 1)
 
     def test_workflow_metrics(self):
         execution_db_help.load_playbooks(['multiactionError', 'multiactionWorkflowTest'])
@@ -71,7 +62,8 @@ class MetricsTest(ServerTestCase):
                                keys)
 
         for key in keys:
-            orderless_list_compare(self, metrics.workflow_metrics[key], ['count', 'avg_time'])
+            orderless_list_compare(self, metrics.workflow_metrics[key], ['completed', 'queue_wait'])
 
-        self.assertEqual(metrics.workflow_metrics[error_key]['count'], 2)
-        self.assertEqual(metrics.workflow_metrics[multiaction_key]['count'], 1)
+        self.assertEqual(metrics.workflow_metrics[error_key]['completed'].count, 2)
+        self.assertEqual(metrics.workflow_metrics[error_key]['queue_wait'].count, 2)
+        self.assertEqual(metrics.workflow_metrics[multiaction_key]['completed'].count, 1)
@@ -0,0 +1,186 @@
+import unittest
+from datetime import timedelta
+
+import walkoff.config.config
+import walkoff.server.metrics as metrics
+from walkoff.events import WalkoffEvent
+from walkoff.server.endpoints.metrics import (_convert_action_time_averages, _convert_workflow_time_averages,
+                                              _format_metrics_text)
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_empty(self):
+        histogram = metrics.LatencyHistogram()
+        self.assertIsNone(histogram.mean())
+        self.assertIsNone(histogram.percentile(50))
+        self.assertDictEqual(histogram.as_json(), {'count': 0, 'avg_time': '0:00:00', 'p50_time': '0:00:00',
+                                                   'p90_time': '0:00:00', 'p99_time': '0:00:00'})
+
+    def test_observe(self):
+        histogram = metrics.LatencyHistogram(bounds=(1, 2, 4))
+        for duration in (0.5, 1.5, 1.5, 3, timedelta(seconds=10)):
+            histogram.observe(duration)
+        self.assertListEqual(histogram.buckets, [1, 2, 1, 1])
+        self.assertEqual(histogram.count, 5)
+        self.assertAlmostEqual(histogram.mean(), 3.3)
+        self.assertEqual(histogram.min, 0.5)
+        self.assertEqual(histogram.max, 10)
+
+    def test_observe_bucket_bounds_are_inclusive(self):
+        histogram = metrics.LatencyHistogram(bounds=(1, 2))
+        histogram.observe(1)
+        histogram.observe(2)
+        self.assertListEqual(histogram.buckets, [1, 1, 0])
+
+    def test_percentile(self):
+        histogram = metrics.LatencyHistogram(bounds=(1, 2, 4))
+        for _ in range(50):
+            histogram.observe(0.5)
+        for _ in range(40):
+            histogram.observe(1.5)
+        for _ in range(10):
+            histogram.observe(3)
+        self.assertEqual(histogram.percentile(50), 1)
+        self.assertEqual(histogram.percentile(90), 2)
+        self.assertAlmostEqual(histogram.percentile(70), 1.5)
+        self.assertEqual(histogram.percentile(99), 3)
+        self.assertEqual(histogram.percentile(0), 0.5)
+
+    def test_percentile_default_bounds(self):
+        histogram = metrics.LatencyHistogram()
+        for i in range(1, 1001):
+            histogram.observe(i / 1000.0)
+        for percentile in (50, 90, 99):
+            self.assertAlmostEqual(histogram.percentile(percentile), percentile / 100.0, delta=percentile / 1000.0)
+
+    def test_merge(self):
+        histogram1 = metrics.LatencyHistogram(bounds=(1, 2))
+        histogram2 = metrics.LatencyHistogram(bounds=(1, 2))
+        histogram1.observe(0.5)
+        histogram2.observe(1.5)
+        histogram2.observe(5)
+        histogram1.merge(histogram2)
+        self.assertListEqual(histogram1.buckets, [1, 1, 1])
+        self.assertEqual(histogram1.count, 3)
+        self.assertEqual(histogram1.sum, 7)
+        self.assertEqual(histogram1.min, 0.5)
+        self.assertEqual(histogram1.max, 5)
+
+    def test_merge_different_bounds(self):
+        with self.assertRaises(ValueError):
+            metrics.LatencyHistogram(bounds=(1, 2)).merge(metrics.LatencyHistogram(bounds=(1, 3)))
+
+
+class TestMetricsTracking(unittest.TestCase):
+    def setUp(self):
+        metrics.app_metrics = {}
+        metrics.workflow_metrics = {}
+        self.original_max_tracked = walkoff.config.config.metrics_max_tracked_executions
+
+    def tearDown(self):
+        walkoff.config.config.metrics_max_tracked_executions = self.original_max_tracked
+        for execution_id in ('workflow1', 'workflow2', 'workflow3'):
+            WalkoffEvent.WorkflowAborted.send({'execution_id': execution_id, 'id': 'id', 'name': 'workflow'})
+        metrics.app_metrics = {}
+        metrics.workflow_metrics = {}
+
+    @staticmethod
+    def start_workflow(execution_id, name='workflow'):
+        sender = {'execution_id': execution_id, 'id': 'id', 'name': name}
+        WalkoffEvent.WorkflowExecutionPending.send(sender)
+        WalkoffEvent.WorkflowExecutionStart.send(sender)
+
+    @staticmethod
+    def get_action_sender(execution_id, action_name):
+        return {'execution_id': execution_id, 'id': 'id', 'name': 'name', 'app_name': 'app',
+                'action_name': action_name}
+
+    def start_action(self, execution_id, workflow_execution_id, action_name='action'):
+        WalkoffEvent.ActionStarted.send(self.get_action_sender(execution_id, action_name),
+                                        data={'workflow': {'execution_id': workflow_execution_id}})
+
+    def end_action(self, execution_id, event=WalkoffEvent.ActionExecutionSuccess, action_name='action'):
+        event.send(self.get_action_sender(execution_id, action_name),
+                   data={'data': {'result': None}, 'workflow': {'execution_id': 'workflow'}})
+
+    def test_action_metrics(self):
+        self.start_workflow('workflow1')
+        self.start_action('action1', 'workflow1')
+        self.start_action('action2', 'workflow1')
+        self.start_action('action3', 'workflow1', action_name='other')
+        self.assertEqual(metrics.get_in_flight()['executing_actions'], 3)
+        self.end_action('action1')
+        self.end_action('action2', event=WalkoffEvent.ActionExecutionError)
+        self.end_action('action3', action_name='other')
+        self.assertEqual(metrics.app_metrics['app']['count'], 3)
+        self.assertEqual(metrics.app_metrics['app']['actions']['action']['success'].count, 1)
+        self.assertEqual(metrics.app_metrics['app']['actions']['action']['error'].count, 1)
+        self.assertEqual(metrics.get_in_flight()['executing_actions'], 0)
+        converted = _convert_action_time_averages()
+        action = next(action for action in converted['apps'][0]['actions'] if action['name'] == 'action')
+        self.assertSetEqual(set(action['success_metrics'].keys()),
+                            {'count', 'avg_time', 'p50_time', 'p90_time', 'p99_time'})
+
+    def test_workflow_metrics(self):
+        self.start_workflow('workflow1')
+        self.start_workflow('workflow2')
+        WalkoffEvent.WorkflowExecutionPending.send({'execution_id': 'workflow3', 'id': 'id', 'name': 'workflow'})
+        self.assertDictEqual(metrics.get_in_flight(),
+                             {'pending_workflows': 1, 'executing_workflows': 2, 'executing_actions': 0})
+        WalkoffEvent.WorkflowShutdown.send({'execution_id': 'workflow1', 'id': 'id', 'name': 'workflow'},
+                                           data={})
+        WalkoffEvent.WorkflowAborted.send({'execution_id': 'workflow2', 'id': 'id', 'name': 'workflow'})
+        workflow = metrics.workflow_metrics['workflow']
+        self.assertEqual(workflow['completed'].count, 1)
+        self.assertEqual(workflow['aborted'].count, 1)
+        self.assertEqual(workflow['queue_wait'].count, 2)
+        converted = _convert_workflow_time_averages()
+        self.assertEqual(converted['workflows'][0]['count'], 1)
+        self.assertEqual(converted['workflows'][0]['aborted_count'], 1)
+        self.assertEqual(converted['workflows'][0]['queue_wait']['count'], 2)
+        self.assertDictEqual(converted['in_flight'],
+                             {'pending_workflows': 1, 'executing_workflows': 0, 'executing_actions': 0})
+
+    def test_unfinished_actions_forgotten_when_workflow_ends(self):
+        self.start_workflow('workflow1')
+        self.start_action('action1', 'workflow1')
+        self.start_workflow('workflow2')
+        self.start_action('action2', 'workflow2')
+        WalkoffEvent.WorkflowAborted.send({'execution_id': 'workflow1', 'id': 'id', 'name': 'workflow'})
+        self.assertEqual(metrics.get_in_flight()['executing_actions'], 1)
+        self.end_action('action1')
+        self.assertDictEqual(metrics.app_metrics, {})
+
+    def test_tracked_executions_are_bounded(self):
+        walkoff.config.config.metrics_max_tracked_executions = 2
+        for execution_id in ('workflow1', 'workflow2', 'workflow3'):
+            self.start_workflow(execution_id)
+        self.assertEqual(metrics.get_in_flight()['executing_workflows'], 2)
+
+    def test_format_metrics_text(self):
+        self.start_workflow('workflow1', name='work"flow')
+        self.start_action('action1', 'workflow1')
+        self.end_action('action1')
+        text = _format_metrics_text({'queue_depth': 3, 'processed': 10, 'backpressure': 0, 'dropped': 1})
+        lines = text.splitlines()
+        self.assertIn('# TYPE walkoff_action_duration_seconds histogram', lines)
+        self.assertIn('walkoff_action_duration_seconds_bucket{app="app",action="action",status="success",le="+Inf"} 1',
+                      lines)
+        self.assertIn('walkoff_action_duration_seconds_count{app="app",action="action",status="success"} 1', lines)
+        self.assertIn('walkoff_workflow_queue_wait_seconds_count{workflow="work\\"flow"} 1', lines)
+        self.assertIn('walkoff_workflows_executing 1', lines)
+        self.assertIn('walkoff_receiver_queue_depth 3', lines)
+        self.assertIn('walkoff_receiver_dropped_total 1', lines)
+        buckets = [int(line.rsplit(' ', 1)[1]) for line in lines
+                   if line.startswith('walkoff_action_duration_seconds_bucket')]
+        self.assertListEqual(buckets, sorted(buckets))
+
+    def test_format_metrics_text_autoscaler(self):
+        text = _format_metrics_text(autoscaler_statistics={'workers': 3, 'draining': 1, 'scale_ups': 2,
+                                                           'scale_downs': 1})
+        lines = text.splitlines()
+        self.assertIn('walkoff_workers 3', lines)
+        self.assertIn('walkoff_workers_draining 1', lines)
+        self.assertIn('walkoff_worker_scale_ups_total 2', lines)
+        self.assertIn('walkoff_worker_scale_downs_total 1', lines)
+        self.assertNotIn('walkoff_receiver_queue_depth', text)
@@ -12,43 +12,39 @@ from walkoff.server.endpoints.metrics import _convert_action_time_averages, _con
 class MetricsServerTest(ServerTestCase):
     def setUp(self):
         metrics.app_metrics = {}
+        metrics.workflow_metrics = {}
 
     def tearDown(self):
         execution_db_help.cleanup_device_db()
 
+    @staticmethod
+    def make_histogram(duration, count):
+        histogram = metrics.LatencyHistogram()
+        for _ in range(count):
+            histogram.observe(duration)
+        return histogram
+
+    @staticmethod
+    def expected_metrics(count, time):
+        return {'count': count, 'avg_time': time, 'p50_time': time, 'p90_time': time, 'p99_time': time}
+
     def test_convert_action_time_average(self):
-        '''
-        ret = deepcopy(metrics.app_metrics)
-        for app in ret:
-            for action in app['actions']:
-                ret[app]['actions'][action]['avg_time'] = str(action['avg_time'])
-        return ret
-        '''
-
-        test1 = {'app1': {'actions': {'action1': {'success': {'count': 0,
-                                                              'avg_time': timedelta(100, 0, 1)}},
-                                      'action2': {'error': {'count': 2,
-                                                            'avg_time': timedelta(0, 0, 1000)}}},
-                          'count': 2},
-                 'app2': {'actions': {'action1': {'success': {'count': 0,
-                                                              'avg_time': timedelta(0, 100, 1)},
-                                                  'error': {'count': 100,
-                                                            'avg_time': timedelta(1, 100, 500)}}},
-                          'count': 100}}
-        expected_json = {'apps': [{'count': 100,
+        test1 = {'app1': {'actions': {'action1': {'success': self.make_histogram(timedelta(100, 0, 1), 1)},
+                                      'action2': {'error': self.make_histogram(timedelta(0, 0, 1000), 2)}},
+                          'count': 3},
+                 'app2': {'actions': {'action1': {'success': self.make_histogram(timedelta(0, 100, 1), 1),
+                                                  'error': self.make_histogram(timedelta(1, 100, 500), 100)}},
+                          'count': 101}}
+        expected_json = {'apps': [{'count': 101,
                                    'name': 'app2',
-                                   'actions': [{'error_metrics': {'count': 100,
-                                                                  'avg_time': '1 day, 0:01:40.000500'},
-                                                'success_metrics': {'count': 0,
-                                                                    'avg_time': '0:01:40.000001'},
+                                   'actions': [{'error_metrics': self.expected_metrics(100, '1 day, 0:01:40.000500'),
+                                                'success_metrics': self.expected_metrics(1, '0:01:40.000001'),
                                                 'name': 'action1'}]},
-                                  {'count': 2,
+                                  {'count': 3,
                                    'name': 'app1',
-                                   'actions': [{'success_metrics': {'count': 0,
-                                                                    'avg_time': '100 days, 0:00:00.000001'},
+                                   'actions': [{'success_metrics': self.expected_metrics(1, '100 days, 0:00:00.000001'),
                                                 'name': 'action1'},
-                                               {'error_metrics': {'count': 2,
-                                                                  'avg_time': '0:00:00.001000'},
+                                               {'error_metrics': self.expected_metrics(2, '0:00:00.001000'),
                                                 'name': 'action2'}]}]}
         metrics.app_metrics = test1
         converted = _convert_action_time_averages()
@@ -56,46 +52,35 @@ class MetricsServerTest(ServerTestCase):
         self.assertEqual(len(converted['apps']), len(expected_json['apps']))
         orderless_list_compare(self, [x['name'] for x in converted['apps']], ['app1', 'app2'])
 
-        app1_metrics = [x for x in converted['apps'] if x['name'] == 'app1'][0]
-        expected_app1_metrics = [x for x in expected_json['apps'] if x['name'] == 'app1'][0]
-        orderless_list_compare(self, app1_metrics.keys(), ['count', 'name', 'actions'])
-        self.assertEqual(app1_metrics['count'], expected_app1_metrics['count'])
-        self.assertTrue(len(app1_metrics['actions']), len(expected_app1_metrics['actions']))
-        for action_metric in expected_app1_metrics['actions']:
-            self.assertIn(action_metric, app1_metrics['actions'])
-
-        app2_metrics = [x for x in converted['apps'] if x['name'] == 'app2'][0]
-        expected_app2_metrics = [x for x in expected_json['apps'] if x['name'] == 'app2'][0]
-        orderless_list_compare(self, app2_metrics.keys(), ['count', 'name', 'actions'])
-        self.assertEqual(app2_metrics['count'], expected_app2_metrics['count'])
-        self.assertTrue(len(app2_metrics['actions']), len(expected_app2_metrics['actions']))
-        for action_metric in expected_app2_metrics['actions']:
-            self.assertIn(action_metric, app2_metrics['actions'])
+        for app_name in ('app1', 'app2'):
+            app_metrics = [x for x in converted['apps'] if x['name'] == app_name][0]
+            expected_app_metrics = [x for x in expected_json['apps'] if x['name'] == app_name][0]
+            orderless_list_compare(self, app_metrics.keys(), ['count', 'name', 'actions'])
+            self.assertEqual(app_metrics['count'], expected_app_metrics['count'])
+            self.assertEqual(len(app_metrics['actions']), len(expected_app_metrics['actions']))
+            for action_metric in expected_app_metrics['actions']:
+                self.assertIn(action_metric, app_metrics['actions'])
 
     def test_convert_workflow_time_average(self):
-        test1 = {'workflow1': {'count': 0,
-                               'avg_time': timedelta(100, 0, 1)},
-                 'workflow2': {'count': 2,
-                               'avg_time': timedelta(0, 0, 1000)},
-                 'workflow3': {'count': 0,
-                               'avg_time': timedelta(0, 100, 1)},
-                 'workflow4': {'count': 100,
-                               'avg_time': timedelta(1, 100, 500)}}
-        expected_json = {'workflows': [{'count': 100,
-                                        'avg_time': '1 day, 0:01:40.000500',
-                                        'name': 'workflow4'},
-                                       {'count': 2,
-                                        'avg_time': '0:00:00.001000',
-                                        'name': 'workflow2'},
-                                       {'count': 0,
-                                        'avg_time': '0:01:40.000001',
-                                        'name': 'workflow3'},
-                                       {'count': 0,
-                                        'avg_time': '100 days, 0:00:00.000001',
-                                        'name': 'workflow1'}]}
+        test1 = {'workflow1': {'completed': self.make_histogram(timedelta(100, 0, 1), 1)},
+                 'workflow2': {'completed': self.make_histogram(timedelta(0, 0, 1000), 2),
+                               'aborted': self.make_histogram(timedelta(0, 1), 3)},
+                 'workflow3': {'queue_wait': self.make_histogram(timedelta(0, 100, 1), 1)},
+                 'workflow4': {'completed': self.make_histogram(timedelta(1, 100, 500), 100),
+                               'queue_wait': self.make_histogram(timedelta(0, 0, 500), 100)}}
+        expected_json = {'workflows': [dict(self.expected_metrics(100, '1 day, 0:01:40.000500'),
+                                            name='workflow4', aborted_count=0,
+                                            queue_wait=self.expected_metrics(100, '0:00:00.000500')),
+                                       dict(self.expected_metrics(2, '0:00:00.001000'),
+                                            name='workflow2', aborted_count=3),
+                                       dict(self.expected_metrics(0, '0:00:00'),
+                                            name='workflow3', aborted_count=0,
+                                            queue_wait=self.expected_metrics(1, '0:01:40.000001')),
+                                       dict(self.expected_metrics(1, '100 days, 0:00:00.000001'),
+                                            name='workflow1', aborted_count=0)]}
         metrics.workflow_metrics = test1
         converted = _convert_workflow_time_averages()
-        orderless_list_compare(self, converted.keys(), ['workflows'])
+        orderless_list_compare(self, converted.keys(), ['workflows', 'in_flight'])
         self.assertEqual(len(converted['workflows']), len(expected_json['workflows']))
         for workflow in expected_json['workflows']:
             self.assertIn(workflow, converted['workflows'])
@@ -0,0 +1,57 @@
+import json
+import unittest
+
+import walkoff.config.config
+import walkoff.server.blueprints.notifications as notifications
+from walkoff.server.blueprints.notifications import (NotificationSseEvent, send_sse, notification_event_stream,
+                                                     get_user_stream)
+
+
+class TestNotificationStreams(unittest.TestCase):
+    def setUp(self):
+        self.original_heartbeat_interval = walkoff.config.config.sse_heartbeat_interval
+        walkoff.config.config.sse_heartbeat_interval = 0.01
+        notifications.user_streams.clear()
+
+    def tearDown(self):
+        walkoff.config.config.sse_heartbeat_interval = self.original_heartbeat_interval
+        notifications.user_streams.clear()
+
+    @staticmethod
+    def subscribe(user_id, last_event_id=None):
+        stream = notification_event_stream(user_id, last_event_id)
+        next(stream)
+        return stream
+
+    @staticmethod
+    def get_data(stream):
+        event = next(stream)
+        return json.loads(event.strip().splitlines()[-1][len('data: '):]) if not event.startswith(':') else None
+
+    def test_only_recipients_notified(self):
+        stream1 = self.subscribe(1)
+        stream2 = self.subscribe(2)
+        send_sse({1}, NotificationSseEvent.created, {'id': 1})
+        send_sse({1, 2}, NotificationSseEvent.read, {'id': 2})
+        self.assertEqual(self.get_data(stream1), {'id': 1})
+        self.assertEqual(self.get_data(stream1), {'id': 2})
+        self.assertEqual(self.get_data(stream2), {'id': 2})
+        self.assertEqual(get_user_stream(2).last_event_id, 1)
+
+    def test_event_name(self):
+        stream = self.subscribe(1)
+        send_sse({1}, NotificationSseEvent.responded, {'id': 1})
+        self.assertIn('event: responded\n', next(stream))
+
+    def test_replay_on_reconnect(self):
+        send_sse({1}, NotificationSseEvent.created, {'id': 1})
+        send_sse({1}, NotificationSseEvent.created, {'id': 2})
+        send_sse({1}, NotificationSseEvent.created, {'id': 3})
+        stream = self.subscribe(1, last_event_id='1')
+        self.assertEqual(self.get_data(stream), {'id': 2})
+        self.assertEqual(self.get_data(stream), {'id': 3})
+
+    def test_new_connection_only_receives_new_notifications(self):
+        send_sse({1}, NotificationSseEvent.created, {'id': 1})
+        stream = self.subscribe(1)
+        self.assertIsNone(self.get_data(stream))
@@ -0,0 +1,137 @@
+import threading
+import unittest
+from uuid import uuid4
+
+import walkoff.appgateway
+import walkoff.config.config
+from tests import config
+from tests.util import execution_db_help
+from walkoff.events import WalkoffEvent
+from walkoff.executiondb.action import Action
+from walkoff.executiondb.argument import Argument
+from walkoff.executiondb.branch import Branch
+from walkoff.executiondb.condition import Condition
+from walkoff.executiondb.conditionalexpression import ConditionalExpression
+from walkoff.executiondb.workflow import Workflow
+from walkoff.helpers import InvalidExecutionElement
+
+
+class TestParallelWorkflow(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        execution_db_help.setup_dbs()
+        walkoff.appgateway.cache_apps(config.test_apps_path)
+        walkoff.config.config.load_app_apis(apps_path=config.test_apps_path)
+
+    def setUp(self):
+        self.events = []
+        self.threads = set()
+
+        def record_event(sender, **kwargs):
+            self.events.append((sender, kwargs['event']))
+            if kwargs['event'] == WalkoffEvent.ActionStarted:
+                self.threads.add(threading.current_thread().name)
+
+        self.record_event = record_event
+        WalkoffEvent.CommonWorkflowSignal.connect(record_event)
+
+    def tearDown(self):
+        WalkoffEvent.CommonWorkflowSignal.signal.disconnect(self.record_event)
+
+    @classmethod
+    def tearDownClass(cls):
+        walkoff.appgateway.clear_cache()
+        execution_db_help.tear_down_device_db()
+
+    @staticmethod
+    def plus_one(name, number=None, reference=None):
+        argument = Argument('number', value=number) if number is not None else Argument('number', reference=reference)
+        return Action('HelloWorld', 'returnPlusOne', name, id=uuid4(), arguments=[argument])
+
+    @staticmethod
+    def add_three(name, *references):
+        arguments = [Argument('num{}'.format(i + 1), reference=reference) for i, reference in enumerate(references)]
+        return Action('HelloWorld', 'Add Three', name, id=uuid4(), arguments=arguments)
+
+    @staticmethod
+    def regex_condition(regex):
+        return ConditionalExpression(
+            'and',
+            conditions=[Condition('HelloWorld', action_name='regMatch', arguments=[Argument('regex', value=regex)])])
+
+    def get_events(self, event):
+        return [sender for sender, sent_event in self.events if sent_event == event]
+
+    def build_fan_out_workflow(self, conditions=(None, None, None)):
+        start = self.plus_one('start', number=1)
+        fan_out = [self.plus_one('branch{}'.format(i), reference=start.id) for i in range(3)]
+        join = self.add_three('join', *[action.id for action in fan_out])
+        branches = [Branch(source_id=start.id, destination_id=action.id, condition=condition)
+                    for action, condition in zip(fan_out, conditions)]
+        branches.extend(Branch(source_id=action.id, destination_id=join.id) for action in fan_out)
+        workflow = Workflow('parallel', start.id, actions=[start, join] + fan_out, branches=branches, parallel=True)
+        workflow.reset()
+        return workflow, start, fan_out, join
+
+    def test_fan_out_fan_in(self):
+        workflow, start, fan_out, join = self.build_fan_out_workflow()
+        workflow.execute('execution_id')
+
+        accumulator = workflow.get_accumulator()
+        self.assertEqual(accumulator[start.id], 2)
+        for action in fan_out:
+            self.assertEqual(accumulator[action.id], 3)
+        self.assertEqual(accumulator[join.id], 9)
+        self.assertEqual(len(self.get_events(WalkoffEvent.ActionExecutionSuccess)), 5)
+        self.assertEqual(len(self.get_events(WalkoffEvent.BranchTaken)), 6)
+        self.assertEqual(len(self.get_events(WalkoffEvent.WorkflowShutdown)), 1)
+        self.assertGreater(len(self.threads), 1)
+
+    def test_join_waits_for_all_predecessors(self):
+        workflow, start, fan_out, join = self.build_fan_out_workflow()
+        workflow.execute('execution_id')
+
+        started = self.get_events(WalkoffEvent.ActionStarted)
+        self.assertIs(started[0], start)
+        self.assertIs(started[-1], join)
+        self.assertEqual(len([action for action in started if action is join]), 1)
+
+    def test_branch_not_taken_skips_path(self):
+        workflow, start, fan_out, join = self.build_fan_out_workflow(
+            conditions=(None, self.regex_condition('aaa'), None))
+        workflow.execute('execution_id')
+
+        accumulator = workflow.get_accumulator()
+        self.assertIn(fan_out[0].id, accumulator)
+        self.assertNotIn(fan_out[1].id, accumulator)
+        self.assertIn(fan_out[2].id, accumulator)
+        self.assertEqual(len(self.get_events(WalkoffEvent.BranchNotTaken)), 1)
+        self.assertIn(join.id, accumulator)
+        self.assertListEqual(self.get_events(WalkoffEvent.ActionArgumentsInvalid), [join])
+        self.assertEqual(len(self.get_events(WalkoffEvent.WorkflowShutdown)), 1)
+
+    def test_abort(self):
+        workflow, start, fan_out, join = self.build_fan_out_workflow()
+        workflow.abort()
+        workflow.execute('execution_id')
+
+        self.assertDictEqual(workflow.get_accumulator(), {})
+        self.assertEqual(len(self.get_events(WalkoffEvent.WorkflowAborted)), 1)
+        self.assertEqual(len(self.get_events(WalkoffEvent.WorkflowShutdown)), 0)
+
+    def test_sequential_workflow_follows_one_branch(self):
+        workflow, start, fan_out, join = self.build_fan_out_workflow()
+        workflow.parallel = False
+        workflow.execute('execution_id')
+
+        accumulator = workflow.get_accumulator()
+        self.assertEqual(len([action for action in fan_out if action.id in accumulator]), 1)
+
+    def test_cycle_invalid(self):
+        action1 = self.plus_one('action1', number=1)
+        action2 = self.plus_one('action2', number=1)
+        branches = [Branch(source_id=action1.id, destination_id=action2.id),
+                    Branch(source_id=action2.id, destination_id=action1.id)]
+        Workflow('sequential', action1.id, actions=[action1, action2], branches=branches)
+        with self.assertRaises(InvalidExecutionElement):
+            Workflow('parallel', action1.id, actions=[action1, action2], branches=branches, parallel=True)
@@ -0,0 +1,111 @@
+import unittest
+
+import walkoff.config.config
+from walkoff.multiprocessedexecutor.pendingqueue import PendingWorkflowQueue
+
+
+class TestPendingWorkflowQueue(unittest.TestCase):
+    def setUp(self):
+        self.queue = PendingWorkflowQueue(aging=10)
+
+    def put(self, execution_id, priority=0, now=0, workflow_id='workflow', concurrency_limits=None):
+        self.queue.put(workflow_id, execution_id, priority=priority, concurrency_limits=concurrency_limits, now=now)
+
+    def get_all(self, now=0):
+        execution_ids = []
+        pending_workflow = self.queue.get(now=now)
+        while pending_workflow is not None:
+            execution_ids.append(pending_workflow.execution_id)
+            pending_workflow = self.queue.get(now=now)
+        return execution_ids
+
+    def test_empty(self):
+        self.assertTrue(self.queue.empty())
+        self.assertIsNone(self.queue.get())
+        self.put('a')
+        self.assertFalse(self.queue.empty())
+
+    def test_fifo_within_priority(self):
+        for i, execution_id in enumerate('abc'):
+            self.put(execution_id, now=i)
+        self.assertListEqual(self.get_all(now=2), ['a', 'b', 'c'])
+
+    def test_higher_priority_first(self):
+        self.put('low', priority=1, now=0)
+        self.put('high', priority=5, now=1)
+        self.put('medium', priority=3, now=2)
+        self.assertListEqual(self.get_all(now=2), ['high', 'medium', 'low'])
+
+    def test_aging(self):
+        self.put('low', priority=1, now=0)
+        self.put('high', priority=5, now=45)
+        self.assertListEqual(self.get_all(now=45), ['low', 'high'])
+
+    def test_aging_disabled(self):
+        self.queue.aging = 0
+        self.put('low', priority=1, now=0)
+        self.put('high', priority=5, now=1000)
+        self.assertListEqual(self.get_all(now=1000), ['high', 'low'])
+
+    def test_aging_default_from_config(self):
+        self.queue.aging = None
+        walkoff.config.config.workflow_priority_aging, original = 1, walkoff.config.config.workflow_priority_aging
+        try:
+            self.put('low', priority=1, now=0)
+            self.put('high', priority=5, now=10)
+            self.assertListEqual(self.get_all(now=10), ['low', 'high'])
+        finally:
+            walkoff.config.config.workflow_priority_aging = original
+
+    def test_concurrency_limit_holds_without_blocking(self):
+        limits = {'workflow': 1}
+        self.put('a', priority=5, concurrency_limits=limits)
+        self.put('b', priority=5, concurrency_limits=limits)
+        self.put('c', priority=1, workflow_id='other')
+        self.assertListEqual(self.get_all(), ['a', 'c'])
+        self.assertTrue(self.queue.empty())
+        self.assertDictEqual(self.queue.get_statistics(now=0),
+                             {'ready': 0, 'oldest_wait': 0, 'held': 1, 'executing': 2})
+        self.assertTrue(self.queue.release('a'))
+        self.assertListEqual(self.get_all(), ['b'])
+
+    def test_playbook_limit_shared_by_workflows(self):
+        self.put('a', workflow_id='workflow1', concurrency_limits={'workflow1': None, 'playbook': 2})
+        self.put('b', workflow_id='workflow2', concurrency_limits={'workflow2': None, 'playbook': 2})
+        self.put('c', workflow_id='workflow2', concurrency_limits={'workflow2': None, 'playbook': 2})
+        self.assertListEqual(self.get_all(), ['a', 'b'])
+        self.assertFalse(self.queue.release('unknown'))
+        self.assertTrue(self.queue.release('b'))
+        self.assertListEqual(self.get_all(), ['c'])
+
+    def test_limit_updated_by_later_put(self):
+        self.put('a', concurrency_limits={'workflow': 1})
+        self.put('b', concurrency_limits={'workflow': 1})
+        self.assertListEqual(self.get_all(), ['a'])
+        self.put('c', concurrency_limits={'workflow': None})
+        self.assertListEqual(self.get_all(), ['b', 'c'])
+
+    def test_released_held_workflow_keeps_its_place(self):
+        self.put('a', concurrency_limits={'workflow': 1}, now=0)
+        self.put('b', concurrency_limits={'workflow': 1}, now=1)
+        self.assertListEqual(self.get_all(now=1), ['a'])
+        self.put('c', workflow_id='other', now=2)
+        self.queue.release('a')
+        self.assertListEqual(self.get_all(now=2), ['b', 'c'])
+
+    def test_release_unholds_only_freed_executions(self):
+        for i, execution_id in enumerate(['a', 'b', 'c', 'd']):
+            self.put(execution_id, concurrency_limits={'workflow': 1}, now=i)
+        self.assertListEqual(self.get_all(now=4), ['a'])
+        self.assertTrue(self.queue.release('a'))
+        self.assertDictEqual(self.queue.get_statistics(now=4),
+                             {'ready': 1, 'oldest_wait': 3, 'held': 2, 'executing': 0})
+        self.assertListEqual(self.get_all(now=4), ['b'])
+        self.assertTrue(self.queue.release('b'))
+        self.assertListEqual(self.get_all(now=4), ['c'])
+
+    def test_statistics(self):
+        self.put('a', now=0)
+        self.put('b', priority=3, now=5)
+        self.assertDictEqual(self.queue.get_statistics(now=10),
+                             {'ready': 2, 'oldest_wait': 10, 'held': 0, 'executing': 0})
@@ -0,0 +1,142 @@
+import json
+import unittest
+from copy import copy
+from uuid import uuid4
+
+import walkoff.appgateway
+import walkoff.config.config
+from tests import config
+from tests.util import execution_db_help
+from walkoff.events import WalkoffEvent
+from walkoff.executiondb.action import Action
+from walkoff.executiondb.argument import Argument
+from walkoff.executiondb.branch import Branch
+from walkoff.executiondb.workflow import Workflow
+from walkoff.multiprocessedexecutor.encoding import (format_ready_message, parse_ready_message, negotiate_encoding,
+                                                     proto_to_dict, msgpack, pack, unpack)
+from walkoff.multiprocessedexecutor.loadbalancer import Receiver
+from walkoff.multiprocessedexecutor.worker import convert_to_protobuf
+from walkoff.proto.build.data_pb2 import Message, ExecuteWorkflowMessage
+
+
+class TestResultEncoding(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        execution_db_help.setup_dbs()
+        walkoff.appgateway.cache_apps(config.test_apps_path)
+        walkoff.config.config.load_app_apis(apps_path=config.test_apps_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        walkoff.appgateway.clear_cache()
+        execution_db_help.tear_down_device_db()
+
+    def setUp(self):
+        self.action = Action('HelloWorld', 'returnPlusOne', 'start', id=uuid4(),
+                             arguments=[Argument('number', value=4)])
+        self.action._execution_id = str(uuid4())
+        self.workflow = Workflow('workflow', self.action.id, id=uuid4(), actions=[self.action])
+        self.workflow._execution_id = str(uuid4())
+        self.original_encoding = walkoff.config.config.preferred_result_encoding
+
+    def tearDown(self):
+        walkoff.config.config.preferred_result_encoding = self.original_encoding
+
+    def assert_encodings_equal(self, sender, **kwargs):
+        json_message = convert_to_protobuf(copy(sender), self.workflow, encoding=Message.JSON, **kwargs)
+        packed_message = convert_to_protobuf(copy(sender), self.workflow, encoding=Message.MSGPACK, **kwargs)
+        parsed_packed_message = Message()
+        parsed_packed_message.ParseFromString(packed_message)
+        self.assertEqual(parsed_packed_message.encoding, Message.MSGPACK)
+        self.assertTupleEqual(Receiver.parse_message(json_message), Receiver.parse_message(packed_message))
+        return Receiver.parse_message(packed_message)
+
+    @unittest.skipIf(msgpack is None, 'msgpack is not installed')
+    def test_workflow_event(self):
+        event, sender, data, execution_id = self.assert_encodings_equal(
+            self.workflow, event=WalkoffEvent.WorkflowExecutionStart)
+        self.assertEqual(event, WalkoffEvent.WorkflowExecutionStart)
+        self.assertDictEqual(sender, {'name': 'workflow', 'id': str(self.workflow.id),
+                                      'execution_id': self.workflow.get_execution_id()})
+        self.assertEqual(execution_id, self.workflow.get_execution_id())
+
+    @unittest.skipIf(msgpack is None, 'msgpack is not installed')
+    def test_action_event(self):
+        result = {'result': {'a': [1, 2.5, None, True, 'b'], 'c': {'d': 'e'}}, 'status': 'Success'}
+        event, sender, data, execution_id = self.assert_encodings_equal(
+            self.action, event=WalkoffEvent.ActionExecutionSuccess, data=result)
+        self.assertDictEqual(data['data'], result)
+        self.assertListEqual(sender['arguments'], [{'name': 'number', 'value': '4'}])
+        self.assertEqual(sender['device_id'], -1)
+        self.assertEqual(data['workflow']['execution_id'], self.workflow.get_execution_id())
+        self.assertEqual(execution_id, self.workflow.get_execution_id())
+
+    @unittest.skipIf(msgpack is None, 'msgpack is not installed')
+    def test_branch_event(self):
+        branch = Branch(source_id=self.action.id, destination_id=self.action.id, id=uuid4())
+        event, sender, data, execution_id = self.assert_encodings_equal(branch, event=WalkoffEvent.BranchTaken)
+        self.assertDictEqual(sender, {'id': str(branch.id)})
+
+    @unittest.skipIf(msgpack is None, 'msgpack is not installed')
+    def test_send_message(self):
+        message = {'body': [{'text': 'hello'}], 'subject': 'subject'}
+        event, sender, data, execution_id = self.assert_encodings_equal(
+            message, event=WalkoffEvent.SendMessage, users=[1, 2], roles=[3], requires_reauth=True)
+        self.assertDictEqual(dict(data['message'], users=list(data['message']['users']),
+                                  roles=list(data['message']['roles'])),
+                             {'users': [1, 2], 'roles': [3], 'requires_reauth': True, 'body': [{'text': 'hello'}],
+                              'subject': 'subject'})
+
+    @unittest.skipIf(msgpack is None, 'msgpack is not installed')
+    def test_unpackable_data_falls_back_to_json(self):
+        packet_bytes = convert_to_protobuf(self.action, self.workflow, encoding=Message.MSGPACK,
+                                           event=WalkoffEvent.ActionExecutionSuccess,
+                                           data={'result': 2 ** 70, 'status': 'Success'})
+        message = Message()
+        message.ParseFromString(packet_bytes)
+        self.assertEqual(message.encoding, Message.JSON)
+        self.assertEqual(Receiver.parse_message(packet_bytes)[2]['data']['result'], 2 ** 70)
+
+    @unittest.skipIf(msgpack is None, 'msgpack is not installed')
+    def test_non_string_keys_match_json(self):
+        result = {'result': {1: 'a', 2.5: [{None: True, False: 'b'}]}, 'status': 'Success'}
+        event, sender, data, execution_id = self.assert_encodings_equal(
+            self.action, event=WalkoffEvent.ActionExecutionSuccess, data=result)
+        self.assertDictEqual(data['data']['result'], {'1': 'a', '2.5': [{'null': True, 'false': 'b'}]})
+
+    @unittest.skipIf(msgpack is None, 'msgpack is not installed')
+    def test_pack_round_trip_matches_json(self):
+        payload = {'a': [1, 2.5, None, True, u'\u00e9', ('b', {3: 'c'})], 'd': {'e': {False: []}}}
+        self.assertEqual(unpack(pack(payload)), json.loads(json.dumps(payload)))
+
+    @unittest.skipIf(msgpack is None, 'msgpack is not installed')
+    def test_pack_bytes_matches_json(self):
+        payload = {'a': [b'bytes'], b'b': 'c'}
+        try:
+            expected = json.loads(json.dumps(payload))
+        except TypeError:
+            self.assertRaises(TypeError, pack, payload)
+        else:
+            self.assertEqual(unpack(pack(payload)), expected)
+
+    def test_ready_message(self):
+        self.assertListEqual(parse_ready_message(b'Ready'), [Message.JSON])
+        self.assertSetEqual(set(parse_ready_message(format_ready_message([Message.JSON, Message.MSGPACK]))),
+                            {Message.JSON, Message.MSGPACK})
+        self.assertIsNone(parse_ready_message(b'Other'))
+
+    @unittest.skipIf(msgpack is None, 'msgpack is not installed')
+    def test_negotiate_encoding(self):
+        walkoff.config.config.preferred_result_encoding = 'msgpack'
+        self.assertEqual(negotiate_encoding([Message.JSON, Message.MSGPACK]), Message.MSGPACK)
+        self.assertEqual(negotiate_encoding([Message.JSON]), Message.JSON)
+        walkoff.config.config.preferred_result_encoding = 'json'
+        self.assertEqual(negotiate_encoding([Message.JSON, Message.MSGPACK]), Message.JSON)
+
+    def test_proto_to_dict(self):
+        message = ExecuteWorkflowMessage(workflow_id='a', resume=True)
+        argument = message.arguments.add()
+        argument.name = 'arg'
+        argument.value = '1'
+        self.assertDictEqual(proto_to_dict(message),
+                             {'workflow_id': 'a', 'resume': True, 'arguments': [{'name': 'arg', 'value': '1'}]})
@@ -0,0 +1,118 @@
+import json
+import unittest
+
+import walkoff.config.config
+from walkoff.server.sse import SseStream, get_list_argument
+from werkzeug.datastructures import MultiDict
+
+
+class TestSseStream(unittest.TestCase):
+    def setUp(self):
+        self.original_heartbeat_interval = walkoff.config.config.sse_heartbeat_interval
+        walkoff.config.config.sse_heartbeat_interval = 0.01
+        self.stream = SseStream('test', buffer_size=5)
+
+    def tearDown(self):
+        walkoff.config.config.sse_heartbeat_interval = self.original_heartbeat_interval
+
+    @staticmethod
+    def parse_event(formatted):
+        fields = {}
+        for line in formatted.strip().splitlines():
+            name, value = line.split(': ', 1)
+            fields[name] = value
+        if 'data' in fields:
+            fields['data'] = json.loads(fields['data'])
+        return fields
+
+    def subscribe(self, **kwargs):
+        subscriber = self.stream.subscribe(**kwargs)
+        self.assertEqual(next(subscriber), ': connected\n\n')
+        return subscriber
+
+    def test_publish_ids_increase(self):
+        self.assertEqual(self.stream.publish('a', {'x': 1}), 1)
+        self.assertEqual(self.stream.publish('b', {'x': 2}), 2)
+        events, missed = self.stream.read(0)
+        self.assertListEqual([event[0] for event in events], [1, 2])
+        self.assertEqual(missed, 0)
+
+    def test_ring_buffer(self):
+        for i in range(8):
+            self.stream.publish('a', i)
+        events, missed = self.stream.read(1)
+        self.assertListEqual([event[2] for event in events], [3, 4, 5, 6, 7])
+        self.assertEqual(missed, 2)
+        self.assertListEqual([event[2] for event in self.stream.read(6)[0]], [6, 7])
+
+    def test_subscriber_receives_new_events_only(self):
+        self.stream.publish('a', 'old')
+        subscriber = self.subscribe()
+        self.stream.publish('b', 'new')
+        event = self.parse_event(next(subscriber))
+        self.assertDictEqual(event, {'id': '2', 'event': 'b', 'data': 'new'})
+
+    def test_slow_subscribers_do_not_lose_events(self):
+        subscriber = self.subscribe()
+        for i in range(3):
+            self.stream.publish('a', i)
+        self.assertListEqual([self.parse_event(next(subscriber))['data'] for _ in range(3)], [0, 1, 2])
+
+    def test_last_event_id_resume(self):
+        for i in range(4):
+            self.stream.publish('a', i)
+        subscriber = self.subscribe(last_event_id='2')
+        self.assertListEqual([self.parse_event(next(subscriber))['id'] for _ in range(2)], ['3', '4'])
+
+    def test_last_event_id_from_before_restart(self):
+        self.stream.publish('a', 0)
+        subscriber = self.subscribe(last_event_id='100')
+        self.assertEqual(self.parse_event(next(subscriber))['id'], '1')
+
+    def test_invalid_last_event_id(self):
+        self.stream.publish('a', 0)
+        subscriber = self.subscribe(last_event_id='invalid')
+        self.stream.publish('a', 1)
+        self.assertEqual(self.parse_event(next(subscriber))['data'], 1)
+
+    def test_dropped_events(self):
+        subscriber = self.subscribe()
+        for i in range(7):
+            self.stream.publish('a', i)
+        dropped = self.parse_event(next(subscriber))
+        self.assertEqual(dropped['event'], 'dropped')
+        self.assertDictEqual(dropped['data'], {'count': 2})
+        self.assertEqual(self.parse_event(next(subscriber))['data'], 2)
+        self.assertEqual(self.stream.get_statistics()['dropped'], 2)
+
+    def test_filters(self):
+        subscriber = self.subscribe(execution_id=['e1', 'e2'], event=['started'])
+        self.stream.publish('started', 1, execution_id='e1')
+        self.stream.publish('started', 2, execution_id='e3')
+        self.stream.publish('completed', 3, execution_id='e2')
+        self.stream.publish('started', 4, execution_id='e2')
+        self.assertListEqual([self.parse_event(next(subscriber))['data'] for _ in range(2)], [1, 4])
+
+    def test_empty_filters_ignored(self):
+        subscriber = self.subscribe(execution_id=[], workflow_id=None)
+        self.stream.publish('started', 1, execution_id='e1')
+        self.assertEqual(self.parse_event(next(subscriber))['data'], 1)
+
+    def test_heartbeat(self):
+        subscriber = self.subscribe()
+        self.assertEqual(next(subscriber), ': heartbeat\n\n')
+
+    def test_subscriber_count(self):
+        subscriber1 = self.subscribe()
+        subscriber2 = self.subscribe()
+        self.assertEqual(self.stream.get_statistics()['subscribers'], 2)
+        subscriber1.close()
+        self.assertEqual(self.stream.get_statistics()['subscribers'], 1)
+        subscriber2.close()
+        self.assertEqual(self.stream.get_statistics()['subscribers'], 0)
+
+    def test_get_list_argument(self):
+        args = MultiDict([('execution_id', 'a,b'), ('execution_id', 'c'), ('event', '')])
+        self.assertListEqual(get_list_argument(args, 'execution_id'), ['a', 'b', 'c'])
+        self.assertListEqual(get_list_argument(args, 'event'), [])
+        self.assertListEqual(get_list_argument(args, 'workflow_id'), [])
@@ -0,0 +1,222 @@
+import threading
+import time
+import unittest
+
+import zmq.green
+
+import walkoff.config.config
+from tests.util.thread_control import modified_setup_worker_env
+from walkoff.events import WalkoffEvent
+from walkoff.multiprocessedexecutor.autoscaler import (WorkerAutoscaler, get_worker_identity,
+                                                       get_max_worker_processes, get_initial_worker_processes)
+from walkoff.multiprocessedexecutor.loadbalancer import LoadBalancer
+from walkoff.multiprocessedexecutor.multiprocessedexecutor import spawn_worker_process, terminate_worker_process
+
+
+class MockProcess(object):
+    def __init__(self, number):
+        self.number = number
+        self.alive = True
+
+    def is_alive(self):
+        return self.alive
+
+
+class MockLoadBalancer(object):
+    def __init__(self):
+        self.workers = {}
+        self.draining = set()
+        self.pending = 0
+        self.oldest_pending_wait = 0
+
+    def register(self, number, free_slots=None):
+        slots = walkoff.config.config.num_threads_per_process
+        self.workers[get_worker_identity(number)] = [slots, free_slots if free_slots is not None else slots]
+
+    def drain_worker(self):
+        candidates = [worker for worker in self.workers if worker not in self.draining]
+        if not candidates:
+            return None
+        worker = max(candidates, key=lambda worker_: self.workers[worker_][1])
+        self.draining.add(worker)
+        return worker
+
+    def pop_drained_workers(self):
+        drained = [worker for worker in self.draining if self.workers[worker][1] >= self.workers[worker][0]]
+        for worker in drained:
+            self.remove_worker(worker)
+        return drained
+
+    def remove_worker(self, worker):
+        self.workers.pop(worker, None)
+        self.draining.discard(worker)
+
+    def get_worker_statistics(self):
+        active = [slots for worker, slots in self.workers.items() if worker not in self.draining]
+        return {'workers': len(self.workers), 'draining': len(self.draining),
+                'slots': sum(slots for slots, _ in active), 'free_slots': sum(free for _, free in active),
+                'pending': self.pending, 'oldest_pending_wait': self.oldest_pending_wait}
+
+
+class TestWorkerAutoscaler(unittest.TestCase):
+    def setUp(self):
+        self.original_num_threads = walkoff.config.config.num_threads_per_process
+        walkoff.config.config.num_threads_per_process = 2
+        self.load_balancer = MockLoadBalancer()
+        self.terminated = []
+        self.processes = [MockProcess(0), MockProcess(1)]
+        for process in self.processes:
+            self.load_balancer.register(process.number)
+        self.autoscaler = WorkerAutoscaler(self.load_balancer, MockProcess, self.terminated.append,
+                                           processes=self.processes, min_processes=1, max_processes=4,
+                                           queue_depth=4, queue_wait=10, cooldown=60)
+        self.events = []
+        WalkoffEvent.WorkersScaledUp.connect(self.on_scaled, weak=False)
+        WalkoffEvent.WorkersScaledDown.connect(self.on_scaled, weak=False)
+
+    def tearDown(self):
+        WalkoffEvent.WorkersScaledUp.signal.disconnect(self.on_scaled)
+        WalkoffEvent.WorkersScaledDown.signal.disconnect(self.on_scaled)
+        walkoff.config.config.num_threads_per_process = self.original_num_threads
+        walkoff.config.config.worker_autoscaling = 'disabled'
+
+    def on_scaled(self, sender, **kwargs):
+        self.events.append((kwargs['data']['count'], kwargs['data']['reason']))
+
+    def register_spawned(self):
+        for process in self.processes:
+            if get_worker_identity(process.number) not in self.load_balancer.workers:
+                self.load_balancer.register(process.number)
+
+    def test_config_helpers(self):
+        walkoff.config.config.worker_autoscaling = 'disabled'
+        self.assertEqual(get_max_worker_processes(), walkoff.config.config.num_processes)
+        self.assertEqual(get_initial_worker_processes(), walkoff.config.config.num_processes)
+        walkoff.config.config.worker_autoscaling = 'enabled'
+        self.assertEqual(get_max_worker_processes(), walkoff.config.config.max_processes)
+        self.assertLessEqual(get_initial_worker_processes(), walkoff.config.config.max_processes)
+        self.assertGreaterEqual(get_initial_worker_processes(), walkoff.config.config.min_processes)
+
+    def test_no_scaling_below_thresholds(self):
+        self.load_balancer.pending = 3
+        self.assertEqual(self.autoscaler.scale(now=0), 0)
+        self.assertListEqual(self.events, [])
+
+    def test_scale_up_on_queue_depth(self):
+        self.load_balancer.pending = 5
+        self.assertEqual(self.autoscaler.scale(now=0), 2)
+        self.assertEqual(len(self.processes), 4)
+        self.assertListEqual([process.number for process in self.processes[2:]], [2, 3])
+        self.assertListEqual(self.events, [(2, 'queue_depth')])
+
+    def test_scale_up_on_queue_wait(self):
+        self.load_balancer.pending = 1
+        self.load_balancer.oldest_pending_wait = 15
+        self.assertEqual(self.autoscaler.scale(now=0), 1)
+        self.assertListEqual(self.events, [(1, 'queue_wait')])
+
+    def test_scale_up_limited_to_max_processes(self):
+        self.load_balancer.pending = 100
+        self.assertEqual(self.autoscaler.scale(now=0), 2)
+        self.register_spawned()
+        self.assertEqual(self.autoscaler.scale(now=1), 0)
+        self.assertEqual(len(self.processes), 4)
+
+    def test_no_scale_up_while_workers_starting(self):
+        self.load_balancer.pending = 5
+        self.autoscaler.max_processes = 10
+        self.autoscaler.scale(now=0)
+        self.assertEqual(self.autoscaler.scale(now=1), 0)
+        self.register_spawned()
+        self.assertEqual(self.autoscaler.scale(now=2), 3)
+
+    def test_scale_down_after_cooldown(self):
+        self.assertEqual(self.autoscaler.scale(now=0), 0)
+        self.assertEqual(self.autoscaler.scale(now=30), 0)
+        self.assertEqual(self.autoscaler.scale(now=60), -1)
+        self.assertListEqual(self.events, [(1, 'idle')])
+        self.assertEqual(len(self.load_balancer.draining), 1)
+        self.assertEqual(self.autoscaler.scale(now=61), 0)
+        self.assertEqual(len(self.terminated), 1)
+        self.assertEqual(len(self.processes), 1)
+        self.assertEqual(self.autoscaler.scale(now=1000), 0)
+        self.assertEqual(len(self.processes), 1)
+
+    def test_busy_workers_not_scaled_down(self):
+        self.load_balancer.register(0, free_slots=0)
+        self.load_balancer.register(1, free_slots=1)
+        self.autoscaler.scale(now=0)
+        self.assertEqual(self.autoscaler.scale(now=100), 0)
+
+    def test_draining_worker_retired_when_free(self):
+        self.load_balancer.register(0, free_slots=0)
+        self.autoscaler.scale(now=0)
+        self.autoscaler.scale(now=60)
+        self.assertIn(get_worker_identity(1), self.load_balancer.draining)
+        self.load_balancer.register(0, free_slots=2)
+        self.load_balancer.workers[get_worker_identity(1)][1] = 1
+        self.autoscaler.scale(now=61)
+        self.assertListEqual(self.terminated, [])
+        self.load_balancer.workers[get_worker_identity(1)][1] = 2
+        self.autoscaler.scale(now=62)
+        self.assertListEqual(self.terminated, [self.autoscaler_process(1)])
+
+    def autoscaler_process(self, number):
+        return next(process for process in self.processes + self.terminated if process.number == number)
+
+    def test_dead_worker_replaced(self):
+        self.autoscaler.min_processes = 2
+        self.processes[0].alive = False
+        self.assertEqual(self.autoscaler.scale(now=0), 1)
+        self.assertNotIn(get_worker_identity(0), self.load_balancer.workers)
+        self.assertListEqual([process.number for process in self.processes], [1, 2])
+        self.assertListEqual(self.events, [(1, 'min_processes')])
+
+    def test_statistics(self):
+        self.load_balancer.pending = 5
+        self.autoscaler.scale(now=0)
+        self.assertDictEqual(self.autoscaler.get_statistics(),
+                             {'workers': 4, 'draining': 0, 'scale_ups': 1, 'scale_downs': 0})
+
+    def test_start_stop(self):
+        self.autoscaler.interval = 0.01
+        self.autoscaler.start()
+        self.autoscaler.stop()
+        self.assertIsNone(self.autoscaler._thread)
+
+
+class TestSpawnWorkerProcess(unittest.TestCase):
+    def setUp(self):
+        self.original_addresses = (walkoff.config.config.zmq_requests_address,
+                                   walkoff.config.config.zmq_results_address,
+                                   walkoff.config.config.zmq_communication_address)
+        walkoff.config.config.zmq_requests_address = 'tcp://127.0.0.1:5755'
+        walkoff.config.config.zmq_results_address = 'tcp://127.0.0.1:5756'
+        walkoff.config.config.zmq_communication_address = 'tcp://127.0.0.1:5757'
+        self.ctx = zmq.green.Context()
+        self.load_balancer = LoadBalancer(self.ctx)
+        self.thread = threading.Thread(target=self.load_balancer.manage_workflows)
+        self.thread.start()
+
+    def tearDown(self):
+        self.load_balancer.thread_exit = True
+        self.load_balancer.wake()
+        self.thread.join(timeout=2)
+        self.ctx.term()
+        (walkoff.config.config.zmq_requests_address,
+         walkoff.config.config.zmq_results_address,
+         walkoff.config.config.zmq_communication_address) = self.original_addresses
+
+    def test_spawned_worker_uses_server_config(self):
+        process = spawn_worker_process(0, worker_environment_setup=modified_setup_worker_env)
+        identity = get_worker_identity(0)
+        try:
+            end = time.time() + 30
+            while identity not in self.load_balancer.workers and time.time() < end and process.is_alive():
+                time.sleep(0.1)
+            self.assertIn(identity, self.load_balancer.workers)
+        finally:
+            self.load_balancer.send_exit_to_worker_comms()
+            terminate_worker_process(process)
+        self.assertFalse(process.is_alive())
+        self.assertEqual(process.exitcode, 0)
@@ -0,0 +1,106 @@
+import unittest
+
+import walkoff.appgateway
+import walkoff.config.config
+from tests import config
+from tests.util import execution_db_help
+from walkoff import executiondb
+from walkoff.multiprocessedexecutor.workflowcache import WorkflowCache
+
+
+class TestWorkflowCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        execution_db_help.setup_dbs()
+        walkoff.appgateway.cache_apps(config.test_apps_path)
+        walkoff.config.config.load_app_apis(apps_path=config.test_apps_path)
+
+    def setUp(self):
+        self.cache = WorkflowCache(max_workflows=2)
+        self.workflow = execution_db_help.load_workflow('multiactionWorkflowTest', 'multiactionWorkflow')
+
+    def tearDown(self):
+        execution_db_help.cleanup_device_db()
+
+    @classmethod
+    def tearDownClass(cls):
+        walkoff.appgateway.clear_cache()
+        execution_db_help.tear_down_device_db()
+
+    def test_checkout_loads_detached_workflow(self):
+        workflow = self.cache.checkout(self.workflow.id)
+        self.assertEqual(workflow.id, self.workflow.id)
+        self.assertNotIn(workflow, executiondb.execution_db.session)
+        self.assertEqual(len(workflow.actions), len(self.workflow.actions))
+        self.assertEqual(len(workflow.branches), len(self.workflow.branches))
+
+    def test_checkout_loads_triggers(self):
+        workflow = execution_db_help.load_workflow('triggerActionWorkflow', 'triggerActionWorkflow')
+        workflow = self.cache.checkout(workflow.id)
+        self.assertNotIn(workflow, executiondb.execution_db.session)
+        self.assertTrue(any(action.trigger is not None for action in workflow.actions))
+        for action in workflow.actions:
+            repr(action)
+
+    def test_checkout_nonexistent_workflow(self):
+        self.assertIsNone(self.cache.checkout('c5a7c29a-0b8c-4c87-8bc7-4bd7a4b33b2e'))
+
+    def test_checkin_reuses_workflow(self):
+        workflow = self.cache.checkout(self.workflow.id)
+        workflow._accumulator['a'] = 1
+        self.cache.checkin(workflow)
+        reused = self.cache.checkout(self.workflow.id)
+        self.assertIs(reused, workflow)
+        self.assertDictEqual(reused.get_accumulator(), {})
+
+    def test_checkin_resets_actions(self):
+        workflow = self.cache.checkout(self.workflow.id)
+        workflow.execute('some_execution_id')
+        self.assertTrue(all(action.get_output() is not None for action in workflow.actions))
+        self.cache.checkin(workflow)
+        reused = self.cache.checkout(self.workflow.id)
+        for action in reused.actions:
+            self.assertIsNone(action.get_output())
+            self.assertEqual(action.get_execution_id(), 'default')
+
+    def test_concurrent_checkouts_are_distinct(self):
+        workflow1 = self.cache.checkout(self.workflow.id)
+        workflow2 = self.cache.checkout(self.workflow.id)
+        self.assertIsNot(workflow1, workflow2)
+
+    def test_new_version_reloads_workflow(self):
+        workflow = self.cache.checkout(self.workflow.id, version=0)
+        self.cache.checkin(workflow, version=0)
+        reloaded = self.cache.checkout(self.workflow.id, version=1)
+        self.assertIsNot(reloaded, workflow)
+
+    def test_checkin_stale_version_is_discarded(self):
+        workflow = self.cache.checkout(self.workflow.id, version=0)
+        self.cache.checkout(self.workflow.id, version=1)
+        self.cache.checkin(workflow, version=0)
+        self.assertIsNot(self.cache.checkout(self.workflow.id, version=1), workflow)
+
+    def test_invalidate(self):
+        workflow = self.cache.checkout(self.workflow.id)
+        self.cache.checkin(workflow)
+        self.cache.invalidate(self.workflow.id)
+        self.assertIsNot(self.cache.checkout(self.workflow.id), workflow)
+
+    def test_least_recently_used_workflow_evicted(self):
+        workflow = self.cache.checkout(self.workflow.id)
+        self.cache.checkin(workflow)
+        for workflow_name in ('helloWorldWorkflow',):
+            other = execution_db_help.load_workflow('basicWorkflowTest', workflow_name)
+            self.cache.checkin(self.cache.checkout(other.id))
+        third = execution_db_help.load_workflow('dataflowTest', 'dataflowWorkflow')
+        self.cache.checkin(self.cache.checkout(third.id))
+        self.assertIsNot(self.cache.checkout(self.workflow.id), workflow)
+
+    def test_cached_workflow_executes(self):
+        workflow = self.cache.checkout(self.workflow.id)
+        workflow.execute('some_execution_id')
+        self.assertEqual(len(workflow.get_accumulator()), 2)
+        self.cache.checkin(workflow)
+        workflow = self.cache.checkout(self.workflow.id)
+        workflow.execute('another_execution_id')
+        self.assertEqual(len(workflow.get_accumulator()), 2)
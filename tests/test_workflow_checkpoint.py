@@ -0,0 +1,128 @@
+import unittest
+from uuid import uuid4
+
+from tests.util import execution_db_help
+from walkoff import executiondb
+from walkoff.appgateway.appinstancerepo import AppInstanceRepo
+from walkoff.executiondb.checkpoint import (Accumulator, save_checkpoint, load_checkpoint, delete_checkpoints,
+                                            get_checkpoint_statistics)
+from walkoff.executiondb.saved_workflow import SavedWorkflow, SavedAccumulatorEntries
+
+
+class MockWorkflow(object):
+    def __init__(self):
+        self.id = uuid4()
+        self.execution_id = uuid4()
+        self.action_id = uuid4()
+        self.accumulator = Accumulator()
+        self.app_devices = [['HelloWorld', 1]]
+
+    def get_execution_id(self):
+        return self.execution_id
+
+    def get_executing_action_id(self):
+        return self.action_id
+
+    def get_accumulator(self):
+        return self.accumulator
+
+    def get_app_devices(self):
+        return self.app_devices
+
+
+class TestWorkflowCheckpoint(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        execution_db_help.setup_dbs()
+
+    def setUp(self):
+        self.session = executiondb.execution_db.session
+        self.workflow = MockWorkflow()
+
+    def tearDown(self):
+        self.session.rollback()
+        self.session.query(SavedWorkflow).delete()
+        self.session.query(SavedAccumulatorEntries).delete()
+        self.session.commit()
+
+    @classmethod
+    def tearDownClass(cls):
+        execution_db_help.tear_down_device_db()
+
+    def count_entries(self):
+        return self.session.query(SavedAccumulatorEntries).filter_by(
+            workflow_execution_id=self.workflow.execution_id).count()
+
+    def test_accumulator_tracks_changes(self):
+        accumulator = Accumulator()
+        accumulator['a'] = 1
+        accumulator.update({'b': 2})
+        self.assertDictEqual(accumulator.pop_changes(), {'a': 1, 'b': 2})
+        self.assertDictEqual(accumulator.pop_changes(), {})
+        accumulator['a'] = 3
+        self.assertDictEqual(accumulator.pop_changes(), {'a': 3})
+        self.assertDictEqual(accumulator, {'a': 3, 'b': 2})
+
+    def test_save_and_load(self):
+        self.workflow.accumulator['a'] = {'result': [1, 2, 3]}
+        save_checkpoint(self.session, self.workflow)
+        saved_state, accumulator = load_checkpoint(self.session, self.workflow.execution_id)
+        self.assertEqual(saved_state.workflow_id, self.workflow.id)
+        self.assertEqual(saved_state.action_id, self.workflow.action_id)
+        self.assertListEqual(saved_state.app_devices, [['HelloWorld', 1]])
+        self.assertDictEqual(accumulator, {'a': {'result': [1, 2, 3]}})
+
+    def test_load_no_checkpoint(self):
+        self.assertEqual(load_checkpoint(self.session, uuid4()), (None, None))
+
+    def test_only_changed_entries_saved(self):
+        self.workflow.accumulator['a'] = 'x' * 10000
+        save_checkpoint(self.session, self.workflow)
+        self.workflow.accumulator['b'] = 2
+        self.workflow.action_id = uuid4()
+        size = save_checkpoint(self.session, self.workflow)
+        self.assertLess(size, 100)
+        self.assertEqual(self.count_entries(), 2)
+        self.assertEqual(self.session.query(SavedWorkflow).count(), 1)
+        saved_state, accumulator = load_checkpoint(self.session, self.workflow.execution_id)
+        self.assertEqual(saved_state.action_id, self.workflow.action_id)
+        self.assertDictEqual(accumulator, {'a': 'x' * 10000, 'b': 2})
+
+    def test_unchanged_accumulator_saves_no_entries(self):
+        self.workflow.accumulator['a'] = 1
+        save_checkpoint(self.session, self.workflow)
+        self.assertEqual(save_checkpoint(self.session, self.workflow), 0)
+        self.assertEqual(self.count_entries(), 1)
+
+    def test_later_entries_override_earlier(self):
+        self.workflow.accumulator['a'] = 1
+        save_checkpoint(self.session, self.workflow)
+        self.workflow.accumulator['a'] = 2
+        save_checkpoint(self.session, self.workflow)
+        _, accumulator = load_checkpoint(self.session, self.workflow.execution_id)
+        self.assertDictEqual(accumulator, {'a': 2})
+        self.assertDictEqual(accumulator.pop_changes(), {})
+
+    def test_delete_checkpoints(self):
+        self.workflow.accumulator['a'] = 1
+        save_checkpoint(self.session, self.workflow)
+        delete_checkpoints(self.session, [self.workflow.execution_id])
+        self.session.commit()
+        self.assertEqual(load_checkpoint(self.session, self.workflow.execution_id), (None, None))
+        self.assertEqual(self.count_entries(), 0)
+
+    def test_statistics(self):
+        before = get_checkpoint_statistics()
+        self.workflow.accumulator['a'] = 1
+        size = save_checkpoint(self.session, self.workflow)
+        load_checkpoint(self.session, self.workflow.execution_id)
+        after = get_checkpoint_statistics()
+        self.assertEqual(after['saves'], before['saves'] + 1)
+        self.assertEqual(after['restores'], before['restores'] + 1)
+        self.assertEqual(after['saved_bytes'], before['saved_bytes'] + size)
+        self.assertEqual(after['restored_bytes'], before['restored_bytes'] + size)
+
+    def test_app_instances_recreated_from_devices(self):
+        repo = AppInstanceRepo.from_app_devices([['InvalidApp', 1], ['InvalidApp', None]])
+        self.assertListEqual(sorted(repo.get_app_devices(), key=str), [['InvalidApp', 1], ['InvalidApp', None]])
+        self.assertIsNotNone(repo.get_app_instance(('InvalidApp', 1)))
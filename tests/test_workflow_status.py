@@ -1,4 +1,5 @@
 import json
+from datetime import datetime, timedelta
 from uuid import uuid4
 
 import walkoff.case.database as case_database
@@ -10,6 +11,7 @@ from walkoff import executiondb
 from walkoff.events import WalkoffEvent
 from walkoff.executiondb import WorkflowStatusEnum, ActionStatusEnum
 from walkoff.executiondb.executionelement import ExecutionElement
+from walkoff.executiondb.statusrecorder import workflow_status_recorder
 from walkoff.executiondb.workflow import Workflow
 from walkoff.executiondb.workflowresults import WorkflowStatus, ActionStatus
 from walkoff.multiprocessedexecutor.multiprocessedexecutor import MultiprocessedExecutor
@@ -134,6 +136,59 @@ class TestWorkflowStatus(ServerTestCase):
                         'name': 'name'}}
         self.assertDictEqual(response, expected)
 
+    def add_started_workflow_statuses(self, count):
+        started_at = datetime.utcnow()
+        workflow_statuses = []
+        for i in range(count):
+            workflow_status = WorkflowStatus(uuid4(), uuid4(), 'test{}'.format(i % 2))
+            workflow_status.running()
+            workflow_status.started_at = started_at - timedelta(minutes=i)
+            executiondb.execution_db.session.add(workflow_status)
+            workflow_statuses.append(workflow_status)
+        executiondb.execution_db.session.commit()
+        return [str(workflow_status.execution_id) for workflow_status in workflow_statuses]
+
+    def test_read_all_workflow_status_paginated(self):
+        execution_ids = self.add_started_workflow_statuses(5)
+        response = self.get_with_status_check('/api/workflowqueue?limit=2', headers=self.headers)
+        self.assertListEqual([status['execution_id'] for status in response], execution_ids[:2])
+        response = self.get_with_status_check('/api/workflowqueue?after={}'.format(execution_ids[1]),
+                                              headers=self.headers)
+        self.assertListEqual([status['execution_id'] for status in response], execution_ids[2:])
+
+    def test_read_all_workflow_status_default_includes_all_executing(self):
+        execution_ids = self.add_started_workflow_statuses(55)
+        completed_status = WorkflowStatus(uuid4(), uuid4(), 'test')
+        completed_status.completed()
+        executiondb.execution_db.session.add(completed_status)
+        executiondb.execution_db.session.commit()
+        response = self.get_with_status_check('/api/workflowqueue', headers=self.headers)
+        self.assertListEqual([status['execution_id'] for status in response], execution_ids)
+
+    def test_read_all_workflow_status_filtered(self):
+        execution_ids = self.add_started_workflow_statuses(4)
+        executiondb.execution_db.session.add(WorkflowStatus(uuid4(), uuid4(), 'test1'))
+        executiondb.execution_db.session.commit()
+        response = self.get_with_status_check('/api/workflowqueue?name=test1', headers=self.headers)
+        self.assertListEqual([status['execution_id'] for status in response], [execution_ids[1], execution_ids[3]])
+        response = self.get_with_status_check('/api/workflowqueue?status=pending', headers=self.headers)
+        self.assertEqual(len(response), 1)
+        self.assertEqual(response[0]['status'], 'pending')
+
+    def test_read_all_workflow_status_invalid_after(self):
+        self.get_with_status_check('/api/workflowqueue?after={}'.format(uuid4()), headers=self.headers,
+                                   status_code=BAD_REQUEST)
+
+    def test_read_workflow_status_counts(self):
+        self.add_started_workflow_statuses(3)
+        executiondb.execution_db.session.add(WorkflowStatus(uuid4(), uuid4(), 'test1'))
+        executiondb.execution_db.session.commit()
+        response = self.get_with_status_check('/api/workflowqueue/counts', headers=self.headers)
+        self.assertDictEqual(response, {'pending': 1, 'running': 3, 'paused': 0, 'awaiting_data': 0,
+                                        'completed': 0, 'aborted': 0})
+        response = self.get_with_status_check('/api/workflowqueue/counts?name=test1', headers=self.headers)
+        self.assertEqual(response['running'], 1)
+
     def test_read_workflow_status(self):
         wf_exec_id = uuid4()
         wf_id = uuid4()
@@ -199,6 +254,7 @@ class TestWorkflowStatus(ServerTestCase):
         self.assertIn('id', response)
         self.assertEqual(result['count'], 1)
 
+        workflow_status_recorder.flush()
         workflow_status = executiondb.execution_db.session.query(WorkflowStatus).filter_by(
             execution_id=response['id']).first()
         self.assertIsNotNone(workflow_status)
@@ -283,6 +339,7 @@ class TestWorkflowStatus(ServerTestCase):
         self.assertIn('id', response)
         self.assertTrue(result['aborted'])
 
+        workflow_status_recorder.flush()
         workflow_status = executiondb.execution_db.session.query(WorkflowStatus).filter_by(
             execution_id=response['id']).first()
         self.assertIsNotNone(workflow_status)
@@ -0,0 +1,181 @@
+import unittest
+from uuid import uuid4
+
+from tests.util import execution_db_help
+from walkoff import executiondb
+from walkoff.executiondb import WorkflowStatusEnum, ActionStatusEnum
+from walkoff.executiondb.statusrecorder import WorkflowStatusRecorder
+from walkoff.executiondb.workflowresults import WorkflowStatus, ActionStatus
+
+
+class TestWorkflowStatusRecorder(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        execution_db_help.setup_dbs()
+
+    def setUp(self):
+        self.recorder = WorkflowStatusRecorder(max_pending=1000)
+        self.workflow_execution_id = str(uuid4())
+        self.workflow_id = str(uuid4())
+
+    def tearDown(self):
+        execution_db_help.cleanup_device_db()
+
+    @classmethod
+    def tearDownClass(cls):
+        execution_db_help.tear_down_device_db()
+
+    @staticmethod
+    def get_workflow_status(execution_id):
+        executiondb.execution_db.session.expire_all()
+        return executiondb.execution_db.session.query(WorkflowStatus).filter_by(execution_id=execution_id).first()
+
+    @staticmethod
+    def get_action_status(execution_id):
+        executiondb.execution_db.session.expire_all()
+        return executiondb.execution_db.session.query(ActionStatus).filter_by(execution_id=execution_id).first()
+
+    def start_action(self, execution_id=None):
+        execution_id = execution_id if execution_id is not None else str(uuid4())
+        self.recorder.action_started(self.workflow_execution_id, execution_id, str(uuid4()), 'name', 'HelloWorld',
+                                     'helloWorld', '[]')
+        return execution_id
+
+    def test_nothing_written_before_flush(self):
+        self.recorder.workflow_pending(self.workflow_execution_id, self.workflow_id, 'workflow')
+        self.assertIsNone(self.get_workflow_status(self.workflow_execution_id))
+        self.assertEqual(self.recorder.get_pending_workflow_status(self.workflow_execution_id),
+                         WorkflowStatusEnum.pending)
+
+    def test_transitions_coalesced(self):
+        self.recorder.workflow_pending(self.workflow_execution_id, self.workflow_id, 'workflow')
+        self.recorder.workflow_started(self.workflow_execution_id)
+        action_execution_id = self.start_action()
+        self.recorder.action_succeeded(action_execution_id, '"result"')
+        self.recorder.workflow_completed(self.workflow_execution_id)
+        self.recorder.flush()
+
+        self.assertIsNone(self.recorder.get_pending_workflow_status(self.workflow_execution_id))
+        workflow_status = self.get_workflow_status(self.workflow_execution_id)
+        self.assertEqual(workflow_status.status, WorkflowStatusEnum.completed)
+        self.assertEqual(workflow_status.name, 'workflow')
+        self.assertIsNotNone(workflow_status.started_at)
+        self.assertIsNotNone(workflow_status.completed_at)
+        action_status = self.get_action_status(action_execution_id)
+        self.assertEqual(action_status.status, ActionStatusEnum.success)
+        self.assertEqual(action_status.result, '"result"')
+        self.assertEqual(str(action_status._workflow_status_id), self.workflow_execution_id)
+
+    def test_updates_across_flushes(self):
+        self.recorder.workflow_pending(self.workflow_execution_id, self.workflow_id, 'workflow')
+        self.recorder.workflow_started(self.workflow_execution_id)
+        action_execution_id = self.start_action()
+        self.recorder.flush()
+        self.assertEqual(self.get_action_status(action_execution_id).status, ActionStatusEnum.executing)
+
+        self.recorder.action_failed(action_execution_id, '"error"')
+        self.recorder.workflow_completed(self.workflow_execution_id)
+        self.recorder.flush()
+        self.assertEqual(self.get_action_status(action_execution_id).status, ActionStatusEnum.failure)
+        self.assertEqual(self.get_workflow_status(self.workflow_execution_id).status, WorkflowStatusEnum.completed)
+
+    def test_many_workflows_written_in_one_flush(self):
+        execution_ids = [str(uuid4()) for _ in range(20)]
+        for execution_id in execution_ids:
+            self.recorder.workflow_pending(execution_id, self.workflow_id, 'workflow')
+            self.recorder.workflow_started(execution_id)
+        self.recorder.flush()
+        self.assertEqual(
+            executiondb.execution_db.session.query(WorkflowStatus).filter(
+                WorkflowStatus.status == WorkflowStatusEnum.running).count(),
+            len(execution_ids))
+
+    def test_flush_when_full(self):
+        recorder = WorkflowStatusRecorder(max_pending=2)
+        recorder.workflow_pending(self.workflow_execution_id, self.workflow_id, 'workflow')
+        self.assertIsNone(self.get_workflow_status(self.workflow_execution_id))
+        recorder.workflow_pending(str(uuid4()), self.workflow_id, 'workflow')
+        self.assertIsNotNone(self.get_workflow_status(self.workflow_execution_id))
+
+    def test_abort_awaiting_data(self):
+        self.recorder.workflow_pending(self.workflow_execution_id, self.workflow_id, 'workflow')
+        self.recorder.workflow_started(self.workflow_execution_id)
+        action_execution_id = self.start_action()
+        self.recorder.workflow_awaiting_data(self.workflow_execution_id)
+        self.recorder.flush()
+        self.assertEqual(self.get_action_status(action_execution_id).status, ActionStatusEnum.awaiting_data)
+
+        self.recorder.workflow_aborted(self.workflow_execution_id)
+        self.recorder.flush()
+        self.assertEqual(self.get_workflow_status(self.workflow_execution_id).status, WorkflowStatusEnum.aborted)
+        self.assertEqual(self.get_action_status(action_execution_id).status, ActionStatusEnum.aborted)
+
+    def test_abort_executing_action_unchanged(self):
+        self.recorder.workflow_pending(self.workflow_execution_id, self.workflow_id, 'workflow')
+        self.recorder.workflow_started(self.workflow_execution_id)
+        action_execution_id = self.start_action()
+        self.recorder.workflow_aborted(self.workflow_execution_id)
+        self.recorder.flush()
+        self.assertEqual(self.get_workflow_status(self.workflow_execution_id).status, WorkflowStatusEnum.aborted)
+        self.assertEqual(self.get_action_status(action_execution_id).status, ActionStatusEnum.executing)
+
+    @staticmethod
+    def fail_next_commit(during_commit=None):
+        session = executiondb.execution_db.session
+
+        def commit():
+            del session.commit
+            if during_commit is not None:
+                during_commit()
+            raise Exception('database is locked')
+
+        session.commit = commit
+
+    def test_failed_flush_retried(self):
+        self.recorder.workflow_pending(self.workflow_execution_id, self.workflow_id, 'workflow')
+        self.recorder.workflow_started(self.workflow_execution_id)
+        action_execution_id = self.start_action()
+        self.fail_next_commit()
+        self.recorder.flush()
+        self.assertIsNone(self.get_workflow_status(self.workflow_execution_id))
+        self.assertEqual(self.recorder.get_pending_workflow_status(self.workflow_execution_id),
+                         WorkflowStatusEnum.running)
+
+        self.recorder.action_succeeded(action_execution_id, '"result"')
+        self.recorder.flush()
+        workflow_status = self.get_workflow_status(self.workflow_execution_id)
+        self.assertEqual(workflow_status.status, WorkflowStatusEnum.running)
+        self.assertEqual(workflow_status.name, 'workflow')
+        action_status = self.get_action_status(action_execution_id)
+        self.assertEqual(action_status.status, ActionStatusEnum.success)
+        self.assertEqual(action_status.name, 'name')
+        self.assertIsNone(self.recorder.get_pending_workflow_status(self.workflow_execution_id))
+
+    def test_failed_flush_keeps_newer_transitions(self):
+        self.recorder.workflow_pending(self.workflow_execution_id, self.workflow_id, 'workflow')
+        self.recorder.flush()
+        self.recorder.workflow_started(self.workflow_execution_id)
+        self.fail_next_commit(lambda: self.recorder.workflow_completed(self.workflow_execution_id))
+        self.recorder.flush()
+        self.assertEqual(self.recorder.get_pending_workflow_status(self.workflow_execution_id),
+                         WorkflowStatusEnum.completed)
+        self.recorder.flush()
+        workflow_status = self.get_workflow_status(self.workflow_execution_id)
+        self.assertEqual(workflow_status.status, WorkflowStatusEnum.completed)
+        self.assertIsNotNone(workflow_status.started_at)
+
+    def test_pending_status_visible_during_flush(self):
+        statuses = []
+        self.recorder.workflow_pending(self.workflow_execution_id, self.workflow_id, 'workflow')
+        session = executiondb.execution_db.session
+        commit = session.commit
+
+        def check_status_and_commit():
+            statuses.append(self.recorder.get_pending_workflow_status(self.workflow_execution_id))
+            del session.commit
+            commit()
+
+        session.commit = check_status_and_commit
+        self.recorder.flush()
+        self.assertListEqual(statuses, [WorkflowStatusEnum.pending])
+        self.assertIsNone(self.recorder.get_pending_workflow_status(self.workflow_execution_id))
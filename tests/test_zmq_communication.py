@@ -26,7 +26,7 @@ class TestZMQCommunication(unittest.TestCase):
         from walkoff.multiprocessedexecutor.multiprocessedexecutor import spawn_worker_processes
         walkoff.config.config.num_processes = 2
         pids = spawn_worker_processes(worker_environment_setup=modified_setup_worker_env)
-        multiprocessedexecutor.initialize_threading(pids)
+        multiprocessedexecutor.initialize_threading(pids, worker_environment_setup=modified_setup_worker_env)
         walkoff.appgateway.cache_apps(config.test_apps_path)
         walkoff.config.config.load_app_apis(apps_path=config.test_apps_path)
         walkoff.config.config.num_processes = 2
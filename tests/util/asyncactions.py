@@ -0,0 +1,21 @@
+"""Coroutine actions used by the asyncio worker tests. This module requires Python 3.7 or later, and is only imported
+by tests/test_asyncio_worker.py when it is available.
+"""
+import asyncio
+
+from walkoff.appgateway.decorators import action
+from walkoff.executiondb.workflow import get_executing_workflow
+
+executing_workflows = []
+
+
+@action
+async def async_plus_one(number):
+    await asyncio.sleep(0.2)
+    executing_workflows.append(get_executing_workflow())
+    return number + 1
+
+
+@action
+async def async_buggy(number):
+    raise ValueError('bug')
@@ -1,5 +1,6 @@
 import walkoff.case.database as case_database
 import walkoff.case.subscription as case_subscription
+from walkoff.case.eventwriter import case_event_writer
 from walkoff.events import WalkoffEvent
 from walkoff.helpers import timestamp_to_datetime
 
@@ -15,6 +16,7 @@ def setup_subscriptions_for_action(workflow_ids, action_ids, action_events=None,
 
 
 def executed_actions(workflow_id, start_time, end_time):
+    case_event_writer.flush()
     events = [event.as_json()
               for event in case_database.case_db.session.query(case_database.Event).filter(
             case_database.Event.originator == str(workflow_id)).all()]
@@ -6,7 +6,7 @@ from zmq.utils.strtypes import cast_unicode
 
 from walkoff import executiondb
 from walkoff.events import WalkoffEvent
-from walkoff.executiondb.saved_workflow import SavedWorkflow
+from walkoff.executiondb.checkpoint import save_checkpoint
 from walkoff.executiondb.workflow import Workflow
 from walkoff.multiprocessedexecutor import loadbalancer
 from walkoff.multiprocessedexecutor.worker import convert_to_protobuf
@@ -19,7 +19,7 @@ except ImportError:
 workflows_executed = 0
 
 
-def mock_initialize_threading(self, pids=None):
+def mock_initialize_threading(self, pids=None, worker_environment_setup=None):
     global workflows_executed
     workflows_executed = 0
 
@@ -70,13 +70,7 @@ class MockLoadBalancer(object):
     def on_data_sent(self, sender, **kwargs):
         workflow = self.workflow_comms[self.exec_id]
         if kwargs['event'] in [WalkoffEvent.TriggerActionAwaitingData, WalkoffEvent.WorkflowPaused]:
-            saved_workflow = SavedWorkflow(workflow_execution_id=workflow.get_execution_id(),
-                                           workflow_id=workflow.id,
-                                           action_id=workflow.get_executing_action_id(),
-                                           accumulator=workflow.get_accumulator(),
-                                           app_instances=workflow.get_instances())
-            executiondb.execution_db.session.add(saved_workflow)
-            executiondb.execution_db.session.commit()
+            save_checkpoint(executiondb.execution_db.session, workflow)
 
         if self.exec_id or not hasattr(sender, "_execution_id"):
             packet_bytes = convert_to_protobuf(sender, workflow, **kwargs)
@@ -86,7 +80,8 @@ class MockLoadBalancer(object):
 
         self.results_queue.send(packet_bytes)
 
-    def add_workflow(self, workflow_id, workflow_execution_id, start=None, start_arguments=None, resume=False):
+    def add_workflow(self, workflow_id, workflow_execution_id, start=None, start_arguments=None, resume=False,
+                     priority=None, concurrency_limits=None):
         self.pending_workflows.put((workflow_id, workflow_execution_id, start, start_arguments, resume))
 
     def manage_workflows(self):
@@ -107,6 +102,9 @@ class MockLoadBalancer(object):
                              resume=resume)
             self.exec_id = ''
 
+    def invalidate_workflow(self, workflow_id):
+        pass
+
     def pause_workflow(self, workflow_execution_id):
         if workflow_execution_id in self.workflow_comms:
             self.workflow_comms[workflow_execution_id].pause()
@@ -70,7 +70,8 @@ class ServerTestCase(unittest.TestCase):
         else:
             from walkoff.multiprocessedexecutor.multiprocessedexecutor import spawn_worker_processes
             pids = spawn_worker_processes(worker_environment_setup=modified_setup_worker_env)
-            flaskserver.running_context.executor.initialize_threading(pids)
+            flaskserver.running_context.executor.initialize_threading(
+                pids, worker_environment_setup=modified_setup_worker_env)
 
     @classmethod
     def tearDownClass(cls):
@@ -0,0 +1,197 @@
+import logging
+import threading
+import time
+import weakref
+from collections import OrderedDict, deque
+
+from sqlalchemy import select
+
+import walkoff.config.config
+import walkoff.executiondb
+from walkoff.appgateway.appinstance import AppInstance
+from walkoff.helpers import format_exception_message
+
+logger = logging.getLogger(__name__)
+
+
+class AppInstancePool(object):
+    """A pool of idle app instances which can be reused by later workflow executions in the same process
+
+    Instances are leased for the duration of a workflow execution and returned afterwards, so an app which connects to
+    its device when it is constructed only reconnects when no idle instance for the device is available. An idle
+    instance is shut down instead of being leased if it has been idle for longer than the TTL, if its device has been
+    modified since it was created, or if the app's optional is_healthy() method returns False or raises. At most
+    max_per_device idle instances are kept for each app and device, and at most max_size in total, with the instances of
+    the least recently returned app and device shut down first.
+
+    Args:
+        max_size (int, optional): The maximum number of idle instances. Defaults to
+            walkoff.config.config.app_instance_pool_size
+        max_per_device (int, optional): The maximum number of idle instances for each app and device. Defaults to
+            walkoff.config.config.app_instance_pool_max_per_device
+        ttl (float, optional): The number of seconds an instance can be idle before it is shut down. Defaults to
+            walkoff.config.config.app_instance_pool_ttl
+    """
+
+    def __init__(self, max_size=None, max_per_device=None, ttl=None):
+        self.max_size = max_size if max_size is not None else walkoff.config.config.app_instance_pool_size
+        self.max_per_device = (max_per_device if max_per_device is not None
+                               else walkoff.config.config.app_instance_pool_max_per_device)
+        self.ttl = ttl if ttl is not None else walkoff.config.config.app_instance_pool_ttl
+        self._idle = OrderedDict()
+        self._size = 0
+        self._versions = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def lease(self, app_name, device_id):
+        """Leases an instance of an app for a device, reusing an idle instance if a usable one is available
+
+        Args:
+            app_name (str): The name of the app
+            device_id (int): The ID of the device, or None
+
+        Returns:
+            (AppInstance): The instance. It must be returned with release() when it is no longer used.
+        """
+        key = (app_name, device_id)
+        version = None
+        while True:
+            with self._lock:
+                expired = self.__pop_expired(time.time())
+                entry = self.__pop_idle(key)
+            self.__shutdown(expired)
+            if entry is None:
+                break
+            instance, _, instance_version = entry
+            if version is None:
+                version = self.__get_device_version(device_id)
+            if instance_version == version and self.__is_healthy(instance):
+                with self._lock:
+                    self.hits += 1
+                    self._versions[instance] = version
+                return instance
+            self.__shutdown([instance])
+
+        version = version if version is not None else self.__get_device_version(device_id)
+        instance = AppInstance.create(app_name, device_id)
+        with self._lock:
+            self.misses += 1
+            self._versions[instance] = version
+        return instance
+
+    def release(self, app_name, device_id, instance):
+        """Returns a leased instance to the pool
+
+        Args:
+            app_name (str): The name of the app
+            device_id (int): The ID of the device, or None
+            instance (AppInstance): The instance returned by lease()
+        """
+        key = (app_name, device_id)
+        with self._lock:
+            version = self._versions.pop(instance, None)
+            if instance() is None:
+                return
+            if len(self._idle.get(key, ())) >= self.max_per_device:
+                to_shutdown = [instance]
+            else:
+                instances = self._idle.pop(key, deque())
+                instances.append((instance, time.time(), version))
+                self._idle[key] = instances
+                self._size += 1
+                to_shutdown = self.__pop_expired(time.time()) + self.__pop_least_recently_used()
+        self.__shutdown(to_shutdown)
+
+    def clear(self):
+        """Shuts down all idle instances
+        """
+        with self._lock:
+            to_shutdown = [instance for instances in self._idle.values() for instance, _, _ in instances]
+            self._idle = OrderedDict()
+            self._size = 0
+        self.__shutdown(to_shutdown, evicted=False)
+
+    def get_statistics(self):
+        """Gets the statistics of the pool
+
+        Returns:
+            (dict): The number of idle instances, the number of leases which reused an idle instance and which created
+                a new instance, and the number of idle instances which were shut down because they expired, were
+                unhealthy, or did not fit in the pool
+        """
+        with self._lock:
+            return {'idle': self._size, 'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+    def __pop_idle(self, key):
+        instances = self._idle.get(key)
+        if not instances:
+            return None
+        entry = instances.pop()
+        self._size -= 1
+        if not instances:
+            del self._idle[key]
+        return entry
+
+    def __pop_expired(self, now):
+        expired = []
+        for key in list(self._idle):
+            instances = self._idle[key]
+            while instances and now - instances[0][1] > self.ttl:
+                expired.append(instances.popleft()[0])
+                self._size -= 1
+            if not instances:
+                del self._idle[key]
+        return expired
+
+    def __pop_least_recently_used(self):
+        evicted = []
+        while self._size > self.max_size:
+            key = next(iter(self._idle))
+            instances = self._idle[key]
+            evicted.append(instances.popleft()[0])
+            self._size -= 1
+            if not instances:
+                del self._idle[key]
+        return evicted
+
+    @staticmethod
+    def __get_device_version(device_id):
+        if not device_id:
+            return None
+        from walkoff.executiondb.device import Device
+        with walkoff.executiondb.execution_db.read_engine.connect() as connection:
+            return connection.execute(select([Device.modified_at]).where(Device.id == device_id)).scalar()
+
+    @staticmethod
+    def __is_healthy(instance):
+        is_healthy = getattr(instance(), 'is_healthy', None)
+        if not callable(is_healthy):
+            return True
+        try:
+            return bool(is_healthy())
+        except Exception as e:
+            logger.warning('Health check of app instance {0} failed. Error: {1}'.format(
+                instance, format_exception_message(e)))
+            return False
+
+    def __shutdown(self, instances, evicted=True):
+        if not instances:
+            return
+        if evicted:
+            with self._lock:
+                self.evictions += len(instances)
+        for instance in instances:
+            try:
+                logger.debug('Shutting down pooled app instance {0}'.format(instance))
+                instance.shutdown()
+            except Exception as e:
+                logger.error('Error caught while shutting down pooled app instance. Error {0}'.format(
+                    format_exception_message(e)))
+
+
+app_instance_pool = None
+"""The pool of idle app instances of this process, or None if app instances are not pooled
+"""
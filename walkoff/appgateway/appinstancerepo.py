@@ -1,5 +1,6 @@
 import logging
 
+import walkoff.appgateway.appinstancepool
 from walkoff.appgateway.appinstance import AppInstance
 from walkoff.events import WalkoffEvent
 from walkoff.helpers import format_exception_message
@@ -16,14 +17,18 @@ class AppInstanceRepo(object):
     Args:
         instances (dict{int: AppInstance}, optional): An existing repository of device ID to AppInstance to
             initialize this repository to.
+        pool (AppInstancePool, optional): The pool to lease new instances from and return instances to when they are
+            shut down. Defaults to walkoff.appgateway.appinstancepool.app_instance_pool. If there is no pool, instances
+            are created and shut down.
     """
-    def __init__(self, instances=None):
+    def __init__(self, instances=None, pool=None):
         self._instances = instances or {}
+        self._pool = pool if pool is not None else walkoff.appgateway.appinstancepool.app_instance_pool
 
     def setup_app_instance(self, action):
         device_id = (action.app_name, action.device_id)
         if device_id not in self._instances:
-            self._instances[device_id] = AppInstance.create(action.app_name, action.device_id)
+            self._instances[device_id] = self.__create_app_instance(action.app_name, action.device_id)
             WalkoffEvent.CommonWorkflowSignal.send(self, event=WalkoffEvent.AppInstanceCreated)
             logger.debug('Created new app instance: App {0}, device {1}'.format(action.app_name, action.device_id))
         return device_id
@@ -37,7 +42,41 @@ class AppInstanceRepo(object):
     def set_all_app_instances(self, instances):
         self._instances = instances
 
+    def get_app_devices(self):
+        """Gets the app name and device ID of each app instance
+
+        Returns:
+            (list[list]): The app name and device ID of each app instance
+        """
+        return [[app_name, device_id] for app_name, device_id in self._instances]
+
+    @classmethod
+    def from_app_devices(cls, app_devices):
+        """Creates a repository with a new app instance for each app name and device ID
+
+        Args:
+            app_devices (list[list]): The app name and device ID of each app instance, as returned by get_app_devices
+
+        Returns:
+            (AppInstanceRepo): The repository
+        """
+        repo = cls()
+        for app_name, device_id in app_devices:
+            repo._instances[(app_name, device_id)] = repo.__create_app_instance(app_name, device_id)
+            logger.debug('Re-created app instance: App {0}, device {1}'.format(app_name, device_id))
+        return repo
+
+    def __create_app_instance(self, app_name, device_id):
+        if self._pool is not None:
+            return self._pool.lease(app_name, device_id)
+        return AppInstance.create(app_name, device_id)
+
     def shutdown_instances(self):
+        if self._pool is not None:
+            for (app_name, device_id), instance in self._instances.items():
+                self._pool.release(app_name, device_id, instance)
+            self._instances = {}
+            return
         for instance_name, instance in self._instances.items():
             try:
                 if instance() is not None:
@@ -0,0 +1,40 @@
+"""Support for actions defined with "async def". This module requires Python 3.7 or later, and is only imported when
+such an action is defined or executed on Python 3.7 or later.
+"""
+import asyncio
+from functools import wraps
+
+
+def wrap_coroutine_action(func, format_result):
+    """Wraps a coroutine action so that awaiting it returns an ActionResult
+
+    Args:
+        func (func): The coroutine function
+        format_result (func): The function which converts the return value of the action to an ActionResult
+
+    Returns:
+        (func): The wrapped coroutine function
+    """
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        return format_result(await func(*args, **kwargs))
+
+    return wrapper
+
+
+def run_coroutine(coroutine):
+    """Runs a coroutine to completion on a new event loop in the current thread. This is used to execute coroutine
+    actions outside of an event loop.
+
+    Args:
+        coroutine (coroutine): The coroutine
+
+    Returns:
+        The result of the coroutine
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
@@ -1,9 +1,14 @@
+import inspect
+import sys
 from functools import wraps
 
 from walkoff.appgateway.actionresult import ActionResult
 from walkoff.helpers import get_function_arg_names
 from .walkofftag import WalkoffTag
 
+# Coroutine actions rely on contextvars to track the executing workflow, so they are only supported on Python 3.7+
+_iscoroutinefunction = inspect.iscoroutinefunction if sys.version_info >= (3, 7) else None
+
 
 def format_result(result):
     """Converts a result to an ActionResult object
@@ -31,8 +36,22 @@ def tag(func, tag_name):
     setattr(func, tag_name, True)
 
 
+def is_coroutine_action(func):
+    """Checks if an action is a coroutine function, defined with "async def". Coroutine actions are only supported on
+    Python 3.7 or later, so this is always False on earlier versions.
+
+    Args:
+        func (func): The action
+
+    Returns:
+        (bool): True if the action must be awaited, False otherwise
+    """
+    return _iscoroutinefunction is not None and _iscoroutinefunction(func)
+
+
 def action(func):
-    """Decorator used to tag a method or function as an action
+    """Decorator used to tag a method or function as an action. Coroutine functions, defined with "async def", can
+    also be tagged, in which case the tagged function must be awaited.
 
     Args:
         func (func): Function to tag
@@ -40,9 +59,13 @@ def action(func):
         (func) Tagged function
     """
 
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        return format_result(func(*args, **kwargs))
+    if is_coroutine_action(func):
+        from walkoff.appgateway.asyncactions import wrap_coroutine_action
+        wrapper = wrap_coroutine_action(func, format_result)
+    else:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return format_result(func(*args, **kwargs))
 
     WalkoffTag.action.tag(wrapper)
     wrapper.__arg_names = get_function_arg_names(func)
@@ -11,7 +11,7 @@ from swagger_spec_validator import ref_validators
 from swagger_spec_validator.validator20 import deref
 
 import walkoff.config.paths
-from walkoff.helpers import InvalidArgument, get_function_arg_names, InvalidApi, format_exception_message
+from walkoff.helpers import InvalidArgument, get_function_arg_names, InvalidApi, format_exception_message, no_parameters
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +39,14 @@ def convert_primitive_type(value, parameter_type):
     return make_type(value, parameter_type)
 
 
+def get_primitive_converter(parameter_type):
+    type_func = TYPE_MAP[parameter_type]
+    if type_func is str:
+        return lambda value: json.dumps(value) if isinstance(value, (dict, list)) else str(value)
+    else:
+        return type_func
+
+
 def convert_primitive_array(values, parameter_type):
     return [convert_primitive_type(value, parameter_type) for value in values]
 
@@ -314,94 +322,252 @@ def validate_primitive_parameter(value, param, parameter_type, message_prefix, h
         return converted_value
 
 
-def validate_parameter(value, param, message_prefix):
-    param = deepcopy(param)
-    primitive_type = 'primitive' if 'type' in param else 'object'
-    converted_value = None
-    if value is not None:
-        if primitive_type == 'primitive':
-            primitive_type = param['type']
-            if primitive_type in TYPE_MAP:
-                converted_value = validate_primitive_parameter(value, param, primitive_type, message_prefix)
-            elif primitive_type == 'array':
+class ParameterValidator(object):
+    """Validates and converts the input to a single parameter of an action, condition, or transform
+
+    The parameter's API is compiled once into a JSON schema validator and a type converter, so validating an input
+    neither copies the API nor constructs a new validator.
+
+    Args:
+        param (dict): The API of the parameter
+        message_prefix (str): The prefix to use in error messages
+    """
+
+    def __init__(self, param, message_prefix):
+        self.message_prefix = message_prefix
+        self.name = param.get('name')
+        self.required = param.get('required')
+        self.primitive_type = 'primitive' if 'type' in param else 'object'
+        self.parameter_type = param.get('type')
+        self._param = deepcopy(param)
+        self._converter = None
+        self._schema_validator = None
+
+        if self.primitive_type == 'primitive':
+            if self.parameter_type in TYPE_MAP:
+                self._converter = get_primitive_converter(self.parameter_type)
+                schema = deepcopy(param)
+                if schema['type'] in ('user', 'role'):
+                    handle_user_roles_validation(schema)
+                schema.pop('required', None)
+                self._schema_validator = Draft4Validator(schema, format_checker=draft4_format_checker)
+            elif self.parameter_type == 'array':
+                schema = deepcopy(param)
+                if 'items' in schema and schema['items']['type'] in ('user', 'role'):
+                    handle_user_roles_validation(schema['items'])
+                self._schema_validator = Draft4Validator(schema, format_checker=draft4_format_checker)
+        elif 'schema' in param:
+            self._schema_validator = Draft4Validator(param['schema'], format_checker=draft4_format_checker)
+
+    def validate(self, value):
+        """Validates and converts an input to the parameter
+
+        Args:
+            value: The input to the parameter
+
+        Returns:
+            The converted input
+        """
+        if value is not None:
+            if self.primitive_type == 'primitive':
+                if self.parameter_type in TYPE_MAP:
+                    return self.__validate_primitive(value)
+                elif self.parameter_type == 'array':
+                    try:
+                        converted_value = convert_array(self._param, value, self.message_prefix)
+                        self._schema_validator.validate(converted_value)
+                    except ValidationError as exception:
+                        self.__raise_invalid(value, exception)
+                    return converted_value
+                else:
+                    raise InvalidArgument(
+                        'In {0}: Unknown parameter type {1}'.format(self.message_prefix, self.parameter_type))
+            else:
                 try:
-                    converted_value = convert_array(param, value, message_prefix)
-                    if 'items' in param and param['items']['type'] in ('user', 'role'):
-                        handle_user_roles_validation(param['items'])
-
-                    Draft4Validator(
-                        param, format_checker=draft4_format_checker).validate(converted_value)
+                    converted_value = convert_json(self._param, value, self.message_prefix)
+                    self._schema_validator.validate(converted_value)
                 except ValidationError as exception:
-                    message = '{0} has invalid input. Input {1} does not conform to ' \
-                              'validators: {2}'.format(message_prefix, value, format_exception_message(exception))
-                    logger.error(message)
-                    raise InvalidArgument(message)
-            else:
-                raise InvalidArgument('In {0}: Unknown parameter type {1}'.format(message_prefix, primitive_type))
-        else:
-            try:
-                converted_value = convert_json(param, value, message_prefix)
-                Draft4Validator(
-                    param['schema'], format_checker=draft4_format_checker).validate(converted_value)
-            except ValidationError as exception:
-                message = '{0} has invalid input. Input {1} does not conform to ' \
-                          'validators: {2}'.format(message_prefix, value, format_exception_message(exception))
-                logger.error(message)
-                raise InvalidArgument(message)
-    elif param.get('required'):
-        message = "In {0}: Missing {1} parameter '{2}'".format(message_prefix, primitive_type, param['name'])
+                    self.__raise_invalid(value, exception)
+                return converted_value
+        elif self.required:
+            message = "In {0}: Missing {1} parameter '{2}'".format(self.message_prefix, self.primitive_type, self.name)
+            logger.error(message)
+            raise InvalidArgument(message)
+        return None
+
+    def __validate_primitive(self, value):
+        try:
+            converted_value = self._converter(value)
+        except (ValueError, TypeError):
+            message = '{0} has invalid input. ' \
+                      'Input {1} could not be converted to type {2}'.format(self.message_prefix, value,
+                                                                            self.parameter_type)
+            logger.error(message)
+            raise InvalidArgument(message)
+        try:
+            self._schema_validator.validate(converted_value)
+        except ValidationError as exception:
+            message = '{0} has invalid input. ' \
+                      'Input {1} with type {2} does not conform to ' \
+                      'validators: {3}'.format(self.message_prefix, value, self.parameter_type,
+                                               format_exception_message(exception))
+            logger.error(message)
+            raise InvalidArgument(message)
+        return converted_value
+
+    def __raise_invalid(self, value, exception):
+        message = '{0} has invalid input. Input {1} does not conform to ' \
+                  'validators: {2}'.format(self.message_prefix, value, format_exception_message(exception))
         logger.error(message)
         raise InvalidArgument(message)
 
-    return converted_value
+
+class ParametersValidator(object):
+    """Validates and converts the arguments to an action, condition, or transform against its parameters' APIs
+
+    Args:
+        api (list[dict]): The APIs of the parameters
+        message_prefix (str): The prefix to use in error messages
+    """
+
+    def __init__(self, api, message_prefix):
+        self.api = api
+        self.message_prefix = message_prefix
+        self.parameters = {}
+        self.defaults = {}
+        self.required = set()
+        for param in api:
+            self.parameters[param['name']] = ParameterValidator(param, message_prefix)
+            if 'default' in param:
+                self.defaults[param['name']] = param['default']
+            if 'required' in param:
+                self.required.add(param['name'])
+
+    def validate(self, arguments, accumulator=None):
+        """Validates and converts arguments
+
+        Args:
+            arguments (list[Argument]): The arguments to validate
+            accumulator (dict, optional): The accumulated results of previous Actions used to resolve references.
+                Defaults to None.
+
+        Returns:
+            (dict): The converted arguments keyed by parameter name
+        """
+        message_prefix = self.message_prefix
+        converted = {}
+        seen_params = set()
+        arguments_by_name = {argument.name: argument for argument in reversed(arguments)} if arguments else {}
+        arguments_set = set(arguments_by_name)
+        errors = {}
+        for param_name, parameter in self.parameters.items():
+            try:
+                argument = arguments_by_name.get(param_name)
+                if argument:
+                    arg_val = argument.get_value(accumulator)
+                    if accumulator or not argument.is_ref():
+                        converted[param_name] = parameter.validate(arg_val)
+                elif param_name in self.defaults:
+                    default = self.defaults[param_name]
+                    try:
+                        default_param = parameter.validate(default)
+                    except InvalidArgument as e:
+                        default_param = default
+                        logger.warning(
+                            'For {0}: Default input {1} (value {2}) does not conform to schema. (Error: {3})'
+                            'Using anyways'.format(message_prefix, param_name, default,
+                                                   format_exception_message(e)))
+
+                    converted[param_name] = default_param
+                    arguments_set.add(param_name)
+                elif param_name in self.required:
+                    message = 'For {0}: Parameter {1} is not specified and has no default'.format(message_prefix,
+                                                                                                param_name)
+                    logger.error(message)
+                    raise InvalidArgument(message)
+                else:
+                    converted[param_name] = None
+                    arguments_set.add(param_name)
+                seen_params.add(param_name)
+            except InvalidArgument as e:
+                errors[param_name] = e.message
+        if seen_params != arguments_set:
+            message = 'For {0}: Too many arguments. Extra arguments: {1}'.format(message_prefix,
+                                                                                 arguments_set - seen_params)
+            logger.error(message)
+            errors['_arguments'] = message
+        if errors:
+            raise InvalidArgument('Invalid arguments', errors=errors)
+        return converted
+
+
+_parameters_validators = {}
+
+
+def get_parameters_validator(app_name, api_type, name, api, message_prefix):
+    """Gets the compiled validator for the parameters of an app's action, condition, or transform, compiling it if it
+    has not been compiled or if the API has changed since it was compiled
+
+    Args:
+        app_name (str): The name of the app
+        api_type (str): The type of the API. One of 'actions', 'conditions', or 'transforms'
+        name (str): The name of the action, condition, or transform
+        api (list[dict]): The APIs of the parameters
+        message_prefix (str): The prefix to use in error messages
+
+    Returns:
+        (ParametersValidator): The compiled validator
+    """
+    key = (app_name, api_type, name)
+    validator = _parameters_validators.get(key)
+    if validator is None or validator.api is not api:
+        validator = ParametersValidator(api, message_prefix)
+        _parameters_validators[key] = validator
+    return validator
+
+
+def get_app_action_parameters_validator(app_name, action_name, api):
+    return get_parameters_validator(app_name, 'actions', action_name, api,
+                                    'app {0} action {1}'.format(app_name, action_name))
+
+
+def get_condition_parameters_validator(app_name, condition_name, api):
+    return get_parameters_validator(app_name, 'conditions', condition_name, api,
+                                    'condition {0}'.format(condition_name))
+
+
+def get_transform_parameters_validator(app_name, transform_name, api):
+    return get_parameters_validator(app_name, 'transforms', transform_name, api,
+                                    'transform {0}'.format(transform_name))
+
+
+def compile_app_parameters_validators(app_name, api):
+    """Compiles the validators for the parameters of all the actions, conditions, and transforms of an app
+
+    Args:
+        app_name (str): The name of the app
+        api (dict): The API of the app
+    """
+    for action_name, action_api in api.get('actions', {}).items():
+        get_app_action_parameters_validator(app_name, action_name, action_api.get('parameters', no_parameters))
+    for condition_name, condition_api in api.get('conditions', {}).items():
+        get_condition_parameters_validator(app_name, condition_name, condition_api.get('parameters', no_parameters))
+    for transform_name, transform_api in api.get('transforms', {}).items():
+        get_transform_parameters_validator(app_name, transform_name, transform_api.get('parameters', no_parameters))
+
+
+def clear_parameters_validators():
+    """Clears all compiled parameter validators
+    """
+    _parameters_validators.clear()
+
+
+def validate_parameter(value, param, message_prefix):
+    return ParameterValidator(param, message_prefix).validate(value)
 
 
 def validate_parameters(api, arguments, message_prefix, accumulator=None):
-    api_dict = {}
-    for param in api:
-        api_dict[param['name']] = param
-    converted = {}
-    seen_params = set()
-    arg_names = [argument.name for argument in arguments] if arguments else []
-    arguments_set = set(arg_names)
-    errors = {}
-    for param_name, param_api in api_dict.items():
-        try:
-            argument = get_argument_by_name(arguments, param_name)
-            if argument:
-                arg_val = argument.get_value(accumulator)
-                if accumulator or not argument.is_ref():
-                    converted[param_name] = validate_parameter(arg_val, param_api, message_prefix)
-            elif 'default' in param_api:
-                try:
-                    default_param = validate_parameter(param_api['default'], param_api, message_prefix)
-                except InvalidArgument as e:
-                    default_param = param_api['default']
-                    logger.warning(
-                        'For {0}: Default input {1} (value {2}) does not conform to schema. (Error: {3})'
-                        'Using anyways'.format(message_prefix, param_name, param_api['default'],
-                                               format_exception_message(e)))
-
-                converted[param_name] = default_param
-                arguments_set.add(param_name)
-            elif 'required' in param_api:
-                message = 'For {0}: Parameter {1} is not specified and has no default'.format(message_prefix, param_name)
-                logger.error(message)
-                raise InvalidArgument(message)
-            else:
-                converted[param_name] = None
-                arguments_set.add(param_name)
-            seen_params.add(param_name)
-        except InvalidArgument as e:
-            errors[param_name] = e.message
-    if seen_params != arguments_set:
-        message = 'For {0}: Too many arguments. Extra arguments: {1}'.format(message_prefix,
-                                                                             arguments_set - seen_params)
-        logger.error(message)
-        errors['_arguments'] = message
-    if errors:
-        raise InvalidArgument('Invalid arguments', errors=errors)
-    return converted
+    return ParametersValidator(api, message_prefix).validate(arguments, accumulator)
 
 
 def get_argument_by_name(arguments, name):
@@ -1,10 +1,8 @@
-import datetime
 import json
 from six import string_types
 
 import walkoff.case.subscription as case_subscription
-from walkoff.case import database
-from walkoff.case.database import Event
+from walkoff.case.eventwriter import case_event_writer
 
 
 def add_entry_to_case(sender, data, event_type, entry_message, message_name):
@@ -30,10 +28,5 @@ def add_entry_to_case(sender, data, event_type, entry_message, message_name):
                 data = json.dumps(data)
             except TypeError:
                 data = str(data)
-        event = Event(type=event_type,
-                      timestamp=datetime.datetime.utcnow(),
-                      originator=originator,
-                      message=entry_message,
-                      data=data)
-        database.case_db.add_event(event, cases_to_add)
+        case_event_writer.add_event(event_type, originator, entry_message, data, cases_to_add)
 
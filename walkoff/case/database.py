@@ -1,8 +1,9 @@
 import json
 import logging
+import threading
 from datetime import datetime
 
-from sqlalchemy import Column, Integer, ForeignKey, String, DateTime, create_engine
+from sqlalchemy import Column, Integer, ForeignKey, String, DateTime, create_engine, func, or_
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, sessionmaker, scoped_session
 
@@ -19,7 +20,7 @@ Case_Base = declarative_base()
 class _CaseEventLink(Case_Base):
     __tablename__ = 'case_event'
     case_id = Column(Integer, ForeignKey('case.id'), primary_key=True)
-    event_id = Column(Integer, ForeignKey('event.id'), primary_key=True)
+    event_id = Column(Integer, ForeignKey('event.id'), primary_key=True, index=True)
 
 
 class Case(Case_Base):
@@ -52,7 +53,7 @@ class Event(Case_Base):
     """
     __tablename__ = 'event'
     id = Column(Integer, primary_key=True)
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
     type = Column(String)
     originator = Column(String)
     message = Column(String)
@@ -107,6 +108,10 @@ class CaseDatabase(object):
         Case_Base.metadata.bind = self.engine
         Case_Base.metadata.create_all(self.engine)
 
+        self._case_ids = None
+        self._case_ids_lock = threading.Lock()
+        self._event_ids_lock = threading.Lock()
+
     def __new__(cls, *args, **kwargs):
         if cls.__instance is None:
             cls.__instance = super(CaseDatabase, cls).__new__(cls)
@@ -129,6 +134,7 @@ class CaseDatabase(object):
         additions = [Case(name=case_name) for case_name in (set(case_names) - existing_cases)]
         self.session.add_all(additions)
         self.session.commit()
+        self.invalidate_case_ids()
 
     def delete_cases(self, case_names):
         """ Removes cases to the database
@@ -139,6 +145,7 @@ class CaseDatabase(object):
         if case_names:
             self.session.query(Case).filter(Case.name.in_(case_names)).delete(synchronize_session=False)
             self.session.commit()
+            self.invalidate_case_ids()
 
     def rename_case(self, old_case_name, new_case_name):
         """ Renames a case
@@ -152,6 +159,7 @@ class CaseDatabase(object):
             if case:
                 case.name = new_case_name
                 self.session.commit()
+                self.invalidate_case_ids()
 
     def edit_event_note(self, event_id, note):
         """ Edits the note attached to an event
@@ -174,18 +182,106 @@ class CaseDatabase(object):
             cases (list[str]): The names of the cases to add the event to
         """
         event.originator = str(event.originator)
-        existing_cases = case_db.session.query(Case).all()
-        existing_case_names = [case.name for case in existing_cases]
+        existing_cases = self.session.query(Case).filter(Case.name.in_(cases)).all()
+        existing_case_names = {case.name for case in existing_cases}
         for case in cases:
-            if case in existing_case_names:
-                for case_elem in existing_cases:
-                    if case_elem.name == case:
-                        event.cases.append(case_elem)
-            else:
+            if case not in existing_case_names:
                 logger.error("Case is not tracked")
+        for case_elem in existing_cases:
+            event.cases.append(case_elem)
         self.session.add(event)
         self.session.commit()
 
+    def add_events(self, events):
+        """ Adds many events to cases in a single transaction. The events are given IDs following the largest existing
+        event ID so that they and their links to cases can each be written with a single multi-row insert
+
+        Args:
+            events (list[tuple(dict, list[int])]): The columns of each event, and the IDs of the cases to add the
+                event to
+        """
+        if not events:
+            return
+        with self._event_ids_lock:
+            first_id = (self.session.query(func.max(Event.id)).scalar() or 0) + 1
+            rows = []
+            links = []
+            for event_id, (columns, case_ids) in enumerate(events, start=first_id):
+                rows.append(dict(columns, id=event_id))
+                links.extend({'case_id': case_id, 'event_id': event_id} for case_id in case_ids)
+            self.session.execute(Event.__table__.insert(), rows)
+            if links:
+                self.session.execute(_CaseEventLink.__table__.insert(), links)
+            self.session.commit()
+
+    def get_expired_events(self, before=None, keep=None, limit=None):
+        """ Gets the oldest events which have expired, and the names of the cases they belong to
+
+        Args:
+            before (datetime, optional): Events which occurred before this time are expired
+            keep (int, optional): All but the newest keep events are expired
+            limit (int, optional): The maximum number of events to get
+
+        Returns:
+            (list[tuple(Event, list[str])]): The expired events, ordered by their IDs, and the names of their cases
+        """
+        conditions = []
+        if before is not None:
+            conditions.append(Event.timestamp < before)
+        if keep is not None:
+            newest_expired = self.session.query(Event.id).order_by(Event.id.desc()).offset(keep).limit(1).scalar()
+            if newest_expired is not None:
+                conditions.append(Event.id <= newest_expired)
+        if not conditions:
+            return []
+        query = self.session.query(Event).filter(or_(*conditions)).order_by(Event.id)
+        if limit is not None:
+            query = query.limit(limit)
+        events = query.all()
+        if not events:
+            return []
+        case_names = {event.id: [] for event in events}
+        links = self.session.query(_CaseEventLink.event_id, Case.name) \
+            .join(Case, Case.id == _CaseEventLink.case_id) \
+            .filter(_CaseEventLink.event_id.in_(list(case_names.keys())))
+        for event_id, case_name in links:
+            case_names[event_id].append(case_name)
+        return [(event, case_names[event.id]) for event in events]
+
+    def delete_events(self, event_ids):
+        """ Removes events and their links to cases from the database in a single transaction
+
+        Args:
+            event_ids (list[int]): The IDs of the events to remove
+        """
+        if event_ids:
+            self.session.execute(_CaseEventLink.__table__.delete().where(_CaseEventLink.event_id.in_(event_ids)))
+            self.session.query(Event).filter(Event.id.in_(event_ids)).delete(synchronize_session=False)
+            self.session.commit()
+
+    def get_case_ids(self, case_names):
+        """ Gets the IDs of cases from their names
+
+        The names and IDs of the cases are cached, and are reloaded from the database when a case is added, removed,
+        or renamed, or when a name is not found in the cache.
+
+        Args:
+            case_names (list[str]): The names of the cases
+
+        Returns:
+            (dict{str: int}): The IDs of the cases which exist, keyed by their names
+        """
+        with self._case_ids_lock:
+            if self._case_ids is None or any(case_name not in self._case_ids for case_name in case_names):
+                self._case_ids = {name: case_id for case_id, name in self.session.query(Case.id, Case.name)}
+            return {case_name: self._case_ids[case_name] for case_name in case_names if case_name in self._case_ids}
+
+    def invalidate_case_ids(self):
+        """ Clears the cached names and IDs of the cases
+        """
+        with self._case_ids_lock:
+            self._case_ids = None
+
     def cases_as_json(self):
         """Gets the JSON representation of all the cases in the case database.
         
@@ -216,6 +312,67 @@ class CaseDatabase(object):
                   for event in event_id.events]
         return result
 
+    def get_case_events(self, case_id, after=None, limit=None, start=None, end=None, event_type=None,
+                        originator=None):
+        """Gets a page of the events of a case, ordered by their IDs
+
+        Pages are selected by the ID of the last event of the previous page rather than by an offset, so reading a page
+        costs the same no matter how far into the case it is.
+
+        Args:
+            case_id (int): The ID of the case
+            after (int, optional): Only get events with an ID greater than this one
+            limit (int, optional): The maximum number of events to get
+            start (datetime, optional): Only get events which occurred at or after this time
+            end (datetime, optional): Only get events which occurred at or before this time
+            event_type (str, optional): Only get events of this type
+            originator (str, optional): Only get events sent by this execution element
+
+        Returns:
+            (list[Event]): The events
+        """
+        query = self.session.query(Event).join(_CaseEventLink, _CaseEventLink.event_id == Event.id) \
+            .filter(_CaseEventLink.case_id == case_id)
+        if after is not None:
+            query = query.filter(_CaseEventLink.event_id > after)
+        if start is not None:
+            query = query.filter(Event.timestamp >= start)
+        if end is not None:
+            query = query.filter(Event.timestamp <= end)
+        if event_type is not None:
+            query = query.filter(Event.type == event_type)
+        if originator is not None:
+            query = query.filter(Event.originator == str(originator))
+        query = query.order_by(_CaseEventLink.event_id)
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+
+    def iter_case_events(self, case_id, batch_size=None, **filters):
+        """Iterates over all the events of a case, ordered by their IDs
+
+        The events are read batch_size at a time using get_case_events, so only one batch is held in memory and no read
+        is held open on the database between batches.
+
+        Args:
+            case_id (int): The ID of the case
+            batch_size (int, optional): The number of events to read at a time. Defaults to
+                walkoff.config.config.case_event_read_batch_size
+            **filters: The start, end, event_type, and originator filters accepted by get_case_events
+
+        Yields:
+            (Event): The events
+        """
+        batch_size = batch_size if batch_size is not None else walkoff.config.config.case_event_read_batch_size
+        after = None
+        while True:
+            events = self.get_case_events(case_id, after=after, limit=batch_size, **filters)
+            for event in events:
+                yield event
+            if len(events) < batch_size:
+                return
+            after = events[-1].id
+
 
 def get_case_db(_singleton=None):
     """ Singleton factory which returns the case database"""
@@ -233,3 +390,5 @@ def initialize():
     """
     Case_Base.metadata.drop_all()
     Case_Base.metadata.create_all()
+    if case_db is not None:
+        case_db.invalidate_case_ids()
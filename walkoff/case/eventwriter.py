@@ -0,0 +1,132 @@
+import logging
+import threading
+from datetime import datetime
+
+import walkoff.config.config
+from walkoff.case import database
+
+logger = logging.getLogger(__name__)
+
+
+class CaseEventWriter(object):
+    """Writes events to the cases which are subscribed to them
+
+    How events are written depends on the durability mode. In 'immediate' mode each event is written before add_event
+    returns. In 'batched' mode events are queued in memory and written in a single transaction either every
+    flush_interval seconds by a background thread or as soon as max_pending events are queued. Queued events are lost
+    if the process exits without calling stop(). Events are written immediately in either mode while the background
+    thread is not running. Events which could not be written are queued again, ahead of newer events, and retried by
+    the next flush, keeping at most max_unwritten of them.
+
+    Args:
+        flush_interval (float, optional): The number of seconds between flushes. Defaults to
+            walkoff.config.config.case_event_flush_interval
+        max_pending (int, optional): The number of queued events which triggers a flush. Defaults to
+            walkoff.config.config.case_event_flush_size
+        durability (str, optional): Either 'immediate' or 'batched'. Defaults to
+            walkoff.config.config.case_event_durability
+        max_unwritten (int, optional): The number of events which could not be written to keep for the next flush.
+            Defaults to walkoff.config.config.case_event_max_unwritten
+    """
+
+    def __init__(self, flush_interval=None, max_pending=None, durability=None, max_unwritten=None):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.durability = durability
+        self.max_unwritten = max_unwritten
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flush_requested = threading.Event()
+        self._thread = None
+        self._exit = False
+        self._pending = []
+
+    def start(self):
+        """Starts the background thread which periodically writes queued events
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._exit = False
+            self._thread = threading.Thread(target=self._flush_periodically)
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self):
+        """Stops the background thread and writes any queued events
+        """
+        self._exit = True
+        self._flush_requested.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        self.flush()
+
+    def _flush_periodically(self):
+        while not self._exit:
+            flush_interval = (self.flush_interval if self.flush_interval is not None
+                              else walkoff.config.config.case_event_flush_interval)
+            self._flush_requested.wait(flush_interval)
+            self._flush_requested.clear()
+            self.flush()
+            database.case_db.session.remove()
+
+    def add_event(self, event_type, originator, message, data, case_names):
+        """Adds an event to some cases
+
+        Args:
+            event_type (str): The type of the event
+            originator (str): The ID of the execution element which sent the event
+            message (str): The message of the event
+            data (str): The data of the event
+            case_names (list[str]): The names of the cases to add the event to
+        """
+        case_ids = database.case_db.get_case_ids(case_names)
+        if len(case_ids) != len(set(case_names)):
+            logger.error('Cases {} are not tracked'.format(list(set(case_names) - set(case_ids))))
+        columns = {'type': event_type,
+                   'timestamp': datetime.utcnow(),
+                   'originator': str(originator),
+                   'message': message,
+                   'data': data}
+        with self._lock:
+            self._pending.append((columns, list(case_ids.values())))
+            pending = len(self._pending)
+        if not self.__is_batching():
+            self.flush()
+        elif pending >= self.__get_max_pending():
+            self._flush_requested.set()
+
+    def flush(self):
+        """Writes all queued events to the database. If the write fails, the events are queued again to be retried by
+        the next flush.
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+            if not pending:
+                return
+            try:
+                database.case_db.add_events(pending)
+            except Exception:
+                database.case_db.session.rollback()
+                max_unwritten = self.__get_max_unwritten()
+                dropped = max(len(pending) - max_unwritten, 0)
+                logger.exception('Could not write {0} case events. Retrying {1} of them on the next flush'.format(
+                    len(pending), len(pending) - dropped))
+                with self._lock:
+                    self._pending[:0] = pending[dropped:]
+
+    def __is_batching(self):
+        durability = self.durability if self.durability is not None else walkoff.config.config.case_event_durability
+        return durability == 'batched' and self._thread is not None and self._thread.is_alive()
+
+    def __get_max_pending(self):
+        return self.max_pending if self.max_pending is not None else walkoff.config.config.case_event_flush_size
+
+    def __get_max_unwritten(self):
+        return (self.max_unwritten if self.max_unwritten is not None
+                else walkoff.config.config.case_event_max_unwritten)
+
+
+case_event_writer = CaseEventWriter()
+"""The writer used to add events to cases
+"""
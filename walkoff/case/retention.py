@@ -0,0 +1,273 @@
+import gzip
+import io
+import json
+import logging
+import os
+import threading
+import zlib
+from datetime import datetime, timedelta
+from os.path import join, isdir
+
+import walkoff.config.config
+import walkoff.config.paths
+from walkoff.case import database
+from walkoff.helpers import utc_as_rfc_datetime, rfc_datetime_as_utc
+
+logger = logging.getLogger(__name__)
+
+archive_prefix = 'case_events_'
+archive_suffix = '.jsonl.gz'
+partition_format = '%Y-%m-%d'
+
+
+def get_archive_file_path(day, archive_path=None):
+    """Gets the path of the archive file holding the events which occurred on a day
+
+    Args:
+        day (datetime): A time on the day
+        archive_path (str, optional): The directory of the archive files. Defaults to
+            walkoff.config.paths.case_archive_path
+
+    Returns:
+        (str): The path of the archive file
+    """
+    archive_path = archive_path if archive_path is not None else walkoff.config.paths.case_archive_path
+    return join(archive_path, archive_prefix + day.strftime(partition_format) + archive_suffix)
+
+
+def get_archived_days(archive_path=None):
+    """Gets the days which have archived events
+
+    Args:
+        archive_path (str, optional): The directory of the archive files. Defaults to
+            walkoff.config.paths.case_archive_path
+
+    Returns:
+        (list[datetime]): The start of each day which has an archive file, in order
+    """
+    archive_path = archive_path if archive_path is not None else walkoff.config.paths.case_archive_path
+    if not isdir(archive_path):
+        return []
+    days = []
+    for filename in os.listdir(archive_path):
+        if filename.startswith(archive_prefix) and filename.endswith(archive_suffix):
+            try:
+                days.append(datetime.strptime(filename[len(archive_prefix):-len(archive_suffix)], partition_format))
+            except ValueError:
+                continue
+    return sorted(days)
+
+
+def event_to_archive_record(event, case_names):
+    """Converts an event to the record stored in an archive file
+
+    Args:
+        event (Event): The event
+        case_names (list[str]): The names of the cases the event belongs to
+
+    Returns:
+        (dict): The record
+    """
+    return {'id': event.id,
+            'timestamp': utc_as_rfc_datetime(event.timestamp),
+            'type': event.type,
+            'originator': event.originator,
+            'message': event.message,
+            'note': event.note,
+            'data': event.data,
+            'cases': case_names}
+
+
+def archive_record_to_event(record):
+    """Converts a record stored in an archive file to the JSON representation of its event
+
+    Args:
+        record (dict): The record
+
+    Returns:
+        (dict): The JSON representation of the event, in the format of Event.as_json, with the names of its cases
+    """
+    event = database.Event(id=record['id'],
+                           timestamp=rfc_datetime_as_utc(record['timestamp']),
+                           type=record['type'],
+                           originator=record['originator'],
+                           message=record['message'],
+                           note=record['note'],
+                           data=record['data'])
+    output = event.as_json()
+    output['cases'] = record['cases']
+    return output
+
+
+def iter_archived_events(case_name=None, start=None, end=None, event_type=None, originator=None, archive_path=None):
+    """Iterates over archived events
+
+    Only the archive files for the days between start and end are read. Archive files are never modified by this
+    function, and are read one line at a time.
+
+    Args:
+        case_name (str, optional): Only get events which belonged to this case when they were archived
+        start (datetime, optional): Only get events which occurred at or after this time
+        end (datetime, optional): Only get events which occurred at or before this time
+        event_type (str, optional): Only get events of this type
+        originator (str, optional): Only get events sent by this execution element
+        archive_path (str, optional): The directory of the archive files. Defaults to
+            walkoff.config.paths.case_archive_path
+
+    Yields:
+        (dict): The JSON representation of each event, in the format of Event.as_json, with the names of its cases,
+            ordered by day and then by the order the events were archived
+    """
+    for day in get_archived_days(archive_path):
+        if start is not None and day + timedelta(days=1) <= start:
+            continue
+        if end is not None and day > end:
+            break
+        for record in _read_archive_file(get_archive_file_path(day, archive_path)):
+            if case_name is not None and case_name not in record['cases']:
+                continue
+            if event_type is not None and record['type'] != event_type:
+                continue
+            if originator is not None and record['originator'] != str(originator):
+                continue
+            timestamp = rfc_datetime_as_utc(record['timestamp'])
+            if (start is not None and timestamp < start) or (end is not None and timestamp > end):
+                continue
+            yield archive_record_to_event(record)
+
+
+def _read_archive_file(path):
+    try:
+        with io.TextIOWrapper(gzip.open(path, 'rb'), encoding='utf-8') as archive_file:
+            for line in archive_file:
+                if line.strip():
+                    yield json.loads(line)
+    except (EOFError, IOError, OSError, ValueError, zlib.error):
+        logger.warning('Could not read all events from case archive {}'.format(path), exc_info=True)
+
+
+class CaseEventRetention(object):
+    """Removes expired events from the case database, optionally archiving them to disk first
+
+    Events expire when they are older than max_age days, or when there are more than max_count newer events. Expired
+    events are removed oldest first, batch_size at a time, with each batch written to the archive files and then
+    deleted in its own short transaction so event writers are never blocked for long. An event is always archived
+    before it is deleted, so an interrupted pass can at worst archive some events twice.
+
+    Archived events are appended as JSON lines to a gzip file per day, named by the day the events occurred. Each batch
+    is written as its own gzip member, so files can be appended to and are readable with any gzip reader. Use
+    iter_archived_events to query them.
+
+    Args:
+        max_age (float, optional): The age in days after which events expire. Defaults to
+            walkoff.config.config.case_event_max_age
+        max_count (int, optional): The number of events to keep. Defaults to walkoff.config.config.case_event_max_count
+        expiry (str, optional): Either 'archive' or 'delete'. Defaults to walkoff.config.config.case_event_expiry
+        interval (float, optional): The number of seconds between passes of the background thread. Defaults to
+            walkoff.config.config.case_event_retention_interval
+        batch_size (int, optional): The number of events removed per transaction. Defaults to
+            walkoff.config.config.case_event_retention_batch_size
+        archive_path (str, optional): The directory of the archive files. Defaults to
+            walkoff.config.paths.case_archive_path
+    """
+
+    def __init__(self, max_age=None, max_count=None, expiry=None, interval=None, batch_size=None, archive_path=None):
+        self.max_age = max_age
+        self.max_count = max_count
+        self.expiry = expiry
+        self.interval = interval
+        self.batch_size = batch_size
+        self.archive_path = archive_path
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._exit = False
+
+    def start(self):
+        """Starts the background thread which periodically removes expired events
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._exit = False
+            self._thread = threading.Thread(target=self._expire_periodically)
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self):
+        """Stops the background thread
+        """
+        self._exit = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def _expire_periodically(self):
+        while not self._exit:
+            interval = (self.interval if self.interval is not None
+                        else walkoff.config.config.case_event_retention_interval)
+            self._wake.wait(interval)
+            self._wake.clear()
+            if self._exit:
+                break
+            try:
+                self._expire_events(interruptible=True)
+            except Exception:
+                database.case_db.session.rollback()
+                logger.exception('Could not remove expired case events')
+            finally:
+                database.case_db.session.remove()
+
+    def expire_events(self):
+        """Removes all expired events from the case database
+
+        Returns:
+            (int): The number of events removed
+        """
+        return self._expire_events(interruptible=False)
+
+    def _expire_events(self, interruptible):
+        max_age = self.max_age if self.max_age is not None else walkoff.config.config.case_event_max_age
+        max_count = self.max_count if self.max_count is not None else walkoff.config.config.case_event_max_count
+        if max_age is None and max_count is None:
+            return 0
+        batch_size = (self.batch_size if self.batch_size is not None
+                      else walkoff.config.config.case_event_retention_batch_size)
+        before = datetime.utcnow() - timedelta(days=max_age) if max_age is not None else None
+
+        removed = 0
+        with self._lock:
+            while not (interruptible and self._exit):
+                expired = database.case_db.get_expired_events(before=before, keep=max_count, limit=batch_size)
+                if not expired:
+                    break
+                if self.__get_expiry() == 'archive':
+                    self._archive(expired)
+                database.case_db.delete_events([event.id for event, _ in expired])
+                removed += len(expired)
+                if len(expired) < batch_size:
+                    break
+        if removed:
+            logger.info('Removed {} expired case events'.format(removed))
+        return removed
+
+    def _archive(self, expired):
+        archive_path = self.archive_path if self.archive_path is not None else walkoff.config.paths.case_archive_path
+        if not isdir(archive_path):
+            os.makedirs(archive_path)
+        days = {}
+        for event, case_names in expired:
+            day = event.timestamp.strftime(partition_format)
+            line = json.dumps(event_to_archive_record(event, case_names), sort_keys=True) + '\n'
+            days.setdefault(day, []).append(line.encode('utf-8'))
+        for day, lines in days.items():
+            with gzip.open(get_archive_file_path(datetime.strptime(day, partition_format), archive_path),
+                           'ab') as archive_file:
+                archive_file.write(b''.join(lines))
+
+    def __get_expiry(self):
+        return self.expiry if self.expiry is not None else walkoff.config.config.case_event_expiry
+
+
+case_event_retention = CaseEventRetention()
+"""Removes expired events from the case database
+"""
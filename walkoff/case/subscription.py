@@ -1,4 +1,7 @@
 import logging
+import threading
+
+from six import string_types
 
 from walkoff.case import database
 
@@ -6,6 +9,11 @@ subscriptions = {}
 
 logger = logging.getLogger(__name__)
 
+_no_cases = frozenset()
+_subscription_index = {}
+_indexed_subscriptions = None
+_index_lock = threading.RLock()
+
 
 def set_subscriptions(new_subscriptions):
     """ Resets the subscriptions
@@ -15,7 +23,9 @@ def set_subscriptions(new_subscriptions):
             Takes the form of "{case_name: {id: [events]}"
     """
     global subscriptions
-    subscriptions = new_subscriptions
+    with _index_lock:
+        subscriptions = new_subscriptions
+        _rebuild_index()
     new_cases = new_subscriptions.keys()
     existing_cases = {x[0] for x in
                       database.case_db.session.query(database.Case).with_entities(database.Case.name).all()}
@@ -32,10 +42,13 @@ def add_cases(cases):
     """
     global subscriptions
     valid_cases = []
-    for case_name, case in cases.items():
-        if case_name not in subscriptions:
-            subscriptions[case_name] = case
-            valid_cases.append(case_name)
+    with _index_lock:
+        _ensure_index()
+        for case_name, case in cases.items():
+            if case_name not in subscriptions:
+                subscriptions[case_name] = case
+                _index_case(case_name, case)
+                valid_cases.append(case_name)
     database.case_db.add_cases(valid_cases)
 
 
@@ -47,10 +60,12 @@ def delete_cases(cases):
     """
     global subscriptions
     valid_cases = []
-    for case_name in cases:
-        if case_name in subscriptions:
-            del subscriptions[case_name]
-            valid_cases.append(case_name)
+    with _index_lock:
+        _ensure_index()
+        for case_name in cases:
+            if case_name in subscriptions:
+                _unindex_case(case_name, subscriptions.pop(case_name))
+                valid_cases.append(case_name)
     database.case_db.delete_cases(valid_cases)
 
 
@@ -62,21 +77,28 @@ def rename_case(old_case_name, new_case_name):
         new_case_name (str): Case's new name
     """
     global subscriptions
-    if old_case_name in subscriptions and new_case_name not in subscriptions:
-        subscriptions[new_case_name] = subscriptions.pop(old_case_name)
-        database.case_db.rename_case(old_case_name, new_case_name)
-        return True
-    else:
-        return False
+    with _index_lock:
+        _ensure_index()
+        if old_case_name not in subscriptions or new_case_name in subscriptions:
+            return False
+        case_subscriptions = subscriptions.pop(old_case_name)
+        _unindex_case(old_case_name, case_subscriptions)
+        subscriptions[new_case_name] = case_subscriptions
+        _index_case(new_case_name, case_subscriptions)
+    database.case_db.rename_case(old_case_name, new_case_name)
+    return True
 
 
 def clear_subscriptions():
     """ Clears and resets the subscriptions
     """
     global subscriptions
-    subscriptions = {}
+    with _index_lock:
+        subscriptions = {}
+        _rebuild_index()
     database.case_db.session.query(database.Case).delete(synchronize_session='fetch')
     database.case_db.session.commit()
+    database.case_db.invalidate_case_ids()
 
 
 def get_cases_subscribed(originator, message_name):
@@ -85,10 +107,19 @@ def get_cases_subscribed(originator, message_name):
     Args:
         originator (str): The id of the element from which the event originated
         message_name (str): The name of the message to check
+
+    Returns:
+        (frozenset[str]): The names of the subscribed cases
     """
-    global subscriptions
-    return [case for case, case_subscriptions in subscriptions.items()
-            if (str(originator) in case_subscriptions and message_name in case_subscriptions[str(originator)])]
+    if subscriptions is not _indexed_subscriptions:
+        with _index_lock:
+            _ensure_index()
+    if not isinstance(originator, string_types):
+        originator = str(originator)
+    originator_subscriptions = _subscription_index.get(originator)
+    if originator_subscriptions is None:
+        return _no_cases
+    return originator_subscriptions.get(message_name, _no_cases)
 
 
 def modify_subscription(case, originator, events):
@@ -103,8 +134,13 @@ def modify_subscription(case, originator, events):
         True if successfully edited. False otherwise.
     """
     global subscriptions
-    if case in subscriptions:
-        subscriptions[case][originator] = events
+    with _index_lock:
+        _ensure_index()
+        if case in subscriptions:
+            if originator in subscriptions[case]:
+                _unindex_case(case, {originator: subscriptions[case][originator]})
+            subscriptions[case][originator] = events
+            _index_case(case, {originator: events})
 
 
 def remove_subscription_node(case, originator):
@@ -116,5 +152,48 @@ def remove_subscription_node(case, originator):
         originator (str): The id of the element from which the event originated
     """
     global subscriptions
-    if case in subscriptions:
-        subscriptions[case].pop(originator, False)
+    with _index_lock:
+        _ensure_index()
+        if case in subscriptions and originator in subscriptions[case]:
+            _unindex_case(case, {originator: subscriptions[case].pop(originator)})
+
+
+def _ensure_index():
+    """Rebuilds the subscription index if the subscriptions were replaced without using set_subscriptions. Must be
+    called while holding _index_lock.
+    """
+    if subscriptions is not _indexed_subscriptions:
+        _rebuild_index()
+
+
+def _rebuild_index():
+    global _subscription_index, _indexed_subscriptions
+    _subscription_index = {}
+    for case_name, case_subscriptions in subscriptions.items():
+        _index_case(case_name, case_subscriptions)
+    _indexed_subscriptions = subscriptions
+
+
+def _index_case(case_name, case_subscriptions):
+    """Adds the subscriptions of a case to the index. The sets of cases in the index are replaced rather than modified,
+    so that get_cases_subscribed can read the index without holding the lock.
+    """
+    for originator, events in case_subscriptions.items():
+        originator_subscriptions = _subscription_index.setdefault(str(originator), {})
+        for event in events:
+            originator_subscriptions[event] = originator_subscriptions.get(event, _no_cases) | {case_name}
+
+
+def _unindex_case(case_name, case_subscriptions):
+    for originator, events in case_subscriptions.items():
+        originator_subscriptions = _subscription_index.get(str(originator))
+        if originator_subscriptions is None:
+            continue
+        for event in events:
+            cases = originator_subscriptions.get(event, _no_cases) - {case_name}
+            if cases:
+                originator_subscriptions[event] = cases
+            else:
+                originator_subscriptions.pop(event, None)
+        if not originator_subscriptions:
+            _subscription_index.pop(str(originator), None)
@@ -61,16 +61,146 @@ zmq_requests_address = 'tcp://127.0.0.1:5555'
 zmq_results_address = 'tcp://127.0.0.1:5556'
 zmq_communication_address = 'tcp://127.0.0.1:5557'
 
-# Specify the number of worker processes, and the number of threads for each worker process. Multiplying these numbers
-# together specifies the max number of workflows that may be executing at the same time.
+# Specify the number of worker processes, and the number of threads for each worker process. In the 'threads' worker
+# mode, multiplying these numbers together specifies the max number of workflows that may be executing at the same time.
 num_processes = 4
 num_threads_per_process = 3
 
+# How workers execute workflows, either 'threads' or 'asyncio'. With 'threads', each worker executes up to
+# num_threads_per_process workflows at a time, each on its own thread. With 'asyncio', each worker executes up to
+# asyncio_workflows_per_process workflows at a time on an asyncio event loop. Actions defined with "async def" are
+# awaited on the event loop, and all other actions run on num_threads_per_process threads. 'asyncio' requires Python
+# 3.7 or later.
+worker_mode = 'threads'
+asyncio_workflows_per_process = 1000
+
+# Whether the number of worker processes is scaled with the number of workflows waiting to execute, either 'enabled' or
+# 'disabled'. When enabled, num_processes workers are started with the server, and every autoscale_interval seconds
+# more are started if at least autoscale_queue_depth workflows are waiting for a free slot or the oldest of them has
+# waited autoscale_queue_wait seconds. Workers are retired once a worker's worth of slots has been unused for
+# autoscale_cooldown seconds. There are always between min_processes and max_processes workers.
+worker_autoscaling = 'disabled'
+min_processes = 1
+max_processes = 8
+autoscale_interval = 5
+autoscale_queue_depth = 10
+autoscale_queue_wait = 5
+autoscale_cooldown = 300
+
+# Number of seconds a worker which has been told to exit is given to finish the workflows it is executing before it is
+# killed
+worker_exit_timeout = 5
+
+# Maximum time (in milliseconds) the load balancer will block waiting for a worker message or a new workflow before
+# rechecking whether it should exit. Dispatching is event-driven, so this does not affect dispatch latency.
+load_balancer_poll_timeout = 500
+
+# Maximum number of workflows the load balancer will send to a single worker in one message. The number actually sent
+# is also limited by the number of free threads on the worker.
+max_workflows_per_dispatch = 10
+
+# Pending workflows are sent to workers in order of priority, highest first. Workflows executed through the API default
+# to default_workflow_priority, and scheduled workflows are executed with scheduled_workflow_priority. A pending
+# workflow gains one priority level for every workflow_priority_aging seconds it waits, so that lower priority
+# workflows are not starved.
+default_workflow_priority = 5
+scheduled_workflow_priority = 1
+workflow_priority_aging = 30
+
+# Results from the workers are received in batches of up to receiver_batch_size messages, and their callbacks are
+# triggered by receiver_callback_threads threads. At most receiver_queue_size results may be waiting for their
+# callbacks before the receiver stops taking results from the workers.
+receiver_batch_size = 100
+receiver_callback_threads = 4
+receiver_queue_size = 10000
+
+# Encoding used by the workers to send results to the server, either 'msgpack' or 'json'. msgpack avoids encoding large
+# action results as JSON strings, and is only used if msgpack 0.6.1 or later is installed. Otherwise JSON is used.
+preferred_result_encoding = 'msgpack'
+
+# Maximum number of distinct workflows each worker process keeps loaded in memory between executions
+workflow_cache_size = 100
+
+# Maximum number of actions of a single parallel workflow which may execute concurrently
+max_parallel_actions = 10
+
+# Workflow and action status changes are written to the execution database in batches. Pending changes are written
+# every workflow_status_flush_interval seconds, or as soon as workflow_status_flush_size executions have pending changes
+workflow_status_flush_interval = 0.5
+workflow_status_flush_size = 500
+
+# How events are written to cases. With 'immediate', each event is written as soon as it occurs. With 'batched', events
+# are written every case_event_flush_interval seconds, or as soon as case_event_flush_size events are waiting. Batched
+# events which have not yet been written are lost if the server crashes.
+case_event_durability = 'batched'
+case_event_flush_interval = 0.5
+case_event_flush_size = 500
+
+# Batched events which could not be written are retried on the next flush. At most case_event_max_unwritten of them are
+# kept, and the oldest are dropped beyond that so that a case database which keeps failing cannot exhaust memory
+case_event_max_unwritten = 10000
+
+# The number of events read from the case database at a time when a case's events are exported
+case_event_read_batch_size = 1000
+
+# Events are removed from the case database once they are older than case_event_max_age days, or once there are more
+# than case_event_max_count newer events. Either limit can be None to disable it. With 'archive', removed events are
+# first appended to daily compressed files in walkoff.config.paths.case_archive_path. With 'delete', they are discarded.
+# Expired events are removed every case_event_retention_interval seconds, case_event_retention_batch_size events per
+# transaction.
+case_event_max_age = None
+case_event_max_count = None
+case_event_expiry = 'archive'
+case_event_retention_interval = 600
+case_event_retention_batch_size = 500
+
+# Maximum number of pending or executing workflows and executing actions whose start times are tracked for metrics.
+# The oldest are forgotten first, so executions which never finish do not accumulate.
+metrics_max_tracked_executions = 10000
+
+# Number of recent events each server-sent event stream keeps so slow or reconnecting clients can catch up, and the
+# number of seconds between heartbeats sent to idle clients
+sse_buffer_size = 1000
+sse_heartbeat_interval = 15
+
+# Number of recent notifications kept for each user so they can be replayed when the user's client reconnects
+notification_buffer_size = 100
+
+# Whether each worker process keeps the app instances of finished workflows for reuse by later workflows, either
+# 'enabled' or 'disabled'. At most app_instance_pool_size idle instances are kept, and at most
+# app_instance_pool_max_per_device for each app and device. Instances idle for longer than app_instance_pool_ttl
+# seconds are shut down.
+app_instance_pooling = 'enabled'
+app_instance_pool_size = 50
+app_instance_pool_max_per_device = 4
+app_instance_pool_ttl = 300
+
+# Number of seconds each process keeps the decrypted fields of a device in memory. Devices modified through the REST
+# API are reloaded immediately by the server, and by workers once they see the device's new modification time.
+device_config_cache_ttl = 60
+
 # Database types
 walkoff_db_type = 'sqlite'
 case_db_type = 'sqlite'
 device_db_type = 'sqlite'
 
+# Connection pool of the execution database. 'queue' keeps up to execution_db_pool_size connections open, opens up to
+# execution_db_max_overflow more under load, waits execution_db_pool_timeout seconds for a free connection, and
+# replaces connections older than execution_db_pool_recycle seconds. 'null' opens a new connection for every
+# transaction. The read-only connections used by the REST API have a separate pool of the same size.
+execution_db_pool = 'queue'
+execution_db_pool_size = 10
+execution_db_max_overflow = 20
+execution_db_pool_timeout = 30
+execution_db_pool_recycle = 3600
+
+# Journal mode and synchronous setting of SQLite execution databases, or 'default' to leave them unchanged. In WAL
+# mode readers do not block writers and writers do not block readers. Connections wait up to sqlite_busy_timeout
+# milliseconds for a lock before failing with "database is locked".
+sqlite_journal_mode = 'wal'
+sqlite_synchronous = 'normal'
+sqlite_busy_timeout = 5000
+
 # Secret key
 secret_key = 'SHORTSTOPKEYTEST'
 
@@ -102,9 +232,10 @@ def load_app_apis(apps_path=None):
                 url = join(apps_path, app, 'api.yaml')
                 with open(url) as function_file:
                     api = yaml.load(function_file.read())
-                    from walkoff.appgateway.validator import validate_app_spec
+                    from walkoff.appgateway.validator import validate_app_spec, compile_app_parameters_validators
                     validate_app_spec(api, app)
                     app_apis[app] = api
+                    compile_app_parameters_validators(app, api)
             except Exception as e:
                 __logger.error(
                     'Cannot load apps api for app {0}: Error {1}'.format(app, str(format_exception_message(e))))
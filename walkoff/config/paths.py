@@ -5,6 +5,7 @@ data_path = join('.', 'data')
 api_path = join('.', 'walkoff', 'api')
 apps_path = join('.', 'apps')
 case_db_path = join(data_path, 'events.db')
+case_archive_path = join(data_path, 'case_archives')
 
 client_path = join('.', 'walkoff', 'client')
 config_path = join(data_path, 'walkoff.config')
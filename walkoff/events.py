@@ -102,9 +102,9 @@ class ControllerSignal(WalkoffSignal):
     Args:
         name (str): The name of the signal
         message (str): The message log with this signal to a case. Defaults to empty string
-        scheduler_event (int): The APScheduler event connected to this signal.
+        scheduler_event (int, optional): The APScheduler event connected to this signal. Defaults to None
     """
-    def __init__(self, name, message, scheduler_event):
+    def __init__(self, name, message, scheduler_event=None):
         super(ControllerSignal, self).__init__(name, EventType.controller, message=message)
         self.scheduler_event = scheduler_event
 
@@ -188,6 +188,8 @@ class WalkoffEvent(Enum):
     SchedulerJobRemoved = ControllerSignal('Job Removed', 'Job removed', EVENT_JOB_REMOVED)
     SchedulerJobExecuted = ControllerSignal('Job Executed', 'Job executed successfully', EVENT_JOB_EXECUTED)
     SchedulerJobError = ControllerSignal('Job Error', 'Job executed with error', EVENT_JOB_ERROR)
+    WorkersScaledUp = ControllerSignal('Workers Scaled Up', 'Worker processes started')
+    WorkersScaledDown = ControllerSignal('Workers Scaled Down', 'Worker process draining')
 
     WorkflowExecutionPending = WorkflowSignal('Workflow Execution Pending', 'Workflow execution pending')
     WorkflowExecutionStart = WorkflowSignal('Workflow Execution Start', 'Workflow execution started')
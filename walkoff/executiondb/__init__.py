@@ -1,8 +1,8 @@
 import enum
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, scoped_session
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import NullPool, QueuePool
 
 import walkoff.config.config
 import walkoff.config.paths
@@ -13,6 +13,12 @@ Device_Base = declarative_base()
 
 class ExecutionDatabase(object):
     """Wrapper for the SQLAlchemy database connection object
+
+    Attributes:
+        session (scoped_session): The session used to read and write the database
+        read_session (scoped_session): A session with its own engine and connection pool which can only read the
+            database. It is used by REST endpoints which only read, so that they do not contend with status writers
+            for connections and, with SQLite in WAL mode, are not blocked by their transactions.
     """
 
     __instance = None
@@ -32,15 +38,17 @@ class ExecutionDatabase(object):
         from walkoff.executiondb.saved_workflow import SavedWorkflow
         from walkoff.executiondb.workflowresults import WorkflowStatus, ActionStatus
 
-        self.engine = create_engine(format_db_path(
-            walkoff.config.config.device_db_type, walkoff.config.paths.execution_db_path), poolclass=NullPool)
-        self.connection = self.engine.connect()
-        self.transaction = self.connection.begin()
+        self.engine = _create_engine()
+        self.read_engine = _create_engine(read_only=True)
 
         Session = sessionmaker()
         Session.configure(bind=self.engine)
         self.session = scoped_session(Session)
 
+        ReadSession = sessionmaker()
+        ReadSession.configure(bind=self.read_engine)
+        self.read_session = scoped_session(ReadSession)
+
         Device_Base.metadata.bind = self.engine
         Device_Base.metadata.create_all(self.engine)
 
@@ -51,8 +59,43 @@ class ExecutionDatabase(object):
 
     def tear_down(self):
         self.session.rollback()
-        self.connection.close()
+        self.session.remove()
+        self.read_session.remove()
         self.engine.dispose()
+        self.read_engine.dispose()
+
+
+def _create_engine(read_only=False):
+    db_type = walkoff.config.config.device_db_type
+    kwargs = {}
+    if walkoff.config.config.execution_db_pool == 'null':
+        kwargs['poolclass'] = NullPool
+    else:
+        kwargs.update(poolclass=QueuePool,
+                      pool_size=walkoff.config.config.execution_db_pool_size,
+                      max_overflow=walkoff.config.config.execution_db_max_overflow,
+                      pool_timeout=walkoff.config.config.execution_db_pool_timeout,
+                      pool_recycle=walkoff.config.config.execution_db_pool_recycle)
+    if db_type == 'sqlite':
+        # Pooled connections are used by whichever thread checks them out
+        kwargs['connect_args'] = {'check_same_thread': False}
+
+    engine = create_engine(format_db_path(db_type, walkoff.config.paths.execution_db_path), **kwargs)
+
+    if db_type == 'sqlite':
+        @event.listens_for(engine, 'connect')
+        def configure_sqlite_connection(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute('PRAGMA busy_timeout={}'.format(int(walkoff.config.config.sqlite_busy_timeout)))
+            if walkoff.config.config.sqlite_journal_mode != 'default':
+                cursor.execute('PRAGMA journal_mode={}'.format(walkoff.config.config.sqlite_journal_mode))
+            if walkoff.config.config.sqlite_synchronous != 'default':
+                cursor.execute('PRAGMA synchronous={}'.format(walkoff.config.config.sqlite_synchronous))
+            if read_only:
+                cursor.execute('PRAGMA query_only=ON')
+            cursor.close()
+
+    return engine
 
 
 execution_db = None
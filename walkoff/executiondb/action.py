@@ -1,6 +1,7 @@
 import logging
 import traceback
 import uuid
+from functools import partial
 
 from sqlalchemy import Column, Integer, ForeignKey, String, orm
 from sqlalchemy.orm import relationship
@@ -8,7 +9,8 @@ from sqlalchemy_utils import UUIDType
 
 from walkoff.appgateway import get_app_action, is_app_action_bound
 from walkoff.appgateway.actionresult import ActionResult
-from walkoff.appgateway.validator import validate_app_action_parameters
+from walkoff.appgateway.decorators import is_coroutine_action
+from walkoff.appgateway.validator import validate_app_action_parameters, get_app_action_parameters_validator
 from walkoff.events import WalkoffEvent
 from walkoff.executiondb import Device_Base
 from walkoff.executiondb.argument import Argument
@@ -75,8 +77,12 @@ class Action(ExecutionElement, Device_Base):
     def init_on_load(self):
         """Loads all necessary fields upon Action being loaded from database"""
         self._run, self._arguments_api = get_app_action_api(self.app_name, self.action_name)
-        self._output = None
         self._action_executable = get_app_action(self.app_name, self._run)
+        self.reset()
+
+    def reset(self):
+        """Resets the execution state of the Action so that it can be executed again"""
+        self._output = None
         self._execution_id = 'default'
 
     def validate(self):
@@ -133,6 +139,39 @@ class Action(ExecutionElement, Device_Base):
         Returns:
             The result of the executed function.
         """
+        result, call = self.start_execution(instance, accumulator, arguments=arguments, resume=resume)
+        if call is None:
+            return result
+        try:
+            result = call()
+            if self.is_coroutine():
+                from walkoff.appgateway.asyncactions import run_coroutine
+                result = run_coroutine(result)
+        except Exception as e:
+            return self.finish_execution(error=e)
+        return self.finish_execution(result)
+
+    def is_coroutine(self):
+        """Checks if the app function of this Action is a coroutine function, which must be awaited
+        Returns:
+            True if the app function is a coroutine function, False otherwise
+        """
+        return is_coroutine_action(self._action_executable)
+
+    def start_execution(self, instance, accumulator, arguments=None, resume=False):
+        """Starts executing an Action, up to calling the associated app function. execute() should be used unless the
+            app function is called separately, for example on an event loop.
+        Args:
+            instance (App): The instance of an App object to be used to execute the associated function.
+            accumulator (dict): Dict containing the results of the previous actions
+            arguments (list[Argument]): Optional list of Arguments to be used if the Action is the starting step of
+                the Workflow. Defaults to None.
+            resume (bool, optional): Optional boolean to resume a previously paused workflow. Defaults to False.
+        Returns:
+            A tuple of the result of the Action and None if the Action has finished without calling the app function,
+            because it is a trigger awaiting data or its arguments are invalid. Otherwise, a tuple of None and a
+            function which calls the app function. Its result must be passed to finish_execution().
+        """
         self._execution_id = str(uuid.uuid4())
 
         WalkoffEvent.CommonWorkflowSignal.send(self, event=WalkoffEvent.ActionStarted)
@@ -140,17 +179,34 @@ class Action(ExecutionElement, Device_Base):
             WalkoffEvent.CommonWorkflowSignal.send(self, event=WalkoffEvent.TriggerActionAwaitingData)
             logger.debug('Trigger Action {} is awaiting data'.format(self.name))
             self._output = None
-            return ActionResult("trigger", "trigger")
+            return ActionResult("trigger", "trigger"), None
 
         arguments = arguments if arguments else self.arguments
 
         try:
-            args = validate_app_action_parameters(self._arguments_api, arguments, self.app_name, self.action_name,
-                                                  accumulator=accumulator)
-            if is_app_action_bound(self.app_name, self._run):
-                result = self._action_executable(instance, **args)
-            else:
-                result = self._action_executable(**args)
+            validator = get_app_action_parameters_validator(self.app_name, self.action_name, self._arguments_api)
+            args = validator.validate(arguments, accumulator=accumulator)
+            is_bound = is_app_action_bound(self.app_name, self._run)
+        except Exception as e:
+            self.__handle_execution_error(e)
+            return None, None
+        if is_bound:
+            return None, partial(self._action_executable, instance, **args)
+        else:
+            return None, partial(self._action_executable, **args)
+
+    def finish_execution(self, result=None, error=None):
+        """Finishes executing an Action with the result of the function returned by start_execution()
+        Args:
+            result (ActionResult, optional): The result of the app function. Defaults to None.
+            error (Exception, optional): The exception raised by the app function, if it raised one. Defaults to None.
+        Returns:
+            The result of the executed function.
+        """
+        if error is not None:
+            self.__handle_execution_error(error)
+            return None
+        try:
             result.set_default_status(self.app_name, self.action_name)
             if result.is_failure(self.app_name, self.action_name):
                 WalkoffEvent.CommonWorkflowSignal.send(self, event=WalkoffEvent.ActionExecutionError,
@@ -0,0 +1,147 @@
+import logging
+import pickle
+import threading
+import time
+import zlib
+
+from walkoff.executiondb.saved_workflow import SavedWorkflow, SavedAccumulatorEntries
+
+logger = logging.getLogger(__name__)
+
+_statistics_lock = threading.Lock()
+_statistics = {'saves': 0, 'save_seconds': 0.0, 'saved_bytes': 0,
+               'restores': 0, 'restore_seconds': 0.0, 'restored_bytes': 0}
+
+
+class Accumulator(dict):
+    """The results of the executed Actions of a workflow, keyed by Action ID
+
+    Remembers which entries were set since the workflow was last checkpointed so that each checkpoint only has to
+    save those entries.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(Accumulator, self).__init__(*args, **kwargs)
+        self._changed = set()
+
+    def __setitem__(self, key, value):
+        super(Accumulator, self).__setitem__(key, value)
+        self._changed.add(key)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def pop_changes(self):
+        """Gets the entries which were set since this was last called, and forgets that they were set
+
+        Returns:
+            (dict): The entries
+        """
+        changes = {key: self[key] for key in self._changed if key in self}
+        self._changed = set()
+        return changes
+
+    def mark_changed(self, keys):
+        """Marks entries as set so that they are included in the next checkpoint
+
+        Args:
+            keys (iterable): The keys of the entries
+        """
+        self._changed.update(keys)
+
+
+def save_checkpoint(session, workflow):
+    """Saves the state of a workflow so that it can be resumed later, possibly by another process
+
+    Only the accumulator entries set since the previous checkpoint of the execution are written, compressed, as a new
+    row. App instances are not saved; instead the app name and device ID of each instance are saved so that the
+    instances can be re-created when the workflow resumes.
+
+    Args:
+        session (Session): The execution database session
+        workflow (Workflow): The executing workflow
+
+    Returns:
+        (int): The number of bytes of accumulator entries written
+    """
+    start = time.time()
+    accumulator = workflow.get_accumulator()
+    changes = accumulator.pop_changes()
+    try:
+        session.merge(SavedWorkflow(workflow_execution_id=workflow.get_execution_id(),
+                                    workflow_id=workflow.id,
+                                    action_id=workflow.get_executing_action_id(),
+                                    app_devices=workflow.get_app_devices()))
+        size = 0
+        if changes:
+            data = zlib.compress(pickle.dumps(changes, pickle.HIGHEST_PROTOCOL))
+            size = len(data)
+            session.add(SavedAccumulatorEntries(workflow_execution_id=workflow.get_execution_id(), data=data))
+        session.commit()
+    except Exception:
+        session.rollback()
+        accumulator.mark_changed(changes.keys())
+        raise
+    _record('save', time.time() - start, size)
+    logger.debug('Saved checkpoint of workflow execution {0}: {1} accumulator entries, {2} bytes'.format(
+        workflow.get_execution_id(), len(changes), size))
+    return size
+
+
+def load_checkpoint(session, workflow_execution_id):
+    """Loads the saved state of a workflow execution
+
+    Args:
+        session (Session): The execution database session
+        workflow_execution_id (str): The execution ID of the workflow
+
+    Returns:
+        (tuple(SavedWorkflow, Accumulator)): The saved state and the accumulator of the workflow, or None and None if
+            the execution has no saved state
+    """
+    start = time.time()
+    saved_state = session.query(SavedWorkflow).filter_by(workflow_execution_id=workflow_execution_id).first()
+    if saved_state is None:
+        return None, None
+    accumulator = Accumulator()
+    size = 0
+    for data, in session.query(SavedAccumulatorEntries.data).filter_by(
+            workflow_execution_id=workflow_execution_id).order_by(SavedAccumulatorEntries.id):
+        size += len(data)
+        dict.update(accumulator, pickle.loads(zlib.decompress(data)))
+    _record('restore', time.time() - start, size)
+    logger.debug('Loaded checkpoint of workflow execution {0}: {1} accumulator entries, {2} bytes'.format(
+        workflow_execution_id, len(accumulator), size))
+    return saved_state, accumulator
+
+
+def delete_checkpoints(session, workflow_execution_ids):
+    """Deletes the saved states of workflow executions. The session is not committed.
+
+    Args:
+        session (Session): The execution database session
+        workflow_execution_ids (list[str]): The execution IDs of the workflows
+    """
+    session.query(SavedWorkflow).filter(
+        SavedWorkflow.workflow_execution_id.in_(workflow_execution_ids)).delete(synchronize_session=False)
+    session.query(SavedAccumulatorEntries).filter(
+        SavedAccumulatorEntries.workflow_execution_id.in_(workflow_execution_ids)).delete(synchronize_session=False)
+
+
+def get_checkpoint_statistics():
+    """Gets the cost of the checkpoints saved and loaded by this process
+
+    Returns:
+        (dict): The number of checkpoints saved and loaded, the total seconds spent saving and loading them, and the
+            total compressed size in bytes of the accumulator entries saved and loaded
+    """
+    with _statistics_lock:
+        return dict(_statistics)
+
+
+def _record(operation, seconds, size):
+    with _statistics_lock:
+        _statistics[operation + 's'] += 1
+        _statistics[operation + '_seconds'] += seconds
+        _statistics[operation + 'd_bytes'] += size
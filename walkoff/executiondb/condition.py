@@ -6,7 +6,7 @@ from sqlalchemy_utils import UUIDType
 
 from walkoff import executiondb
 from walkoff.appgateway import get_condition
-from walkoff.appgateway.validator import validate_condition_parameters
+from walkoff.appgateway.validator import validate_condition_parameters, get_condition_parameters_validator
 from walkoff.events import WalkoffEvent
 from walkoff.executiondb.argument import Argument
 from walkoff.executiondb.executionelement import ExecutionElement
@@ -99,7 +99,8 @@ class Condition(ExecutionElement, executiondb.Device_Base):
             data = transform.execute(data, accumulator)
         try:
             arguments = self.__update_arguments_with_data(data)
-            args = validate_condition_parameters(self._api, arguments, self.action_name, accumulator=accumulator)
+            validator = get_condition_parameters_validator(self.app_name, self.action_name, self._api)
+            args = validator.validate(arguments, accumulator=accumulator)
             logger.debug('Arguments passed to condition {} are valid'.format(self.id))
             ret = self._condition_executable(**args)
             WalkoffEvent.CommonWorkflowSignal.send(self, event=WalkoffEvent.ConditionSuccess)
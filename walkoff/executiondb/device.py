@@ -1,5 +1,8 @@
 import logging
 import sys
+import threading
+import time
+from collections import namedtuple
 
 import pyaes
 from sqlalchemy import Column, Integer, ForeignKey, String, LargeBinary, Enum, DateTime, func
@@ -7,6 +10,7 @@ from sqlalchemy.ext.declarative import declared_attr
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 
+import walkoff.config.config
 from walkoff import executiondb
 from walkoff.appgateway.validator import convert_primitive_type
 from walkoff.config.config import secret_key as key
@@ -55,7 +59,7 @@ class App(Device_Base):
         Returns:
             Device: The Device with the given ID if found. None otherwise
         """
-        device = next((device for device in self.devices if device.id == device_id), None)
+        device = self.devices.filter(Device.id == device_id).first()
         if device is not None:
             return device
         else:
@@ -165,7 +169,7 @@ class Device(Device_Base):
             dict{str: str|int|bool|float}: All the plaintext fields associated with this device.
                 In the form of {field_name: value}
         """
-        return {field.name: field.value for field in self.plaintext_fields}
+        return device_config_cache.get_plaintext_fields(self)
 
     def get_encrypted_field(self, field_name):
         """Gets an encrypted field
@@ -179,11 +183,7 @@ class Device(Device_Base):
         Raises:
             UnknownDeviceField: If the device does not have an encrypted field with this name
         """
-        field = next((field for field in self.encrypted_fields if field.name == field_name), None)
-        if field is not None:
-            return field.value
-        else:
-            raise UnknownDeviceField
+        return device_config_cache.get_encrypted_field(self, field_name)
 
     def as_json(self, export=False):
         """Constructs a JSON representation of this object
@@ -242,6 +242,7 @@ class Device(Device_Base):
                     self.encrypted_fields.append(updated_field)
 
             self.plaintext_fields = updated_plaintext_fields
+            self.modified_at = func.current_timestamp()
         if 'type' in json_in:
             self.type = json_in['type']
 
@@ -417,6 +418,119 @@ class EncryptedDeviceField(Device_Base, DeviceFieldMixin):
         return EncryptedDeviceField(data['name'], type_, data['value'])
 
 
+_DeviceConfig = namedtuple('_DeviceConfig', ['expires_at', 'modified_at', 'plaintext_fields', 'encrypted_fields'])
+
+
+class DeviceConfigCache(object):
+    """An in-memory cache of the plaintext fields and decrypted encrypted fields of devices
+
+    The fields of a device are loaded and decrypted the first time they are accessed, and are reused until they are
+    older than the TTL, until the device's modified_at time changes, or until the device is invalidated. The decrypted
+    values are only ever held in memory by this cache; they are never written to the database, to disk, or to the
+    logs.
+
+    Args:
+        ttl (float, optional): The number of seconds the fields of a device are cached for. Defaults to
+            walkoff.config.config.device_config_cache_ttl
+    """
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl
+        self._entries = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_plaintext_fields(self, device):
+        """Gets the plaintext fields of a device
+
+        Args:
+            device (Device): The device
+
+        Returns:
+            dict{str: str|int|bool|float}: The plaintext fields of the device in the form of {field_name: value}
+        """
+        return dict(self.__get_config(device).plaintext_fields)
+
+    def get_encrypted_field(self, device, field_name):
+        """Gets the decrypted value of an encrypted field of a device
+
+        Args:
+            device (Device): The device
+            field_name (str): The name of the encrypted field
+
+        Returns:
+            The decrypted value of the field
+
+        Raises:
+            UnknownDeviceField: If the device does not have an encrypted field with this name
+        """
+        encrypted_fields = self.__get_config(device).encrypted_fields
+        if field_name not in encrypted_fields:
+            raise UnknownDeviceField
+        return encrypted_fields[field_name]
+
+    def invalidate(self, device_id=None):
+        """Removes the cached fields of a device
+
+        Args:
+            device_id (int, optional): The ID of the device. Defaults to None, which removes the fields of all devices
+        """
+        with self._lock:
+            self._generation += 1
+            if device_id is None:
+                self._entries = {}
+            else:
+                self._entries.pop(device_id, None)
+
+    def get_statistics(self):
+        """Gets the statistics of the cache
+
+        Returns:
+            (dict): The number of cached devices, and the number of lookups which used and which did not use the cache
+        """
+        with self._lock:
+            return {'size': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+    def __get_config(self, device):
+        if device.id is None:
+            return DeviceConfigCache.__load(device, None)
+        now = time.time()
+        modified_at = device.modified_at
+        with self._lock:
+            config = self._entries.get(device.id)
+            if config is not None and config.expires_at > now and config.modified_at == modified_at:
+                self.hits += 1
+                return config
+            self.misses += 1
+            generation = self._generation
+
+        config = DeviceConfigCache.__load(device, now + self.__get_ttl())
+        with self._lock:
+            if generation == self._generation:
+                self._entries = {device_id: entry for device_id, entry in self._entries.items()
+                                 if entry.expires_at > now}
+                self._entries[device.id] = config
+        return config
+
+    def __get_ttl(self):
+        return self.ttl if self.ttl is not None else walkoff.config.config.device_config_cache_ttl
+
+    @staticmethod
+    def __load(device, expires_at):
+        return _DeviceConfig(
+            expires_at,
+            device.modified_at,
+            {field.name: field.value for field in device.plaintext_fields},
+            {field.name: field.value for field in device.encrypted_fields})
+
+
+device_config_cache = DeviceConfigCache()
+"""The cache of device fields of this process
+"""
+
+
 def get_all_devices_for_app(app_name):
     """ Gets all the devices associated with an app
 
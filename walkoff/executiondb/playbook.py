@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String
+from sqlalchemy import Column, String, Integer
 from sqlalchemy.orm import relationship, backref
 from walkoff.executiondb import Device_Base
 from walkoff.executiondb.executionelement import ExecutionElement
@@ -8,8 +8,9 @@ class Playbook(ExecutionElement, Device_Base):
     __tablename__ = 'playbook'
     name = Column(String(255), nullable=False, unique=True)
     workflows = relationship('Workflow', backref=backref('playbook'), cascade='all, delete-orphan')
+    max_concurrent_executions = Column(Integer)
 
-    def __init__(self, name, workflows=None, id=None):
+    def __init__(self, name, workflows=None, id=None, max_concurrent_executions=None):
         """Creates a Playbook object.
 
         Args:
@@ -18,11 +19,15 @@ class Playbook(ExecutionElement, Device_Base):
                 Defaults to None.
             id (str|UUID, optional): Optional UUID to pass into the Playbook. Must be UUID object or valid UUID string.
                 Defaults to None.
+            max_concurrent_executions (int, optional): The maximum number of executions of the Workflows of this
+                Playbook which may execute at the same time. Further executions wait in the queue. Defaults to None,
+                for no limit.
         """
         ExecutionElement.__init__(self, id)
         self.name = name
         if workflows:
             self.workflows = workflows
+        self.max_concurrent_executions = max_concurrent_executions
 
         self.validate()
 
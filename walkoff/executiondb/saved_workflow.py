@@ -1,7 +1,7 @@
 import logging
 
-from sqlalchemy import Column, PickleType
-from sqlalchemy_utils import UUIDType
+from sqlalchemy import Column, Integer, LargeBinary
+from sqlalchemy_utils import UUIDType, JSONType
 
 from walkoff.executiondb import Device_Base
 
@@ -13,22 +13,38 @@ class SavedWorkflow(Device_Base):
     workflow_execution_id = Column(UUIDType(binary=False), primary_key=True)
     workflow_id = Column(UUIDType(binary=False), nullable=False)
     action_id = Column(UUIDType(binary=False), nullable=False)
-    accumulator = Column(PickleType(), nullable=False)
-    app_instances = Column(PickleType(), nullable=False)
+    app_devices = Column(JSONType, nullable=False)
 
-    def __init__(self, workflow_execution_id, workflow_id, action_id, accumulator, app_instances):
+    def __init__(self, workflow_execution_id, workflow_id, action_id, app_devices):
         """Initializes a SavedWorkflow object. This is used when a workflow pauses execution, and must be reloaded
-            at a later point.
+            at a later point. The accumulator of the workflow is saved separately as SavedAccumulatorEntries.
 
         Args:
             workflow_execution_id (str): The workflow execution UID that this saved state refers to.
             workflow_id (str): The ID of the workflow that this saved state refers to.
             action_id (str): The currently executing action ID.
-            accumulator (dict): The accumulator up to this point in the workflow.
-            app_instances (str): The pickled app instances for the saved workflow
+            app_devices (list[list]): The app name and device ID of each app instance used by the workflow, from
+                which the app instances are re-created when the workflow is resumed
         """
         self.workflow_execution_id = workflow_execution_id
         self.workflow_id = workflow_id
         self.action_id = action_id
-        self.accumulator = accumulator
-        self.app_instances = app_instances
+        self.app_devices = app_devices
+
+
+class SavedAccumulatorEntries(Device_Base):
+    __tablename__ = 'saved_accumulator_entries'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    workflow_execution_id = Column(UUIDType(binary=False), nullable=False, index=True)
+    data = Column(LargeBinary(), nullable=False)
+
+    def __init__(self, workflow_execution_id, data):
+        """Initializes a SavedAccumulatorEntries object. This holds the entries of a workflow's accumulator which were
+            added or changed since the workflow was last saved.
+
+        Args:
+            workflow_execution_id (str): The workflow execution UID that these entries refer to.
+            data (bytes): The compressed entries
+        """
+        self.workflow_execution_id = workflow_execution_id
+        self.data = data
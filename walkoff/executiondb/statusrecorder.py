@@ -0,0 +1,278 @@
+import logging
+import threading
+from datetime import datetime
+
+import walkoff.config.config
+from walkoff import executiondb
+from walkoff.executiondb import WorkflowStatusEnum, ActionStatusEnum
+from walkoff.executiondb.checkpoint import delete_checkpoints
+from walkoff.executiondb.workflowresults import WorkflowStatus, ActionStatus
+
+logger = logging.getLogger(__name__)
+
+
+class WorkflowStatusRecorder(object):
+    """Records the status transitions of workflows and their actions, and writes them to the execution database in
+    batches.
+
+    Transitions are accumulated in memory, with all the transitions of one execution ID coalesced into a single row,
+    and are written with bulk inserts and updates either every flush_interval seconds by a background thread or as
+    soon as max_pending executions have pending transitions. Anything which reads statuses from the database should
+    call flush() first, or get_pending_workflow_status() if it only needs the status of one workflow.
+
+    Args:
+        flush_interval (float, optional): The number of seconds between flushes. Defaults to
+            walkoff.config.config.workflow_status_flush_interval
+        max_pending (int, optional): The number of executions with pending transitions which triggers a flush.
+            Defaults to walkoff.config.config.workflow_status_flush_size
+    """
+
+    def __init__(self, flush_interval=None, max_pending=None):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flush_requested = threading.Event()
+        self._thread = None
+        self._exit = False
+        self._reset_pending()
+        self._flushing_workflows = {}
+        self._current_actions = {}
+        self._awaiting_data_actions = set()
+
+    def _reset_pending(self):
+        self._workflows = {}
+        self._new_workflows = set()
+        self._actions = {}
+        self._new_actions = set()
+        self._finished_workflows = set()
+        self._unresolved_aborts = set()
+
+    def start(self):
+        """Starts the background thread which periodically flushes pending transitions
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._exit = False
+            self._thread = threading.Thread(target=self._flush_periodically)
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self):
+        """Stops the background thread and flushes any remaining transitions
+        """
+        self._exit = True
+        self._flush_requested.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        self.flush()
+
+    def _flush_periodically(self):
+        while not self._exit:
+            flush_interval = (self.flush_interval if self.flush_interval is not None
+                              else walkoff.config.config.workflow_status_flush_interval)
+            self._flush_requested.wait(flush_interval)
+            self._flush_requested.clear()
+            self.flush()
+            executiondb.execution_db.session.remove()
+
+    def workflow_pending(self, execution_id, workflow_id, name):
+        execution_id = str(execution_id)
+        with self._lock:
+            if execution_id not in self._workflows or execution_id in self._new_workflows:
+                self._new_workflows.add(execution_id)
+            workflow = self.__get_workflow(execution_id)
+            if execution_id in self._new_workflows:
+                workflow.update({'workflow_id': workflow_id, 'name': name})
+            workflow['status'] = WorkflowStatusEnum.pending
+        self.__request_flush_if_full()
+
+    def workflow_started(self, execution_id):
+        with self._lock:
+            self.__get_workflow(execution_id).update(
+                {'status': WorkflowStatusEnum.running, 'started_at': datetime.utcnow()})
+        self.__request_flush_if_full()
+
+    def workflow_paused(self, execution_id):
+        with self._lock:
+            self.__get_workflow(execution_id)['status'] = WorkflowStatusEnum.paused
+        self.__request_flush_if_full()
+
+    def workflow_awaiting_data(self, execution_id):
+        execution_id = str(execution_id)
+        with self._lock:
+            self.__get_workflow(execution_id)['status'] = WorkflowStatusEnum.awaiting_data
+            action_execution_id = self._current_actions.get(execution_id)
+            if action_execution_id is not None:
+                self.__get_action(action_execution_id)['status'] = ActionStatusEnum.awaiting_data
+                self._awaiting_data_actions.add(action_execution_id)
+        self.__request_flush_if_full()
+
+    def workflow_completed(self, execution_id):
+        with self._lock:
+            self.__get_workflow(execution_id).update(
+                {'status': WorkflowStatusEnum.completed, 'completed_at': datetime.utcnow()})
+            self.__finish_workflow(execution_id)
+        self.__request_flush_if_full()
+
+    def workflow_aborted(self, execution_id):
+        execution_id = str(execution_id)
+        with self._lock:
+            self.__get_workflow(execution_id).update(
+                {'status': WorkflowStatusEnum.aborted, 'completed_at': datetime.utcnow()})
+            action_execution_id = self._current_actions.get(execution_id)
+            if action_execution_id is None:
+                self._unresolved_aborts.add(execution_id)
+            elif action_execution_id in self._awaiting_data_actions:
+                self.__get_action(action_execution_id)['status'] = ActionStatusEnum.aborted
+            self.__finish_workflow(execution_id)
+        self.__request_flush_if_full()
+
+    def action_started(self, workflow_execution_id, execution_id, action_id, name, app_name, action_name,
+                       arguments=None):
+        execution_id = str(execution_id)
+        with self._lock:
+            if execution_id not in self._actions:
+                self._new_actions.add(execution_id)
+            action = self.__get_action(execution_id)
+            if execution_id in self._new_actions:
+                action.update({'action_id': action_id, 'name': name, 'app_name': app_name,
+                               'action_name': action_name, 'arguments': arguments, 'started_at': datetime.utcnow(),
+                               '_workflow_status_id': str(workflow_execution_id)})
+            action['status'] = ActionStatusEnum.executing
+            self.__set_current_action(workflow_execution_id, execution_id)
+        self.__request_flush_if_full()
+
+    def action_succeeded(self, execution_id, result):
+        self.__complete_action(execution_id, ActionStatusEnum.success, result)
+
+    def action_failed(self, execution_id, result):
+        self.__complete_action(execution_id, ActionStatusEnum.failure, result)
+
+    def __complete_action(self, execution_id, status, result):
+        with self._lock:
+            self.__get_action(execution_id).update(
+                {'status': status, 'result': result, 'completed_at': datetime.utcnow()})
+            self._awaiting_data_actions.discard(str(execution_id))
+        self.__request_flush_if_full()
+
+    def get_pending_workflow_status(self, execution_id):
+        """Gets the most recent status of a workflow which has not yet been written to the database, including one
+        which is being written by a flush which has not yet committed
+
+        Args:
+            execution_id (str|UUID): The execution ID of the workflow
+
+        Returns:
+            (WorkflowStatusEnum): The status, or None if there are no pending changes to the workflow's status
+        """
+        execution_id = str(execution_id)
+        with self._lock:
+            status = self._workflows.get(execution_id, {}).get('status')
+            if status is None:
+                status = self._flushing_workflows.get(execution_id, {}).get('status')
+            return status
+
+    def flush(self):
+        """Writes all pending transitions to the database. If the write fails, the transitions are kept pending and
+        are retried by the next flush.
+        """
+        with self._flush_lock:
+            with self._lock:
+                workflows, new_workflows = self._workflows, self._new_workflows
+                actions, new_actions = self._actions, self._new_actions
+                finished_workflows, unresolved_aborts = self._finished_workflows, self._unresolved_aborts
+                self._reset_pending()
+                self._flushing_workflows = workflows
+
+            if not (workflows or actions or finished_workflows):
+                return
+
+            session = executiondb.execution_db.session
+            try:
+                self.__write(session, WorkflowStatus, workflows, new_workflows)
+                self.__write(session, ActionStatus, actions, new_actions)
+                for execution_id in unresolved_aborts:
+                    self.__abort_awaiting_action(session, execution_id)
+                if finished_workflows:
+                    delete_checkpoints(session, finished_workflows)
+                session.commit()
+            except Exception:
+                session.rollback()
+                logger.exception('Could not write {0} workflow statuses and {1} action statuses. Retrying on the next '
+                                 'flush'.format(len(workflows), len(actions)))
+                with self._lock:
+                    self.__restore_pending(self._workflows, workflows)
+                    self.__restore_pending(self._actions, actions)
+                    self._new_workflows |= new_workflows
+                    self._new_actions |= new_actions
+                    self._finished_workflows |= finished_workflows
+                    self._unresolved_aborts |= unresolved_aborts
+            finally:
+                with self._lock:
+                    self._flushing_workflows = {}
+
+    @staticmethod
+    def __restore_pending(pending, failed):
+        for execution_id, mapping in failed.items():
+            restored = dict(mapping)
+            restored.update(pending.get(execution_id, {}))
+            pending[execution_id] = restored
+
+    @staticmethod
+    def __write(session, model, pending, new_ids):
+        if not pending:
+            return
+        existing_ids = set()
+        if new_ids:
+            existing_ids = {str(execution_id) for execution_id, in session.query(model.execution_id).filter(
+                model.execution_id.in_(new_ids))}
+        inserts = [mapping for execution_id, mapping in pending.items()
+                   if execution_id in new_ids and execution_id not in existing_ids]
+        updates = [mapping for execution_id, mapping in pending.items()
+                   if execution_id not in new_ids or execution_id in existing_ids]
+        if inserts:
+            session.bulk_insert_mappings(model, inserts)
+        if updates:
+            session.bulk_update_mappings(model, updates)
+
+    @staticmethod
+    def __abort_awaiting_action(session, workflow_execution_id):
+        action_status = session.query(ActionStatus).filter_by(_workflow_status_id=workflow_execution_id).order_by(
+            ActionStatus.started_at.desc()).first()
+        if action_status is not None:
+            action_status.aborted()
+
+    def __get_workflow(self, execution_id):
+        execution_id = str(execution_id)
+        return self._workflows.setdefault(execution_id, {'execution_id': execution_id})
+
+    def __get_action(self, execution_id):
+        execution_id = str(execution_id)
+        return self._actions.setdefault(execution_id, {'execution_id': execution_id})
+
+    def __set_current_action(self, workflow_execution_id, execution_id):
+        previous = self._current_actions.get(str(workflow_execution_id))
+        if previous is not None:
+            self._awaiting_data_actions.discard(previous)
+        self._current_actions[str(workflow_execution_id)] = str(execution_id)
+
+    def __finish_workflow(self, execution_id):
+        execution_id = str(execution_id)
+        self._finished_workflows.add(execution_id)
+        action_execution_id = self._current_actions.pop(execution_id, None)
+        self._awaiting_data_actions.discard(action_execution_id)
+
+    def __request_flush_if_full(self):
+        max_pending = (self.max_pending if self.max_pending is not None
+                       else walkoff.config.config.workflow_status_flush_size)
+        if len(self._workflows) + len(self._actions) >= max_pending:
+            if self._thread is not None and self._thread.is_alive():
+                self._flush_requested.set()
+            else:
+                self.flush()
+
+
+workflow_status_recorder = WorkflowStatusRecorder()
+"""The recorder used by the server to track workflow and action statuses
+"""
@@ -6,7 +6,7 @@ from sqlalchemy.orm import relationship
 from sqlalchemy_utils import UUIDType
 
 from walkoff.appgateway import get_transform
-from walkoff.appgateway.validator import validate_transform_parameters
+from walkoff.appgateway.validator import validate_transform_parameters, get_transform_parameters_validator
 from walkoff.events import WalkoffEvent
 from walkoff.executiondb import Device_Base
 from walkoff.executiondb.argument import Argument
@@ -87,7 +87,8 @@ class Transform(ExecutionElement, Device_Base):
         original_data_in = deepcopy(data_in)
         try:
             arguments = self.__update_arguments_with_data(data_in)
-            args = validate_transform_parameters(self._api, arguments, self.action_name, accumulator=accumulator)
+            validator = get_transform_parameters_validator(self.app_name, self.action_name, self._api)
+            args = validator.validate(arguments, accumulator=accumulator)
             result = self._transform_executable(**args)
             WalkoffEvent.CommonWorkflowSignal.send(self, event=WalkoffEvent.TransformSuccess)
             return result
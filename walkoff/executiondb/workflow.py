@@ -1,20 +1,59 @@
 import json
 import logging
+import threading
+from collections import deque
 from uuid import UUID
 
-from sqlalchemy import Column, String, ForeignKey, orm, UniqueConstraint
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from sqlalchemy import Column, String, ForeignKey, orm, UniqueConstraint, Boolean, Integer
 from sqlalchemy.orm import relationship
 from sqlalchemy_utils import UUIDType
 
+import walkoff.config.config
 from walkoff.appgateway.appinstancerepo import AppInstanceRepo
 from walkoff.events import WalkoffEvent
 from walkoff.executiondb import Device_Base
 from walkoff.executiondb.action import Action
+from walkoff.executiondb.checkpoint import Accumulator
 from walkoff.executiondb.executionelement import ExecutionElement
 from walkoff.helpers import InvalidExecutionElement
 
+try:
+    import contextvars
+except ImportError:
+    contextvars = None
+
 logger = logging.getLogger(__name__)
 
+if contextvars is not None:
+    _executing = contextvars.ContextVar('executing_workflow', default=None)
+else:
+    _executing = threading.local()
+
+
+def get_executing_workflow():
+    """Gets the Workflow which is executing an Action in the current thread, or in the current asyncio task
+
+    Returns:
+        (Workflow): The Workflow, or None if no Workflow has been set as executing
+    """
+    if contextvars is not None:
+        return _executing.get()
+    return getattr(_executing, 'workflow', None)
+
+
+def set_executing_workflow(workflow):
+    """Sets the Workflow which is executing an Action in the current thread. When called from an asyncio task on
+    Python 3.7 or later, it only applies to that task.
+
+    Args:
+        workflow (Workflow): The Workflow, or None if no Workflow is executing
+    """
+    if contextvars is not None:
+        _executing.set(workflow)
+    else:
+        _executing.workflow = workflow
+
 
 class Workflow(ExecutionElement, Device_Base):
     __tablename__ = 'workflow'
@@ -23,9 +62,12 @@ class Workflow(ExecutionElement, Device_Base):
     actions = relationship('Action', cascade='all, delete-orphan')
     branches = relationship('Branch', cascade='all, delete-orphan')
     start = Column(UUIDType(binary=False))
+    parallel = Column(Boolean, nullable=False, default=False)
+    max_concurrent_executions = Column(Integer)
     __table_args__ = (UniqueConstraint('playbook_id', 'name', name='_playbook_workflow'),)
 
-    def __init__(self, name, start, id=None, actions=None, branches=None):
+    def __init__(self, name, start, id=None, actions=None, branches=None, parallel=False,
+                 max_concurrent_executions=None):
         """Initializes a Workflow object. A Workflow falls under a Playbook, and has many associated Actions
             within it that get executed.
         Args:
@@ -35,6 +77,10 @@ class Workflow(ExecutionElement, Device_Base):
                 Defaults to None.
             actions (list[Action]): Optional Action objects. Defaults to None.
             branches (list[Branch], optional): A list of Branch objects for the Workflow object. Defaults to None.
+            parallel (bool, optional): Should every Branch whose condition is met be followed concurrently? If False,
+                only the highest priority Branch of each Action is followed. Defaults to False.
+            max_concurrent_executions (int, optional): The maximum number of executions of the Workflow which may
+                execute at the same time. Further executions wait in the queue. Defaults to None, for no limit.
         """
         ExecutionElement.__init__(self, id)
         self.name = name
@@ -42,23 +88,38 @@ class Workflow(ExecutionElement, Device_Base):
         self.branches = branches if branches else []
 
         self.start = start
+        self.parallel = parallel
+        self.max_concurrent_executions = max_concurrent_executions
 
         self._is_paused = False
         self._abort = False
-        self._accumulator = {}
+        self._accumulator = Accumulator()
         self._execution_id = 'default'
         self._instance_repo = None
+        self._actions_by_id = None
+        self._branches_by_source_id = None
 
         self.validate()
 
     @orm.reconstructor
     def init_on_load(self):
         """Loads all necessary fields upon Workflow being loaded from database"""
+        self.__reset_execution_state()
+
+    def reset(self):
+        """Resets the execution state of the Workflow and its Actions so that it can be executed again"""
+        self.__reset_execution_state()
+        for action in self.actions:
+            action.reset()
+
+    def __reset_execution_state(self):
         self._is_paused = False
         self._abort = False
-        self._accumulator = {}
+        self._accumulator = Accumulator()
         self._instance_repo = AppInstanceRepo()
         self._execution_id = 'default'
+        self._actions_by_id = None
+        self._branches_by_source_id = None
 
     def validate(self):
         action_ids = [action.id for action in self.actions]
@@ -75,11 +136,43 @@ class Workflow(ExecutionElement, Device_Base):
             if branch.destination_id not in action_ids:
                 branch_errors.append(
                     'Branch destination ID {} not found in workflow actions'.format(branch.destination_id))
+        if self.parallel:
+            if self.__has_cycle():
+                branch_errors.append('Branches of a parallel workflow cannot form a cycle')
+            action_errors = ['Action {} has a trigger but is not the start of the parallel workflow'.format(action.id)
+                             for action in self.actions if action.trigger is not None and action.id != self.start]
+            if action_errors:
+                errors['actions'] = action_errors
         if branch_errors:
             errors['branches'] = branch_errors
         if errors:
             raise InvalidExecutionElement(self.id, self.name, 'Invalid workflow', errors=errors)
 
+    def __has_cycle(self):
+        destinations = {}
+        for branch in self.branches:
+            destinations.setdefault(branch.source_id, []).append(branch.destination_id)
+        visited = set()
+        for root in destinations:
+            if root in visited:
+                continue
+            path = {root}
+            stack = [(root, iter(destinations.get(root, [])))]
+            visited.add(root)
+            while stack:
+                node, children = stack[-1]
+                child = next(children, None)
+                if child is None:
+                    stack.pop()
+                    path.discard(node)
+                elif child in path:
+                    return True
+                elif child not in visited:
+                    visited.add(child)
+                    path.add(child)
+                    stack.append((child, iter(destinations.get(child, []))))
+        return False
+
     def get_action_by_id(self, action_id):
         return next((action for action in self.actions if action.id == action_id), None)
 
@@ -94,6 +187,8 @@ class Workflow(ExecutionElement, Device_Base):
         self.actions.remove(action_to_remove)
         self.branches[:] = [branch for branch in self.branches if
                             (branch.source_id != action_id and branch.destination_id != action_id)]
+        self._actions_by_id = None
+        self._branches_by_source_id = None
 
         logger.debug('Removed action {0} from workflow {1}'.format(action_id, self.name))
         return True
@@ -118,16 +213,39 @@ class Workflow(ExecutionElement, Device_Base):
             start_arguments (list[Argument]): Argument parameters into the first Action. Defaults to None.
             resume (bool, optional): Optional boolean to resume a previously paused workflow. Defaults to False.
         """
+        steps = self.execute_steps(execution_id, start=start, start_arguments=start_arguments, resume=resume)
+        result = None
+        while True:
+            try:
+                action, kwargs = steps.send(result)
+            except StopIteration:
+                return
+            result = action.execute(**kwargs)
+
+    def execute_steps(self, execution_id, start=None, start_arguments=None, resume=False):
+        """Executes a Workflow like execute(), but yields each Action to be executed instead of executing it. This
+            allows Actions to be executed by the caller, for example on an event loop. The Actions of a parallel
+            Workflow are executed by the Workflow itself, so nothing is yielded for them.
+        Args:
+            execution_id (str): The UUID4 hex string uniquely identifying this workflow instance
+            start (int, optional): The ID of the first Action. Defaults to None.
+            start_arguments (list[Argument]): Argument parameters into the first Action. Defaults to None.
+            resume (bool, optional): Optional boolean to resume a previously paused workflow. Defaults to False.
+        Yields:
+            A tuple of the Action to execute and the keyword arguments of Action.execute(). The result of executing
+            the Action must be sent back into the generator.
+        """
         self._execution_id = execution_id
         logger.info('Executing workflow {0}'.format(self.name))
         WalkoffEvent.CommonWorkflowSignal.send(self, event=WalkoffEvent.WorkflowExecutionStart)
         start = start if start is not None else self.start
         if not isinstance(start, UUID):
             start = UUID(start)
-        executor = self.__execute(start, start_arguments, resume)
-        next(executor)
+        self.__build_indexes()
+        if self.parallel:
+            self.__execute_parallel(start, start_arguments, resume)
+            return
 
-    def __execute(self, start, start_arguments=None, resume=False):
         actions = self.__actions(start=start)
         first = True
         for action in (action_ for action_ in actions if action_ is not None):
@@ -137,35 +255,164 @@ class Workflow(ExecutionElement, Device_Base):
             if self._is_paused:
                 self._is_paused = False
                 WalkoffEvent.CommonWorkflowSignal.send(self, event=WalkoffEvent.WorkflowPaused)
-                yield
+                return
             if self._abort:
                 self._abort = False
                 WalkoffEvent.CommonWorkflowSignal.send(self, event=WalkoffEvent.WorkflowAborted)
-                yield
+                return
 
             device_id = self._instance_repo.setup_app_instance(action)
 
+            kwargs = {'instance': self._instance_repo.get_app_instance(device_id)(),
+                      'accumulator': self._accumulator,
+                      'resume': resume}
             if first:
                 first = False
-                result = action.execute(instance=self._instance_repo.get_app_instance(device_id)(),
-                                        accumulator=self._accumulator, arguments=start_arguments, resume=resume)
-            else:
-                result = action.execute(instance=self._instance_repo.get_app_instance(device_id)(),
-                                        accumulator=self._accumulator, resume=resume)
+                kwargs['arguments'] = start_arguments
+            result = yield action, kwargs
             if result and result.status == "trigger":
-                yield
+                return
             self._accumulator[action.id] = action.get_output().result
         self.__shutdown()
-        yield
+
+    def __execute_parallel(self, start, start_arguments=None, resume=False):
+        """Executes the Workflow, following every Branch whose condition is met. Actions which become ready at the
+            same time are executed concurrently on a thread pool. An Action with several incoming Branches is executed
+            once all of its predecessors have finished and at least one of their Branches to it was taken.
+
+            The accumulator is only written to by the thread calling this method, and an Action is only submitted once
+            the results of all of its predecessors are in the accumulator. Pausing, aborting, and triggers only take
+            effect when a single Action is ready and none are executing.
+        """
+        start_action = self._actions_by_id.get(start)
+        if start_action is None:
+            self.__shutdown()
+            return
+
+        reachable = self.__get_reachable_action_ids(start)
+        remaining_predecessors = {action_id: 0 for action_id in reachable}
+        for action_id in reachable:
+            for branch in self._branches_by_source_id.get(action_id, []):
+                remaining_predecessors[branch.destination_id] += 1
+        taken = {start}
+        ready = deque([start_action])
+        running = {}
+        instance_locks = {}
+        first = True
+        pool = None
+
+        try:
+            while ready or running:
+                if not running and len(ready) == 1:
+                    action = ready.popleft()
+                    self._executing_action = action
+                    logger.debug('Executing action {0} of workflow {1}'.format(action, self.name))
+                    if self._is_paused:
+                        self._is_paused = False
+                        WalkoffEvent.CommonWorkflowSignal.send(self, event=WalkoffEvent.WorkflowPaused)
+                        return
+                    if self._abort:
+                        self._abort = False
+                        WalkoffEvent.CommonWorkflowSignal.send(self, event=WalkoffEvent.WorkflowAborted)
+                        return
+
+                    device_id = self._instance_repo.setup_app_instance(action)
+                    instance = self._instance_repo.get_app_instance(device_id)()
+                    if first:
+                        first = False
+                        result = action.execute(instance=instance, accumulator=self._accumulator,
+                                                arguments=start_arguments, resume=resume)
+                    else:
+                        result = action.execute(instance=instance, accumulator=self._accumulator, resume=resume)
+                    if result and result.status == "trigger":
+                        return
+                    self.__complete_parallel_action(action, ready, remaining_predecessors, taken)
+                    continue
+
+                if self._abort:
+                    for future in wait(running).done:
+                        action = running.pop(future)
+                        self._accumulator[action.id] = action.get_output().result
+                    self._abort = False
+                    WalkoffEvent.CommonWorkflowSignal.send(self, event=WalkoffEvent.WorkflowAborted)
+                    return
+
+                if pool is None:
+                    pool = ThreadPoolExecutor(max_workers=walkoff.config.config.max_parallel_actions)
+                while ready:
+                    action = ready.popleft()
+                    logger.debug('Executing action {0} of workflow {1} in parallel'.format(action, self.name))
+                    device_id = self._instance_repo.setup_app_instance(action)
+                    instance = self._instance_repo.get_app_instance(device_id)()
+                    instance_lock = instance_locks.setdefault(device_id, threading.Lock())
+                    future = pool.submit(self.__execute_action_in_thread, action, instance, instance_lock, resume)
+                    running[future] = action
+
+                for future in wait(running, return_when=FIRST_COMPLETED).done:
+                    action = running.pop(future)
+                    future.result()
+                    self.__complete_parallel_action(action, ready, remaining_predecessors, taken)
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True)
+
+        self.__shutdown()
+
+    def __execute_action_in_thread(self, action, instance, instance_lock, resume):
+        set_executing_workflow(self)
+        try:
+            with instance_lock:
+                return action.execute(instance=instance, accumulator=self._accumulator, resume=resume)
+        finally:
+            set_executing_workflow(None)
+
+    def __complete_parallel_action(self, action, ready, remaining_predecessors, taken):
+        self._accumulator[action.id] = action.get_output().result
+        resolved = []
+        for branch in self._branches_by_source_id.get(action.id, []):
+            if branch.execute(action.get_output(), self._accumulator) is not None:
+                taken.add(branch.destination_id)
+            resolved.append(branch.destination_id)
+
+        while resolved:
+            action_id = resolved.pop()
+            remaining_predecessors[action_id] -= 1
+            if remaining_predecessors[action_id] == 0:
+                if action_id in taken:
+                    ready.append(self._actions_by_id[action_id])
+                else:
+                    resolved.extend(branch.destination_id for branch in self._branches_by_source_id.get(action_id, []))
+
+    def __get_reachable_action_ids(self, start):
+        reachable = {start}
+        to_visit = [start]
+        while to_visit:
+            for branch in self._branches_by_source_id.get(to_visit.pop(), []):
+                if branch.destination_id not in reachable:
+                    reachable.add(branch.destination_id)
+                    to_visit.append(branch.destination_id)
+        return reachable
+
+    def __build_indexes(self):
+        """Builds the lookup tables used to find Actions by ID and Branches by source ID during execution. The
+            Branches for each source Action are sorted by priority.
+        """
+        self._actions_by_id = {action.id: action for action in self.actions}
+        branches_by_source_id = {}
+        for branch in self.branches:
+            branches_by_source_id.setdefault(branch.source_id, []).append(branch)
+        for branches in branches_by_source_id.values():
+            branches.sort(key=lambda branch_: branch_.priority)
+        self._branches_by_source_id = branches_by_source_id
 
     def __actions(self, start):
         current_id = start
-        current_action = self.get_action_by_id(current_id)
+        current_action = self._actions_by_id.get(current_id)
 
         while current_action:
             yield current_action
             current_id = self.get_branch(current_action, self._accumulator)
-            current_action = self.get_action_by_id(current_id) if current_id is not None else None
+            current_action = self._actions_by_id.get(current_id) if current_id is not None else None
             yield  # needed so that when for-loop calls next() it doesn't advance too far
         yield  # needed so you can avoid catching StopIteration exception
 
@@ -179,9 +426,7 @@ class Workflow(ExecutionElement, Device_Base):
             The ID of the next Action to be executed if successful, else None.
         """
         if self.branches:
-            branches = sorted(
-                self.__get_branches_by_action_id(current_action.id), key=lambda branch_: branch_.priority)
-            for branch in branches:
+            for branch in self.__get_branches_by_action_id(current_action.id):
                 # TODO: This here is the only hold up from getting rid of action._output.
                 # Keep whole result in accumulator
                 destination_id = branch.execute(current_action.get_output(), accumulator)
@@ -191,12 +436,9 @@ class Workflow(ExecutionElement, Device_Base):
             return None
 
     def __get_branches_by_action_id(self, id_):
-        branches = []
-        if self.branches:
-            for branch in self.branches:
-                if branch.source_id == id_:
-                    branches.append(branch)
-        return branches
+        if self._branches_by_source_id is None:
+            self.__build_indexes()
+        return self._branches_by_source_id.get(id_, [])
 
     def __shutdown(self):
         # Upon finishing shut down instances
@@ -250,3 +492,10 @@ class Workflow(ExecutionElement, Device_Base):
             All instances
         """
         return self._instance_repo.get_all_app_instances()
+
+    def get_app_devices(self):
+        """Gets the app name and device ID of each instance
+        Returns:
+            The app name and device ID of each instance
+        """
+        return self._instance_repo.get_app_devices()
@@ -1,7 +1,7 @@
 import json
 from datetime import datetime
 
-from sqlalchemy import Column, String, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, String, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship, backref
 from sqlalchemy_utils import UUIDType
 
@@ -20,6 +20,7 @@ class WorkflowStatus(Device_Base):
     started_at = Column(DateTime)
     completed_at = Column(DateTime)
     _action_statuses = relationship('ActionStatus', backref=backref('_workflow_status'), cascade='all, delete-orphan')
+    __table_args__ = (Index('ix_workflow_status_status_started_at', 'status', 'started_at'),)
 
     def __init__(self, execution_id, workflow_id, name):
         self.execution_id = execution_id
@@ -84,7 +85,7 @@ class ActionStatus(Device_Base):
     status = Column(Enum(ActionStatusEnum), nullable=False)
     started_at = Column(DateTime, default=datetime.utcnow)
     completed_at = Column(DateTime)
-    _workflow_status_id = Column(UUIDType(binary=False), ForeignKey('workflow_status.execution_id'))
+    _workflow_status_id = Column(UUIDType(binary=False), ForeignKey('workflow_status.execution_id'), index=True)
 
     def __init__(self, execution_id, action_id, name, app_name, action_name, arguments=None):
         self.execution_id = execution_id
@@ -3,8 +3,9 @@ import json
 import logging
 import os
 import pkgutil
+import re
 import sys
-from datetime import datetime
+from datetime import datetime, timedelta
 from uuid import uuid4
 
 import walkoff.config.config
@@ -260,6 +261,11 @@ def format_db_path(db_type, path):
     return '{0}://{1}'.format(db_type, path) if db_type != 'sqlite' else '{0}:///{1}'.format(db_type, path)
 
 
+# The parameters of APIs which have none. The same object is always used so that compiled parameter validators, which
+# are recompiled when their API is a different object, are reused for these APIs.
+no_parameters = ()
+
+
 def get_app_action_api(app, action):
     """
     Gets the api for a given app and action
@@ -279,7 +285,7 @@ def get_app_action_api(app, action):
         try:
             action_api = app_api['actions'][action]
             run = action_api['run']
-            return run, action_api.get('parameters', [])
+            return run, action_api.get('parameters', no_parameters)
         except KeyError:
             raise UnknownAppAction(app, action)
 
@@ -366,7 +372,7 @@ def get_condition_api(app, condition):
         try:
             condition_api = app_api['conditions'][condition]
             run = condition_api['run']
-            return condition_api['data_in'], run, condition_api.get('parameters', [])
+            return condition_api['data_in'], run, condition_api.get('parameters', no_parameters)
         except KeyError:
             raise UnknownCondition(app, condition)
 
@@ -380,7 +386,7 @@ def get_transform_api(app, transform):
         try:
             transform_api = app_api['transforms'][transform]
             run = transform_api['run']
-            return transform_api['data_in'], run, transform_api.get('parameters', [])
+            return transform_api['data_in'], run, transform_api.get('parameters', no_parameters)
         except KeyError:
             raise UnknownTransform(app, transform)
 
@@ -533,3 +539,34 @@ def utc_as_rfc_datetime(timestamp):
 
 def timestamp_to_datetime(time):
     return datetime.strptime(time, '%Y-%m-%dT%H:%M:%S.%fZ')
+
+
+rfc_datetime_pattern = re.compile(r'^(\d{4}-\d{2}-\d{2})[Tt](\d{2}:\d{2}:\d{2})(\.\d+)?([Zz]|[+-]\d{2}:\d{2})?$')
+
+
+def rfc_datetime_as_utc(timestamp):
+    """Converts an RFC 3339 date-time to a naive datetime in UTC
+
+    Args:
+        timestamp (str): The date-time, for example 2018-01-01T12:00:00.000Z or 2018-01-01T07:00:00-05:00. A date-time
+            without an offset is assumed to be in UTC. Can be None.
+
+    Returns:
+        (datetime): The date-time in UTC, or None if timestamp is None
+
+    Raises:
+        ValueError: If the timestamp is not an RFC 3339 date-time
+    """
+    if timestamp is None:
+        return None
+    match = rfc_datetime_pattern.match(timestamp)
+    if match is None:
+        raise ValueError('{} is not an RFC 3339 date-time'.format(timestamp))
+    date, time, fraction, offset = match.groups()
+    ret = datetime.strptime('{}T{}'.format(date, time), '%Y-%m-%dT%H:%M:%S')
+    if fraction:
+        ret += timedelta(microseconds=int(round(float(fraction) * 1000000)))
+    if offset and offset not in ('Z', 'z'):
+        utc_offset = timedelta(hours=int(offset[1:3]), minutes=int(offset[4:6]))
+        ret = ret - utc_offset if offset[0] == '+' else ret + utc_offset
+    return ret
@@ -0,0 +1,149 @@
+"""Execution of workflows on an asyncio event loop. This module requires Python 3.7 or later, and is only imported by
+workers when walkoff.config.config.worker_mode is 'asyncio'.
+"""
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from walkoff.executiondb.workflow import set_executing_workflow
+from walkoff.helpers import format_exception_message
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncioWorkflowExecutor(object):
+    """Executes workflows concurrently on an asyncio event loop running in its own thread
+
+    Actions defined with "async def" are awaited on the event loop, so workflows which are waiting on them do not
+    occupy a thread. All other actions, parallel workflows, and the loading of workflows run on a thread pool, as do
+    the steps of a workflow between its actions (setting up app instances, evaluating branches, and sending the events
+    which write checkpoints), so that nothing which may block runs on the event loop itself.
+
+    Args:
+        max_threads (int): The number of threads used to execute actions which are not coroutines
+    """
+
+    def __init__(self, max_threads):
+        self.threadpool = ThreadPoolExecutor(max_workers=max_threads)
+        self.loop = asyncio.new_event_loop()
+        self.loop.set_default_executor(self.threadpool)
+        self._thread = threading.Thread(target=self.__run_loop, name='AsyncioWorkflowExecutor')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def submit(self, checkout, checkin, start=None, start_arguments=None, resume=False):
+        """Submits a workflow to be executed on the event loop
+
+        Args:
+            checkout (func): Called on the thread pool with no arguments to get the Workflow ready to be executed. It
+                returns None if the workflow cannot be executed.
+            checkin (func): Called with the Workflow once it has finished executing
+            start (str, optional): The ID of the first Action. Defaults to None.
+            start_arguments (list[Argument], optional): The arguments to the first Action. Defaults to None.
+            resume (bool, optional): Is the workflow being resumed? Defaults to False.
+
+        Returns:
+            (Future): A concurrent.futures.Future which is done once the workflow has finished executing
+        """
+        return asyncio.run_coroutine_threadsafe(
+            self.__checkout_and_execute(checkout, checkin, start, start_arguments, resume), self.loop)
+
+    def shutdown(self, timeout=None):
+        """Stops the event loop and waits for the actions executing on the thread pool to finish
+
+        Args:
+            timeout (float, optional): The number of seconds to wait for the event loop to stop. Defaults to None,
+                which waits indefinitely.
+        """
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
+        self.threadpool.shutdown()
+
+    async def execute_workflow(self, workflow, start=None, start_arguments=None, resume=False):
+        """Executes a Workflow. This must be awaited on the event loop.
+
+        Args:
+            workflow (Workflow): The Workflow, with its execution ID set
+            start (str, optional): The ID of the first Action. Defaults to None.
+            start_arguments (list[Argument], optional): The arguments to the first Action. Defaults to None.
+            resume (bool, optional): Is the workflow being resumed? Defaults to False.
+        """
+        set_executing_workflow(workflow)
+        if workflow.parallel:
+            await self.loop.run_in_executor(None, partial(
+                self.__call_in_thread, workflow, workflow.execute, workflow.get_execution_id(), start=start,
+                start_arguments=start_arguments, resume=resume))
+            return
+
+        steps = workflow.execute_steps(workflow.get_execution_id(), start=start, start_arguments=start_arguments,
+                                       resume=resume)
+        result = None
+        while True:
+            step = await self.loop.run_in_executor(None, self.__call_in_thread, workflow, self.__next_step, steps,
+                                                   result)
+            if step is None:
+                return
+            action, kwargs = step
+            result = await self.execute_action(workflow, action, **kwargs)
+
+    async def execute_action(self, workflow, action, instance, accumulator, arguments=None, resume=False):
+        """Executes an Action of a Workflow, awaiting it on the event loop if it is a coroutine and otherwise executing
+        it on the thread pool. This must be awaited on the event loop.
+
+        Args:
+            workflow (Workflow): The Workflow which is executing the Action
+            action (Action): The Action
+            instance (App): The instance of the App used to execute the Action
+            accumulator (dict): The results of the previous Actions
+            arguments (list[Argument], optional): The arguments to use instead of the Action's own. Defaults to None.
+            resume (bool, optional): Is the workflow being resumed? Defaults to False.
+
+        Returns:
+            (ActionResult): The result of the Action
+        """
+        result, call = await self.loop.run_in_executor(None, partial(
+            self.__call_in_thread, workflow, action.start_execution, instance, accumulator, arguments=arguments,
+            resume=resume))
+        if call is None:
+            return result
+        try:
+            if action.is_coroutine():
+                result = await call()
+            else:
+                result = await self.loop.run_in_executor(None, self.__call_in_thread, workflow, call)
+        except Exception as e:
+            return await self.loop.run_in_executor(None, partial(
+                self.__call_in_thread, workflow, action.finish_execution, error=e))
+        return await self.loop.run_in_executor(None, self.__call_in_thread, workflow, action.finish_execution, result)
+
+    def __run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    async def __checkout_and_execute(self, checkout, checkin, start, start_arguments, resume):
+        workflow = await self.loop.run_in_executor(None, checkout)
+        if workflow is None:
+            return
+        try:
+            await self.execute_workflow(workflow, start=start, start_arguments=start_arguments, resume=resume)
+        except Exception as e:
+            logger.error('Error executing workflow {0}. Error: {1}'.format(workflow.name, format_exception_message(e)))
+        finally:
+            checkin(workflow)
+
+    @staticmethod
+    def __next_step(steps, result):
+        try:
+            return steps.send(result)
+        except StopIteration:
+            return None
+
+    @staticmethod
+    def __call_in_thread(workflow, func, *args, **kwargs):
+        set_executing_workflow(workflow)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            set_executing_workflow(None)
@@ -0,0 +1,233 @@
+import logging
+import threading
+import time
+
+import walkoff.config.config
+from walkoff.events import WalkoffEvent
+from walkoff.multiprocessedexecutor.worker import get_workflow_slots
+
+logger = logging.getLogger(__name__)
+
+
+def get_worker_identity(number):
+    """Gets the ZMQ identity of a worker
+
+    Args:
+        number (int): The number of the worker
+
+    Returns:
+        (bytes): The identity
+    """
+    return u'Worker-{}'.format(number).encode('ascii')
+
+
+def get_max_worker_processes():
+    """Gets the maximum number of worker processes
+
+    Returns:
+        (int): walkoff.config.config.max_processes if autoscaling is enabled, otherwise
+            walkoff.config.config.num_processes
+    """
+    if walkoff.config.config.worker_autoscaling == 'enabled':
+        return walkoff.config.config.max_processes
+    return walkoff.config.config.num_processes
+
+
+def get_initial_worker_processes():
+    """Gets the number of worker processes started with the server
+
+    Returns:
+        (int): walkoff.config.config.num_processes, limited to between walkoff.config.config.min_processes and
+            walkoff.config.config.max_processes if autoscaling is enabled
+    """
+    if walkoff.config.config.worker_autoscaling == 'enabled':
+        return min(max(walkoff.config.config.num_processes, walkoff.config.config.min_processes),
+                   walkoff.config.config.max_processes)
+    return walkoff.config.config.num_processes
+
+
+class WorkerAutoscaler(object):
+    """Starts and retires worker processes as the number of workflows waiting to execute changes
+
+    Every interval seconds, more workers are started if at least queue_depth workflows are waiting for a free slot or
+    the oldest of them has waited for at least queue_wait seconds, as long as no previously started worker is still
+    starting up. Enough workers are started to give every waiting workflow a slot, up to max_processes. Once there have
+    been no waiting workflows and at least a worker's worth of free slots for cooldown seconds, and nothing has been
+    scaled for cooldown seconds, the worker executing the fewest workflows is drained. The load balancer stops sending
+    it workflows, and it is retired once the workflows it is executing have finished. Workers are never drained below
+    min_processes, and workers whose processes have died are replaced. The workflows a dead worker was executing are
+    recorded as aborted.
+
+    Each decision is sent as a WorkersScaledUp or WorkersScaledDown event.
+
+    Args:
+        load_balancer (LoadBalancer): The load balancer which sends workflows to the workers
+        spawn (func): Called with the number of a new worker to start its process. Returns the process.
+        terminate (func): Called with the process of a retired worker to stop it
+        processes (list[Process], optional): The processes of the running workers, in order of their numbers. This
+            list is updated as workers are started and retired. Defaults to an empty list.
+        min_processes (int, optional): Defaults to walkoff.config.config.min_processes
+        max_processes (int, optional): Defaults to walkoff.config.config.max_processes
+        interval (float, optional): Defaults to walkoff.config.config.autoscale_interval
+        queue_depth (int, optional): Defaults to walkoff.config.config.autoscale_queue_depth
+        queue_wait (float, optional): Defaults to walkoff.config.config.autoscale_queue_wait
+        cooldown (float, optional): Defaults to walkoff.config.config.autoscale_cooldown
+    """
+
+    def __init__(self, load_balancer, spawn, terminate, processes=None, min_processes=None, max_processes=None,
+                 interval=None, queue_depth=None, queue_wait=None, cooldown=None):
+        self.id = 'controller'
+        self.load_balancer = load_balancer
+        self.spawn = spawn
+        self.terminate = terminate
+        self.processes = processes if processes is not None else []
+        self.min_processes = min_processes
+        self.max_processes = max_processes
+        self.interval = interval
+        self.queue_depth = queue_depth
+        self.queue_wait = queue_wait
+        self.cooldown = cooldown
+        self.scale_ups = 0
+        self.scale_downs = 0
+        self._identities = {get_worker_identity(number): process for number, process in enumerate(self.processes)}
+        self._next_number = len(self.processes)
+        self._last_scaled = None
+        self._underused_since = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._exit = False
+
+    def start(self):
+        """Starts the background thread which periodically scales the workers
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._exit = False
+            self._thread = threading.Thread(target=self._scale_periodically)
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self):
+        """Stops the background thread
+        """
+        self._exit = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def _scale_periodically(self):
+        while not self._exit:
+            self._wake.wait(self.__get('interval', 'autoscale_interval'))
+            self._wake.clear()
+            if self._exit:
+                break
+            try:
+                self.scale()
+            except Exception:
+                logger.exception('Could not scale worker processes')
+
+    def scale(self, now=None):
+        """Retires drained workers, then starts or drains workers if needed
+
+        Args:
+            now (float, optional): The current time. Defaults to time.time()
+
+        Returns:
+            (int): The number of workers started, or minus the number of workers drained
+        """
+        now = now if now is not None else time.time()
+        with self._lock:
+            self.__remove_dead_workers()
+            for identity in self.load_balancer.pop_drained_workers():
+                self.__retire(identity)
+
+            statistics = self.load_balancer.get_worker_statistics()
+            active = len(self._identities) - statistics['draining']
+            starting = len(self._identities) - statistics['workers']
+            min_processes = self.__get('min_processes', 'min_processes')
+            max_processes = self.__get('max_processes', 'max_processes')
+
+            reason = None
+            if active < min_processes:
+                reason, count = 'min_processes', min_processes - active
+            elif starting <= 0 and statistics['pending'] > 0 and active < max_processes:
+                if statistics['pending'] >= self.__get('queue_depth', 'autoscale_queue_depth'):
+                    reason = 'queue_depth'
+                elif statistics['oldest_pending_wait'] >= self.__get('queue_wait', 'autoscale_queue_wait'):
+                    reason = 'queue_wait'
+                count = min(-(-statistics['pending'] // get_workflow_slots()), max_processes - active)
+            if reason is not None:
+                for _ in range(count):
+                    self.__spawn()
+                self.__scaled(now, WalkoffEvent.WorkersScaledUp, count, active + count, reason, statistics)
+                return count
+
+            if (statistics['pending'] > 0 or active <= min_processes
+                    or statistics['free_slots'] < get_workflow_slots()):
+                self._underused_since = None
+                return 0
+            if self._underused_since is None:
+                self._underused_since = now
+            cooldown = self.__get('cooldown', 'autoscale_cooldown')
+            if now - self._underused_since < cooldown or (
+                    self._last_scaled is not None and now - self._last_scaled < cooldown):
+                return 0
+            if self.load_balancer.drain_worker() is None:
+                return 0
+            self.__scaled(now, WalkoffEvent.WorkersScaledDown, 1, active - 1, 'idle', statistics)
+            return -1
+
+    def get_statistics(self):
+        """Gets the statistics of the autoscaler
+
+        Returns:
+            (dict): The number of worker processes, including those starting up and draining, the number of draining
+                workers, and the numbers of times workers were started and drained
+        """
+        draining = self.load_balancer.get_worker_statistics()['draining']
+        with self._lock:
+            return {'workers': len(self._identities), 'draining': draining, 'scale_ups': self.scale_ups,
+                    'scale_downs': self.scale_downs}
+
+    def __spawn(self):
+        number = self._next_number
+        self._next_number += 1
+        process = self.spawn(number)
+        self._identities[get_worker_identity(number)] = process
+        self.processes.append(process)
+        logger.info('Started worker {}'.format(number))
+
+    def __retire(self, identity):
+        process = self._identities.pop(identity, None)
+        if process is None:
+            return
+        logger.info('Retiring drained worker {}'.format(identity.decode('ascii')))
+        self.terminate(process)
+        if process in self.processes:
+            self.processes.remove(process)
+
+    def __remove_dead_workers(self):
+        for identity, process in list(self._identities.items()):
+            if not process.is_alive():
+                logger.error('Worker {} exited unexpectedly'.format(identity.decode('ascii')))
+                self.load_balancer.remove_worker(identity)
+                del self._identities[identity]
+                if process in self.processes:
+                    self.processes.remove(process)
+
+    def __scaled(self, now, event, count, workers, reason, statistics):
+        if event == WalkoffEvent.WorkersScaledUp:
+            self.scale_ups += 1
+        else:
+            self.scale_downs += 1
+        self._last_scaled = now
+        self._underused_since = None
+        data = {'count': count, 'workers': workers, 'reason': reason, 'pending': statistics['pending'],
+                'oldest_pending_wait': statistics['oldest_pending_wait']}
+        logger.info('{0}: {1}'.format(event.signal_name, data))
+        event.send(self, data=data)
+
+    def __get(self, attribute, config_name):
+        value = getattr(self, attribute)
+        return value if value is not None else getattr(walkoff.config.config, config_name)
@@ -0,0 +1,128 @@
+import logging
+import threading
+
+try:
+    from Queue import Queue, Full
+except ImportError:
+    from queue import Queue, Full
+
+logger = logging.getLogger(__name__)
+
+
+class CallbackPipeline(object):
+    """A bounded pipeline which hands items off to a pool of consumer threads.
+
+    Items are sharded across the consumers by key, so all the items with the same key are handled in the order in
+    which they were put. When a consumer's queue is full, put() blocks until there is room, which pushes back on the
+    producer rather than letting the queue grow without bound.
+
+    Args:
+        handler (func): The function called by the consumers with each item
+        num_consumers (int): The number of consumer threads
+        max_size (int): The maximum number of items waiting to be handled, across all the consumers
+        name (str, optional): The name used for the consumer threads. Defaults to 'callback-pipeline'
+    """
+
+    __stop = object()
+    __put_retry_interval = 0.1
+
+    def __init__(self, handler, num_consumers, max_size, name='callback-pipeline'):
+        self.handler = handler
+        self.num_consumers = max(num_consumers, 1)
+        self.name = name
+        queue_size = max(max_size // self.num_consumers, 1)
+        self._queues = [Queue(maxsize=queue_size) for _ in range(self.num_consumers)]
+        self._consumers = []
+        self._stopping = False
+        self._counter_lock = threading.Lock()
+        self.processed_count = 0
+        self.backpressure_count = 0
+        self.dropped_count = 0
+
+    def start(self):
+        """Starts the consumer threads
+        """
+        self._stopping = False
+        self._consumers = []
+        for index, queue in enumerate(self._queues):
+            consumer = threading.Thread(target=self.__consume, args=(queue,), name='{0}-{1}'.format(self.name, index))
+            consumer.daemon = True
+            consumer.start()
+            self._consumers.append(consumer)
+
+    def stop(self, timeout=None):
+        """Stops the consumer threads once they have handled all the items already put in the pipeline
+
+        Args:
+            timeout (float, optional): The maximum number of seconds to wait for each consumer. Defaults to None,
+                meaning wait until the consumer finishes.
+        """
+        self._stopping = True
+        for queue in self._queues:
+            queue.put(self.__stop)
+        for consumer in self._consumers:
+            consumer.join(timeout=timeout)
+        self._consumers = []
+
+    def put(self, key, item):
+        """Puts an item in the pipeline, blocking while the consumer for its key is full
+
+        Args:
+            key (str): The key used to pick the consumer. Items with the same key are handled in order.
+            item: The item to pass to the handler
+
+        Returns:
+            (bool): True if the item was put in the pipeline, False if it was dropped because the pipeline is stopping
+        """
+        queue = self._queues[hash(key) % self.num_consumers]
+        try:
+            queue.put_nowait(item)
+            return True
+        except Full:
+            self.__increment('backpressure_count')
+        while not self._stopping:
+            try:
+                queue.put(item, timeout=self.__put_retry_interval)
+                return True
+            except Full:
+                continue
+        self.record_dropped()
+        return False
+
+    def record_dropped(self):
+        """Records an item which was dropped before it could be put in the pipeline
+        """
+        self.__increment('dropped_count')
+
+    @property
+    def queue_depth(self):
+        """The number of items waiting to be handled
+        """
+        return sum(queue.qsize() for queue in self._queues)
+
+    def get_statistics(self):
+        """Gets the current queue depth and the counts of processed, dropped, and backpressured items
+
+        Returns:
+            (dict): The statistics of the pipeline
+        """
+        with self._counter_lock:
+            return {'queue_depth': self.queue_depth,
+                    'processed': self.processed_count,
+                    'backpressure': self.backpressure_count,
+                    'dropped': self.dropped_count}
+
+    def __consume(self, queue):
+        while True:
+            item = queue.get()
+            if item is self.__stop:
+                return
+            try:
+                self.handler(item)
+            except Exception:
+                logger.exception('Error handling item in {}'.format(self.name))
+            self.__increment('processed_count')
+
+    def __increment(self, counter):
+        with self._counter_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
@@ -0,0 +1,167 @@
+import json
+import logging
+
+from google.protobuf.descriptor import FieldDescriptor
+from six import binary_type, integer_types, string_types
+
+import walkoff.config.config
+from walkoff.proto.build.data_pb2 import Message
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+else:
+    # Older versions of msgpack cannot unpack maps with non-string keys, or unpack strings as str
+    if msgpack.version < (0, 6, 1):
+        msgpack = None
+
+logger = logging.getLogger(__name__)
+
+encoding_names = {'json': Message.JSON, 'msgpack': Message.MSGPACK}
+
+ready_message = b'Ready'
+
+
+def get_supported_encodings():
+    """Gets the encodings of results which this process is able to send and receive
+
+    Returns:
+        (list[Message.Encoding]): The supported encodings. JSON is always supported, and MSGPACK is supported if msgpack
+            0.6.1 or later is installed.
+    """
+    return [Message.JSON, Message.MSGPACK] if msgpack is not None else [Message.JSON]
+
+
+def format_ready_message(encodings=None):
+    """Formats the message a worker sends to the load balancer to announce it is ready to execute workflows
+
+    Args:
+        encodings (list[Message.Encoding], optional): The encodings of results the worker can send. Defaults to the
+            encodings supported by this process.
+
+    Returns:
+        (bytes): The ready message
+    """
+    encodings = encodings if encodings is not None else get_supported_encodings()
+    names = [name for name, encoding in encoding_names.items() if encoding in encodings]
+    return ready_message + b':' + ','.join(sorted(names)).encode('ascii')
+
+
+def parse_ready_message(message):
+    """Parses a ready message sent by a worker
+
+    Workers which do not announce their encodings only send JSON.
+
+    Args:
+        message (bytes): The message sent by the worker
+
+    Returns:
+        (list[Message.Encoding]): The encodings the worker can send, or None if the message is not a ready message
+    """
+    if message == ready_message:
+        return [Message.JSON]
+    if message.startswith(ready_message + b':'):
+        names = message[len(ready_message) + 1:].decode('ascii').split(',')
+        return [encoding_names[name] for name in names if name in encoding_names]
+    return None
+
+
+def negotiate_encoding(worker_encodings):
+    """Picks the encoding a worker should use to send results
+
+    Args:
+        worker_encodings (list[Message.Encoding]): The encodings the worker can send
+
+    Returns:
+        (Message.Encoding): The configured preferred encoding if both the worker and this process support it,
+            otherwise JSON
+    """
+    preferred = encoding_names.get(walkoff.config.config.preferred_result_encoding, Message.JSON)
+    if preferred in worker_encodings and preferred in get_supported_encodings():
+        return preferred
+    return Message.JSON
+
+
+def _json_string(value):
+    if not isinstance(value, string_types):
+        raise TypeError('{!r} is not JSON serializable'.format(value))
+    if isinstance(value, binary_type):
+        return value.decode('utf-8')
+    return value
+
+
+def _json_key(key):
+    if isinstance(key, (string_types, binary_type)):
+        return _json_string(key)
+    if key is True or key is False or key is None or isinstance(key, float):
+        return json.dumps(key)
+    if isinstance(key, integer_types):
+        return str(key)
+    raise TypeError('Key {!r} is not a valid JSON key'.format(key))
+
+
+def _to_json_types(value):
+    if isinstance(value, dict):
+        return {_json_key(key): _to_json_types(element) for key, element in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_json_types(element) for element in value]
+    if isinstance(value, binary_type):
+        return _json_string(value)
+    return value
+
+
+def pack(payload):
+    """Serializes a payload with msgpack
+
+    Non-string dict keys are converted to strings the same way the json module converts them, so that the payload has
+    the same shape whichever encoding is used to send it. For the same reason, bytes are rejected as they are by the
+    json module, except for Python 2 strings, which are decoded as UTF-8.
+
+    Args:
+        payload (dict): The payload to serialize
+
+    Returns:
+        (bytes): The serialized payload
+
+    Raises:
+        TypeError: If the payload holds bytes or a dict key which cannot be sent as JSON
+    """
+    return msgpack.packb(_to_json_types(payload), use_bin_type=True)
+
+
+def unpack(packed):
+    """Deserializes a payload serialized by pack()
+
+    Args:
+        packed (bytes): The serialized payload
+
+    Returns:
+        (dict): The payload
+    """
+    return msgpack.unpackb(packed, raw=False, strict_map_key=False)
+
+
+def proto_to_dict(message):
+    """Converts a protobuf message to a dict of the fields which are set on it
+
+    This gives the same result as MessageToDict with preserving_proto_field_name for the messages sent between the
+    workers and the server, which have no enum, 64-bit integer, or bytes fields, without its per-field overhead.
+
+    Args:
+        message (Message): The protobuf message
+
+    Returns:
+        (dict): The fields which are set on the message
+    """
+    ret = {}
+    for field, value in message.ListFields():
+        if field.type == FieldDescriptor.TYPE_MESSAGE:
+            if field.label == FieldDescriptor.LABEL_REPEATED:
+                value = [proto_to_dict(element) for element in value]
+            else:
+                value = proto_to_dict(value)
+        elif field.label == FieldDescriptor.LABEL_REPEATED:
+            value = list(value)
+        ret[field.name] = value
+    return ret
@@ -1,25 +1,25 @@
+import heapq
 import json
 import logging
 import os
+import threading
 
-import gevent
 import zmq.auth as auth
 import zmq.green as zmq
-from gevent.queue import Queue
-from google.protobuf.json_format import MessageToDict
 from six import string_types
 
 import walkoff.config.config
 import walkoff.config.paths
 from walkoff import executiondb
 from walkoff.events import WalkoffEvent, EventType
+from walkoff.multiprocessedexecutor.callbackpipeline import CallbackPipeline
+from walkoff.multiprocessedexecutor.encoding import parse_ready_message, negotiate_encoding, unpack, proto_to_dict
+from walkoff.multiprocessedexecutor.pendingqueue import PendingWorkflowQueue
+from walkoff.multiprocessedexecutor.autoscaler import get_max_worker_processes
+from walkoff.multiprocessedexecutor.worker import get_workflow_slots
+from walkoff.executiondb.statusrecorder import workflow_status_recorder
 from walkoff.executiondb.workflowresults import WorkflowStatus, WorkflowStatusEnum
-from walkoff.proto.build.data_pb2 import Message, CommunicationPacket, ExecuteWorkflowMessage
-
-try:
-    from Queue import Queue
-except ImportError:
-    from queue import Queue
+from walkoff.proto.build.data_pb2 import Message, CommunicationPacket, ExecuteWorkflowBatchMessage
 
 logger = logging.getLogger(__name__)
 
@@ -33,10 +33,16 @@ class LoadBalancer:
         """
 
         self.workers = {}
+        self.worker_slots = {}
+        self.worker_encodings = {}
+        self.draining_workers = set()
 
         self.workflow_comms = {}
         self.thread_exit = False
-        self.pending_workflows = Queue()
+        self.pending_workflows = PendingWorkflowQueue()
+        self.pending_execution_ids = set()
+        self.aborted_execution_ids = set()
+        self.workflow_versions = {}
 
         @WalkoffEvent.WorkflowShutdown.connect
         def handle_workflow_shutdown(sender, **kwargs):
@@ -56,6 +62,12 @@ class LoadBalancer:
 
         self.handle_workflow_paused = handle_workflow_paused
 
+        @WalkoffEvent.WorkflowAborted.connect
+        def handle_workflow_aborted(sender, **kwargs):
+            self.on_workflow_aborted(sender, **kwargs)
+
+        self.handle_workflow_aborted = handle_workflow_aborted
+
         self.ctx = ctx
         server_secret_file = os.path.join(walkoff.config.paths.zmq_private_keys_path, "server.key_secret")
         server_public, server_secret = auth.load_certificate(server_secret_file)
@@ -72,65 +84,287 @@ class LoadBalancer:
         self.comm_socket.curve_server = True
         self.comm_socket.bind(walkoff.config.config.zmq_communication_address)
 
+        self.wakeup_address = 'inproc://loadbalancer-wakeup-{}'.format(id(self))
+        self.wakeup_socket = self.ctx.socket(zmq.PULL)
+        self.wakeup_socket.bind(self.wakeup_address)
+        self.wakeup_sender = self.ctx.socket(zmq.PUSH)
+        self.wakeup_sender.connect(self.wakeup_address)
+        self.wakeup_lock = threading.Lock()
+
+        self.poller = zmq.Poller()
+        self.poller.register(self.request_socket, zmq.POLLIN)
+        self.poller.register(self.wakeup_socket, zmq.POLLIN)
+
+        self.workers_lock = threading.RLock()
+        self.available_workers = []
+
     def manage_workflows(self):
         """Manages the workflows to be executed and the workers. It waits for the server to submit a request to
         execute a workflow, and then passes the workflow off to an available worker, once one becomes available.
+
+        Rather than polling on a fixed interval, this blocks until either a worker sends a message over the request
+        socket or a wakeup is signaled by add_workflow or on_worker_available.
         """
         while True:
             if self.thread_exit:
                 break
 
-            if len(self.workers) < walkoff.config.config.num_processes:
-                try:
-                    worker, message = self.request_socket.recv_multipart(flags=zmq.NOBLOCK)
-                    if message == b"Ready":
-                        self.workers[worker] = walkoff.config.config.num_threads_per_process
-                except zmq.ZMQError:
-                    pass
-
-            # There is a worker available and a workflow in the queue, so pop it off and send it to the worker
-            if any(val > 0 for val in self.workers.values()) and not self.pending_workflows.empty():
-                workflow_id, workflow_execution_id, start, start_arguments, resume = self.pending_workflows.get()
-
-                executiondb.execution_db.session.expire_all()
-                workflow_status = executiondb.execution_db.session.query(WorkflowStatus).filter_by(
-                    execution_id=workflow_execution_id).first()
-                if workflow_status.status == WorkflowStatusEnum.aborted:
+            try:
+                events = dict(self.poller.poll(walkoff.config.config.load_balancer_poll_timeout))
+            except zmq.ZMQError:
+                break
+
+            if self.request_socket in events:
+                self.__receive_worker_messages()
+            if self.wakeup_socket in events:
+                self.__drain_wakeups()
+
+            if self.thread_exit:
+                break
+
+            self.__dispatch_pending_workflows()
+
+        self.poller.unregister(self.request_socket)
+        self.poller.unregister(self.wakeup_socket)
+        self.request_socket.close()
+        self.comm_socket.close()
+        self.wakeup_sender.close()
+        self.wakeup_socket.close()
+        return
+
+    def __receive_worker_messages(self):
+        while True:
+            try:
+                worker, message = self.request_socket.recv_multipart(flags=zmq.NOBLOCK)
+            except zmq.ZMQError:
+                return
+            encodings = parse_ready_message(message)
+            if encodings is not None:
+                self.register_worker(worker, encodings)
+
+    def register_worker(self, worker, encodings, slots=None):
+        """Registers a worker which has announced it is ready to execute workflows
+
+        Workers beyond the maximum number of worker processes are ignored.
+
+        Args:
+            worker (bytes): The identity of the worker
+            encodings (list[Message.Encoding]): The encodings of results the worker can send
+            slots (int, optional): The number of workflows the worker executes at the same time. Defaults to
+                get_workflow_slots()
+
+        Returns:
+            (bool): True if the worker was registered, False otherwise
+        """
+        with self.workers_lock:
+            if worker not in self.workers and len(self.workers) >= get_max_worker_processes():
+                return False
+            slots = slots if slots is not None else get_workflow_slots()
+            self.workers[worker] = slots
+            self.worker_slots[worker] = slots
+            self.worker_encodings[worker] = negotiate_encoding(encodings)
+            self.draining_workers.discard(worker)
+            self.__push_available_worker(worker)
+        self.wake()
+        return True
+
+    def drain_worker(self):
+        """Stops sending workflows to the worker which is executing the fewest workflows, so that it can be retired
+        once the workflows it is executing have finished
+
+        Returns:
+            (bytes): The identity of the worker, or None if there are no workers which are not already draining
+        """
+        with self.workers_lock:
+            candidates = [worker for worker in self.workers if worker not in self.draining_workers]
+            if not candidates:
+                return None
+            worker = max(candidates, key=lambda worker_: self.workers[worker_] - self.worker_slots[worker_])
+            self.draining_workers.add(worker)
+            return worker
+
+    def pop_drained_workers(self):
+        """Removes the draining workers which are no longer executing any workflows, and tells them to exit
+
+        Returns:
+            (list[bytes]): The identities of the removed workers
+        """
+        with self.workers_lock:
+            drained = [worker for worker in self.draining_workers if self.workers[worker] >= self.worker_slots[worker]]
+            for worker in drained:
+                self.__remove_worker(worker)
+        for worker in drained:
+            self.__send_exit(worker)
+        return drained
+
+    def remove_worker(self, worker):
+        """Removes a worker, for example one whose process has died, so that no more workflows are sent to it. The
+        workflows it was executing are recorded as aborted, and their executions are released from their concurrency
+        limits.
+
+        Args:
+            worker (bytes): The identity of the worker
+        """
+        with self.workers_lock:
+            self.__remove_worker(worker)
+        unheld = False
+        for execution_id, execution_worker in list(self.workflow_comms.items()):
+            if execution_worker != worker:
+                continue
+            self.workflow_comms.pop(execution_id, None)
+            unheld = self.pending_workflows.release(execution_id) or unheld
+            workflow_status_recorder.workflow_aborted(execution_id)
+            logger.error('Workflow {0} was aborted because worker {1} exited'.format(
+                execution_id, worker.decode('ascii')))
+        if unheld:
+            self.wake()
+
+    def get_worker_statistics(self):
+        """Gets the number of workers, their slots, and the workflows waiting for a free slot
+
+        Returns:
+            (dict): The number of registered workers and how many of them are draining, the total and free slots of
+                the workers which are not draining, the number of pending workflows which are not held back by their
+                concurrency limits and the number of seconds the oldest of them has waited, and the number of pending
+                workflows which are held back
+        """
+        with self.workers_lock:
+            active = [worker for worker in self.workers if worker not in self.draining_workers]
+            statistics = {'workers': len(self.workers),
+                          'draining': len(self.draining_workers),
+                          'slots': sum(self.worker_slots[worker] for worker in active),
+                          'free_slots': sum(max(self.workers[worker], 0) for worker in active)}
+        pending_statistics = self.pending_workflows.get_statistics()
+        statistics['pending'] = pending_statistics['ready']
+        statistics['oldest_pending_wait'] = pending_statistics['oldest_wait']
+        statistics['held'] = pending_statistics['held']
+        return statistics
+
+    def __remove_worker(self, worker):
+        self.workers.pop(worker, None)
+        self.worker_slots.pop(worker, None)
+        self.worker_encodings.pop(worker, None)
+        self.draining_workers.discard(worker)
+
+    def __drain_wakeups(self):
+        while True:
+            try:
+                self.wakeup_socket.recv(flags=zmq.NOBLOCK)
+            except zmq.ZMQError:
+                return
+
+    def __dispatch_pending_workflows(self):
+        while not self.pending_workflows.empty():
+            worker, slots = self.__reserve_available_worker(walkoff.config.config.max_workflows_per_dispatch)
+            if worker is None:
+                return
+
+            batch = ExecuteWorkflowBatchMessage()
+            batch.result_encoding = self.worker_encodings.get(worker, Message.JSON)
+            while slots > 0:
+                pending_workflow = self.pending_workflows.get()
+                if pending_workflow is None:
+                    break
+                workflow_id, workflow_execution_id, start, start_arguments, resume = pending_workflow[:5]
+                if self.__is_aborted(workflow_execution_id, resume):
+                    self.pending_workflows.release(workflow_execution_id)
                     continue
 
-                worker = self.__get_available_worker()
                 self.workflow_comms[workflow_execution_id] = worker
 
-                message = ExecuteWorkflowMessage()
+                message = batch.workflows.add()
                 message.workflow_id = str(workflow_id)
                 message.workflow_execution_id = workflow_execution_id
                 message.resume = resume
+                message.workflow_version = self.workflow_versions.get(str(workflow_id), 0)
 
                 if start:
                     message.start = str(start)
                 if start_arguments:
                     self.__set_arguments_for_proto(message, start_arguments)
+                slots -= 1
 
-                self.request_socket.send_multipart([worker, message.SerializeToString()])
+            if slots > 0:
+                self.__release_worker(worker, slots)
+            if batch.workflows:
+                self.request_socket.send_multipart([worker, batch.SerializeToString()])
 
-            gevent.sleep(0.1)
+    def __is_aborted(self, workflow_execution_id, resume):
+        """Determines if a workflow taken off of the queue has been aborted while it was pending.
 
-        self.request_socket.close()
-        self.comm_socket.close()
-        return
+        Aborts of pending workflows are tracked in memory. Workflows being resumed may have been aborted before this
+        load balancer was started, so the database is checked for those.
+        """
+        self.pending_execution_ids.discard(workflow_execution_id)
+        if workflow_execution_id in self.aborted_execution_ids:
+            self.aborted_execution_ids.discard(workflow_execution_id)
+            return True
+        if resume:
+            pending_status = workflow_status_recorder.get_pending_workflow_status(workflow_execution_id)
+            if pending_status is not None:
+                return pending_status == WorkflowStatusEnum.aborted
+            workflow_status = executiondb.execution_db.session.query(WorkflowStatus).filter_by(
+                execution_id=workflow_execution_id).first()
+            return workflow_status is not None and workflow_status.status == WorkflowStatusEnum.aborted
+        return False
+
+    def __push_available_worker(self, worker):
+        """Pushes a worker onto the heap with its current number of free slots.
+
+        Stale entries are only discarded when they are popped, and those with fewer slots than a valid entry may never
+        be popped, so the heap is rebuilt with one entry per available worker once it holds more than two entries per
+        worker.
+        """
+        heapq.heappush(self.available_workers, (-self.workers[worker], worker))
+        if len(self.available_workers) > 2 * len(self.workers):
+            self.available_workers = [(-slots, worker_) for worker_, slots in self.workers.items()
+                                      if slots > 0 and worker_ not in self.draining_workers]
+            heapq.heapify(self.available_workers)
+
+    def __reserve_available_worker(self, max_slots):
+        """Pops the worker with the most free slots off of the heap, reserving up to max_slots of its slots.
+
+        Entries in the heap whose slot count no longer matches the worker's current count are stale, and are
+        discarded as they are encountered.
 
-    def __get_available_worker(self):
-        max_avail = 0
-        available_worker = None
-        for worker, value in self.workers.items():
-            if value > max_avail:
-                max_avail = value
-                available_worker = worker
-        if available_worker:
-            self.workers[available_worker] -= 1
-        return available_worker
-
-    def add_workflow(self, workflow_id, workflow_execution_id, start=None, start_arguments=None, resume=False):
+        Args:
+            max_slots (int): The maximum number of slots to reserve on the worker.
+
+        Returns:
+            (tuple(bytes, int)): The identity of the worker and the number of slots reserved, or (None, 0) if no
+                worker has a free slot.
+        """
+        with self.workers_lock:
+            while self.available_workers:
+                negative_slots, worker = heapq.heappop(self.available_workers)
+                slots = self.workers.get(worker, 0)
+                if slots <= 0 or -negative_slots != slots or worker in self.draining_workers:
+                    continue
+                reserved = min(slots, max_slots)
+                self.workers[worker] -= reserved
+                if self.workers[worker] > 0:
+                    self.__push_available_worker(worker)
+                return worker, reserved
+            return None, 0
+
+    def __release_worker(self, worker, slots=1):
+        with self.workers_lock:
+            if worker in self.workers:
+                self.workers[worker] += slots
+                if worker not in self.draining_workers:
+                    self.__push_available_worker(worker)
+
+    def wake(self):
+        """Wakes up the manage_workflows loop so that it checks for pending workflows and available workers
+        """
+        with self.wakeup_lock:
+            try:
+                self.wakeup_sender.send(b'', zmq.NOBLOCK)
+            except zmq.ZMQError:
+                pass
+
+    def add_workflow(self, workflow_id, workflow_execution_id, start=None, start_arguments=None, resume=False,
+                     priority=None, concurrency_limits=None):
         """Adds a workflow ID to the queue to be executed.
 
         Args:
@@ -139,8 +373,26 @@ class LoadBalancer:
             start (str, optional): The ID of the first, or starting action. Defaults to None.
             start_arguments (list[Argument]): The arguments to the starting action of the workflow. Defaults to None.
             resume (bool, optional): Optional boolean to resume a previously paused workflow. Defaults to False.
+            priority (int, optional): The priority of the workflow. Workflows with a higher priority are sent to
+                workers first. Defaults to walkoff.config.config.default_workflow_priority
+            concurrency_limits (dict, optional): Maps the IDs of the workflow and its playbook to the maximum number
+                of their executions which may execute at the same time, or None for no limit. Defaults to None.
         """
-        self.pending_workflows.put((workflow_id, workflow_execution_id, start, start_arguments, resume))
+        if priority is None:
+            priority = walkoff.config.config.default_workflow_priority
+        self.pending_execution_ids.add(workflow_execution_id)
+        self.pending_workflows.put(workflow_id, workflow_execution_id, start, start_arguments, resume,
+                                   priority=priority, concurrency_limits=concurrency_limits)
+        self.wake()
+
+    def invalidate_workflow(self, workflow_id):
+        """Increments the version of a workflow so that workers will reload it the next time it is executed.
+
+        Args:
+            workflow_id (str): The ID of the workflow which was modified.
+        """
+        workflow_id = str(workflow_id)
+        self.workflow_versions[workflow_id] = self.workflow_versions.get(workflow_id, 0) + 1
 
     def pause_workflow(self, workflow_execution_id):
         """Pauses a workflow currently executing.
@@ -179,17 +431,28 @@ class LoadBalancer:
     def send_exit_to_worker_comms(self):
         """Sends the exit message over the communication sockets, otherwise worker receiver threads will hang
         """
+        for worker in list(self.workers):
+            self.__send_exit(worker)
+
+    def __send_exit(self, worker):
         message = CommunicationPacket()
         message.type = CommunicationPacket.EXIT
-        message_bytes = message.SerializeToString()
-        for worker in self.workers:
-            self.comm_socket.send_multipart([worker, message_bytes])
+        self.comm_socket.send_multipart([worker, message.SerializeToString()])
 
     def on_worker_available(self, sender, **kwargs):
+        unheld = self.pending_workflows.release(sender['execution_id'])
         if sender['execution_id'] in self.workflow_comms:
-            worker = self.workflow_comms[sender['execution_id']]
-            self.workers[worker] += 1
-            self.workflow_comms.pop(sender['execution_id'])
+            worker = self.workflow_comms.pop(sender['execution_id'])
+            self.__release_worker(worker)
+            self.wake()
+        elif unheld:
+            self.wake()
+
+    def on_workflow_aborted(self, sender, **kwargs):
+        execution_id = sender['execution_id']
+        if execution_id in self.pending_execution_ids:
+            self.aborted_execution_ids.add(execution_id)
+        self.on_worker_available(sender, **kwargs)
 
     @staticmethod
     def __set_arguments_for_proto(message, arguments):
@@ -212,11 +475,16 @@ class Receiver:
     def __init__(self, ctx):
         """Initialize a Receiver object, which will receive callbacks from the execution elements.
 
+        Results are drained from the results socket in batches and handed off to a bounded pipeline of consumer
+        threads which trigger the callbacks, so that slow callbacks do not hold up receiving results from the
+        workers. Callbacks for the same workflow execution are always triggered in the order they were received.
+
         Args:
             ctx (Context object): A Context object, shared with the LoadBalancer thread.
         """
         self.thread_exit = False
         self.workflows_executed = 0
+        self.workflows_executed_lock = threading.Lock()
 
         server_secret_file = os.path.join(walkoff.config.paths.zmq_private_keys_path, "server.key_secret")
         server_public, server_secret = auth.load_certificate(server_secret_file)
@@ -229,28 +497,96 @@ class Receiver:
         self.results_sock.curve_server = True
         self.results_sock.bind(walkoff.config.config.zmq_results_address)
 
+        self.poller = zmq.Poller()
+        self.poller.register(self.results_sock, zmq.POLLIN)
+
+        self.pipeline = CallbackPipeline(
+            self.__dispatch, walkoff.config.config.receiver_callback_threads,
+            walkoff.config.config.receiver_queue_size, name='receiver-callbacks')
+
     def receive_results(self):
         """Keep receiving results from execution elements over a ZMQ socket, and trigger the callbacks.
         """
-
+        self.pipeline.start()
         while True:
             if self.thread_exit:
                 break
             try:
-                message_bytes = self.results_sock.recv(zmq.NOBLOCK)
+                events = dict(self.poller.poll(walkoff.config.config.load_balancer_poll_timeout))
             except zmq.ZMQError:
-                gevent.sleep(0.1)
-                continue
-
-            self.send_callback(message_bytes)
+                break
+            if self.results_sock in events:
+                self.__receive_batch()
 
+        self.poller.unregister(self.results_sock)
         self.results_sock.close()
+        self.pipeline.stop()
         return
 
+    def __receive_batch(self):
+        for _ in range(walkoff.config.config.receiver_batch_size):
+            try:
+                message_bytes = self.results_sock.recv(zmq.NOBLOCK)
+            except zmq.ZMQError:
+                return
+            try:
+                callback = self.parse_message(message_bytes)
+            except Exception:
+                logger.exception('Could not parse message from worker')
+                callback = None
+            if callback is None:
+                self.pipeline.record_dropped()
+            else:
+                self.pipeline.put(callback[3], callback)
+
+    def get_statistics(self):
+        """Gets the statistics of the callback pipeline
+
+        Returns:
+            (dict): The current queue depth, and the numbers of processed, backpressured, and dropped messages
+        """
+        return self.pipeline.get_statistics()
+
     def send_callback(self, message_bytes):
+        """Parses a message from a worker and triggers its callback on the calling thread
+
+        Args:
+            message_bytes (bytes): The serialized Message
+        """
+        callback = self.parse_message(message_bytes)
+        if callback is not None:
+            self.__dispatch(callback)
+
+    @staticmethod
+    def parse_message(message_bytes):
+        """Parses a message from a worker into the event it represents
+
+        Args:
+            message_bytes (bytes): The serialized Message
+
+        Returns:
+            (tuple): The WalkoffEvent, the sender, the event data, and the execution ID of the workflow which sent the
+                message, or None if the event is unknown
+        """
         message_outer = Message()
         message_outer.ParseFromString(message_bytes)
         callback_name = message_outer.event_name
+        event = WalkoffEvent.get_event_from_name(callback_name)
+        if event is None:
+            logger.error('Unknown callback {} sent'.format(callback_name))
+            return None
+        if message_outer.encoding == Message.MSGPACK:
+            sender, data = Receiver.__unpack_packed_message(message_outer, event)
+        else:
+            sender, data = Receiver.__unpack_json_message(message_outer, event)
+        if event.event_type != EventType.workflow:
+            workflow_execution_id = data['workflow'].get('execution_id', '')
+        else:
+            workflow_execution_id = sender.get('execution_id', '')
+        return event, sender, data, workflow_execution_id
+
+    @staticmethod
+    def __unpack_json_message(message_outer, event):
         if message_outer.type == Message.WORKFLOWPACKET:
             message = message_outer.workflow_packet
         elif message_outer.type == Message.ACTIONPACKET:
@@ -259,26 +595,41 @@ class Receiver:
             message = message_outer.message_packet
         else:
             message = message_outer.general_packet
-        sender = MessageToDict(message.sender, preserving_proto_field_name=True)
-        event = WalkoffEvent.get_event_from_name(callback_name)
-        if event is not None:
-            if event.event_type != EventType.workflow:
-                data = {'workflow': MessageToDict(message.workflow, preserving_proto_field_name=True)}
+        sender = proto_to_dict(message.sender)
+        if event.event_type != EventType.workflow:
+            data = {'workflow': proto_to_dict(message.workflow)}
+        else:
+            data = {}
+        if event.requires_data():
+            if event != WalkoffEvent.SendMessage:
+                data['data'] = json.loads(message.additional_data)
             else:
-                data = {}
-            if event.requires_data():
-                if event != WalkoffEvent.SendMessage:
-                    data['data'] = json.loads(message.additional_data)
-                else:
-                    data['message'] = format_message_event_data(message)
-            event.send(sender, data=data)
-            if event in [WalkoffEvent.WorkflowShutdown, WalkoffEvent.WorkflowAborted]:
-                self._increment_execution_count()
+                data['message'] = format_message_event_data(message)
+        return sender, data
+
+    @staticmethod
+    def __unpack_packed_message(message_outer, event):
+        payload = unpack(message_outer.packed_data)
+        if event.event_type != EventType.workflow:
+            data = {'workflow': payload['workflow']}
         else:
-            logger.error('Unknown callback {} sent'.format(callback_name))
+            data = {}
+        if event.requires_data():
+            if event != WalkoffEvent.SendMessage:
+                data['data'] = payload['data']
+            else:
+                data['message'] = payload['message']
+        return payload['sender'], data
+
+    def __dispatch(self, callback):
+        event, sender, data, _ = callback
+        event.send(sender, data=data)
+        if event in [WalkoffEvent.WorkflowShutdown, WalkoffEvent.WorkflowAborted]:
+            self._increment_execution_count()
 
     def _increment_execution_count(self):
-        self.workflows_executed += 1
+        with self.workflows_executed_lock:
+            self.workflows_executed += 1
 
 
 def format_message_event_data(message):
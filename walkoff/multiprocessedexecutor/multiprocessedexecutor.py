@@ -5,18 +5,25 @@ import signal
 import sys
 import threading
 import uuid
+from functools import partial
 
 import gevent
 import zmq.green as zmq
+from six import string_types
 
 import walkoff.config.config
 import walkoff.config.paths
-from walkoff import executiondb
+from walkoff import executiondb, initialize_databases
+from walkoff.case.eventwriter import case_event_writer
+from walkoff.case.retention import case_event_retention
 from walkoff.events import WalkoffEvent
 from walkoff.executiondb import WorkflowStatusEnum
+from walkoff.executiondb.checkpoint import load_checkpoint
 from walkoff.executiondb.saved_workflow import SavedWorkflow
+from walkoff.executiondb.statusrecorder import workflow_status_recorder
 from walkoff.executiondb.workflow import Workflow
 from walkoff.executiondb.workflowresults import WorkflowStatus
+from walkoff.multiprocessedexecutor.autoscaler import WorkerAutoscaler, get_initial_worker_processes
 from walkoff.multiprocessedexecutor.loadbalancer import LoadBalancer, Receiver
 from walkoff.multiprocessedexecutor.threadauthenticator import ThreadAuthenticator
 from walkoff.multiprocessedexecutor.worker import Worker
@@ -31,7 +38,7 @@ def spawn_worker_processes(worker_environment_setup=None):
         worker_environment_setup (function, optional): Optional alternative worker setup environment function.
     """
     pids = []
-    for i in range(walkoff.config.config.num_processes):
+    for i in range(get_initial_worker_processes()):
         args = (i, worker_environment_setup) if worker_environment_setup else (i,)
 
         pid = multiprocessing.Process(target=Worker, args=args)
@@ -40,6 +47,86 @@ def spawn_worker_processes(worker_environment_setup=None):
     return pids
 
 
+def spawn_worker_process(number, worker_environment_setup=None):
+    """Starts a worker process after the server has started, for example when scaling up the workers.
+
+    The server process has been monkey patched by gevent by then, so the worker is started in a fresh interpreter where
+    the platform supports it rather than forked. The configuration and paths of the server are passed to the worker and
+    applied before it connects to the server.
+
+    Args:
+        number (int): The number of the worker. Needed for ZMQ socket communication.
+        worker_environment_setup (function, optional): Optional alternative worker setup environment function. It must
+            be picklable, and is called after the configuration of the server has been applied.
+
+    Returns:
+        (Process): The started worker process
+    """
+    config_values, path_values = get_worker_settings()
+    setup = partial(setup_spawned_worker_environment, config_values, path_values, worker_environment_setup)
+    context = multiprocessing.get_context('spawn') if hasattr(multiprocessing, 'get_context') else multiprocessing
+    pid = context.Process(target=Worker, args=(number, setup))
+    pid.start()
+    return pid
+
+
+def get_worker_settings():
+    """Gets the configuration and paths of this process which a worker started in a fresh interpreter needs
+
+    Returns:
+        (tuple(dict, dict)): The values of walkoff.config.config and of walkoff.config.paths
+    """
+    return _get_settings(walkoff.config.config, exclude=('app_apis',)), _get_settings(walkoff.config.paths)
+
+
+def _get_settings(module, exclude=()):
+    setting_types = (bool, int, float, list, dict, tuple, type(None)) + tuple(string_types)
+    return {key: value for key, value in vars(module).items()
+            if not key.startswith('_') and key not in exclude and isinstance(value, setting_types)}
+
+
+def setup_spawned_worker_environment(config_values, path_values, worker_environment_setup=None):
+    """Sets up the environment of a worker started in a fresh interpreter
+
+    The configuration and paths of the server are applied in place of those in the config file, so that the worker
+    uses any values changed in the server at runtime.
+
+    Args:
+        config_values (dict): The values of walkoff.config.config in the server
+        path_values (dict): The values of walkoff.config.paths in the server
+        worker_environment_setup (function, optional): Optional alternative worker setup environment function.
+    """
+    for key, value in path_values.items():
+        setattr(walkoff.config.paths, key, value)
+    for key, value in config_values.items():
+        setattr(walkoff.config.config, key, value)
+    if worker_environment_setup is not None:
+        worker_environment_setup()
+    else:
+        from walkoff.appgateway import cache_apps
+        cache_apps(walkoff.config.paths.apps_path)
+        walkoff.config.config.load_app_apis()
+        initialize_databases()
+
+
+def terminate_worker_process(pid):
+    """Stops a worker process. A worker which has been sent the exit message is given
+    walkoff.config.config.worker_exit_timeout seconds to finish the workflows it is executing and exit, and is then
+    killed if it is still running.
+
+    Args:
+        pid (Process): The worker process
+    """
+    pid.join(timeout=walkoff.config.config.worker_exit_timeout)
+    if pid.is_alive():
+        os.kill(pid.pid, signal.SIGABRT)
+        pid.join(timeout=3)
+        try:
+            os.kill(pid.pid, signal.SIGKILL)
+        except (OSError, AttributeError):
+            pass
+
+
 class MultiprocessedExecutor(object):
     def __init__(self):
         """Initializes a multiprocessed executor, which will handle the execution of workflows.
@@ -56,10 +143,15 @@ class MultiprocessedExecutor(object):
         self.manager_thread = None
         self.receiver = None
         self.receiver_thread = None
+        self.autoscaler = None
 
-    def initialize_threading(self, pids=None):
+    def initialize_threading(self, pids=None, worker_environment_setup=None):
         """Initialize the multiprocessing communication threads, allowing for parallel execution of workflows.
 
+        Args:
+            pids (list[Process], optional): The worker processes which have been started
+            worker_environment_setup (function, optional): Optional alternative setup environment function for
+                workers started by the autoscaler.
         """
         if not (os.path.exists(walkoff.config.paths.zmq_public_keys_path) and
                 os.path.exists(walkoff.config.paths.zmq_private_keys_path)):
@@ -81,6 +173,15 @@ class MultiprocessedExecutor(object):
         self.manager_thread = threading.Thread(target=self.manager.manage_workflows)
         self.manager_thread.start()
 
+        workflow_status_recorder.start()
+        case_event_writer.start()
+        case_event_retention.start()
+
+        if walkoff.config.config.worker_autoscaling == 'enabled' and self.pids is not None:
+            spawn = partial(spawn_worker_process, worker_environment_setup=worker_environment_setup)
+            self.autoscaler = WorkerAutoscaler(self.manager, spawn, terminate_worker_process, processes=self.pids)
+            self.autoscaler.start()
+
         self.threading_is_initialized = True
         logger.debug('Controller threading initialized')
 
@@ -98,22 +199,22 @@ class MultiprocessedExecutor(object):
     def shutdown_pool(self):
         """Shuts down the threadpool.
         """
+        if self.autoscaler is not None:
+            self.autoscaler.stop()
         self.manager.send_exit_to_worker_comms()
         if self.manager_thread:
             self.manager.thread_exit = True
+            self.manager.wake()
             self.manager_thread.join(timeout=1)
         if len(self.pids) > 0:
             for p in self.pids:
-                if p.is_alive():
-                    os.kill(p.pid, signal.SIGABRT)
-                    p.join(timeout=3)
-                    try:
-                        os.kill(p.pid, signal.SIGKILL)
-                    except (OSError, AttributeError):
-                        pass
+                terminate_worker_process(p)
         if self.receiver_thread:
             self.receiver.thread_exit = True
             self.receiver_thread.join(timeout=1)
+        workflow_status_recorder.stop()
+        case_event_writer.stop()
+        case_event_retention.stop()
         self.threading_is_initialized = False
         logger.debug('Controller thread pool shutdown')
 
@@ -134,8 +235,10 @@ class MultiprocessedExecutor(object):
         self.threading_is_initialized = False
         self.manager = None
         self.receiver = None
+        self.autoscaler = None
 
-    def execute_workflow(self, workflow_id, execution_id_in=None, start=None, start_arguments=None, resume=False):
+    def execute_workflow(self, workflow_id, execution_id_in=None, start=None, start_arguments=None, resume=False,
+                         priority=None):
         """Executes a workflow.
 
         Args:
@@ -145,6 +248,8 @@ class MultiprocessedExecutor(object):
             start (str, optional): The ID of the first, or starting action. Defaults to None.
             start_arguments (list[Argument]): The arguments to the starting action of the workflow. Defaults to None.
             resume (bool, optional): Optional boolean to resume a previously paused workflow. Defaults to False.
+            priority (int, optional): The priority of the execution. Pending executions with a higher priority are
+                started first. Defaults to walkoff.config.config.default_workflow_priority.
 
         Returns:
             The execution ID of the Workflow.
@@ -163,17 +268,42 @@ class MultiprocessedExecutor(object):
 
         workflow_data = {'execution_id': execution_id, 'id': workflow.id, 'name': workflow.name}
         WalkoffEvent.WorkflowExecutionPending.send(workflow_data)
-        self.manager.add_workflow(workflow.id, execution_id, start, start_arguments, resume)
+        concurrency_limits = {str(workflow.id): workflow.max_concurrent_executions}
+        if workflow.playbook is not None:
+            concurrency_limits[str(workflow.playbook_id)] = workflow.playbook.max_concurrent_executions
+        self.manager.add_workflow(workflow.id, execution_id, start, start_arguments, resume, priority=priority,
+                                  concurrency_limits=concurrency_limits)
 
         WalkoffEvent.SchedulerJobExecuted.send(self)
         return execution_id
 
+    def execute_scheduled_workflow(self, workflow_id):
+        """Executes a workflow for a scheduled task, with walkoff.config.config.scheduled_workflow_priority.
+
+        Args:
+            workflow_id (Workflow): The Workflow to be executed.
+
+        Returns:
+            The execution ID of the Workflow.
+        """
+        return self.execute_workflow(workflow_id, priority=walkoff.config.config.scheduled_workflow_priority)
+
+    def invalidate_workflow(self, workflow_id):
+        """Notifies the workers that a workflow has been modified, so that any cached copies of it are reloaded.
+
+        Args:
+            workflow_id (str): The ID of the workflow which was modified.
+        """
+        if self.manager is not None:
+            self.manager.invalidate_workflow(workflow_id)
+
     def pause_workflow(self, execution_id):
         """Pauses a workflow that is currently executing.
 
         Args:
             execution_id (str): The execution id of the workflow.
         """
+        workflow_status_recorder.flush()
         workflow_status = executiondb.execution_db.session.query(WorkflowStatus).filter_by(
             execution_id=execution_id).first()
         if workflow_status and workflow_status.status == WorkflowStatusEnum.running:
@@ -189,6 +319,7 @@ class MultiprocessedExecutor(object):
         Args:
             execution_id (str): The execution id of the workflow.
         """
+        workflow_status_recorder.flush()
         workflow_status = executiondb.execution_db.session.query(WorkflowStatus).filter_by(
             execution_id=execution_id).first()
 
@@ -213,13 +344,14 @@ class MultiprocessedExecutor(object):
         Args:
             execution_id (str): The execution id of the workflow.
         """
+        workflow_status_recorder.flush()
         workflow_status = executiondb.execution_db.session.query(WorkflowStatus).filter_by(
             execution_id=execution_id).first()
 
         if workflow_status:
             if workflow_status.status in [WorkflowStatusEnum.pending, WorkflowStatusEnum.paused,
                                           WorkflowStatusEnum.awaiting_data]:
-                workflow = walkoff.coredb.devicedb.device_db.session.query(Workflow).filter_by(
+                workflow = executiondb.execution_db.session.query(Workflow).filter_by(
                     id=workflow_status.workflow_id).first()
                 if workflow is not None:
                     WalkoffEvent.WorkflowAborted.send(
@@ -241,8 +373,7 @@ class MultiprocessedExecutor(object):
             arguments (list[Argument], optional): Optional list of new Arguments for the trigger action.
                 Defaults to None.
         """
-        saved_state = executiondb.execution_db.session.query(SavedWorkflow).filter_by(
-            workflow_execution_id=execution_id).first()
+        saved_state, accumulator = load_checkpoint(executiondb.execution_db.session, execution_id)
         workflow = executiondb.execution_db.session.query(Workflow).filter_by(
             id=saved_state.workflow_id).first()
         workflow._execution_id = execution_id
@@ -252,7 +383,7 @@ class MultiprocessedExecutor(object):
         for action in workflow.actions:
             if action.id == saved_state.action_id:
                 exec_action = action
-                executed = action.execute_trigger(data_in, saved_state.accumulator)
+                executed = action.execute_trigger(data_in, accumulator)
                 break
 
         if executed:
@@ -271,6 +402,7 @@ class MultiprocessedExecutor(object):
         Returns:
             A list of execution IDs of workflows currently awaiting data to be sent to a trigger.
         """
+        workflow_status_recorder.flush()
         executiondb.execution_db.session.expire_all()
         wf_statuses = executiondb.execution_db.session.query(WorkflowStatus).filter_by(
             status=WorkflowStatusEnum.awaiting_data).all()
@@ -285,6 +417,9 @@ class MultiprocessedExecutor(object):
         Returns:
             The status of the workflow
         """
+        pending_status = workflow_status_recorder.get_pending_workflow_status(execution_id)
+        if pending_status is not None:
+            return pending_status
         workflow_status = executiondb.execution_db.session.query(WorkflowStatus).filter_by(
             execution_id=execution_id).first()
         if workflow_status:
@@ -0,0 +1,180 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import namedtuple
+
+import walkoff.config.config
+
+PendingWorkflow = namedtuple('PendingWorkflow', ['workflow_id', 'execution_id', 'start', 'start_arguments', 'resume',
+                                                 'priority', 'concurrency_limits', 'enqueued_at'])
+
+
+class PendingWorkflowQueue(object):
+    """A queue of workflows waiting to be sent to a worker, ordered by priority
+
+    Workflows with a higher priority are taken from the queue first, and workflows with the same priority in the order
+    they were added. A workflow gains one priority level for every aging seconds it waits, so that lower priority
+    workflows are not starved by a steady stream of higher priority ones.
+
+    A workflow can be limited to a maximum number of executions at the same time, for example of the workflow itself
+    or of the workflows in its playbook. A workflow taken from the queue counts as executing until it is released.
+    Workflows which would exceed a limit are held back until an execution under that limit is released, without
+    blocking the workflows behind them. Only as many held workflows as there are free executions under the limit are
+    returned to the queue at a time, oldest first.
+
+    Args:
+        aging (float, optional): The number of seconds a workflow waits to gain a priority level, or None or 0 to
+            disable aging. Defaults to walkoff.config.config.workflow_priority_aging
+    """
+
+    def __init__(self, aging=None):
+        self.aging = aging
+        self._ready = {}
+        self._held = {}
+        self._limits = {}
+        self._executing = {}
+        self._executing_counts = {}
+        self._ready_count = 0
+        self._held_count = 0
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def put(self, workflow_id, execution_id, start=None, start_arguments=None, resume=False, priority=0,
+            concurrency_limits=None, now=None):
+        """Adds a workflow to the queue
+
+        Args:
+            workflow_id (UUID): The ID of the workflow
+            execution_id (str): The execution ID of the workflow
+            start (str, optional): The ID of the first, or starting action. Defaults to None.
+            start_arguments (list[Argument]): The arguments to the starting action of the workflow. Defaults to None.
+            resume (bool, optional): Is a paused workflow being resumed? Defaults to False.
+            priority (int, optional): The priority of the workflow. Defaults to 0.
+            concurrency_limits (dict, optional): Maps keys, such as the IDs of the workflow and its playbook, to the
+                maximum number of executions under that key which may execute at the same time, or None for no
+                limit. The limits replace those given with earlier workflows. Defaults to None.
+            now (float, optional): The current time. Defaults to time.time()
+        """
+        concurrency_limits = concurrency_limits or {}
+        entry = PendingWorkflow(workflow_id, execution_id, start, start_arguments, resume, priority,
+                                tuple(concurrency_limits), now if now is not None else time.time())
+        with self._lock:
+            self._limits.update(concurrency_limits)
+            for key in concurrency_limits:
+                if not self.__is_limited(key):
+                    self.__unhold(key)
+            self.__push_ready(entry)
+
+    def get(self, now=None):
+        """Takes the workflow with the highest aged priority which does not exceed any of its limits off of the queue,
+        and counts it as executing until it is released
+
+        Args:
+            now (float, optional): The current time. Defaults to time.time()
+
+        Returns:
+            (PendingWorkflow): The workflow, or None if no workflow can be executed
+        """
+        now = now if now is not None else time.time()
+        with self._lock:
+            while self._ready_count:
+                priority = max(self._ready, key=lambda priority_: self.__aged_priority(priority_, now))
+                entry = self.__pop_ready(priority)
+                limited_key = next((key for key in entry.concurrency_limits if self.__is_limited(key)), None)
+                if limited_key is not None:
+                    heapq.heappush(self._held.setdefault(limited_key, []),
+                                   (entry.enqueued_at, next(self._counter), entry))
+                    self._held_count += 1
+                    continue
+                self._executing[entry.execution_id] = entry.concurrency_limits
+                for key in entry.concurrency_limits:
+                    self._executing_counts[key] = self._executing_counts.get(key, 0) + 1
+                return entry
+            return None
+
+    def release(self, execution_id):
+        """Stops counting a workflow as executing, for example when it has completed or is paused
+
+        Args:
+            execution_id (str): The execution ID of the workflow
+
+        Returns:
+            (bool): True if workflows held back by the limits of the workflow can now be executed, False otherwise
+        """
+        with self._lock:
+            keys = self._executing.pop(execution_id, None)
+            if keys is None:
+                return False
+            unheld = False
+            for key in keys:
+                count = self._executing_counts.get(key, 0) - 1
+                if count > 0:
+                    self._executing_counts[key] = count
+                else:
+                    self._executing_counts.pop(key, None)
+                unheld = self.__unhold(key) or unheld
+            return unheld
+
+    def empty(self):
+        """Checks if there are no workflows waiting to execute which are not held back by their limits
+
+        Returns:
+            (bool): True if there are no such workflows, False otherwise
+        """
+        return self._ready_count == 0
+
+    def get_statistics(self, now=None):
+        """Gets the number of workflows in the queue
+
+        Args:
+            now (float, optional): The current time. Defaults to time.time()
+
+        Returns:
+            (dict): The number of workflows waiting to execute which are not held back by their limits, the number
+                of seconds the oldest of them has waited, the number of workflows held back by their limits, and the
+                number of workflows counted as executing
+        """
+        now = now if now is not None else time.time()
+        with self._lock:
+            oldest = min(heap[0][0] for heap in self._ready.values()) if self._ready else None
+            return {'ready': self._ready_count,
+                    'oldest_wait': now - oldest if oldest is not None else 0,
+                    'held': self._held_count,
+                    'executing': len(self._executing)}
+
+    def __push_ready(self, entry):
+        heapq.heappush(self._ready.setdefault(entry.priority, []),
+                       (entry.enqueued_at, next(self._counter), entry))
+        self._ready_count += 1
+
+    def __pop_ready(self, priority):
+        heap = self._ready[priority]
+        entry = heapq.heappop(heap)[2]
+        if not heap:
+            del self._ready[priority]
+        self._ready_count -= 1
+        return entry
+
+    def __unhold(self, key):
+        held = self._held.get(key)
+        if not held:
+            return False
+        limit = self._limits.get(key)
+        count = len(held) if limit is None else min(limit - self._executing_counts.get(key, 0), len(held))
+        for _ in range(count):
+            self.__push_ready(heapq.heappop(held)[2])
+        if not held:
+            del self._held[key]
+        self._held_count -= max(count, 0)
+        return count > 0
+
+    def __aged_priority(self, priority, now):
+        enqueued_at, counter, _ = self._ready[priority][0]
+        aging = self.aging if self.aging is not None else walkoff.config.config.workflow_priority_aging
+        aged_priority = priority + (now - enqueued_at) / float(aging) if aging else priority
+        return aged_priority, -counter
+
+    def __is_limited(self, key):
+        limit = self._limits.get(key)
+        return limit is not None and self._executing_counts.get(key, 0) >= limit
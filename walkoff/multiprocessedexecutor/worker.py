@@ -2,24 +2,29 @@ import json
 import logging
 import os
 import signal
+import sys
 import threading
+from functools import partial
 
 import zmq
 import zmq.auth as auth
 from concurrent.futures import ThreadPoolExecutor
-from google.protobuf.json_format import MessageToDict
 from six import string_types
 
+import walkoff.appgateway.appinstancepool
 import walkoff.config.config
 import walkoff.config.paths
 import walkoff.executiondb
 from walkoff import initialize_databases
+from walkoff.appgateway.appinstancepool import AppInstancePool
 from walkoff.appgateway.appinstancerepo import AppInstanceRepo
 from walkoff.events import EventType, WalkoffEvent
 from walkoff.executiondb.argument import Argument
-from walkoff.executiondb.saved_workflow import SavedWorkflow
-from walkoff.executiondb.workflow import Workflow
-from walkoff.proto.build.data_pb2 import Message, CommunicationPacket, ExecuteWorkflowMessage
+from walkoff.executiondb.checkpoint import load_checkpoint, save_checkpoint
+from walkoff.executiondb.workflow import get_executing_workflow, set_executing_workflow
+from walkoff.multiprocessedexecutor.encoding import format_ready_message, pack, proto_to_dict
+from walkoff.multiprocessedexecutor.workflowcache import WorkflowCache
+from walkoff.proto.build.data_pb2 import Message, CommunicationPacket, ExecuteWorkflowBatchMessage
 
 try:
     from Queue import Queue
@@ -29,12 +34,35 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 
-def convert_to_protobuf(sender, workflow, **kwargs):
+def uses_asyncio():
+    """Checks if workers execute workflows on an asyncio event loop, which requires Python 3.7 or later
+
+    Returns:
+        (bool): True if walkoff.config.config.worker_mode is 'asyncio' and asyncio is supported, False otherwise
+    """
+    return walkoff.config.config.worker_mode == 'asyncio' and sys.version_info >= (3, 7)
+
+
+def get_workflow_slots():
+    """Gets the number of workflows each worker executes at the same time
+
+    Returns:
+        (int): walkoff.config.config.asyncio_workflows_per_process if workers execute workflows on an asyncio event
+            loop, otherwise walkoff.config.config.num_threads_per_process
+    """
+    if uses_asyncio():
+        return walkoff.config.config.asyncio_workflows_per_process
+    return walkoff.config.config.num_threads_per_process
+
+
+def convert_to_protobuf(sender, workflow, encoding=Message.JSON, **kwargs):
     """Converts an execution element and its data to a protobuf message.
 
     Args:
         sender (execution element): The execution element object that is sending the data.
         workflow (Workflow): The workflow which is sending the event
+        encoding (Message.Encoding, optional): The encoding of the sender and data. Defaults to JSON. If the data
+            cannot be encoded with msgpack, JSON is used instead.
         kwargs (dict, optional): A dict of extra fields, such as data, callback_name, etc.
 
     Returns:
@@ -44,6 +72,15 @@ def convert_to_protobuf(sender, workflow, **kwargs):
     data = kwargs['data'] if 'data' in kwargs else None
     packet = Message()
     packet.event_name = event.name
+    if encoding == Message.MSGPACK:
+        payload = convert_to_packed_proto(packet, sender, workflow, **kwargs)
+        try:
+            packet.packed_data = pack(payload)
+            return packet.SerializeToString()
+        except (TypeError, ValueError, OverflowError):
+            logger.debug('Could not encode {} event with msgpack. Using JSON instead'.format(event.name))
+            packet = Message()
+            packet.event_name = event.name
     if event.event_type == EventType.workflow:
         convert_workflow_to_proto(packet, workflow, data)
     elif event.event_type == EventType.action:
@@ -58,6 +95,43 @@ def convert_to_protobuf(sender, workflow, **kwargs):
     return packet_bytes
 
 
+def convert_to_packed_proto(packet, sender, workflow, **kwargs):
+    """Sets the type and encoding of a packet which is sent with msgpack, and gets the payload to pack into it
+
+    The payload holds the same sender, workflow, and data which the server would otherwise read out of the fields of
+    the packet and the JSON in them.
+    """
+    event = kwargs['event']
+    payload = {'data': kwargs.get('data')}
+    if event.event_type == EventType.workflow:
+        packet.type = Message.WORKFLOWPACKET
+        payload['sender'] = workflow_to_dict(workflow)
+    elif event.event_type == EventType.action:
+        payload['workflow'] = workflow_to_dict(workflow)
+        if event == WalkoffEvent.SendMessage:
+            packet.type = Message.USERMESSAGE
+            payload['sender'] = {}
+            payload['message'] = {'users': list(kwargs.get('users', [])),
+                                  'roles': list(kwargs.get('roles', [])),
+                                  'requires_reauth': kwargs.get('requires_reauth', False),
+                                  'body': sender['body'],
+                                  'subject': sender.get('subject', '')}
+        else:
+            packet.type = Message.ACTIONPACKET
+            payload['sender'] = action_sender_to_dict(sender)
+    elif event.event_type in (
+            EventType.branch, EventType.condition, EventType.transform, EventType.conditonalexpression):
+        packet.type = Message.GENERALPACKET
+        payload['sender'] = {'id': str(sender.id)}
+        if hasattr(sender, 'app_name'):
+            payload['sender']['app_name'] = sender.app_name
+        payload['workflow'] = workflow_to_dict(workflow)
+    else:
+        payload['sender'] = {}
+    packet.encoding = Message.MSGPACK
+    return payload
+
+
 def convert_workflow_to_proto(packet, sender, data=None):
     packet.type = Message.WORKFLOWPACKET
     workflow_packet = packet.workflow_packet
@@ -102,17 +176,35 @@ def add_sender_to_action_packet_proto(action_packet, sender):
 def add_arguments_to_action_proto(action_packet, sender):
     for argument in sender.arguments:
         arg = action_packet.sender.arguments.add()
-        arg.name = argument.name
-        for field in ('value', 'reference', 'selection'):
-            val = getattr(argument, field)
-            if val is not None:
-                if not isinstance(val, string_types):
-                    try:
-                        setattr(arg, field, json.dumps(val))
-                    except (ValueError, TypeError):
-                        setattr(arg, field, str(val))
-                else:
-                    setattr(arg, field, val)
+        for field, value in argument_to_dict(argument).items():
+            setattr(arg, field, value)
+
+
+def argument_to_dict(argument):
+    ret = {'name': argument.name}
+    for field in ('value', 'reference', 'selection'):
+        val = getattr(argument, field)
+        if val is not None:
+            if not isinstance(val, string_types):
+                try:
+                    ret[field] = json.dumps(val)
+                except (ValueError, TypeError):
+                    ret[field] = str(val)
+            else:
+                ret[field] = val
+    return ret
+
+
+def action_sender_to_dict(sender):
+    ret = {'name': sender.name,
+           'id': str(sender.id),
+           'execution_id': str(sender.get_execution_id()),
+           'app_name': sender.app_name,
+           'action_name': sender.action_name,
+           'device_id': sender.device_id if sender.device_id is not None else -1}
+    if sender.arguments:
+        ret['arguments'] = [argument_to_dict(argument) for argument in sender.arguments]
+    return ret
 
 
 def add_workflow_to_proto(packet, workflow):
@@ -121,6 +213,10 @@ def add_workflow_to_proto(packet, workflow):
     packet.execution_id = str(workflow.get_execution_id())
 
 
+def workflow_to_dict(workflow):
+    return {'name': workflow.name, 'id': str(workflow.id), 'execution_id': str(workflow.get_execution_id())}
+
+
 def convert_branch_transform_condition_to_proto(packet, sender, workflow):
     packet.type = Message.GENERALPACKET
     general_packet = packet.general_packet
@@ -152,6 +248,12 @@ class Worker:
 
         self.thread_exit = False
 
+        if worker_environment_setup:
+            worker_environment_setup()
+        else:
+            walkoff.config.config.initialize()
+            initialize_databases()
+
         server_secret_file = os.path.join(walkoff.config.paths.zmq_private_keys_path, "server.key_secret")
         server_public, server_secret = auth.load_certificate(server_secret_file)
         client_secret_file = os.path.join(walkoff.config.paths.zmq_private_keys_path, "client.key_secret")
@@ -179,27 +281,37 @@ class Worker:
         self.results_sock.curve_publickey = client_public
         self.results_sock.curve_serverkey = server_public
         self.results_sock.connect(walkoff.config.config.zmq_results_address)
-
-        if worker_environment_setup:
-            worker_environment_setup()
-        else:
-            walkoff.config.config.initialize()
-            initialize_databases()
+        self.results_sock_lock = threading.Lock()
+        self.result_encoding = Message.JSON
 
         self.comm_thread = threading.Thread(target=self.receive_data)
         self.comm_thread.start()
 
+        if walkoff.config.config.app_instance_pooling == 'enabled':
+            walkoff.appgateway.appinstancepool.app_instance_pool = AppInstancePool()
+
         self.workflows = {}
-        self.threadpool = ThreadPoolExecutor(max_workers=walkoff.config.config.num_threads_per_process)
+        self.workflow_cache = WorkflowCache()
+        self.threadpool = None
+        self.asyncio_executor = None
+        if uses_asyncio():
+            from walkoff.multiprocessedexecutor.asyncioworker import AsyncioWorkflowExecutor
+            self.asyncio_executor = AsyncioWorkflowExecutor(walkoff.config.config.num_threads_per_process)
+        else:
+            if walkoff.config.config.worker_mode == 'asyncio':
+                logger.warning('The asyncio worker mode requires Python 3.7 or later. Using threads instead')
+            self.threadpool = ThreadPoolExecutor(max_workers=walkoff.config.config.num_threads_per_process)
 
         self.receive_requests()
 
     def exit_handler(self, signum, frame):
-        """Clean up upon receiving a SIGINT or SIGABT.
+        """Clean up upon receiving a SIGINT or SIGABT, or an exit message from the load balancer.
         """
         self.thread_exit = True
         if self.threadpool:
             self.threadpool.shutdown()
+        if self.asyncio_executor:
+            self.asyncio_executor.shutdown(timeout=2)
         if self.comm_thread:
             self.comm_thread.join(timeout=2)
         if self.request_sock:
@@ -208,49 +320,119 @@ class Worker:
             self.results_sock.close()
         if self.comm_sock:
             self.comm_sock.close()
+        if walkoff.appgateway.appinstancepool.app_instance_pool is not None:
+            walkoff.appgateway.appinstancepool.app_instance_pool.clear()
         walkoff.executiondb.execution_db.tear_down()
         os._exit(0)
 
     def receive_requests(self):
-        """Receives requests to execute workflows, and sends them off to worker threads"""
-        self.request_sock.send(b"Ready")
+        """Receives batches of requests to execute workflows, and sends them off to worker threads, until the load
+        balancer tells the worker to exit. The workflows which are executing are then allowed to finish.
+        """
+        self.request_sock.send(format_ready_message())
 
-        while True:
+        while not self.thread_exit:
+            if not self.request_sock.poll(walkoff.config.config.load_balancer_poll_timeout):
+                continue
             message_bytes = self.request_sock.recv()
+            self.execute_workflow_batch(message_bytes)
 
-            message = ExecuteWorkflowMessage()
-            message.ParseFromString(message_bytes)
-            start = message.start if hasattr(message, 'start') else None
+        self.exit_handler(None, None)
 
-            start_arguments = []
-            if hasattr(message, 'arguments'):
-                for arg in message.arguments:
-                    start_arguments.append(Argument(**(MessageToDict(arg, preserving_proto_field_name=True))))
+    def execute_workflow_batch(self, message_bytes):
+        """Submits every workflow in a batch sent by the load balancer to be executed
+
+        Args:
+            message_bytes (bytes): The serialized ExecuteWorkflowBatchMessage
+        """
+        batch = ExecuteWorkflowBatchMessage()
+        batch.ParseFromString(message_bytes)
+        self.result_encoding = batch.result_encoding
 
+        for message in batch.workflows:
+            self.submit_workflow(message)
+
+    def submit_workflow(self, message):
+        """Submits a request to execute a workflow to the thread pool
+
+        Args:
+            message (ExecuteWorkflowMessage): The request to execute the workflow
+        """
+        # An empty start is protobuf's default, so the Workflow's own start Action is used
+        start = message.start if getattr(message, 'start', None) else None
+
+        start_arguments = []
+        if hasattr(message, 'arguments'):
+            for arg in message.arguments:
+                start_arguments.append(Argument(**proto_to_dict(arg)))
+
+        if self.asyncio_executor is not None:
+            self.asyncio_executor.submit(
+                partial(self.checkout_workflow, message.workflow_id, message.workflow_execution_id, message.resume,
+                        message.workflow_version),
+                partial(self.checkin_workflow, workflow_version=message.workflow_version),
+                start=start, start_arguments=start_arguments, resume=message.resume)
+        else:
             self.threadpool.submit(self.execute_workflow_worker, message.workflow_id, message.workflow_execution_id,
-                                   start, start_arguments, message.resume)
+                                   start, start_arguments, message.resume, message.workflow_version)
 
-    def execute_workflow_worker(self, workflow_id, workflow_execution_id, start, start_arguments=None, resume=False):
+    def execute_workflow_worker(self, workflow_id, workflow_execution_id, start, start_arguments=None, resume=False,
+                                workflow_version=0):
         """Execute a workflow.
         """
-        walkoff.executiondb.execution_db.session.expire_all()
-        workflow = walkoff.executiondb.execution_db.session.query(Workflow).filter_by(id=workflow_id).first()
+        workflow = self.checkout_workflow(workflow_id, workflow_execution_id, resume, workflow_version)
+        if workflow is None:
+            return
+
+        set_executing_workflow(workflow)
+        try:
+            workflow.execute(execution_id=workflow_execution_id, start=start, start_arguments=start_arguments,
+                             resume=resume)
+        finally:
+            set_executing_workflow(None)
+            self.checkin_workflow(workflow, workflow_version)
+        return
+
+    def checkout_workflow(self, workflow_id, workflow_execution_id, resume=False, workflow_version=0):
+        """Gets a Workflow ready to be executed, restoring its saved state if it is being resumed
+
+        Args:
+            workflow_id (str): The ID of the workflow
+            workflow_execution_id (str): The execution ID of the workflow
+            resume (bool, optional): Is the workflow being resumed? Defaults to False.
+            workflow_version (int, optional): The version of the workflow. Defaults to 0.
+
+        Returns:
+            (Workflow): The Workflow, or None if it does not exist or has no saved state to resume from
+        """
+        workflow = self.workflow_cache.checkout(workflow_id, workflow_version)
+        if workflow is None:
+            logger.error('Cannot execute workflow {0}. Workflow does not exist'.format(workflow_id))
+            return None
         workflow._execution_id = workflow_execution_id
 
         if resume:
-            saved_state = walkoff.executiondb.execution_db.session.query(SavedWorkflow).filter_by(
-                workflow_execution_id=workflow_execution_id).first()
-            workflow._accumulator = saved_state.accumulator
-            workflow._instance_repo = AppInstanceRepo(saved_state.app_instances)
+            walkoff.executiondb.execution_db.session.expire_all()
+            saved_state, accumulator = load_checkpoint(walkoff.executiondb.execution_db.session, workflow_execution_id)
+            if saved_state is None:
+                logger.error('Cannot resume workflow execution {0}. No saved state found'.format(workflow_execution_id))
+                self.workflow_cache.checkin(workflow, workflow_version)
+                return None
+            workflow._accumulator = accumulator
+            workflow._instance_repo = AppInstanceRepo.from_app_devices(saved_state.app_devices)
 
-        self.workflows[threading.current_thread().name] = workflow
+        self.workflows[workflow_execution_id] = workflow
+        return workflow
 
-        start = start if start else workflow.start
-        workflow.execute(execution_id=workflow_execution_id, start=start, start_arguments=start_arguments,
-                         resume=resume)
+    def checkin_workflow(self, workflow, workflow_version=0):
+        """Returns a Workflow which has finished executing to the cache
 
-        self.workflows.pop(threading.current_thread().name)
-        return
+        Args:
+            workflow (Workflow): The Workflow returned by checkout_workflow
+            workflow_version (int, optional): The version of the workflow. Defaults to 0.
+        """
+        self.workflows.pop(workflow.get_execution_id(), None)
+        self.workflow_cache.checkin(workflow, workflow_version)
 
     def receive_data(self):
         """Constantly receives data from the ZMQ socket and handles it accordingly.
@@ -268,6 +450,7 @@ class Worker:
             message.ParseFromString(message_bytes)
 
             if message.type == CommunicationPacket.EXIT:
+                self.thread_exit = True
                 break
 
             workflow = self.__get_workflow_by_execution_id(message.workflow_execution_id)
@@ -289,23 +472,16 @@ class Worker:
         """
         workflow = self._get_current_workflow()
         if kwargs['event'] in [WalkoffEvent.TriggerActionAwaitingData, WalkoffEvent.WorkflowPaused]:
-            saved_workflow = SavedWorkflow(workflow_execution_id=workflow.get_execution_id(),
-                                           workflow_id=workflow.id,
-                                           action_id=workflow.get_executing_action_id(),
-                                           accumulator=workflow.get_accumulator(),
-                                           app_instances=workflow.get_instances())
-            walkoff.executiondb.execution_db.session.add(saved_workflow)
-            walkoff.executiondb.execution_db.session.commit()
+            save_checkpoint(walkoff.executiondb.execution_db.session, workflow)
 
-        packet_bytes = convert_to_protobuf(sender, workflow, **kwargs)
+        packet_bytes = convert_to_protobuf(sender, workflow, encoding=self.result_encoding, **kwargs)
 
-        self.results_sock.send(packet_bytes)
+        with self.results_sock_lock:
+            self.results_sock.send(packet_bytes)
 
-    def _get_current_workflow(self):
-        return self.workflows[threading.currentThread().name]
+    @staticmethod
+    def _get_current_workflow():
+        return get_executing_workflow()
 
     def __get_workflow_by_execution_id(self, workflow_execution_id):
-        for workflow in self.workflows.values():
-            if workflow.get_execution_id() == workflow_execution_id:
-                return workflow
-        return None
+        return self.workflows.get(workflow_execution_id)
@@ -0,0 +1,129 @@
+import logging
+import threading
+from collections import OrderedDict
+
+import walkoff.config.config
+import walkoff.executiondb
+from walkoff.executiondb.workflow import Workflow
+
+logger = logging.getLogger(__name__)
+
+
+class WorkflowCache(object):
+    """A per-process cache of fully loaded Workflows, keyed by workflow ID and version.
+
+    A loaded Workflow holds the state of a single execution, so it is never shared between threads. Instead, each
+    execution checks out an idle Workflow (loading a new one from the database only if none are idle) and checks it
+    back in when it is finished. When a workflow's version changes, all of its cached Workflows are discarded.
+
+    Args:
+        max_workflows (int, optional): The maximum number of distinct workflows to cache. The least recently used
+            workflow is evicted when this is exceeded. Defaults to walkoff.config.config.workflow_cache_size.
+    """
+
+    def __init__(self, max_workflows=None):
+        self.max_workflows = (max_workflows if max_workflows is not None
+                              else walkoff.config.config.workflow_cache_size)
+        self._lock = threading.Lock()
+        self._versions = {}
+        self._idle = OrderedDict()
+
+    def checkout(self, workflow_id, version=0):
+        """Gets a Workflow ready to be executed
+
+        Args:
+            workflow_id (str): The ID of the workflow
+            version (int, optional): The current version of the workflow. Defaults to 0.
+
+        Returns:
+            (Workflow): The Workflow, or None if it does not exist
+        """
+        workflow_id = str(workflow_id)
+        workflow = None
+        with self._lock:
+            if self._versions.get(workflow_id) != version:
+                self._versions[workflow_id] = version
+                self._idle[workflow_id] = []
+            elif workflow_id in self._idle:
+                idle = self._idle.pop(workflow_id)
+                self._idle[workflow_id] = idle
+                if idle:
+                    workflow = idle.pop()
+
+        if workflow is None:
+            workflow = self._load(workflow_id)
+            if workflow is None:
+                return None
+            logger.debug('Loaded workflow {0} version {1} into cache'.format(workflow_id, version))
+
+        workflow.reset()
+        return workflow
+
+    def checkin(self, workflow, version=0):
+        """Returns a Workflow to the cache after it has finished executing
+
+        Args:
+            workflow (Workflow): The Workflow which was checked out
+            version (int, optional): The version of the workflow when it was checked out. Defaults to 0.
+        """
+        workflow_id = str(workflow.id)
+        with self._lock:
+            if self._versions.get(workflow_id) != version:
+                return
+            self._idle.setdefault(workflow_id, []).append(workflow)
+            while len(self._idle) > self.max_workflows:
+                evicted_id, _ = self._idle.popitem(last=False)
+                self._versions.pop(evicted_id, None)
+
+    def invalidate(self, workflow_id):
+        """Discards all cached Workflows for a workflow
+
+        Args:
+            workflow_id (str): The ID of the workflow
+        """
+        workflow_id = str(workflow_id)
+        with self._lock:
+            self._versions.pop(workflow_id, None)
+            self._idle.pop(workflow_id, None)
+
+    def clear(self):
+        """Discards all cached Workflows
+        """
+        with self._lock:
+            self._versions.clear()
+            self._idle.clear()
+
+    @staticmethod
+    def _load(workflow_id):
+        session = walkoff.executiondb.execution_db.session
+        session.expire_all()
+        workflow = session.query(Workflow).filter_by(id=workflow_id).first()
+        if workflow is None:
+            return None
+        _load_workflow_graph(workflow)
+        session.expunge(workflow)
+        return workflow
+
+
+def _load_workflow_graph(workflow):
+    """Loads every lazily-loaded relationship of a Workflow so that it can be used after being detached from its
+    session
+    """
+    for action in workflow.actions:
+        list(action.arguments)
+        action.position
+        if action.trigger is not None:
+            _load_conditional_expression(action.trigger)
+    for branch in workflow.branches:
+        if branch.condition is not None:
+            _load_conditional_expression(branch.condition)
+
+
+def _load_conditional_expression(expression):
+    expression.parent
+    for condition in expression.conditions:
+        list(condition.arguments)
+        for transform in condition.transforms:
+            list(transform.arguments)
+    for child in expression.child_expressions:
+        _load_conditional_expression(child)
@@ -18,7 +18,7 @@ _sym_db = _symbol_database.Default()
 DESCRIPTOR = _descriptor.FileDescriptor(
   name='data.proto',
   package='core',
-  serialized_pb=_b('\n\ndata.proto\x12\x04\x63ore\"\x83\x03\n\x07Message\x12 \n\x04type\x18\x01 \x01(\x0e\x32\x12.core.Message.Type\x12\x12\n\nevent_name\x18\x02 \x01(\t\x12/\n\x0fworkflow_packet\x18\x03 \x01(\x0b\x32\x14.core.WorkflowPacketH\x00\x12+\n\raction_packet\x18\x04 \x01(\x0b\x32\x12.core.ActionPacketH\x00\x12-\n\x0egeneral_packet\x18\x05 \x01(\x0b\x32\x13.core.GeneralPacketH\x00\x12+\n\x0emessage_packet\x18\x06 \x01(\x0b\x32\x11.core.UserMessageH\x00\"~\n\x04Type\x12\x12\n\x0eWORKFLOWPACKET\x10\x01\x12\x16\n\x12WORKFLOWPACKETDATA\x10\x02\x12\x10\n\x0c\x41\x43TIONPACKET\x10\x03\x12\x14\n\x10\x41\x43TIONPACKETDATA\x10\x04\x12\x11\n\rGENERALPACKET\x10\x05\x12\x0f\n\x0bUSERMESSAGE\x10\x06\x42\x08\n\x06packet\"@\n\x0eWorkflowSender\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\n\n\x02id\x18\x02 \x01(\t\x12\x14\n\x0c\x65xecution_id\x18\x03 \x01(\t\"O\n\x0eWorkflowPacket\x12$\n\x06sender\x18\x01 \x01(\x0b\x32\x14.core.WorkflowSender\x12\x17\n\x0f\x61\x64\x64itional_data\x18\x02 \x01(\t\"M\n\x08\x41rgument\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t\x12\x11\n\treference\x18\x03 \x01(\t\x12\x11\n\tselection\x18\x04 \x01(\t\"\x9e\x02\n\x0c\x41\x63tionPacket\x12/\n\x06sender\x18\x01 \x01(\x0b\x32\x1f.core.ActionPacket.ActionSender\x12&\n\x08workflow\x18\x02 \x01(\x0b\x32\x14.core.WorkflowSender\x12\x17\n\x0f\x61\x64\x64itional_data\x18\x03 \x01(\t\x1a\x9b\x01\n\x0c\x41\x63tionSender\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\n\n\x02id\x18\x02 \x01(\t\x12\x14\n\x0c\x65xecution_id\x18\x03 \x01(\t\x12\x10\n\x08\x61pp_name\x18\x04 \x01(\t\x12\x13\n\x0b\x61\x63tion_name\x18\x05 \x01(\t\x12!\n\targuments\x18\x06 \x03(\x0b\x32\x0e.core.Argument\x12\x11\n\tdevice_id\x18\t \x01(\x05\"\x99\x01\n\rGeneralPacket\x12\x31\n\x06sender\x18\x01 \x01(\x0b\x32!.core.GeneralPacket.GeneralSender\x12&\n\x08workflow\x18\x02 \x01(\x0b\x32\x14.core.WorkflowSender\x1a-\n\rGeneralSender\x12\n\n\x02id\x18\x01 \x01(\t\x12\x10\n\x08\x61pp_name\x18\x02 \x01(\t\"\x8a\x01\n\x13\x43ommunicationPacket\x12,\n\x04type\x18\x01 \x01(\x0e\x32\x1e.core.CommunicationPacket.Type\x12\x1d\n\x15workflow_execution_id\x18\x02 \x01(\t\"&\n\x04Type\x12\t\n\x05PAUSE\x10\x01\x12\x08\n\x04\x45XIT\x10\x02\x12\t\n\x05\x41\x42ORT\x10\x03\"\xbc\x01\n\x0bUserMessage\x12/\n\x06sender\x18\x01 \x01(\x0b\x32\x1f.core.ActionPacket.ActionSender\x12&\n\x08workflow\x18\x02 \x01(\x0b\x32\x14.core.WorkflowSender\x12\x0f\n\x07subject\x18\x03 \x01(\t\x12\x0c\n\x04\x62ody\x18\x04 \x01(\t\x12\x17\n\x0frequires_reauth\x18\x05 \x01(\x08\x12\r\n\x05users\x18\x06 \x03(\x05\x12\r\n\x05roles\x18\x07 \x03(\x05\"\x8e\x01\n\x16\x45xecuteWorkflowMessage\x12\x13\n\x0bworkflow_id\x18\x01 \x01(\t\x12\x1d\n\x15workflow_execution_id\x18\x02 \x01(\t\x12\r\n\x05start\x18\x03 \x01(\t\x12!\n\targuments\x18\x04 \x03(\x0b\x32\x0e.core.Argument\x12\x0e\n\x06resume\x18\x05 \x01(\x08')
+  serialized_pb=_b('\n\ndata.proto\x12\x04\x63ore\"\xeb\x03\n\x07Message\x12 \n\x04type\x18\x01 \x01(\x0e\x32\x12.core.Message.Type\x12\x12\n\nevent_name\x18\x02 \x01(\t\x12/\n\x0fworkflow_packet\x18\x03 \x01(\x0b\x32\x14.core.WorkflowPacketH\x00\x12+\n\raction_packet\x18\x04 \x01(\x0b\x32\x12.core.ActionPacketH\x00\x12-\n\x0egeneral_packet\x18\x05 \x01(\x0b\x32\x13.core.GeneralPacketH\x00\x12+\n\x0emessage_packet\x18\x06 \x01(\x0b\x32\x11.core.UserMessageH\x00\x12.\n\x08\x65ncoding\x18\x07 \x01(\x0e\x32\x16.core.Message.Encoding:\x04JSON\x12\x13\n\x0bpacked_data\x18\x08 \x01(\x0c\"~\n\x04Type\x12\x12\n\x0eWORKFLOWPACKET\x10\x01\x12\x16\n\x12WORKFLOWPACKETDATA\x10\x02\x12\x10\n\x0c\x41\x43TIONPACKET\x10\x03\x12\x14\n\x10\x41\x43TIONPACKETDATA\x10\x04\x12\x11\n\rGENERALPACKET\x10\x05\x12\x0f\n\x0bUSERMESSAGE\x10\x06\"!\n\x08\x45ncoding\x12\x08\n\x04JSON\x10\x01\x12\x0b\n\x07MSGPACK\x10\x02\x42\x08\n\x06packet\"@\n\x0eWorkflowSender\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\n\n\x02id\x18\x02 \x01(\t\x12\x14\n\x0c\x65xecution_id\x18\x03 \x01(\t\"O\n\x0eWorkflowPacket\x12$\n\x06sender\x18\x01 \x01(\x0b\x32\x14.core.WorkflowSender\x12\x17\n\x0f\x61\x64\x64itional_data\x18\x02 \x01(\t\"M\n\x08\x41rgument\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t\x12\x11\n\treference\x18\x03 \x01(\t\x12\x11\n\tselection\x18\x04 \x01(\t\"\x9e\x02\n\x0c\x41\x63tionPacket\x12/\n\x06sender\x18\x01 \x01(\x0b\x32\x1f.core.ActionPacket.ActionSender\x12&\n\x08workflow\x18\x02 \x01(\x0b\x32\x14.core.WorkflowSender\x12\x17\n\x0f\x61\x64\x64itional_data\x18\x03 \x01(\t\x1a\x9b\x01\n\x0c\x41\x63tionSender\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\n\n\x02id\x18\x02 \x01(\t\x12\x14\n\x0c\x65xecution_id\x18\x03 \x01(\t\x12\x10\n\x08\x61pp_name\x18\x04 \x01(\t\x12\x13\n\x0b\x61\x63tion_name\x18\x05 \x01(\t\x12!\n\targuments\x18\x06 \x03(\x0b\x32\x0e.core.Argument\x12\x11\n\tdevice_id\x18\t \x01(\x05\"\x99\x01\n\rGeneralPacket\x12\x31\n\x06sender\x18\x01 \x01(\x0b\x32!.core.GeneralPacket.GeneralSender\x12&\n\x08workflow\x18\x02 \x01(\x0b\x32\x14.core.WorkflowSender\x1a-\n\rGeneralSender\x12\n\n\x02id\x18\x01 \x01(\t\x12\x10\n\x08\x61pp_name\x18\x02 \x01(\t\"\x8a\x01\n\x13\x43ommunicationPacket\x12,\n\x04type\x18\x01 \x01(\x0e\x32\x1e.core.CommunicationPacket.Type\x12\x1d\n\x15workflow_execution_id\x18\x02 \x01(\t\"&\n\x04Type\x12\t\n\x05PAUSE\x10\x01\x12\x08\n\x04\x45XIT\x10\x02\x12\t\n\x05\x41\x42ORT\x10\x03\"\xbc\x01\n\x0bUserMessage\x12/\n\x06sender\x18\x01 \x01(\x0b\x32\x1f.core.ActionPacket.ActionSender\x12&\n\x08workflow\x18\x02 \x01(\x0b\x32\x14.core.WorkflowSender\x12\x0f\n\x07subject\x18\x03 \x01(\t\x12\x0c\n\x04\x62ody\x18\x04 \x01(\t\x12\x17\n\x0frequires_reauth\x18\x05 \x01(\x08\x12\r\n\x05users\x18\x06 \x03(\x05\x12\r\n\x05roles\x18\x07 \x03(\x05\"\xa8\x01\n\x16\x45xecuteWorkflowMessage\x12\x13\n\x0bworkflow_id\x18\x01 \x01(\t\x12\x1d\n\x15workflow_execution_id\x18\x02 \x01(\t\x12\r\n\x05start\x18\x03 \x01(\t\x12!\n\targuments\x18\x04 \x03(\x0b\x32\x0e.core.Argument\x12\x0e\n\x06resume\x18\x05 \x01(\x08\x12\x18\n\x10workflow_version\x18\x06 \x01(\x05\"\x85\x01\n\x1b\x45xecuteWorkflowBatchMessage\x12/\n\tworkflows\x18\x01 \x03(\x0b\x32\x1c.core.ExecuteWorkflowMessage\x12\x35\n\x0fresult_encoding\x18\x02 \x01(\x0e\x32\x16.core.Message.Encoding:\x04JSON')
 )
 _sym_db.RegisterFileDescriptor(DESCRIPTOR)
 
@@ -57,11 +57,33 @@ _MESSAGE_TYPE = _descriptor.EnumDescriptor(
   ],
   containing_type=None,
   options=None,
-  serialized_start=272,
-  serialized_end=398,
+  serialized_start=341,
+  serialized_end=467,
 )
 _sym_db.RegisterEnumDescriptor(_MESSAGE_TYPE)
 
+_MESSAGE_ENCODING = _descriptor.EnumDescriptor(
+  name='Encoding',
+  full_name='core.Message.Encoding',
+  filename=None,
+  file=DESCRIPTOR,
+  values=[
+    _descriptor.EnumValueDescriptor(
+      name='JSON', index=0, number=1,
+      options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='MSGPACK', index=1, number=2,
+      options=None,
+      type=None),
+  ],
+  containing_type=None,
+  options=None,
+  serialized_start=469,
+  serialized_end=502,
+)
+_sym_db.RegisterEnumDescriptor(_MESSAGE_ENCODING)
+
 _COMMUNICATIONPACKET_TYPE = _descriptor.EnumDescriptor(
   name='Type',
   full_name='core.CommunicationPacket.Type',
@@ -83,8 +105,8 @@ _COMMUNICATIONPACKET_TYPE = _descriptor.EnumDescriptor(
   ],
   containing_type=None,
   options=None,
-  serialized_start=1182,
-  serialized_end=1220,
+  serialized_start=1286,
+  serialized_end=1324,
 )
 _sym_db.RegisterEnumDescriptor(_COMMUNICATIONPACKET_TYPE)
 
@@ -138,12 +160,27 @@ _MESSAGE = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       options=None),
+    _descriptor.FieldDescriptor(
+      name='encoding', full_name='core.Message.encoding', index=6,
+      number=7, type=14, cpp_type=8, label=1,
+      has_default_value=True, default_value=1,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='packed_data', full_name='core.Message.packed_data', index=7,
+      number=8, type=12, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b(""),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
   ],
   extensions=[
   ],
   nested_types=[],
   enum_types=[
     _MESSAGE_TYPE,
+    _MESSAGE_ENCODING,
   ],
   options=None,
   is_extendable=False,
@@ -154,7 +191,7 @@ _MESSAGE = _descriptor.Descriptor(
       index=0, containing_type=None, fields=[]),
   ],
   serialized_start=21,
-  serialized_end=408,
+  serialized_end=512,
 )
 
 
@@ -197,8 +234,8 @@ _WORKFLOWSENDER = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=410,
-  serialized_end=474,
+  serialized_start=514,
+  serialized_end=578,
 )
 
 
@@ -234,8 +271,8 @@ _WORKFLOWPACKET = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=476,
-  serialized_end=555,
+  serialized_start=580,
+  serialized_end=659,
 )
 
 
@@ -285,8 +322,8 @@ _ARGUMENT = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=557,
-  serialized_end=634,
+  serialized_start=661,
+  serialized_end=738,
 )
 
 
@@ -357,8 +394,8 @@ _ACTIONPACKET_ACTIONSENDER = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=768,
-  serialized_end=923,
+  serialized_start=872,
+  serialized_end=1027,
 )
 
 _ACTIONPACKET = _descriptor.Descriptor(
@@ -400,8 +437,8 @@ _ACTIONPACKET = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=637,
-  serialized_end=923,
+  serialized_start=741,
+  serialized_end=1027,
 )
 
 
@@ -437,8 +474,8 @@ _GENERALPACKET_GENERALSENDER = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=1034,
-  serialized_end=1079,
+  serialized_start=1138,
+  serialized_end=1183,
 )
 
 _GENERALPACKET = _descriptor.Descriptor(
@@ -473,8 +510,8 @@ _GENERALPACKET = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=926,
-  serialized_end=1079,
+  serialized_start=1030,
+  serialized_end=1183,
 )
 
 
@@ -511,8 +548,8 @@ _COMMUNICATIONPACKET = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=1082,
-  serialized_end=1220,
+  serialized_start=1186,
+  serialized_end=1324,
 )
 
 
@@ -583,8 +620,8 @@ _USERMESSAGE = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=1223,
-  serialized_end=1411,
+  serialized_start=1327,
+  serialized_end=1515,
 )
 
 
@@ -630,6 +667,13 @@ _EXECUTEWORKFLOWMESSAGE = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       options=None),
+    _descriptor.FieldDescriptor(
+      name='workflow_version', full_name='core.ExecuteWorkflowMessage.workflow_version', index=5,
+      number=6, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
   ],
   extensions=[
   ],
@@ -641,8 +685,45 @@ _EXECUTEWORKFLOWMESSAGE = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=1414,
-  serialized_end=1556,
+  serialized_start=1518,
+  serialized_end=1686,
+)
+
+
+_EXECUTEWORKFLOWBATCHMESSAGE = _descriptor.Descriptor(
+  name='ExecuteWorkflowBatchMessage',
+  full_name='core.ExecuteWorkflowBatchMessage',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='workflows', full_name='core.ExecuteWorkflowBatchMessage.workflows', index=0,
+      number=1, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='result_encoding', full_name='core.ExecuteWorkflowBatchMessage.result_encoding', index=1,
+      number=2, type=14, cpp_type=8, label=1,
+      has_default_value=True, default_value=1,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  options=None,
+  is_extendable=False,
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1689,
+  serialized_end=1822,
 )
 
 _MESSAGE.fields_by_name['type'].enum_type = _MESSAGE_TYPE
@@ -650,7 +731,9 @@ _MESSAGE.fields_by_name['workflow_packet'].message_type = _WORKFLOWPACKET
 _MESSAGE.fields_by_name['action_packet'].message_type = _ACTIONPACKET
 _MESSAGE.fields_by_name['general_packet'].message_type = _GENERALPACKET
 _MESSAGE.fields_by_name['message_packet'].message_type = _USERMESSAGE
+_MESSAGE.fields_by_name['encoding'].enum_type = _MESSAGE_ENCODING
 _MESSAGE_TYPE.containing_type = _MESSAGE
+_MESSAGE_ENCODING.containing_type = _MESSAGE
 _MESSAGE.oneofs_by_name['packet'].fields.append(
   _MESSAGE.fields_by_name['workflow_packet'])
 _MESSAGE.fields_by_name['workflow_packet'].containing_oneof = _MESSAGE.oneofs_by_name['packet']
@@ -676,6 +759,8 @@ _COMMUNICATIONPACKET_TYPE.containing_type = _COMMUNICATIONPACKET
 _USERMESSAGE.fields_by_name['sender'].message_type = _ACTIONPACKET_ACTIONSENDER
 _USERMESSAGE.fields_by_name['workflow'].message_type = _WORKFLOWSENDER
 _EXECUTEWORKFLOWMESSAGE.fields_by_name['arguments'].message_type = _ARGUMENT
+_EXECUTEWORKFLOWBATCHMESSAGE.fields_by_name['workflows'].message_type = _EXECUTEWORKFLOWMESSAGE
+_EXECUTEWORKFLOWBATCHMESSAGE.fields_by_name['result_encoding'].enum_type = _MESSAGE_ENCODING
 DESCRIPTOR.message_types_by_name['Message'] = _MESSAGE
 DESCRIPTOR.message_types_by_name['WorkflowSender'] = _WORKFLOWSENDER
 DESCRIPTOR.message_types_by_name['WorkflowPacket'] = _WORKFLOWPACKET
@@ -685,6 +770,7 @@ DESCRIPTOR.message_types_by_name['GeneralPacket'] = _GENERALPACKET
 DESCRIPTOR.message_types_by_name['CommunicationPacket'] = _COMMUNICATIONPACKET
 DESCRIPTOR.message_types_by_name['UserMessage'] = _USERMESSAGE
 DESCRIPTOR.message_types_by_name['ExecuteWorkflowMessage'] = _EXECUTEWORKFLOWMESSAGE
+DESCRIPTOR.message_types_by_name['ExecuteWorkflowBatchMessage'] = _EXECUTEWORKFLOWBATCHMESSAGE
 
 Message = _reflection.GeneratedProtocolMessageType('Message', (_message.Message,), dict(
   DESCRIPTOR = _MESSAGE,
@@ -765,5 +851,12 @@ ExecuteWorkflowMessage = _reflection.GeneratedProtocolMessageType('ExecuteWorkfl
   ))
 _sym_db.RegisterMessage(ExecuteWorkflowMessage)
 
+ExecuteWorkflowBatchMessage = _reflection.GeneratedProtocolMessageType('ExecuteWorkflowBatchMessage', (_message.Message,), dict(
+  DESCRIPTOR = _EXECUTEWORKFLOWBATCHMESSAGE,
+  __module__ = 'data_pb2'
+  # @@protoc_insertion_point(class_scope:core.ExecuteWorkflowBatchMessage)
+  ))
+_sym_db.RegisterMessage(ExecuteWorkflowBatchMessage)
+
 
 # @@protoc_insertion_point(module_scope)
@@ -90,7 +90,14 @@ def create_app():
     walkoff.config.config.initialize()
     register_blueprints(_app)
 
+    @_app.teardown_appcontext
+    def remove_read_session(exception=None):
+        from walkoff import executiondb
+        if executiondb.execution_db is not None:
+            executiondb.execution_db.read_session.remove()
+
     import walkoff.server.workflowresults  # Don't delete this import
+    import walkoff.server.metrics  # Don't delete this import
     import walkoff.messaging.utils  # Don't delete this import
     return _app
 
@@ -1,19 +1,19 @@
+import threading
 from datetime import datetime
 
 from enum import Enum, unique
-from flask import Blueprint, Response
+from flask import Blueprint, Response, request
 from flask_jwt_extended import get_jwt_identity
-from gevent import sleep
-from gevent.event import Event, AsyncResult
 
-from walkoff.helpers import create_sse_event
+import walkoff.config.config
 from walkoff.messaging import MessageActionEvent
 from walkoff.security import jwt_required_in_query
+from walkoff.server.sse import SseStream
 
 notifications_page = Blueprint('notifications_page', __name__)
 
-notification_event_result = AsyncResult()
-sync_signal = Event()
+user_streams = {}
+__user_streams_lock = threading.Lock()
 
 
 @unique
@@ -23,23 +23,29 @@ class NotificationSseEvent(Enum):
     responded = 3
 
 
-def notification_event_stream(user_id):
-    sync_signal.wait()
-    event_id = 1
-    while True:
-        user_ids, event, data = notification_event_result.get()
-        if user_id in user_ids:
-            yield create_sse_event(event_id=event_id, event=event.name, data=data)
-            event_id += 1
-        sync_signal.wait()
+def get_user_stream(user_id):
+    """Gets the stream of notifications for a user, creating it if it does not exist
 
+    Args:
+        user_id (int): The ID of the user
 
-def send_sse(user_id, event, data):
-    notification_event_result.set((user_id, event, data))
-    sleep(0)
-    sync_signal.set()
-    sync_signal.clear()
-    sleep(0)
+    Returns:
+        (SseStream): The user's stream
+    """
+    with __user_streams_lock:
+        if user_id not in user_streams:
+            user_streams[user_id] = SseStream('notifications for user {}'.format(user_id),
+                                              buffer_size=walkoff.config.config.notification_buffer_size)
+        return user_streams[user_id]
+
+
+def notification_event_stream(user_id, last_event_id=None):
+    return get_user_stream(user_id).subscribe(last_event_id=last_event_id)
+
+
+def send_sse(user_ids, event, data):
+    for user_id in user_ids:
+        get_user_stream(user_id).publish(event.name, data)
 
 
 @MessageActionEvent.created.connect
@@ -74,4 +80,5 @@ def message_read_callback(message, **data):
 @jwt_required_in_query('access_token')
 def stream_workflow_success_events():
     user_id = get_jwt_identity()
-    return Response(notification_event_stream(user_id), mimetype='text/event-stream')
+    last_event_id = request.headers.get('Last-Event-ID', request.args.get('last_event_id'))
+    return Response(notification_event_stream(user_id, last_event_id), mimetype='text/event-stream')
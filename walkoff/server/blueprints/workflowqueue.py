@@ -1,47 +1,19 @@
 from datetime import datetime
 
-from flask import Blueprint, Response
-from gevent import sleep
-from gevent.event import Event, AsyncResult
+from flask import Blueprint, Response, request
 
 from walkoff import executiondb
 from walkoff.events import WalkoffEvent
 from walkoff.executiondb import ActionStatusEnum, WorkflowStatusEnum
 from walkoff.executiondb.workflowresults import WorkflowStatus
-from walkoff.helpers import convert_action_argument, create_sse_event
+from walkoff.helpers import convert_action_argument
 from walkoff.security import jwt_required_in_query
+from walkoff.server.sse import SseStream, get_list_argument
 
 workflowqueue_page = Blueprint('workflowqueue_page', __name__)
 
-__action_event_json = AsyncResult()
-__action_signal = Event()
-
-__action_event_id_counter = 0
-
-__workflow_event_json = AsyncResult()
-__workflow_signal = Event()
-
-__workflow_event_id_counter = 0
-
-
-def __action_event_stream():
-    global __action_event_id_counter
-    __action_signal.wait()
-    while True:
-        event_type, data = __action_event_json.get()
-        yield create_sse_event(event_id=__action_event_id_counter, event=event_type, data=data)
-        __action_event_id_counter += 1
-        __action_signal.wait()
-
-
-def __workflow_event_stream():
-    global __workflow_event_id_counter
-    __workflow_signal.wait()
-    while True:
-        event_type, data = __workflow_event_json.get()
-        yield create_sse_event(event_id=__workflow_event_id_counter, event=event_type, data=data)
-        __workflow_event_id_counter += 1
-        __workflow_signal.wait()
+action_stream = SseStream('action')
+workflow_stream = SseStream('workflow status')
 
 
 def format_action_data(sender, kwargs, status):
@@ -63,24 +35,25 @@ def format_action_data_with_results(sender, kwargs, status):
     return result
 
 
-def send_action_result_to_sse(result, event):
-    __action_event_json.set((event, result))
-    sleep(0)
-    __action_signal.set()
-    __action_signal.clear()
-    sleep(0)
+def send_action_result_to_sse(result, event, workflow_id=None):
+    action_stream.publish(event, result, workflow_id=workflow_id, execution_id=str(result['workflow_execution_id']))
+
+
+def __get_workflow_id(kwargs):
+    workflow_id = kwargs['data']['workflow'].get('id')
+    return str(workflow_id) if workflow_id is not None else None
 
 
 @WalkoffEvent.ActionStarted.connect
 def __action_started_callback(sender, **kwargs):
     result = format_action_data(sender, kwargs, ActionStatusEnum.executing)
-    send_action_result_to_sse(result, 'started')
+    send_action_result_to_sse(result, 'started', __get_workflow_id(kwargs))
 
 
 @WalkoffEvent.ActionExecutionSuccess.connect
 def __action_ended_callback(sender, **kwargs):
     result = format_action_data_with_results(sender, kwargs, ActionStatusEnum.success)
-    send_action_result_to_sse(result, 'success')
+    send_action_result_to_sse(result, 'success', __get_workflow_id(kwargs))
 
 
 @WalkoffEvent.ActionExecutionError.connect
@@ -95,7 +68,7 @@ def __action_args_invalid_callback(sender, **kwargs):
 
 def __handle_action_error(sender, kwargs):
     result = format_action_data_with_results(sender, kwargs, ActionStatusEnum.failure)
-    send_action_result_to_sse(result, 'failure')
+    send_action_result_to_sse(result, 'failure', __get_workflow_id(kwargs))
 
 
 def format_workflow_result(sender, status):
@@ -121,11 +94,9 @@ def format_workflow_result_with_current_step(workflow_execution_id, status):
 
 
 def send_workflow_result_to_sse(result, event):
-    __workflow_event_json.set((event, result))
-    sleep(0)
-    __workflow_signal.set()
-    __workflow_signal.clear()
-    sleep(0)
+    workflow_id = result.get('workflow_id')
+    workflow_stream.publish(event, result, workflow_id=str(workflow_id) if workflow_id is not None else None,
+                            execution_id=str(result['execution_id']))
 
 
 @WalkoffEvent.WorkflowExecutionPending.connect
@@ -159,7 +130,7 @@ def __trigger_awaiting_data_callback(sender, **kwargs):
     send_workflow_result_to_sse(result, 'awaiting_data')
     # Send to Action SSE stream as well
     action_result = format_action_data(sender, kwargs, ActionStatusEnum.awaiting_data)
-    send_action_result_to_sse(action_result, 'awaiting_data')
+    send_action_result_to_sse(action_result, 'awaiting_data', __get_workflow_id(kwargs))
 
 
 @WalkoffEvent.TriggerActionTaken.connect
@@ -184,10 +155,17 @@ def __workflow_shutdown_callback(sender, **kwargs):
 @workflowqueue_page.route('/actions', methods=['GET'])
 @jwt_required_in_query('access_token')
 def stream_workflow_action_events():
-    return Response(__action_event_stream(), mimetype='text/event-stream')
+    return Response(__subscribe(action_stream), mimetype='text/event-stream')
 
 
 @workflowqueue_page.route('/workflow_status', methods=['GET'])
 @jwt_required_in_query('access_token')
 def stream_workflow_status():
-    return Response(__workflow_event_stream(), mimetype='text/event-stream')
+    return Response(__subscribe(workflow_stream), mimetype='text/event-stream')
+
+
+def __subscribe(stream):
+    return stream.subscribe(last_event_id=request.headers.get('Last-Event-ID', request.args.get('last_event_id')),
+                            workflow_id=get_list_argument(request.args, 'workflow_id'),
+                            execution_id=get_list_argument(request.args, 'execution_id'),
+                            event=get_list_argument(request.args, 'event'))
@@ -1,11 +1,13 @@
 import json
 
-from flask import request, current_app, send_file
+from flask import request, current_app, Response, stream_with_context
 from flask_jwt_extended import jwt_required
 
 import walkoff.case.database as case_database
 import walkoff.case.subscription as case_subscription
+from walkoff.case.eventwriter import case_event_writer
 from walkoff.case.subscription import delete_cases
+from walkoff.helpers import rfc_datetime_as_utc
 from walkoff.security import permissions_accepted_for_resources, ResourcePermissions
 from walkoff.server.decorators import with_resource_factory
 from walkoff.server.problem import Problem
@@ -13,11 +15,6 @@ from walkoff.server.returncodes import *
 from walkoff.serverdb import db
 from walkoff.serverdb.casesubscription import CaseSubscription
 
-try:
-    from StringIO import StringIO
-except ImportError:
-    from io import StringIO
-
 
 def case_getter(case_id):
     return case_database.case_db.session.query(case_database.Case) \
@@ -73,16 +70,39 @@ def read_case(case_id, mode=None):
     @with_case('read', case_id)
     def __func(case_obj):
         if mode == "export":
-            f = StringIO()
-            f.write(json.dumps(case_obj.as_json(), sort_keys=True, indent=4, separators=(',', ': ')))
-            f.seek(0)
-            return send_file(f, attachment_filename=case_obj.name + '.json', as_attachment=True), SUCCESS
+            case_event_writer.flush()
+            return __stream_case_export(case_obj, __case_export_json_stream, case_obj.name + '.json',
+                                        'application/json'), SUCCESS
+        elif mode == "ndjson":
+            case_event_writer.flush()
+            return __stream_case_export(case_obj, __case_export_ndjson_stream, case_obj.name + '.ndjson',
+                                        'application/x-ndjson'), SUCCESS
         else:
             return case_obj.as_json(), SUCCESS
 
     return __func()
 
 
+def __stream_case_export(case_obj, stream, filename, mimetype):
+    response = Response(stream_with_context(stream(case_obj.id, case_obj.name)), mimetype=mimetype)
+    response.headers['Content-Disposition'] = 'attachment; filename={}'.format(filename)
+    return response
+
+
+def __case_export_json_stream(case_id, case_name):
+    yield '{{"id": {}, "name": {}, "events": ['.format(case_id, json.dumps(case_name))
+    separator = ''
+    for event in case_database.case_db.iter_case_events(case_id):
+        yield separator + json.dumps(event.as_json(), sort_keys=True)
+        separator = ', '
+    yield ']}\n'
+
+
+def __case_export_ndjson_stream(case_id, case_name):
+    for event in case_database.case_db.iter_case_events(case_id):
+        yield json.dumps(event.as_json(), sort_keys=True) + '\n'
+
+
 def update_case():
     @jwt_required
     @permissions_accepted_for_resources(ResourcePermissions('cases', ['update']))
@@ -144,19 +164,20 @@ def delete_case(case_id):
     return __func()
 
 
-def read_all_events(case_id):
+def read_all_events(case_id, limit=None, after=None, start=None, end=None, event_type=None, originator=None):
     @jwt_required
     @permissions_accepted_for_resources(ResourcePermissions('cases', ['read']))
-    def __func():
+    @with_case('read', case_id)
+    def __func(case_obj):
         try:
-            result = case_database.case_db.case_events_as_json(case_id)
-        except Exception:
-            current_app.logger.error('Cannot get events for case {0}. Case does not exist.'.format(case_id))
-            return Problem(
-                OBJECT_DNE_ERROR,
-                'Could not read events for case.',
-                'Case {} does not exist.'.format(case_id))
-
-        return result, SUCCESS
+            start_time = rfc_datetime_as_utc(start)
+            end_time = rfc_datetime_as_utc(end)
+        except ValueError:
+            return Problem(BAD_REQUEST, 'Could not read events for case.', 'Invalid timestamp.')
+        case_event_writer.flush()
+        events = case_database.case_db.get_case_events(
+            case_obj.id, after=after, limit=limit, start=start_time, end=end_time, event_type=event_type,
+            originator=originator)
+        return [event.as_json() for event in events], SUCCESS
 
     return __func()
@@ -5,7 +5,7 @@ from flask_jwt_extended import jwt_required
 
 from walkoff import executiondb
 from walkoff.appgateway.validator import validate_device_fields
-from walkoff.executiondb.device import Device, App
+from walkoff.executiondb.device import Device, App, device_config_cache
 from walkoff.helpers import get_app_device_api, InvalidArgument, UnknownDevice, UnknownApp
 from walkoff.security import permissions_accepted_for_resources, ResourcePermissions
 from walkoff.server.decorators import with_resource_factory
@@ -20,11 +20,15 @@ except ImportError:
 with_device = with_resource_factory(
     'device',
     lambda device_id: executiondb.execution_db.session.query(Device).filter(Device.id == device_id).first())
+with_read_only_device = with_resource_factory(
+    'device',
+    lambda device_id: executiondb.execution_db.read_session.query(Device).filter(Device.id == device_id).first())
 
 
-def get_device_json_with_app_name(device):
+def get_device_json_with_app_name(device, session=None):
+    session = session if session is not None else executiondb.execution_db.session
     device_json = device.as_json()
-    app = executiondb.execution_db.session.query(App).filter(App.id == device.app_id).first()
+    app = session.query(App).filter(App.id == device.app_id).first()
     device_json['app_name'] = app.name if app is not None else ''
     return device_json
 
@@ -33,8 +37,8 @@ def read_all_devices():
     @jwt_required
     @permissions_accepted_for_resources(ResourcePermissions('devices', ['read']))
     def __func():
-        return [get_device_json_with_app_name(device) for device in
-                executiondb.execution_db.session.query(Device).all()], SUCCESS
+        session = executiondb.execution_db.read_session
+        return [get_device_json_with_app_name(device, session) for device in session.query(Device).all()], SUCCESS
 
     return __func()
 
@@ -42,15 +46,16 @@ def read_all_devices():
 def read_device(device_id, mode=None):
     @jwt_required
     @permissions_accepted_for_resources(ResourcePermissions('devices', ['read']))
-    @with_device('read', device_id)
+    @with_read_only_device('read', device_id)
     def __func(device):
+        device_json = get_device_json_with_app_name(device, executiondb.execution_db.read_session)
         if mode == "export":
             f = StringIO()
-            f.write(json.dumps(get_device_json_with_app_name(device), sort_keys=True, indent=4, separators=(',', ': ')))
+            f.write(json.dumps(device_json, sort_keys=True, indent=4, separators=(',', ': ')))
             f.seek(0)
             return send_file(f, attachment_filename=device.name + '.json', as_attachment=True), SUCCESS
         else:
-            return get_device_json_with_app_name(device), SUCCESS
+            return device_json, SUCCESS
 
     return __func()
 
@@ -63,6 +68,7 @@ def delete_device(device_id):
         executiondb.execution_db.session.delete(device)
         current_app.logger.info('Device removed {0}'.format(device_id))
         executiondb.execution_db.session.commit()
+        device_config_cache.invalidate(device_id)
         return None, NO_CONTENT
 
     return __func()
@@ -171,6 +177,7 @@ def _update_device(device, update_device_json, validate_required=True):
             add_configuration_keys_to_device_json(fields, device_fields_api)
         device.update_from_json(update_device_json)
         executiondb.execution_db.session.commit()
+        device_config_cache.invalidate(device.id)
         device_json = get_device_json_with_app_name(device)
         # remove_configuration_keys_from_device_json(device_json)
         return device_json, SUCCESS
@@ -1,3 +1,4 @@
+from flask import Response
 from flask_jwt_extended import jwt_required
 
 from walkoff.security import permissions_accepted_for_resources, ResourcePermissions
@@ -22,29 +23,133 @@ def read_workflow_metrics():
     return __func()
 
 
+def read_metrics_text():
+    @jwt_required
+    @permissions_accepted_for_resources(ResourcePermissions('metrics', ['read']))
+    def __func():
+        return Response(_format_metrics_text(_get_receiver_statistics(), _get_autoscaler_statistics()),
+                        mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+    return __func()
+
+
 def _convert_action_time_averages():
     import walkoff.server.metrics as metrics
     apps_json = []
-    for app_name, app in metrics.app_metrics.items():
-        app_json = {"name": app_name, "count": app['count']}
-        actions = []
-        for action_name, action in app['actions'].items():
-            action_json = {"name": action_name}
-            if 'success' in action:
-                action_json["success_metrics"] = {"count": action['success']['count'],
-                                                  "avg_time": str(action['success']['avg_time'])}
-            if 'error' in action:
-                action_json["error_metrics"] = {"count": action['error']['count'],
-                                                "avg_time": str(action['error']['avg_time'])}
-            actions.append(action_json)
-        app_json["actions"] = actions
-        apps_json.append(app_json)
+    with metrics.metrics_lock:
+        for app_name, app in metrics.app_metrics.items():
+            app_json = {"name": app_name, "count": app['count']}
+            actions = []
+            for action_name, action in app['actions'].items():
+                action_json = {"name": action_name}
+                if 'success' in action:
+                    action_json["success_metrics"] = action['success'].as_json()
+                if 'error' in action:
+                    action_json["error_metrics"] = action['error'].as_json()
+                actions.append(action_json)
+            app_json["actions"] = actions
+            apps_json.append(app_json)
     return {"apps": apps_json}
 
 
 def _convert_workflow_time_averages():
     import walkoff.server.metrics as metrics
-    return {"workflows": [{"name": workflow_name,
-                           "count": workflow["count"],
-                           "avg_time": str(workflow["avg_time"])}
-                          for workflow_name, workflow in metrics.workflow_metrics.items()]}
+    workflows_json = []
+    with metrics.metrics_lock:
+        for workflow_name, workflow in metrics.workflow_metrics.items():
+            workflow_json = metrics.LatencyHistogram().as_json()
+            if 'completed' in workflow:
+                workflow_json = workflow['completed'].as_json()
+            workflow_json['name'] = workflow_name
+            workflow_json['aborted_count'] = workflow['aborted'].count if 'aborted' in workflow else 0
+            if 'queue_wait' in workflow:
+                workflow_json['queue_wait'] = workflow['queue_wait'].as_json()
+            workflows_json.append(workflow_json)
+    return {"workflows": workflows_json, "in_flight": metrics.get_in_flight()}
+
+
+def _get_receiver_statistics():
+    from walkoff.server.context import running_context
+    receiver = running_context.executor.receiver
+    return receiver.get_statistics() if receiver is not None else None
+
+
+def _get_autoscaler_statistics():
+    from walkoff.server.context import running_context
+    autoscaler = running_context.executor.autoscaler
+    return autoscaler.get_statistics() if autoscaler is not None else None
+
+
+def _format_metrics_text(receiver_statistics=None, autoscaler_statistics=None):
+    import walkoff.server.metrics as metrics
+    lines = []
+
+    def add_histogram(name, description, histograms):
+        lines.append('# HELP {} {}'.format(name, description))
+        lines.append('# TYPE {} histogram'.format(name))
+        for labels, histogram in histograms:
+            cumulative = 0
+            for bound, bucket_count in zip(histogram.bounds, histogram.buckets):
+                cumulative += bucket_count
+                lines.append('{}_bucket{} {}'.format(name, _format_labels(labels, le=repr(float(bound))), cumulative))
+            lines.append('{}_bucket{} {}'.format(name, _format_labels(labels, le='+Inf'), histogram.count))
+            lines.append('{}_sum{} {!r}'.format(name, _format_labels(labels), histogram.sum))
+            lines.append('{}_count{} {}'.format(name, _format_labels(labels), histogram.count))
+
+    def add_gauge(name, description, value):
+        lines.append('# HELP {} {}'.format(name, description))
+        lines.append('# TYPE {} gauge'.format(name))
+        lines.append('{} {}'.format(name, value))
+
+    def add_counter(name, description, value):
+        lines.append('# HELP {} {}'.format(name, description))
+        lines.append('# TYPE {} counter'.format(name))
+        lines.append('{} {}'.format(name, value))
+
+    with metrics.metrics_lock:
+        add_histogram('walkoff_action_duration_seconds', 'Execution time of actions',
+                      [((('app', app_name), ('action', action_name), ('status', status)), histogram)
+                       for app_name, app in sorted(metrics.app_metrics.items())
+                       for action_name, action in sorted(app['actions'].items())
+                       for status, histogram in sorted(action.items())])
+        add_histogram('walkoff_workflow_duration_seconds', 'Execution time of workflows',
+                      [((('workflow', workflow_name), ('status', status)), workflow[status])
+                       for workflow_name, workflow in sorted(metrics.workflow_metrics.items())
+                       for status in ('completed', 'aborted') if status in workflow])
+        add_histogram('walkoff_workflow_queue_wait_seconds', 'Time workflows waited to start executing',
+                      [((('workflow', workflow_name),), workflow['queue_wait'])
+                       for workflow_name, workflow in sorted(metrics.workflow_metrics.items())
+                       if 'queue_wait' in workflow])
+        in_flight = metrics.get_in_flight()
+    add_gauge('walkoff_workflows_pending', 'Number of workflows waiting to execute', in_flight['pending_workflows'])
+    add_gauge('walkoff_workflows_executing', 'Number of workflows executing', in_flight['executing_workflows'])
+    add_gauge('walkoff_actions_executing', 'Number of actions executing', in_flight['executing_actions'])
+    if receiver_statistics is not None:
+        add_gauge('walkoff_receiver_queue_depth', 'Number of worker results waiting to be handled',
+                  receiver_statistics['queue_depth'])
+        add_counter('walkoff_receiver_processed_total', 'Number of worker results handled',
+                    receiver_statistics['processed'])
+        add_counter('walkoff_receiver_backpressure_total', 'Number of times receiving worker results was blocked',
+                    receiver_statistics['backpressure'])
+        add_counter('walkoff_receiver_dropped_total', 'Number of worker results which could not be handled',
+                    receiver_statistics['dropped'])
+    if autoscaler_statistics is not None:
+        add_gauge('walkoff_workers', 'Number of worker processes', autoscaler_statistics['workers'])
+        add_gauge('walkoff_workers_draining', 'Number of worker processes being retired',
+                  autoscaler_statistics['draining'])
+        add_counter('walkoff_worker_scale_ups_total', 'Number of times worker processes were started',
+                    autoscaler_statistics['scale_ups'])
+        add_counter('walkoff_worker_scale_downs_total', 'Number of times a worker process was retired',
+                    autoscaler_statistics['scale_downs'])
+    return '\n'.join(lines) + '\n'
+
+
+def _format_labels(labels, **extra_labels):
+    labels = list(labels) + sorted(extra_labels.items())
+    if not labels:
+        return ''
+    return '{' + ','.join('{}="{}"'.format(name, _escape_label_value(value)) for name, value in labels) + '}'
+
+
+def _escape_label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
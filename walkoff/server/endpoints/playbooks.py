@@ -33,17 +33,30 @@ def does_workflow_exist(playbook_id, workflow_id):
         exists().where(and_(Workflow.id == workflow_id, Workflow.playbook_id == playbook_id))).scalar()
 
 
-def playbook_getter(playbook_id):
-    playbook = executiondb.execution_db.session.query(Playbook).filter_by(id=playbook_id).first()
+def playbook_getter(playbook_id, session=None):
+    session = session if session is not None else executiondb.execution_db.session
+    playbook = session.query(Playbook).filter_by(id=playbook_id).first()
     return playbook
 
 
-def workflow_getter(workflow_id):
-    return executiondb.execution_db.session.query(Workflow).filter_by(id=workflow_id).first()
+def workflow_getter(workflow_id, session=None):
+    session = session if session is not None else executiondb.execution_db.session
+    return session.query(Workflow).filter_by(id=workflow_id).first()
+
+
+def invalidate_cached_workflow(workflow_id):
+    from walkoff.server.context import running_context
+    running_context.executor.invalidate_workflow(workflow_id)
 
 
 with_playbook = with_resource_factory('playbook', playbook_getter, validator=is_valid_uid)
 with_workflow = with_resource_factory('workflow', workflow_getter, validator=is_valid_uid)
+with_read_only_playbook = with_resource_factory(
+    'playbook', lambda playbook_id: playbook_getter(playbook_id, executiondb.execution_db.read_session),
+    validator=is_valid_uid)
+with_read_only_workflow = with_resource_factory(
+    'workflow', lambda workflow_id: workflow_getter(workflow_id, executiondb.execution_db.read_session),
+    validator=is_valid_uid)
 validate_workflow_is_registered = validate_resource_exists_factory('workflow', does_workflow_exist)
 
 ALLOWED_EXTENSIONS = {'json', 'playbook'}
@@ -76,7 +89,7 @@ def get_playbooks(full=None):
     @permissions_accepted_for_resources(ResourcePermissions('playbooks', ['read']))
     def __func():
         full_rep = bool(full)
-        playbooks = executiondb.execution_db.session.query(Playbook).all()
+        playbooks = executiondb.execution_db.read_session.query(Playbook).all()
 
         if full_rep:
             ret_playbooks = [playbook_schema.dump(playbook).data for playbook in playbooks]
@@ -119,6 +132,9 @@ def create_playbook(source=None):
                 playbook = playbook.data
                 executiondb.execution_db.session.add(playbook)
                 executiondb.execution_db.session.commit()
+                # Imported playbooks keep the IDs of their workflows, which may have been cached before
+                for workflow in playbook.workflows:
+                    invalidate_cached_workflow(workflow.id)
         except (IntegrityError, StatementError):
             executiondb.execution_db.session.rollback()
             current_app.logger.error('Could not create Playbook {}. Unique constraint failed'.format(playbook_name))
@@ -143,7 +159,7 @@ def create_playbook(source=None):
 def read_playbook(playbook_id, mode=None):
     @jwt_required
     @permissions_accepted_for_resources(ResourcePermissions('playbooks', ['read']))
-    @with_playbook('read', playbook_id)
+    @with_read_only_playbook('read', playbook_id)
     def __func(playbook):
         playbook_json = playbook_schema.dump(playbook).data
         if mode == "export":
@@ -167,6 +183,8 @@ def update_playbook():
     def __func(playbook):
         if 'name' in data and playbook.name != data['name']:
             playbook.name = data['name']
+        if 'max_concurrent_executions' in data:
+            playbook.max_concurrent_executions = data['max_concurrent_executions']
 
         try:
             executiondb.execution_db.session.commit()
@@ -174,6 +192,8 @@ def update_playbook():
             executiondb.execution_db.session.rollback()
             current_app.logger.error('Could not update Playbook {}. Unique constraint failed'.format(playbook_id))
             return unique_constraint_problem('playbook', 'update', playbook_id)
+        for workflow in playbook.workflows:
+            invalidate_cached_workflow(workflow.id)
 
         current_app.logger.info('Playbook {} updated'.format(playbook_id))
 
@@ -187,8 +207,11 @@ def delete_playbook(playbook_id):
     @permissions_accepted_for_resources(ResourcePermissions('playbooks', ['delete']))
     @with_playbook('delete', playbook_id)
     def __func(playbook):
+        workflow_ids = [workflow.id for workflow in playbook.workflows]
         executiondb.execution_db.session.delete(playbook)
         executiondb.execution_db.session.commit()
+        for workflow_id in workflow_ids:
+            invalidate_cached_workflow(workflow_id)
         current_app.logger.info('Deleted playbook {0} '.format(playbook_id))
         return None, NO_CONTENT
 
@@ -211,6 +234,7 @@ def copy_playbook(playbook_id):
         playbook_json['name'] = new_playbook_name
         playbook_json.pop('id')
 
+        # The copied workflows are given new IDs, so there are no cached workflows to invalidate
         if 'workflows' in playbook_json:
             for workflow in playbook_json['workflows']:
                 regenerate_workflow_ids(workflow)
@@ -240,7 +264,7 @@ def get_workflows(playbook=None):
     @permissions_accepted_for_resources(ResourcePermissions('playbooks', ['read']))
     def __get():
         return [workflow_schema.dump(workflow).data for workflow in
-                executiondb.execution_db.session.query(Workflow).all()], SUCCESS
+                executiondb.execution_db.read_session.query(Workflow).all()], SUCCESS
 
     if playbook:
         return get_workflows_for_playbook(playbook)
@@ -250,7 +274,7 @@ def get_workflows(playbook=None):
 def get_workflows_for_playbook(playbook_id):
     @jwt_required
     @permissions_accepted_for_resources(ResourcePermissions('playbooks', ['read']))
-    @with_playbook('read workflows', playbook_id)
+    @with_read_only_playbook('read workflows', playbook_id)
     def __func(playbook):
         return [workflow_schema.dump(workflow).data for workflow in playbook.workflows], SUCCESS
 
@@ -279,6 +303,8 @@ def create_workflow(source=None):
                 playbook.workflows.append(workflow)
                 executiondb.execution_db.session.add(workflow)
                 executiondb.execution_db.session.commit()
+                # Imported workflows keep their IDs, so they may have been cached before
+                invalidate_cached_workflow(workflow.id)
         except invalid_execution_element_exceptions:
             executiondb.execution_db.session.rollback()
             current_app.logger.error('Could not add workflow {0}-{1}'.format(playbook_id, workflow_name))
@@ -299,7 +325,7 @@ def create_workflow(source=None):
 def read_workflow(workflow_id):
     @jwt_required
     @permissions_accepted_for_resources(ResourcePermissions('playbooks', ['read']))
-    @with_workflow('read', workflow_id)
+    @with_read_only_workflow('read', workflow_id)
     def __func(workflow):
         return workflow_schema.dump(workflow).data, SUCCESS
 
@@ -338,6 +364,7 @@ def update_workflow():
             current_app.logger.error('Could not update workflow {}. Unique constraint failed'.format(workflow_id))
             return unique_constraint_problem('workflow', 'update', workflow_id)
 
+        invalidate_cached_workflow(workflow_id)
         current_app.logger.info('Updated workflow {0}'.format(workflow_id))
         return workflow_schema.dump(workflow).data, SUCCESS
 
@@ -359,6 +386,7 @@ def delete_workflow(workflow_id):
             executiondb.execution_db.session.delete(playbook)
 
         executiondb.execution_db.session.commit()
+        invalidate_cached_workflow(workflow_id)
 
         current_app.logger.info('Deleted workflow {0}'.format(workflow_id))
         return None, NO_CONTENT
@@ -383,6 +411,7 @@ def copy_workflow(playbook_id, workflow_id):
         workflow_json.pop('id')
         workflow_json['name'] = new_workflow_name
 
+        # The copy is given new IDs, so there is no cached workflow to invalidate
         regenerate_workflow_ids(workflow_json)
 
         if executiondb.execution_db.session.query(exists().where(Playbook.id == playbook_id)).scalar():
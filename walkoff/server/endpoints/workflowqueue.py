@@ -2,13 +2,14 @@ from collections import OrderedDict
 
 from flask import request, current_app
 from flask_jwt_extended import jwt_required
-from sqlalchemy import exists
+from sqlalchemy import exists, func, and_, or_
 
 from walkoff import executiondb
 from walkoff.executiondb.argument import Argument
+from walkoff.executiondb.statusrecorder import workflow_status_recorder
 from walkoff.executiondb.workflow import Workflow
-from walkoff.executiondb.workflowresults import WorkflowStatus, WorkflowStatusEnum
-from walkoff.helpers import InvalidArgument
+from walkoff.executiondb.workflowresults import WorkflowStatus, WorkflowStatusEnum, ActionStatus
+from walkoff.helpers import InvalidArgument, utc_as_rfc_datetime, rfc_datetime_as_utc
 from walkoff.security import permissions_accepted_for_resources, ResourcePermissions
 from walkoff.server.decorators import with_resource_factory, validate_resource_exists_factory, is_valid_uid
 from walkoff.server.problem import Problem
@@ -16,15 +17,18 @@ from walkoff.server.returncodes import *
 
 
 def does_workflow_exist(workflow_id):
-    return executiondb.execution_db.session.query(exists().where(Workflow.id == workflow_id)).scalar()
+    return executiondb.execution_db.read_session.query(exists().where(Workflow.id == workflow_id)).scalar()
 
 
 def does_execution_id_exist(execution_id):
-    return executiondb.execution_db.session.query(exists().where(WorkflowStatus.execution_id == execution_id)).scalar()
+    workflow_status_recorder.flush()
+    return executiondb.execution_db.read_session.query(
+        exists().where(WorkflowStatus.execution_id == execution_id)).scalar()
 
 
 def workflow_status_getter(execution_id):
-    return executiondb.execution_db.session.query(WorkflowStatus).filter_by(execution_id=execution_id).first()
+    workflow_status_recorder.flush()
+    return executiondb.execution_db.read_session.query(WorkflowStatus).filter_by(execution_id=execution_id).first()
 
 
 with_workflow_status = with_resource_factory('workflow', workflow_status_getter, validator=is_valid_uid)
@@ -40,28 +44,144 @@ executing_statuses = (WorkflowStatusEnum.running, WorkflowStatusEnum.awaiting_da
 completed_statuses = (WorkflowStatusEnum.aborted, WorkflowStatusEnum.completed)
 
 
-def get_all_workflow_status(limit=50):
+listed_statuses = executing_statuses + completed_statuses
+
+workflow_status_columns = (WorkflowStatus.execution_id, WorkflowStatus.workflow_id, WorkflowStatus.name,
+                           WorkflowStatus.status, WorkflowStatus.started_at, WorkflowStatus.completed_at)
+
+
+def get_all_workflow_status(limit=50, after=None, status=None, name=None, workflow_id=None, started_after=None,
+                            started_before=None):
     @jwt_required
     @permissions_accepted_for_resources(ResourcePermissions('playbooks', ['read']))
     def __func():
-        ret = executiondb.execution_db.session.query(WorkflowStatus). \
-            filter(WorkflowStatus.status.in_(executing_statuses)). \
-            order_by(WorkflowStatus.started_at). \
-            all()
+        try:
+            start = rfc_datetime_as_utc(started_after)
+            end = rfc_datetime_as_utc(started_before)
+        except ValueError:
+            return Problem(BAD_REQUEST, 'Could not read workflow statuses.', 'Invalid timestamp.')
+        if not is_valid_uid(*[id_ for id_ in (after, workflow_id) if id_ is not None]):
+            return Problem(BAD_REQUEST, 'Could not read workflow statuses.', 'Invalid ID.')
+        statuses = [WorkflowStatusEnum[status_name] for status_name in status] if status else listed_statuses
+
+        workflow_status_recorder.flush()
+        session = executiondb.execution_db.read_session
+        if not request.args:
+            workflow_statuses = __get_default_workflow_statuses(session, limit)
+        else:
+            query = __filter_workflow_statuses(session.query(*workflow_status_columns), name, workflow_id, start, end)
+            query = query.filter(WorkflowStatus.status.in_(statuses))
+            if after is not None:
+                cursor = session.query(WorkflowStatus.started_at).filter_by(execution_id=after).first()
+                if cursor is None:
+                    return Problem(BAD_REQUEST, 'Could not read workflow statuses.',
+                                   'Workflow execution {} does not exist.'.format(after))
+                query = query.filter(__after_cursor(after, cursor.started_at))
+            workflow_statuses = __newest_first(query).limit(limit).all()
+
+        current_actions = __get_current_actions(
+            session, [workflow_status.execution_id for workflow_status in workflow_statuses
+                      if workflow_status.status != WorkflowStatusEnum.completed])
+        return [__workflow_status_as_json(workflow_status, current_actions.get(workflow_status.execution_id))
+                for workflow_status in workflow_statuses], SUCCESS
+
+    return __func()
 
-        if len(ret) < limit:
-            ret.extend(executiondb.execution_db.session.query(WorkflowStatus).
-                       filter(WorkflowStatus.status.in_(completed_statuses)).
-                       order_by(WorkflowStatus.started_at).
-                       limit(limit - len(ret)).
-                       all())
 
-        ret = [workflow_status.as_json() for workflow_status in ret]
-        return ret, SUCCESS
+def get_workflow_status_counts(name=None, workflow_id=None, started_after=None, started_before=None):
+    @jwt_required
+    @permissions_accepted_for_resources(ResourcePermissions('playbooks', ['read']))
+    def __func():
+        try:
+            start = rfc_datetime_as_utc(started_after)
+            end = rfc_datetime_as_utc(started_before)
+        except ValueError:
+            return Problem(BAD_REQUEST, 'Could not count workflow statuses.', 'Invalid timestamp.')
+        if workflow_id is not None and not is_valid_uid(workflow_id):
+            return Problem(BAD_REQUEST, 'Could not count workflow statuses.', 'Invalid ID.')
+
+        workflow_status_recorder.flush()
+        query = executiondb.execution_db.read_session.query(WorkflowStatus.status, func.count())
+        query = __filter_workflow_statuses(query, name, workflow_id, start, end)
+        counts = {status_.name: 0 for status_ in WorkflowStatusEnum}
+        for status_, count in query.group_by(WorkflowStatus.status):
+            counts[status_.name] = count
+        return counts, SUCCESS
 
     return __func()
 
 
+def __filter_workflow_statuses(query, name, workflow_id, start, end):
+    if name is not None:
+        query = query.filter(WorkflowStatus.name == name)
+    if workflow_id is not None:
+        query = query.filter(WorkflowStatus.workflow_id == workflow_id)
+    if start is not None:
+        query = query.filter(WorkflowStatus.started_at >= start)
+    if end is not None:
+        query = query.filter(WorkflowStatus.started_at <= end)
+    return query
+
+
+def __newest_first(query):
+    return query.order_by(WorkflowStatus.started_at.is_(None),
+                          WorkflowStatus.started_at.desc(),
+                          WorkflowStatus.execution_id.desc())
+
+
+def __get_default_workflow_statuses(session, limit):
+    # Clients which do not page through statuses are always sent every executing workflow, followed by the most recent
+    # completed and aborted workflows up to the limit
+    query = session.query(*workflow_status_columns)
+    workflow_statuses = __newest_first(query.filter(WorkflowStatus.status.in_(executing_statuses))).all()
+    if len(workflow_statuses) < limit:
+        workflow_statuses.extend(__newest_first(query.filter(WorkflowStatus.status.in_(completed_statuses))).
+                                 limit(limit - len(workflow_statuses)).all())
+    return workflow_statuses
+
+
+def __after_cursor(execution_id, started_at):
+    # Statuses are ordered by start time, newest first, then by execution ID, with statuses which have not started last
+    if started_at is None:
+        return and_(WorkflowStatus.started_at.is_(None), WorkflowStatus.execution_id < execution_id)
+    return or_(WorkflowStatus.started_at < started_at,
+               and_(WorkflowStatus.started_at == started_at, WorkflowStatus.execution_id < execution_id),
+               WorkflowStatus.started_at.is_(None))
+
+
+def __get_current_actions(session, execution_ids):
+    if not execution_ids:
+        return {}
+    latest = session.query(ActionStatus._workflow_status_id.label('workflow_status_id'),
+                           func.max(ActionStatus.started_at).label('started_at')). \
+        filter(ActionStatus._workflow_status_id.in_(execution_ids)). \
+        group_by(ActionStatus._workflow_status_id).subquery()
+    actions = session.query(ActionStatus.execution_id, ActionStatus.action_id, ActionStatus.name,
+                            ActionStatus.app_name, ActionStatus.action_name, ActionStatus._workflow_status_id). \
+        join(latest, and_(ActionStatus._workflow_status_id == latest.c.workflow_status_id,
+                          ActionStatus.started_at == latest.c.started_at))
+    return {action._workflow_status_id: {'execution_id': str(action.execution_id),
+                                         'action_id': str(action.action_id),
+                                         'name': action.name,
+                                         'app_name': action.app_name,
+                                         'action_name': action.action_name}
+            for action in actions}
+
+
+def __workflow_status_as_json(workflow_status, current_action):
+    ret = {'execution_id': str(workflow_status.execution_id),
+           'workflow_id': str(workflow_status.workflow_id),
+           'name': workflow_status.name,
+           'status': workflow_status.status.name}
+    if workflow_status.started_at:
+        ret['started_at'] = utc_as_rfc_datetime(workflow_status.started_at)
+    if workflow_status.status in completed_statuses:
+        ret['completed_at'] = utc_as_rfc_datetime(workflow_status.completed_at)
+    if current_action is not None:
+        ret['current_action'] = current_action
+    return ret
+
+
 def get_workflow_status(execution_id):
     @jwt_required
     @permissions_accepted_for_resources(ResourcePermissions('playbooks', ['read']))
@@ -96,7 +216,8 @@ def execute_workflow():
                     'Cannot execute workflow.',
                     'An argument is invalid. Reason: {}'.format(e.message))
 
-        execution_id = running_context.executor.execute_workflow(workflow_id, start=start, start_arguments=arguments)
+        execution_id = running_context.executor.execute_workflow(workflow_id, start=start, start_arguments=arguments,
+                                                                 priority=data.get('priority'))
         current_app.logger.info('Executed workflow {0}'.format(workflow_id))
         return {'id': execution_id}, SUCCESS_ASYNC
 
@@ -1,30 +1,177 @@
-from datetime import datetime
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import datetime, timedelta
 
+import walkoff.config.config
 from walkoff.events import WalkoffEvent
 
+
+def _default_bounds():
+    bounds = []
+    for exponent in range(-3, 5):
+        for multiplier in (1, 1.5, 2, 3, 5, 7):
+            bounds.append(float('{}e{}'.format(multiplier, exponent)))
+    return tuple(bounds)
+
+
+class LatencyHistogram(object):
+    """A histogram of durations with fixed buckets
+
+    Histograms with the same bounds can be merged by adding their counts, so histograms recorded separately, for
+    example by different actions of an app or by different servers, can be combined without losing accuracy.
+
+    Args:
+        bounds (tuple(float), optional): The upper bounds in seconds of the buckets, in increasing order. An additional
+            bucket holds durations greater than the last bound. Defaults to 1, 1.5, 2, 3, 5, and 7 times each power of
+            ten from 1 millisecond to 10000 seconds.
+    """
+    default_bounds = _default_bounds()
+
+    def __init__(self, bounds=None):
+        self.bounds = tuple(bounds) if bounds is not None else LatencyHistogram.default_bounds
+        self.buckets = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, duration):
+        """Records a duration
+
+        Args:
+            duration (float|timedelta): The duration, in seconds if it is a number
+        """
+        if isinstance(duration, timedelta):
+            duration = duration.total_seconds()
+        self.buckets[bisect_left(self.bounds, duration)] += 1
+        self.count += 1
+        self.sum += duration
+        self.min = duration if self.min is None else min(self.min, duration)
+        self.max = duration if self.max is None else max(self.max, duration)
+
+    def merge(self, other):
+        """Adds the durations recorded by another histogram to this one
+
+        Args:
+            other (LatencyHistogram): The other histogram. It must have the same bounds as this one.
+        """
+        if other.bounds != self.bounds:
+            raise ValueError('Cannot merge histograms with different bounds')
+        self.buckets = [count + other_count for count, other_count in zip(self.buckets, other.buckets)]
+        self.count += other.count
+        self.sum += other.sum
+        if other.count:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def mean(self):
+        """Gets the mean of the recorded durations
+
+        Returns:
+            (float): The mean in seconds, or None if no durations have been recorded
+        """
+        return self.sum / self.count if self.count else None
+
+    def percentile(self, percentile):
+        """Estimates a percentile of the recorded durations
+
+        The duration is interpolated linearly within the bucket holding the percentile, and is never less than the
+        smallest or more than the largest recorded duration.
+
+        Args:
+            percentile (float): The percentile, from 0 to 100
+
+        Returns:
+            (float): The estimated duration in seconds, or None if no durations have been recorded
+        """
+        if not self.count:
+            return None
+        rank = percentile / 100.0 * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.buckets):
+            if bucket_count and cumulative + bucket_count >= rank:
+                lower = self.bounds[index - 1] if index > 0 else 0.0
+                upper = self.bounds[index] if index < len(self.bounds) else self.max
+                estimate = lower + (upper - lower) * (rank - cumulative) / bucket_count
+                return min(max(estimate, self.min), self.max)
+            cumulative += bucket_count
+        return self.max
+
+    def as_json(self):
+        """Gets the JSON representation of the histogram
+
+        Durations are formatted as strings of timedeltas.
+
+        Returns:
+            (dict): The number of recorded durations, and their mean, 50th, 90th, and 99th percentiles
+        """
+        return {'count': self.count,
+                'avg_time': _format_duration(self.mean()),
+                'p50_time': _format_duration(self.percentile(50)),
+                'p90_time': _format_duration(self.percentile(90)),
+                'p99_time': _format_duration(self.percentile(99))}
+
+
+def _format_duration(seconds):
+    return str(timedelta(seconds=seconds if seconds is not None else 0))
+
+
 app_metrics = {}
 
 '''
-form of {<app>: {'actions': {<action>: {"success" : {'count': <count>
-                                                     'avg_time': <average_execution_time>}
-                                        "error": {'count': <count>
-                                                  'avg_time': <average_execution_time>}
+form of {<app>: {'actions': {<action>: {'success': <LatencyHistogram>,
+                                        'error': <LatencyHistogram>}},
                  'count': <count>}}
 '''
 
 workflow_metrics = {}
 
 '''
-form  of {<workflow-name>: {'count': <count>, 'avg_time': <average_execution_time>}}
+form of {<workflow-name>: {'completed': <LatencyHistogram>,
+                           'aborted': <LatencyHistogram>,
+                           'queue_wait': <LatencyHistogram>}}
+'''
+
+metrics_lock = threading.RLock()
+'''
+Must be held while reading app_metrics or workflow_metrics
 '''
 
-__action_tmp = {}
-__workflow_tmp = {}
+__action_tmp = OrderedDict()
+__workflow_tmp = OrderedDict()
+__workflow_pending_tmp = OrderedDict()
+
+
+def get_in_flight():
+    """Gets the number of workflows and actions which are currently pending or executing
+
+    Returns:
+        (dict): The number of pending workflows, executing workflows, and executing actions
+    """
+    with metrics_lock:
+        return {'pending_workflows': len(__workflow_pending_tmp),
+                'executing_workflows': len(__workflow_tmp),
+                'executing_actions': len(__action_tmp)}
+
+
+def __track(tmp, execution_id, value):
+    tmp[execution_id] = value
+    while len(tmp) > walkoff.config.config.metrics_max_tracked_executions:
+        tmp.popitem(last=False)
+
+
+def __get_histogram(metrics, key):
+    if key not in metrics:
+        metrics[key] = LatencyHistogram()
+    return metrics[key]
 
 
 @WalkoffEvent.ActionStarted.connect
 def __action_started_callback(sender, **kwargs):
-    __action_tmp[sender['execution_id']] = datetime.utcnow()
+    workflow_execution_id = kwargs['data']['workflow']['execution_id']
+    with metrics_lock:
+        __track(__action_tmp, sender['execution_id'], (datetime.utcnow(), workflow_execution_id))
 
 
 @WalkoffEvent.ActionExecutionSuccess.connect
@@ -46,35 +193,49 @@ def __update_error_action_tracker(execution_id, app, action):
 
 
 def __update_action_tracker(form, execution_id, app, action):
-    if execution_id in __action_tmp:
-        execution_time = datetime.utcnow() - __action_tmp[execution_id]
-        if app not in app_metrics:
-            app_metrics[app] = {'count': 0, 'actions': {}}
-        app_metrics[app]['count'] += 1
-        if action not in app_metrics[app]['actions']:
-            app_metrics[app]['actions'][action] = {form: {'count': 1, 'avg_time': execution_time}}
-        elif form not in app_metrics[app]['actions'][action]:
-            app_metrics[app]['actions'][action][form] = {'count': 1, 'avg_time': execution_time}
-        else:
-            app_metrics[app]['actions'][action][form]['count'] += 1
-            app_metrics[app]['actions'][action][form]['avg_time'] = \
-                (app_metrics[app]['actions'][action][form]['avg_time'] + execution_time) / 2
-        __action_tmp.pop(execution_id)
+    with metrics_lock:
+        if execution_id in __action_tmp:
+            start, _ = __action_tmp.pop(execution_id)
+            if app not in app_metrics:
+                app_metrics[app] = {'count': 0, 'actions': {}}
+            app_metrics[app]['count'] += 1
+            action_metrics = app_metrics[app]['actions'].setdefault(action, {})
+            __get_histogram(action_metrics, form).observe(datetime.utcnow() - start)
+
+
+@WalkoffEvent.WorkflowExecutionPending.connect
+def __workflow_pending_callback(sender, **kwargs):
+    with metrics_lock:
+        __track(__workflow_pending_tmp, sender['execution_id'], datetime.utcnow())
 
 
 @WalkoffEvent.WorkflowExecutionStart.connect
 def __workflow_started_callback(sender, **kwargs):
-    __workflow_tmp[sender['execution_id']] = datetime.utcnow()
+    now = datetime.utcnow()
+    with metrics_lock:
+        if sender['execution_id'] in __workflow_pending_tmp:
+            queue_wait = now - __workflow_pending_tmp.pop(sender['execution_id'])
+            __get_histogram(workflow_metrics.setdefault(sender['name'], {}), 'queue_wait').observe(queue_wait)
+        __track(__workflow_tmp, sender['execution_id'], now)
 
 
 @WalkoffEvent.WorkflowShutdown.connect
 def __workflow_ended_callback(sender, **kwargs):
-    if sender['execution_id'] in __workflow_tmp:
-        execution_time = datetime.utcnow() - __workflow_tmp[sender['execution_id']]
-        if sender['name'] not in workflow_metrics:
-            workflow_metrics[sender['name']] = {'count': 1, 'avg_time': execution_time}
-        else:
-            workflow_metrics[sender['name']]['count'] += 1
-            workflow_metrics[sender['name']]['avg_time'] = (workflow_metrics[sender['name']][
-                                                                'avg_time'] + execution_time) / 2
-        __workflow_tmp.pop(sender['execution_id'])
+    __update_workflow_tracker('completed', sender['execution_id'], sender['name'])
+
+
+@WalkoffEvent.WorkflowAborted.connect
+def __workflow_aborted_callback(sender, **kwargs):
+    __update_workflow_tracker('aborted', sender['execution_id'], sender['name'])
+
+
+def __update_workflow_tracker(form, execution_id, name):
+    with metrics_lock:
+        __workflow_pending_tmp.pop(execution_id, None)
+        unfinished_actions = [action_execution_id for action_execution_id, (_, workflow_execution_id)
+                              in __action_tmp.items() if workflow_execution_id == execution_id]
+        for action_execution_id in unfinished_actions:
+            __action_tmp.pop(action_execution_id)
+        if execution_id in __workflow_tmp:
+            execution_time = datetime.utcnow() - __workflow_tmp.pop(execution_id)
+            __get_histogram(workflow_metrics.setdefault(name, {}), form).observe(execution_time)
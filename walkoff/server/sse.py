@@ -0,0 +1,158 @@
+import logging
+import threading
+from collections import deque
+from itertools import islice
+
+import walkoff.config.config
+from walkoff.helpers import create_sse_event
+
+logger = logging.getLogger(__name__)
+
+
+class SseStream(object):
+    """Broadcasts server-sent events to any number of subscribers
+
+    Published events are given increasing IDs and kept in a ring buffer of the most recent buffer_size events. Each
+    subscriber reads the buffer at its own pace from the ID of the last event it has seen, so publishing never waits
+    for subscribers and a slow subscriber never delays the others. A subscriber which falls more than buffer_size
+    events behind, or which resumes from an ID which is no longer buffered, skips the events it missed and is sent a
+    "dropped" event with the number of events it missed.
+
+    Args:
+        name (str): The name of the stream, used in logs
+        buffer_size (int, optional): The number of events to keep. Defaults to walkoff.config.config.sse_buffer_size
+    """
+
+    def __init__(self, name, buffer_size=None):
+        self.name = name
+        buffer_size = buffer_size if buffer_size is not None else walkoff.config.config.sse_buffer_size
+        self._buffer = deque(maxlen=buffer_size)
+        self._condition = threading.Condition()
+        self.last_event_id = 0
+        self.subscribers = 0
+        self.dropped = 0
+
+    def publish(self, event, data, **attributes):
+        """Publishes an event to all subscribers
+
+        Args:
+            event (str): The name of the event
+            data: The data of the event. It will be sent as JSON.
+            **attributes: Values of the event which subscribers can filter on, for example execution_id. The name of
+                the event can always be filtered on as the "event" attribute.
+
+        Returns:
+            (int): The ID of the event
+        """
+        attributes['event'] = event
+        with self._condition:
+            self.last_event_id += 1
+            self._buffer.append((self.last_event_id, event, data, attributes))
+            self._condition.notify_all()
+            return self.last_event_id
+
+    def read(self, after):
+        """Reads the buffered events published after an event
+
+        Args:
+            after (int): The ID of the last event which has been read
+
+        Returns:
+            (tuple(list[tuple], int)): The buffered events with greater IDs as tuples of their ID, name, data, and
+                attributes, and the number of events after the given ID which are no longer buffered
+        """
+        with self._condition:
+            return self.__read(after)
+
+    def __read(self, after):
+        if not self._buffer:
+            return [], 0
+        first_event_id = self._buffer[0][0]
+        missed = max(0, first_event_id - after - 1)
+        return list(islice(self._buffer, max(0, after + 1 - first_event_id), None)), missed
+
+    def wait(self, after, timeout):
+        """Waits until an event is published after an event
+
+        Args:
+            after (int): The ID of the last event which has been read
+            timeout (float): The maximum number of seconds to wait
+
+        Returns:
+            (tuple(list[tuple], int)): The same as read()
+        """
+        with self._condition:
+            if after == self.last_event_id:
+                self._condition.wait(timeout)
+            return self.__read(after)
+
+    def subscribe(self, last_event_id=None, **filters):
+        """Creates a generator of formatted server-sent events for a subscriber
+
+        Args:
+            last_event_id (int|str, optional): The ID of the last event the subscriber received, usually from the
+                Last-Event-ID header of a reconnecting client. Buffered events after this one are sent first. Defaults
+                to only sending events published after subscribing.
+            **filters (iterable): Only send events whose attribute of the same name is one of these values. Filters
+                which are None or empty are ignored.
+
+        Returns:
+            (generator): A generator of server-sent events, formatted as strings
+        """
+        try:
+            cursor = int(last_event_id) if last_event_id is not None else self.last_event_id
+        except ValueError:
+            cursor = self.last_event_id
+        if cursor > self.last_event_id:
+            cursor = 0  # The client's ID is from before the server restarted
+        filters = {attribute: set(values) for attribute, values in filters.items() if values}
+        return self.__stream(cursor, filters)
+
+    def __stream(self, cursor, filters):
+        with self._condition:
+            self.subscribers += 1
+        try:
+            yield ': connected\n\n'
+            while True:
+                events, missed = self.wait(cursor, walkoff.config.config.sse_heartbeat_interval)
+                if missed:
+                    with self._condition:
+                        self.dropped += missed
+                    logger.warning('Subscriber to {} stream missed {} events'.format(self.name, missed))
+                    yield create_sse_event(event='dropped', data={'count': missed})
+                if not events:
+                    yield ': heartbeat\n\n'
+                    continue
+                for event_id, event, data, attributes in events:
+                    cursor = event_id
+                    if all(attributes.get(attribute) in values for attribute, values in filters.items()):
+                        yield create_sse_event(event_id=event_id, event=event, data=data)
+        finally:
+            with self._condition:
+                self.subscribers -= 1
+
+    def get_statistics(self):
+        """Gets the statistics of the stream
+
+        Returns:
+            (dict): The ID of the last event, the number of buffered events, the number of subscribers, and the total
+                number of events subscribers have missed
+        """
+        with self._condition:
+            return {'last_event_id': self.last_event_id,
+                    'buffered': len(self._buffer),
+                    'subscribers': self.subscribers,
+                    'dropped': self.dropped}
+
+
+def get_list_argument(args, name):
+    """Gets the values of a query argument which may be repeated or comma separated
+
+    Args:
+        args (MultiDict): The query arguments of a request
+        name (str): The name of the argument
+
+    Returns:
+        (list[str]): The values of the argument
+    """
+    return [value for values in args.getlist(name) for value in values.split(',') if value]
@@ -84,7 +84,7 @@ class ScheduledTask(db.Model, TrackModificationsMixIn):
     def _start_workflows(self, trigger=None):
         from walkoff.server.flaskserver import running_context
         trigger = trigger if trigger is not None else construct_trigger(self._reconstruct_scheduler_args())
-        running_context.scheduler.schedule_workflows(self.id, running_context.executor.execute_workflow,
+        running_context.scheduler.schedule_workflows(self.id, running_context.executor.execute_scheduled_workflow,
                                                      self._get_workflow_ids_as_list(), trigger)
 
     def _stop_workflows(self):
@@ -102,7 +102,8 @@ class ScheduledTask(db.Model, TrackModificationsMixIn):
         if self.trigger_type != 'unspecified' and self.status == 'running':
             trigger = trigger if trigger is not None else construct_trigger(self._reconstruct_scheduler_args())
             if new:
-                running_context.scheduler.schedule_workflows(self.id, running_context.executor.execute_workflow, new,
+                running_context.scheduler.schedule_workflows(self.id,
+                                                             running_context.executor.execute_scheduled_workflow, new,
                                                              trigger)
             if removed:
                 running_context.scheduler.unschedule_workflows(self.id, removed)